@@ -0,0 +1,155 @@
+"""
+Compara el ciclo while True sin pausa de las estrategias con el EventDispatcher.
+
+Un hilo productor genera ticks sintéticos (ráfagas separadas por periodos sin actividad, como un mercado real)
+y el consumidor los procesa con cada uno de los dos ciclos. Se mide el tiempo de CPU consumido por el hilo
+consumidor y la latencia de reacción: el tiempo entre que el tick está disponible y que el manejador lo recibe.
+No necesita MetaTrader 5.
+
+Uso:
+    python benchmarks/event_loop_benchmark.py --seconds 10 --symbols 8
+"""
+import os
+import sys
+# Agrega la raíz del repositorio al sys.path para poder importar los modelos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from models.event_dispatcher import EventDispatcher
+
+# Subconjunto de FieldType.ticks_dtype usado por el despachador (enums importa MetaTrader5)
+TICKS_DTYPE = np.dtype([('bid', 'f8'), ('last', 'f8'), ('time_msc', 'i8')])
+
+
+class SyntheticTickSource:
+    """
+    Fuente de ticks en memoria con la misma interfaz que TickStream.poll_all().
+    """
+    def __init__(self, symbols, burst_ticks, burst_gap, idle_seconds, seed=0) -> None:
+        self.symbols = symbols
+        self.burst_ticks = burst_ticks
+        self.burst_gap = burst_gap
+        self.idle_seconds = idle_seconds
+        self._random = random.Random(seed)
+        self._pending = {symbol: [] for symbol in symbols}
+        self._lock = threading.Lock()
+        self._running = False
+        self.produced = 0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+    def _produce(self):
+        price = 34000.0
+        while self._running:
+            # Ráfaga de ticks
+            for _ in range(self.burst_ticks):
+                symbol = self._random.choice(self.symbols)
+                price += self._random.uniform(-1, 1)
+                with self._lock:
+                    self._pending[symbol].append((time.perf_counter(), price))
+                self.produced += 1
+                time.sleep(self.burst_gap)
+            # Mercado quieto
+            time.sleep(self.idle_seconds)
+
+    def poll_all(self):
+        with self._lock:
+            pending = {symbol: ticks for symbol, ticks in self._pending.items() if ticks}
+            for symbol in pending:
+                self._pending[symbol] = []
+
+        received = []
+        for symbol, values in pending.items():
+            ticks = np.zeros(len(values), dtype=TICKS_DTYPE)
+            ticks['bid'] = [price for _, price in values]
+            # Se guarda el instante de publicación en microsegundos para medir la latencia
+            ticks['time_msc'] = [int(created * 1e6) for created, _ in values]
+            received.append((symbol, ticks))
+        return received
+
+
+def run_busy_loop(source, seconds, latencies, call_cost):
+    """
+    Réplica del ciclo actual: consulta la fuente sin ninguna pausa.
+
+    El ciclo actual hace dos llamadas a la terminal por símbolo en cada vuelta (posiciones y precio);
+    call_cost simula la duración de esas llamadas; la espera es activa porque cada llamada serializa
+    la petición y la respuesta en el proceso de Python.
+    """
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        call_end = time.perf_counter() + call_cost * 2 * len(source.symbols)
+        while time.perf_counter() < call_end:
+            pass
+        for symbol, ticks in source.poll_all():
+            now = time.perf_counter()
+            latencies.extend(now - ticks['time_msc'] / 1e6)
+
+
+def run_dispatcher(source, seconds, latencies, poll_interval, idle_interval):
+    end = time.monotonic() + seconds
+    dispatcher = EventDispatcher(
+        tick_source=source,
+        poll_interval=poll_interval,
+        idle_interval=idle_interval,
+        stop_when=lambda: time.monotonic() >= end,
+        stop_check_interval=0.05
+    )
+
+    def on_tick(symbol, ticks):
+        now = time.perf_counter()
+        latencies.extend(now - ticks['time_msc'] / 1e6)
+
+    dispatcher.on_tick(on_tick)
+    dispatcher.run()
+    return dispatcher.stats
+
+
+def measure(name, runner, args):
+    source = SyntheticTickSource(args.symbol_names, args.burst_ticks, args.burst_gap, args.idle)
+    latencies = []
+    source.start()
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    runner(source, latencies)
+    wall = time.perf_counter() - wall_start
+    cpu = time.thread_time() - cpu_start
+    source.stop()
+
+    latencies = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    print(f"{name:<18} cpu={cpu:7.3f}s ({cpu / wall * 100:5.1f}% de un núcleo)  ticks={source.produced:6d}  "
+          f"latencia p50={np.percentile(latencies, 50):6.3f}ms p99={np.percentile(latencies, 99):6.3f}ms max={latencies.max():6.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0, help="Duración de cada medición")
+    parser.add_argument('--symbols', type=int, default=8, help="Número de símbolos sintéticos")
+    parser.add_argument('--burst-ticks', type=int, default=200, help="Ticks por ráfaga")
+    parser.add_argument('--burst-gap', type=float, default=0.002, help="Segundos entre ticks dentro de una ráfaga")
+    parser.add_argument('--idle', type=float, default=1.0, help="Segundos sin actividad entre ráfagas")
+    parser.add_argument('--call-cost', type=float, default=0.0002, help="Segundos de cada llamada a la terminal en el ciclo actual")
+    parser.add_argument('--poll-interval', type=float, default=0.001, help="Cadencia mínima del despachador")
+    parser.add_argument('--idle-interval', type=float, default=0.02, help="Espera máxima del despachador sin eventos")
+    args = parser.parse_args()
+    args.symbol_names = [f"SYM{index}" for index in range(args.symbols)]
+
+    measure("while True", lambda source, latencies: run_busy_loop(source, args.seconds, latencies, args.call_cost), args)
+    measure("EventDispatcher", lambda source, latencies: run_dispatcher(source, args.seconds, latencies, args.poll_interval, args.idle_interval), args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Compara las dos formas de los indicadores de technical_indicators: calculate() (vectorizada) y update() (flujo).
+
+Genera barras M1 sintéticas, verifica que ambas formas den el mismo resultado en todas las barras (diferencia
+relativa máxima por debajo de --tolerance) y mide el tiempo de cada una. Como referencia también se mide recalcular
+el indicador sobre la ventana completa en cada barra, que es lo que haría una estrategia sin la forma de flujo.
+
+Uso:
+    python benchmarks/indicators_benchmark.py --bars 1000000 --period 20
+"""
+import os
+import sys
+# technical_indicators importa 'mt5.enums', relativo a la carpeta models
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models'))
+
+import argparse
+import time
+
+import numpy as np
+
+from technical_indicators import SMA, EMA, RSI, ATR, VWAP, RollingHigh, RollingLow, BollingerBands
+from renko_benchmark import make_rates
+
+
+def stream(indicator, rates, fields):
+    """
+    Actualiza el indicador barra por barra y devuelve sus valores.
+    """
+    columns = [rates[field].tolist() for field in fields]
+    return [indicator.update(*values) for values in zip(*columns)]
+
+
+def max_relative_difference(batch, streamed) -> float:
+    batch = np.asarray(batch, dtype='f8')
+    streamed = np.asarray(streamed, dtype='f8')
+    if not np.array_equal(np.isnan(batch), np.isnan(streamed)):
+        return np.inf
+    valid = ~np.isnan(batch)
+    if not valid.any():
+        return 0.0
+    return float(np.max(np.abs(batch[valid] - streamed[valid]) / np.maximum(np.abs(batch[valid]), 1e-12)))
+
+
+def recompute_per_bar(rates, period, bars):
+    """
+    Recalcula la media simple y la desviación de la ventana completa en cada barra.
+    """
+    close = rates['close'][:bars]
+    for end in range(period, bars + 1):
+        window = close[end - period:end]
+        window.mean()
+        window.std()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bars', type=int, default=1_000_000, help="Número de barras M1")
+    parser.add_argument('--period', type=int, default=20, help="Periodo de los indicadores")
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="Diferencia relativa máxima permitida")
+    args = parser.parse_args()
+
+    rates = make_rates(args.bars)
+    rates['tick_volume'] = np.random.default_rng(1).integers(0, 500, args.bars)
+    period = args.period
+
+    cases = [
+        ("SMA", lambda: SMA.calculate(rates, period), lambda: stream(SMA(period), rates, ['close'])),
+        ("EMA", lambda: EMA.calculate(rates, period), lambda: stream(EMA(period), rates, ['close'])),
+        ("RSI", lambda: RSI.calculate(rates, period), lambda: stream(RSI(period), rates, ['close'])),
+        ("ATR", lambda: ATR.calculate(rates, period), lambda: stream(ATR(period), rates, ['high', 'low', 'close'])),
+        ("VWAP", lambda: VWAP.calculate(rates), lambda: stream(VWAP(), rates, ['high', 'low', 'close', 'tick_volume', 'time'])),
+        ("RollingHigh", lambda: RollingHigh.calculate(rates, period), lambda: stream(RollingHigh(period), rates, ['high'])),
+        ("RollingLow", lambda: RollingLow.calculate(rates, period), lambda: stream(RollingLow(period), rates, ['low'])),
+        ("Bollinger", lambda: BollingerBands.calculate(rates, period)[1], lambda: [upper for _, upper, _ in stream(BollingerBands(period), rates, ['close'])]),
+    ]
+
+    print(f"barras={args.bars} periodo={period}")
+    failed = False
+    for name, batch, streaming in cases:
+        start = time.perf_counter()
+        batch_values = batch()
+        batch_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        stream_values = streaming()
+        stream_seconds = time.perf_counter() - start
+
+        difference = max_relative_difference(batch_values, stream_values)
+        failed |= not difference <= args.tolerance
+        print(f"{name:<12} vectorizado={batch_seconds:7.3f}s  flujo={stream_seconds:7.3f}s "
+              f"({stream_seconds / args.bars * 1e6:5.2f}us por barra)  diferencia={difference:.1e}")
+
+    sample = min(args.bars, 100_000)
+    start = time.perf_counter()
+    recompute_per_bar(rates, period, sample)
+    recompute_seconds = (time.perf_counter() - start) / sample
+    print(f"recalcular media y desviación de la ventana en cada barra: {recompute_seconds * 1e6:5.2f}us por barra")
+
+    if failed:
+        print("ERROR: las formas vectorizada y de flujo no coinciden")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Compara el cálculo vectorizado de vRenko.calculate_renko con el cálculo barra por barra.
+
+Genera barras M1 sintéticas (caminata aleatoria), verifica que ambos cálculos produzcan exactamente el mismo
+arreglo de ladrillos sobre una muestra y mide el tiempo de cada uno. El cálculo barra por barra se mide sobre
+la muestra y se extrapola al total de barras. Por defecto se mide un tamaño exacto en binario (2.5) y uno que no
+lo es (0.7), cuyo redondeo obliga a recalcular algunas barras con la fórmula original.
+
+También mide TickRenko con ticks sintéticos, en ticks por segundo: el historial completo con calculate_renko y
+el flujo en lotes con update_renko, verificando que ambos formen los mismos ladrillos.
+
+Uso:
+    python benchmarks/renko_benchmark.py --bars 10000000 --brick-size 2.5 0.7
+    python benchmarks/renko_benchmark.py --bars 1000000 --brick-size 0.1 --ticks 0
+"""
+import os
+import sys
+# technical_indicators importa 'mt5.enums', relativo a la carpeta models
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models'))
+
+import argparse
+import time
+
+import numpy as np
+
+from technical_indicators import TickRenko, vRenko
+from mt5.enums import FieldType
+
+
+def make_rates(bars: int, seed: int = 0) -> np.ndarray:
+    """
+    Crea barras M1 sintéticas con una caminata aleatoria.
+    """
+    rng = np.random.default_rng(seed)
+    close = np.round(34000 + np.cumsum(rng.normal(0, 3, bars)), 2)
+    open_ = np.concatenate(([34000.0], close[:-1]))
+
+    rates = np.zeros(bars, dtype=FieldType.rates_dtype)
+    rates['time'] = 1_600_000_000 + 60 * np.arange(bars)
+    rates['open'] = open_
+    rates['close'] = close
+    rates['high'] = np.maximum(open_, close) + np.round(rng.random(bars) * 2, 2)
+    rates['low'] = np.minimum(open_, close) - np.round(rng.random(bars) * 2, 2)
+    return rates
+
+
+def make_ticks(count: int, seed: int = 0) -> np.ndarray:
+    """
+    Crea ticks sintéticos con una caminata aleatoria del bid, varios por segundo.
+    """
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(count, dtype=FieldType.ticks_dtype)
+    ticks['time_msc'] = 1_600_000_000_000 + np.cumsum(rng.integers(0, 400, count))
+    ticks['time'] = ticks['time_msc'] // 1000
+    ticks['bid'] = np.round(34000 + np.cumsum(rng.normal(0, 0.5, count)), 2)
+    ticks['ask'] = ticks['bid'] + 1.0
+    ticks['flags'] = 6
+    return ticks
+
+
+def same_bricks(left: np.ndarray, right: np.ndarray) -> bool:
+    return left.shape == right.shape and all(np.array_equal(left[name], right[name]) for name in left.dtype.names)
+
+
+def run(rates: np.ndarray, sample_size: int, brick_size: float):
+    """
+    Verifica y mide un tamaño de ladrillo.
+    """
+    sample = rates[:sample_size]
+
+    # Verificación de equivalencia sobre la muestra
+    vectorized = vRenko(brick_size)
+    vectorized.calculate_renko(sample)
+    reference = vRenko(brick_size)
+    start = time.perf_counter()
+    reference._calculate_renko_rows(sample)
+    rows_seconds = (time.perf_counter() - start) * len(rates) / len(sample)
+    if not same_bricks(vectorized.get_renko_data(), reference.get_renko_data()):
+        print("ERROR: el cálculo vectorizado no coincide con el cálculo barra por barra")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    vectorized.calculate_renko(rates)
+    vectorized_seconds = time.perf_counter() - start
+
+    print(f"barras={len(rates)} ladrillos={len(vectorized.get_renko_data())} tamaño={brick_size}")
+    print(f"barra por barra (extrapolado de {len(sample)} barras): {rows_seconds:9.2f}s")
+    print(f"vectorizado:                                  {vectorized_seconds:9.2f}s")
+    print(f"aceleración: {rows_seconds / vectorized_seconds:.0f}x (resultados idénticos en la muestra)")
+
+
+def run_ticks(ticks: np.ndarray, brick_size: float, batch: int):
+    """
+    Mide TickRenko sobre el historial completo y como flujo en lotes de batch ticks.
+    """
+    renko = TickRenko(brick_size)
+    start = time.perf_counter()
+    renko.calculate_renko(ticks)
+    batch_seconds = time.perf_counter() - start
+
+    stream = TickRenko(brick_size)
+    start = time.perf_counter()
+    for index in range(0, len(ticks), batch):
+        stream.update_renko(ticks[index:index + batch])
+    stream_seconds = time.perf_counter() - start
+    if not same_bricks(renko.get_renko_data(), stream.get_renko_data()):
+        print("ERROR: el flujo de TickRenko no coincide con el cálculo del historial")
+        sys.exit(1)
+
+    print(f"ticks={len(ticks)} ladrillos={len(renko.get_renko_data())} tamaño={brick_size}")
+    print(f"TickRenko historial:              {len(ticks) / batch_seconds:14,.0f} ticks/s")
+    print(f"TickRenko flujo (lotes de {batch:>5}): {len(ticks) / stream_seconds:14,.0f} ticks/s (resultados idénticos)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bars', type=int, default=10_000_000, help="Número de barras M1 del cálculo vectorizado")
+    parser.add_argument('--sample', type=int, default=200_000, help="Barras usadas para el cálculo barra por barra y la verificación")
+    parser.add_argument('--brick-size', type=float, nargs='+', default=[2.5, 0.7], help="Tamaños de ladrillo")
+    parser.add_argument('--ticks', type=int, default=5_000_000, help="Número de ticks de la medición de TickRenko, 0 para omitirla")
+    parser.add_argument('--tick-batch', type=int, default=100, help="Ticks por lote en la medición del flujo de TickRenko")
+    args = parser.parse_args()
+
+    rates = make_rates(args.bars)
+    for brick_size in args.brick_size:
+        run(rates, args.sample, brick_size)
+
+    if args.ticks:
+        ticks = make_ticks(args.ticks)
+        for brick_size in args.brick_size:
+            run_ticks(ticks, brick_size, args.tick_batch)
+
+if __name__ == '__main__':
+    main()
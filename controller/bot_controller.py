@@ -11,10 +11,21 @@ from typing import List, Dict, Any, Tuple
 
 # importaciones para realizar operaciones numéricas eficientes
 import numpy as np
+from numpy import ndarray
 
 # Importacion de los clientes de las apis para hacer solicitudes
 from models.alpaca.client import AlpacaApi
 from models.mt5.client import MT5Api
+from models.mt5.gateway import MT5Gateway, MT5GatewayClient
+from models.mt5.quote_board import QuoteBoard
+from models.mt5.opening_range import OpeningRangeService
+from models.mt5.clock import ClockService
+from models.mt5.positions import PositionsPoller, PositionIndex, positions_to_array
+from models.mt5.stop_modifier import StopModifier
+from models.mt5.position_rules import PositionAction, symbol_values, trailing_stops, partial_exits, recovery_stops, send_modifications
+from models.state_store import SymbolStateStore, SharedSymbolList
+from models.event_dispatcher import EventDispatcher, last_price
+from models.level_triggers import LevelTriggerIndex, LevelSpec, LevelDirection
 from models.mt5.enums import TimeFrame, OrderType
 from models.mt5.models import TradePosition
 
@@ -24,10 +35,9 @@ import re
 # Para trabajo en paralelo
 import multiprocessing
 from multiprocessing import Queue
-from multiprocessing.managers import DictProxy, ListProxy
 
 # Importaciones necesarias para manejar fechas y tiempo
-from datetime import datetime, timedelta
+from datetime import timedelta
 import pytz
 import time
 
@@ -36,14 +46,25 @@ import time
 
 
 class BotController:
-    def __init__(self) -> None:
+    def __init__(self, use_gateway: bool = False, use_quote_board: bool = False) -> None:
         # Estos horarios estan en utc
         self._market_opening_time = {'hour':13, 'minute':30}
         self._market_closed_time = {'hour':19, 'minute':55}
+        # Inicio de la ventana del rango de apertura, que termina con la apertura del mercado
+        self._opening_range_time = {'hour':13, 'minute':0}
         self._alpaca_api = AlpacaApi()
+        
+        # Reloj sincronizado con Alpaca y con el servidor de MT5, se consulta sin red
+        self._clock = ClockService(reference=self._alpaca_api.get_current_market_time)
+        
+        # Si es True, un solo proceso gateway mantiene la conexión con la terminal y atiende a todas las estrategias
+        self._use_gateway = use_gateway
+        
+        # Si es True, un proceso publica las cotizaciones en memoria compartida y las estrategias las leen desde ahí
+        self._use_quote_board = use_quote_board
 
     #region Positions Management
-    def manage_positions(self, strategies: List[object]):
+    def manage_positions(self, strategies: List[object], gateway: MT5GatewayClient = None, positions: PositionsPoller = None, position_index: PositionIndex = None):
         """
         Administra las posiciones abiertas según las estrategias proporcionadas.
 
@@ -51,40 +72,86 @@ class BotController:
         
         Args:
             strategies (List[object]): Una lista de objetos que representan las estrategias a seguir.
+            gateway (MT5GatewayClient, optional): Cliente del gateway de MT5 que usará este proceso.
+            positions (PositionsPoller, optional): La foto compartida de las posiciones, que este proceso actualiza
+                con una sola lectura a la terminal por ciclo.
+            position_index (PositionIndex, optional): El índice de posiciones compartido con las estrategias.
 
         Returns:
             None
         """
         print("Iniciando administrador de posiciones abiertas.")
-        while True:
-            number_of_active_positions = 0
-            number_of_active_strategies = 0
-            all_positions = MT5Api.get_positions()
+        if gateway is not None:
+            MT5Api.use_gateway(gateway)
+        if position_index is None:
+            position_index = PositionIndex()
+        # Un solo modificador de stops en este proceso, con el presupuesto de solicitudes de la terminal
+        modifier = StopModifier()
+        # Mantiene una sola conexión con MetaTrader 5 durante todo el ciclo
+        with MT5Api.session():
+            # Solo se despierta a las estrategias cuando cambian las posiciones abiertas
+            dispatcher = EventDispatcher(
+                positions_source=positions.poll if positions is not None else MT5Api.get_positions,
+                stop_when=lambda: not self._is_in_market_hours()
+            )
+            dispatcher.on_position_change(lambda all_positions: self._dispatch_positions(strategies, all_positions, position_index, modifier))
+            dispatcher.run()
             
-            # Iterar a través de las estrategias proporcionadas
-            for strategy in strategies:
-                # Revisa si la estrategia está activa aún
-                if strategy.symbols:
-                    number_of_active_strategies += 1
-                
-                # Usar una comprensión de lista para filtrar las posiciones que contienen el comentario
-                positions = [position for position in all_positions if strategy.comment in position.comment]
-                if positions:
-                    number_of_active_positions += 1
-                    # Llama al método 'manage_positions' de la estrategia para gestionar las posiciones
-                    strategy.manage_positions(positions)
-
-            # # Si no hay posiciones abiertas ni estrategias activas, sal del bucle
-            # if number_of_active_positions == 0 and number_of_active_strategies == 0:
-            #     print("Sin posiciones abiertas ni estrategias activas.")
-            #     break
-
-            # Salir del bucle si terminó el horario de mercado
-            if not self._is_in_market_hours():
-                print("Finalizó el horario de mercado. Cerrando posiciones abiertas")
-                # Envia una solicitud para cerrar todas las posiciones abiertas
-                MT5Api.send_close_all_position()
-                break
+            # Terminó el horario de mercado
+            print("Finalizó el horario de mercado. Cerrando posiciones abiertas")
+            # Envia una solicitud para cerrar todas las posiciones abiertas
+            MT5Api.send_close_all_position()
+    
+    def _dispatch_positions(self, strategies: List[object], all_positions: Tuple[TradePosition], position_index: PositionIndex, modifier: StopModifier = None):
+        """
+        Entrega a cada estrategia sus posiciones abiertas.
+
+        Args:
+            strategies (List[object]): Una lista de objetos que representan las estrategias a seguir.
+            all_positions (Tuple[TradePosition]): Todas las posiciones abiertas.
+            position_index (PositionIndex): El índice de posiciones por estrategia, se actualiza una vez por foto.
+            modifier (StopModifier, optional): La capa de envío de stops, se actualiza con la foto y se comparte con las estrategias.
+        """
+        # Solo se separan los comentarios de las posiciones nuevas
+        position_index.refresh(all_positions)
+        if modifier is not None:
+            modifier.refresh(all_positions)
+        # Iterar a través de las estrategias proporcionadas
+        for strategy in strategies:
+            # Las posiciones de la estrategia se obtienen del índice, sin recorrer las de las demás estrategias
+            positions = position_index.positions(strategy.comment)
+            if positions:
+                # Llama al método 'manage_positions' de la estrategia para gestionar las posiciones
+                strategy.manage_positions(positions, modifier)
+        if modifier is not None:
+            # Envía los cambios que quedaron pendientes por el presupuesto en ciclos anteriores
+            modifier.flush()
+    
+    def publish_quotes(self, quote_board: QuoteBoard, gateway: MT5GatewayClient = None):
+        """
+        Publica las cotizaciones de los símbolos del tablero mientras dure el horario de mercado.
+
+        Args:
+            quote_board (QuoteBoard): El tablero de cotizaciones compartido con las estrategias.
+            gateway (MT5GatewayClient, optional): Cliente del gateway de MT5 que usará este proceso.
+        """
+        print("Iniciando publicador de cotizaciones.")
+        if gateway is not None:
+            MT5Api.use_gateway(gateway)
+        quote_board.run_publisher(stop_when=lambda: not self._is_in_market_hours())
+    
+    def build_opening_range(self, opening_range: OpeningRangeService, gateway: MT5GatewayClient = None):
+        """
+        Construye el rango de apertura de los símbolos con el flujo de ticks durante la ventana del rango.
+
+        Args:
+            opening_range (OpeningRangeService): El servicio del rango de apertura compartido con las estrategias.
+            gateway (MT5GatewayClient, optional): Cliente del gateway de MT5 que usará este proceso.
+        """
+        print("Iniciando cálculo del rango de apertura.")
+        if gateway is not None:
+            MT5Api.use_gateway(gateway)
+        opening_range.run()
     #endregion
 
     #region utilities
@@ -107,13 +174,13 @@ class BotController:
             else:
                 print("Hoy no hubo mercado.")
         """
-        # Obtiene la hora de apertura y cierre del mercado para el dia de hoy en el horario de estados unidos
-        calendar_today = self._alpaca_api.get_next_days_of_market(0)
+        # Obtiene la hora de apertura y cierre del mercado para el dia de hoy desde el calendario en caché
+        calendar_today = self._alpaca_api.get_session()
         business_hours = {}
-        if calendar_today:
+        if calendar_today is not None:
             # Convierte el open y close al tiempo manejado en utc
-            business_hours['open'] = calendar_today[0].open.astimezone(pytz.utc)
-            business_hours['close'] = calendar_today[0].close.astimezone(pytz.utc)
+            business_hours['open'] = calendar_today.open.astimezone(pytz.utc)
+            business_hours['close'] = calendar_today.close.astimezone(pytz.utc)
             return business_hours
         return business_hours   
     
@@ -124,25 +191,26 @@ class BotController:
         Returns:
             bool: True si se encuentra en horario de mercado, False si no lo está.
         """
-        # Obtener la hora y minutos actuales en UTC
-        current_time = datetime.now(pytz.utc).time()
+        # Obtener la hora y minutos actuales en UTC a partir del reloj sincronizado, sin consultar la red
+        current_time = self._clock.now().time()
 
         # Crear objetos time para el horario de apertura y cierre del mercado
         market_open = current_time.replace(hour=self._market_opening_time['hour'], minute=self._market_opening_time['minute'], second=0)
         market_close = current_time.replace(hour=self._market_closed_time['hour'], minute=self._market_closed_time['minute'], second=0)
 
-        # Verificar si la hora actual está dentro del horario de mercado
-        if market_open <= current_time <= market_close and self._get_business_hours_today():
+        # Verificar si la hora actual está dentro del horario de mercado y si hoy hay sesión según el calendario en caché
+        if market_open <= current_time <= market_close and self._alpaca_api.get_session() is not None:
             return True
         else:
             print("El mercado está cerrado.")
             return False
 
-    def _sleep_to_next_market_opening(self, sleep_in_market:bool = True):
+    def _sleep_to_next_market_opening(self, sleep_in_market:bool = True, minutes_before: int = 0):
         """Espera hasta la próxima apertura del mercado.
 
         Args:
             sleep_in_market (bool): Indica si el método debe ejecutarse durante el mercado abierto (False) o no (True).
+            minutes_before (int): Minutos antes de la apertura en los que termina la espera.
 
         Returns:
             None
@@ -155,7 +223,7 @@ class BotController:
         print("Obteniendo proxima apertura de mercado...")
     
         # Obtener la hora actual en UTC
-        current_time = datetime.now(pytz.utc)
+        current_time = self._clock.now()
         
         # Obtiene los calendarios de mercado desde el día actual hasta 10 días después.
         calendars = self._alpaca_api.get_next_days_of_market(10)
@@ -172,14 +240,14 @@ class BotController:
         print("Hora actual utc: ", current_time)
         print("Apertura del mercado utc: ", next_market_open)
         
-        # Calcular la cantidad de segundos que faltan hasta la apertura
-        seconds_until_open = (next_market_open - current_time).total_seconds()
+        # Calcular la cantidad de segundos que faltan hasta la apertura (o hasta minutes_before minutos antes)
+        seconds_until_open = max((next_market_open - timedelta(minutes=minutes_before) - current_time).total_seconds(), 0)
         
         print(f"Esperando {seconds_until_open} segundos hasta la apertura...")
         time.sleep(seconds_until_open)
     
         # Obtener la hora actual en UTC después de esperar
-        current_time = datetime.now(pytz.utc)
+        current_time = self._clock.now()
         print("Hora actual utc: ", current_time)
 
     def _find_value_in_text(self, text: str, pattern: str):
@@ -228,16 +296,39 @@ class BotController:
         # Establece los symbolos
         symbols= ["US30.cash"] 
         
-        # Crea un administrador
-        manager = multiprocessing.Manager()
-        
         # Abre mt5 y espera 4 segundos
         MT5Api.initialize(4)
         MT5Api.shutdown()
+        
+        # Estima la diferencia con los relojes de Alpaca y del servidor, y la actualiza en segundo plano
+        self._clock.start(symbols)
+        
+        # Crea el gateway que sera el unico dueño de la conexion con la terminal
+        gateway_clients = {'rt_breakout': None, 'em_breakout': None, 'hedge': None, 'manager': None, 'quotes': None, 'opening_range': None, 'main': None}
+        if self._use_gateway:
+            gateway = MT5Gateway()
+            gateway_clients = {name: gateway.create_client() for name in gateway_clients}
+            gateway.start()
+            MT5Api.use_gateway(gateway_clients['main'])
                 
         while True:
             print("")
                                     
+            # Minutos entre el inicio de la ventana del rango de apertura y la apertura del mercado
+            opening_range_minutes = (
+                (self._market_opening_time['hour'] - self._opening_range_time['hour']) * 60
+                + self._market_opening_time['minute'] - self._opening_range_time['minute']
+            )
+            
+            # Espera el inicio de la ventana del rango de apertura
+            # Si el mercado se encuentra abierto continua con el programa
+            self._sleep_to_next_market_opening(sleep_in_market= False, minutes_before= opening_range_minutes)
+            
+            # Crea el servicio compartido del rango de apertura y el proceso que lo construye durante la ventana
+            opening_range = OpeningRangeService(symbols, opening_time=self._opening_range_time, closing_time=self._market_opening_time, create=True, clock=self._clock)
+            opening_range_process = multiprocessing.Process(target=self.build_opening_range, args=(opening_range, gateway_clients['opening_range']))
+            opening_range_process.start()
+            
             # Revisa si aun falta tiempo para la apertura de mercado y espera
             # Si el mercado se encuentra abierto continua con el programa
             self._sleep_to_next_market_opening(sleep_in_market= False)
@@ -245,13 +336,30 @@ class BotController:
             # Se crea una lista que contendra a los objetos de las estrategias creadas
             strategies = []
             
+            # Crea la foto compartida de las posiciones, la actualiza el administrador de posiciones y la leen las estrategias
+            positions = PositionsPoller(create=True)
+            
+            # Índice de las posiciones por estrategia y símbolo, compartido por el administrador de posiciones y las estrategias
+            position_index = PositionIndex()
+            
+            # Crea el tablero de cotizaciones compartido y el proceso que lo publica
+            quote_board = None
+            if self._use_quote_board:
+                quote_board = QuoteBoard(symbols, create=True)
+                quotes_process = multiprocessing.Process(target=self.publish_quotes, args=(quote_board, gateway_clients['quotes']))
+                quotes_process.start()
+            
             
             #region creación de estrategias
+            # Cada estrategia tiene su propio índice de niveles: rt y em operan cada una su propia ruptura del mismo
+            # nivel, por lo que un índice compartido haría que la primera en reclamar el cruce dejara a la otra sin operar.
+            # Dentro de cada índice, un cruce se entrega una sola vez aunque varios procesos o hilos lo consulten a la vez.
             
             #region Real-time breakout
-            # Se crea el objeto de la estrategia breakout en tiempo real
-            symbols_rt_breakout = manager.list(symbols)
-            rt_breakoutTrading = BreakoutTrading(data= manager.dict({}), symbols=symbols_rt_breakout, number_stops= 4, in_real_time= True)
+            # Se crea el estado compartido y el objeto de la estrategia breakout en tiempo real
+            data_rt_breakout = SymbolStateStore(symbols, create=True)
+            triggers_rt_breakout = LevelTriggerIndex(symbols, BreakoutTrading.LEVELS, create=True)
+            rt_breakoutTrading = BreakoutTrading(data= data_rt_breakout, symbols=data_rt_breakout.symbols(), number_stops= 4, in_real_time= True, gateway=gateway_clients['rt_breakout'], quote_board=quote_board, triggers=triggers_rt_breakout, opening_range=opening_range, clock=self._clock, positions=positions, position_index=position_index)
             # Se agrega rt_breakout_symbols
             strategies.append(rt_breakoutTrading)                      
             # Se crea el proceso que incia la estrategia
@@ -263,9 +371,10 @@ class BotController:
             #endregion
             
             #region Every-minute breakout
-            # Se crea el objeto de la estrategia breakout cada minuto
-            symbols_em_breakout = manager.list(symbols)
-            em_breakoutTrading = BreakoutTrading(data= manager.dict({}), symbols=symbols_em_breakout, number_stops= 4, in_real_time= False)
+            # Se crea el estado compartido y el objeto de la estrategia breakout cada minuto
+            data_em_breakout = SymbolStateStore(symbols, create=True)
+            triggers_em_breakout = LevelTriggerIndex(symbols, BreakoutTrading.LEVELS, create=True)
+            em_breakoutTrading = BreakoutTrading(data= data_em_breakout, symbols=data_em_breakout.symbols(), number_stops= 4, in_real_time= False, gateway=gateway_clients['em_breakout'], quote_board=quote_board, triggers=triggers_em_breakout, opening_range=opening_range, clock=self._clock, positions=positions, position_index=position_index)
             # Se agrega rt_breakout_symbols
             strategies.append(em_breakoutTrading)                      
             # Se crea el proceso que incia la estrategia
@@ -277,9 +386,10 @@ class BotController:
             #endregion
             
             #region Hedge
-            # Se crea el objeto de la estrategia hedge 
-            symbols_hedge = manager.list(symbols)
-            hedgeTrading = HedgeTrading(data= manager.dict({}), symbols=symbols_hedge)
+            # Se crea el estado compartido y el objeto de la estrategia hedge 
+            data_hedge = SymbolStateStore(symbols, create=True)
+            triggers_hedge = LevelTriggerIndex(symbols, HedgeTrading.LEVELS, create=True)
+            hedgeTrading = HedgeTrading(data= data_hedge, symbols=data_hedge.symbols(), gateway=gateway_clients['hedge'], quote_board=quote_board, triggers=triggers_hedge, opening_range=opening_range, clock=self._clock, positions=positions, position_index=position_index)
             strategies.append(hedgeTrading)                      
             # Se crea el proceso que incia la estrategia
             hedge_process = multiprocessing.Process(target=hedgeTrading.start)
@@ -293,12 +403,35 @@ class BotController:
             
                             
             # Inicia el proceso que administrara todas las posiciones de todas las estrategias agregadas en tiempo real
-            manage_positions_process = multiprocessing.Process(target=self.manage_positions, args=(strategies,))
+            manage_positions_process = multiprocessing.Process(target=self.manage_positions, args=(strategies, gateway_clients['manager'], positions, position_index))
             manage_positions_process.start()
             # Espera a que termine el proceso
             manage_positions_process.join()
             
-            self._sleep_to_next_market_opening(sleep_in_market= True)
+            # Libera el estado compartido de las estrategias del día
+            rt_breakout_process.join()
+            em_breakout_process.join()
+            hedge_process.join()
+            for data in (data_rt_breakout, data_em_breakout, data_hedge):
+                data.close()
+            for triggers in (triggers_rt_breakout, triggers_em_breakout, triggers_hedge):
+                triggers.close()
+            for strategy in strategies:
+                strategy.close()
+            
+            # Libera la foto compartida de las posiciones del día
+            positions.close()
+            
+            # Libera el rango de apertura del día
+            opening_range_process.join()
+            opening_range.close()
+            
+            # Libera el tablero de cotizaciones del día
+            if quote_board is not None:
+                quotes_process.join()
+                quote_board.close()
+            
+            self._sleep_to_next_market_opening(sleep_in_market= True, minutes_before= opening_range_minutes)
 
     #endregion
 
@@ -307,10 +440,28 @@ class BotController:
 
 
 class BreakoutTrading:
-    def __init__(self, data:DictProxy, symbols: ListProxy, number_stops:int = 4, in_real_time: bool = False) -> None:
+    # Niveles de ruptura de cada símbolo, se disparan una sola vez
+    LEVELS = [LevelSpec('high', LevelDirection.ABOVE), LevelSpec('low', LevelDirection.BELOW)]
+    
+    def __init__(self, data:SymbolStateStore, symbols: SharedSymbolList, number_stops:int = 4, in_real_time: bool = False, gateway: MT5GatewayClient = None, quote_board: QuoteBoard = None, triggers: LevelTriggerIndex = None, opening_range: OpeningRangeService = None, clock: ClockService = None, positions: PositionsPoller = None, position_index: PositionIndex = None) -> None:
         # Estos horarios estan en utc
         self._in_real_time = in_real_time
         
+        # Reloj sincronizado del bot, se consulta sin red
+        self._clock = clock if clock is not None else ClockService()
+        
+        # Foto compartida de las posiciones abiertas, None si las posiciones se consultan a la terminal
+        self._positions = positions
+        
+        # Índice de las posiciones por estrategia y símbolo
+        self._position_index = position_index if position_index is not None else PositionIndex()
+        
+        # Cliente del gateway de MT5, None si el proceso usa la terminal directamente
+        self._gateway = gateway
+        
+        # Tablero de cotizaciones compartido, None si los precios se consultan a la terminal
+        self._quote_board = quote_board
+        
         # Se guarda la lista de símbolos compartida
         self.symbols = symbols
         
@@ -320,6 +471,21 @@ class BreakoutTrading:
         # Variable compartida que se acutalizara entre procesos
         self._data = data 
         
+        # Memoria compartida que la estrategia crea porque no se la entregaron; la libera close()
+        self._owned_resources = []
+        
+        # Índice compartido de los niveles de ruptura armados
+        if triggers is None:
+            triggers = LevelTriggerIndex(list(symbols), self.LEVELS, create=True)
+            self._owned_resources.append(triggers)
+        self._triggers = triggers
+        
+        # Rango de apertura compartido por todas las estrategias
+        if opening_range is None:
+            opening_range = OpeningRangeService(list(symbols), create=True, clock=self._clock)
+            self._owned_resources.append(opening_range)
+        self._opening_range = opening_range
+        
         # El numero de intentos de cada símbolo de enviar una orden
         self._purchase_attempts = {}
         
@@ -348,13 +514,25 @@ class BreakoutTrading:
             order (Dict[str, Any]): Un diccionario que contiene información de la orden a enviar a MetaTrader 5.
 
         Returns:
-            None
+            bool: True si la orden fue enviada, False si falló.
         """
         request = MT5Api.send_order(**order)
         if request is None:
             self._purchase_attempts[order['symbol']] += 1
+            return False
         else:
             self._purchase_attempts[order['symbol']] = 0
+            self._record_sent_order(order)
+            return True
+
+    def _record_sent_order(self, order: Dict[str, Any]):
+        """
+        Registra en el índice de posiciones una orden enviada, para que el contador y el tipo de la siguiente orden
+        no dependan de que la foto compartida ya muestre su posición.
+        """
+        _, counter = PositionIndex.parse_comment(order['comment'])
+        position_type = 0 if order['order_type'] == OrderType.MARKET_BUY else 1
+        self._position_index.record_sent(self.comment, order['symbol'], counter, position_type)
     #endregion
     
     #region Utilities
@@ -372,7 +550,7 @@ class BreakoutTrading:
             None
         """
         # Obtener la hora actual
-        current_time = datetime.now()
+        current_time = self._clock.now()
 
         # Calcular el momento en que comienza el próximo minuto (segundo 1, microsegundo 0)
         next_minute = current_time.replace(second=1, microsecond=0) + timedelta(minutes=1)
@@ -406,7 +584,7 @@ class BreakoutTrading:
             bool: True si se encuentra en horario de mercado, False si no lo está.
         """
         # Obtener la hora y minutos actuales en UTC
-        current_time = datetime.now(pytz.utc).time()
+        current_time = self._clock.now().time()
 
         # Crear objetos time para el horario de apertura y cierre del mercado
         market_open = current_time.replace(hour=self._market_opening_time['hour'], minute=self._market_opening_time['minute'])
@@ -428,12 +606,7 @@ class BreakoutTrading:
         Returns:
             int: El número entero extraído si se encuentra, o None si no se encuentra ningún número en el comentario.
         """
-        parts = comment.split()
-
-        if parts[-1].isdigit():
-            return int(parts[-1])
-        else:
-            return None
+        return PositionIndex.parse_comment(comment)[1]
     
     def get_decimal_part(number)->int:
         """
@@ -458,158 +631,111 @@ class BreakoutTrading:
         else:
             # Si no hay parte decimal, devuelve 0
             return 0
-    #endregion
-        
-    #region Positions Management
     
-    def manage_positions(self, positions: List[TradePosition]):
+    def _get_current_price(self, symbol: str) -> float:
         """
-        Gestiona las posiciones de breakout.
+        Obtiene el precio actual de un símbolo.
+
+        Si hay un tablero de cotizaciones compartido, el precio se lee de la memoria compartida;
+        si no, o si aún no tiene cotización para el símbolo, se consulta a MetaTrader 5.
 
         Args:
-            positions (List[TradePosition]): Lista de posiciones de operaciones.
-        """
-        # Itera sobre todas las posiciones en la lista proporcionada.
-        for position in positions:
-            # Obtiene el símbolo asociado a la posición actual.
-            symbol = position.symbol
-            
-            # Comprueba si el símbolo ya está presente en el diccionario de datos.
-            if symbol in self._data:
-                # Verifica si el campo "tp" de la posición actual es igual a cero.
-                if position.tp == 0:
-                    # Si "tp" es cero, aplica una estrategia de trailing stop adicional.
-                    self._trailing_stop(self._data[symbol]['range'], position)
-                else:
-                    # Si "tp" no es cero, llama a la función "_partial_position" para gestionar la posición parcial.
-                    self._partial_position(position)
+            symbol (str): El símbolo a consultar.
 
-    def _partial_position(self, position: TradePosition):
+        Returns:
+            float: El precio actual del símbolo.
+        """
+        if self._quote_board is not None and self._quote_board.has_symbol(symbol):
+            price = self._quote_board.get_last_price(symbol)
+            if price is not None:
+                return price
+        return MT5Api.get_last_price(symbol)
+    
+    def _get_positions(self, symbol: str) -> Tuple[TradePosition]:
         """
-        Calcula y envía órdenes para gestionar una posición parcial.
+        Obtiene las posiciones abiertas de un símbolo.
+
+        Si hay una foto compartida de las posiciones, se lee de la memoria compartida; si no, se consulta a MetaTrader 5.
 
         Args:
-            position (TradePosition): La posición de trading actual.
+            symbol (str): El símbolo a consultar.
 
         Returns:
-            None
+            Tuple[TradePosition]: Las posiciones abiertas del símbolo.
         """
-        # Obtiene el símbolo asociado a la posición actual.
-        symbol = position.symbol
-        # Obtiene los datos relacionados con el símbolo de trading.
-        symbol_data = self._data[symbol]
-        # Obtiene el precio de apertura y el precio actual de la posición.
-        price_open = position.price_open
-        price_current = position.price_current
-        # Obtiene el valor de "take_profit" de la posición.
-        take_profit = position.tp
-        # Calcula la diferencia de precio entre "take_profit" y el precio de apertura.
-        profit_range = abs(take_profit - price_open)
-
-        # Verifica si "first_volume" y "stop_level" no están presentes en los datos del símbolo y los inicializa si no lo están.
-        if "first_volume" not in symbol_data and "stop_level" not in symbol_data:
-            # Inicializa valores iniciales para la posición parcial.
-            symbol_data['first_volume'] = position.volume
-            # Calcula el valor de "take_profit" según el tipo de posición.
-            if position.type == 0:
-                symbol_data['previous_stop_level'] = abs((symbol_data['range'] * 2) - take_profit)
-            else:
-                symbol_data['previous_stop_level'] = abs((symbol_data['range'] * 2) + take_profit)
-            # Actualiza los valores en el diccionario compartido self._data.
-            self._data.update({symbol: symbol_data})
-
-        # Obtiene el número de posición parcial desde el comentario de la posición.
-        partial_position_number = self.get_number_in_comment(position.comment)
-
-        # Calcula el porcentaje de volumen a vender para esta posición parcial.
-        percentage = self._percentage_piece * partial_position_number
-        # Calcula el siguiente rango parcial basado en el porcentaje de ganancia y el rango de ganancia.
-        next_partial_range = percentage * profit_range
-
-        # Calcula el nivel de stop loss basado en el tipo de posición y el rango parcial.
-        if position.type == 0:
-            stop_level = price_open + next_partial_range
-            # Verifica si el nivel de stop es menor que el precio actual antes de enviar la orden.
-            if stop_level < price_current:
-                # Llama a la función para preparar y enviar una orden parcial.
-                self._prepare_and_send_partial_order(symbol_data, position, stop_level, partial_position_number)
-        else:
-            stop_level = price_open - next_partial_range
-            # Verifica si el nivel de stop es mayor que el precio actual antes de enviar la orden.
-            if stop_level > price_current:
-                # Llama a la función para preparar y enviar una orden parcial.
-                self._prepare_and_send_partial_order(symbol_data, position, stop_level, partial_position_number)
-
-    def _prepare_and_send_partial_order(self, symbol_data: Dict[str, Any], position: TradePosition, stop_level, partial_position_number: int):
+        if self._positions is not None:
+            return self._positions.get_positions(symbol)
+        return MT5Api.get_positions(symbol)
+    
+    def _get_strategy_positions(self, symbol: str) -> List[TradePosition]:
         """
-        Prepara y envía una orden para una posición parcial.
+        Obtiene las posiciones abiertas de la estrategia en un símbolo, en el orden en que se abrieron.
 
         Args:
-            symbol_data (Dict[str, Any]): Datos relacionados con el símbolo de trading.
-            position (TradePosition): La posición de trading actual.
-            stop_level: Nivel de stop loss para la posición parcial.
-            partial_position_number (int): Número de la posición parcial.
+            symbol (str): El símbolo a consultar.
 
         Returns:
-            None
+            List[TradePosition]: Las posiciones de la estrategia en el símbolo.
+        """
+        self._position_index.refresh(self._get_positions(symbol), symbol)
+        return self._position_index.positions(self.comment, symbol)
+    #endregion
+        
+    #region Positions Management
+    
+    def manage_positions(self, positions: List[TradePosition], modifier: StopModifier = None):
         """
-        # Obtiene el símbolo del diccionario de datos.
-        symbol = symbol_data['symbol']
-        # Calcula el número de la siguiente posición parcial.
-        next_partial_position_number = partial_position_number + 1
-        # Calcula el nuevo volumen para la venta parcial.
-        new_volume = round(symbol_data['first_volume'] * self._percentage_piece, symbol_data['decimals'])
-        # Crea un nuevo comentario para la orden con el número de la posición parcial.
-        new_comment = self.comment + " " + str(next_partial_position_number)
-
-        # Envía la orden de venta parcial.
-        MT5Api.send_sell_partial_order(symbol, new_volume, position.ticket, new_comment)
-        # Mueve el stop loss al nivel anterior.
-        new_stop_loss = symbol_data['previous_stop_level']
-        # Actualiza el stop loss en MT5.
-        is_change_completed = MT5Api.send_change_stop_loss(symbol, new_stop_loss, position.ticket)
-        # En caso de ser la última posición parcial, elimina el take profit para iniciar el trailing stop.
-        if is_change_completed and next_partial_position_number == self.number_stops:
-            # Elimina el take profit.
-            MT5Api.send_change_take_profit(symbol, 0.0, position.ticket)
-        # Actualiza el nuevo "previous_stop_level" con el "stop_level" actual.
-        symbol_data['previous_stop_level'] = stop_level
-        # Actualiza los valores en el diccionario compartido self._data.
-        self._data.update({symbol: symbol_data})
-        
-    def _trailing_stop(self, range: float, position: TradePosition):
-        """
-        Aplica un trailing stop a una posición.
+        Gestiona las posiciones de breakout.
 
-        Args:
-            range (float): El rango para calcular el trailing stop.
-            position (TradePosition): La posición de la operación.
+        Las salidas parciales y el trailing stop de todas las posiciones se calculan en una sola pasada vectorizada;
+        solo se envían a la terminal las modificaciones resultantes.
 
-        Esta función calcula y aplica un trailing stop a una posición en función del rango especificado.
+        Args:
+            positions (List[TradePosition]): Lista de posiciones de operaciones, o un arreglo POSITION_DTYPE.
+            modifier (StopModifier, optional): La capa de envío de stops del administrador de posiciones.
         """
-        # Se calcula la distancia del trailing stop con el rango especificado
-        trailing_stop_distance = range  * 0.5
-
-        # Calcula la diferencia entre el precio actual y el stop loss existente
-        difference = abs(position.price_current - position.sl)
+        positions = positions_to_array(positions)
+        if len(positions) == 0:
+            return
+        symbols = [str(symbol) for symbol in np.unique(positions['symbol']) if str(symbol) in self._data]
+        
+        # Inicializa el volumen inicial y el nivel de stop anterior de cada símbolo con su primera posición con take profit
+        for symbol in symbols:
+            symbol_data = self._data[symbol]
+            if "first_volume" not in symbol_data and "stop_level" not in symbol_data:
+                with_tp = positions[(positions['symbol'] == symbol) & (positions['tp'] != 0)]
+                if len(with_tp) == 0:
+                    continue
+                position = with_tp[0]
+                symbol_data['first_volume'] = float(position['volume'])
+                # Calcula el valor de "take_profit" según el tipo de posición.
+                if position['type'] == 0:
+                    symbol_data['previous_stop_level'] = abs((symbol_data['range'] * 2) - position['tp'])
+                else:
+                    symbol_data['previous_stop_level'] = abs((symbol_data['range'] * 2) + position['tp'])
+        
+        # Valores de cada símbolo expandidos a cada posición
+        states = {symbol: self._data[symbol] for symbol in symbols}
+        ranges = symbol_values(positions, {symbol: state['range'] for symbol, state in states.items()})
+        first_volumes = symbol_values(positions, {symbol: state['first_volume'] for symbol, state in states.items()})
+        previous_stop_levels = symbol_values(positions, {symbol: state['previous_stop_level'] for symbol, state in states.items()})
+        decimals = symbol_values(positions, {symbol: state['decimals'] for symbol, state in states.items()})
+        
+        # Sin take profit se aplica el trailing stop a la mitad del rango; con take profit, las salidas parciales
+        modifications = np.concatenate([
+            trailing_stops(positions, ranges, distance_factor=0.5),
+            partial_exits(positions, self._percentage_piece, self.number_stops, first_volumes, previous_stop_levels, np.nan_to_num(decimals).astype(np.int64)),
+        ])
+        send_modifications(modifications, modifier)
+        
+        # El nivel alcanzado por cada salida parcial pasa a ser el próximo stop loss del símbolo
+        for modification in modifications[modifications['action'] == PositionAction.PARTIAL_EXIT]:
+            self._data[str(modification['symbol'])]['previous_stop_level'] = float(modification['stop_level'])
 
-        # Si la diferencia es mayor que el rango especificado, se aplica el trailing stop
-        if difference > range:
-            # Calcula el nuevo stop loss
-            if position.type == 0: 
-                # Para una posición de compra (long)
-                new_sl = position.price_current - trailing_stop_distance
-            else:
-                # Para una posición de venta (short)
-                new_sl = position.price_current + trailing_stop_distance
-            
-            # Envia la orden para cambiar el stop loss en MT5
-            MT5Api.send_change_stop_loss(position.symbol, new_sl, position.ticket)
-    
     #endregion
     
     #region Breakout strategy
-    def _breakout_order(self, symbol: str, data: Dict[str, Any]) -> None:
+    def _breakout_order(self, symbol: str, data: Dict[str, Any]) -> bool:
         """
         Prepara órdenes para ser enviadas a MetaTrader 5. Cada orden se prepara en función de los datos recibidos.
 
@@ -618,7 +744,7 @@ class BreakoutTrading:
             data (Dict[str, Any]): Los datos necesarios para preparar la orden, como precios, volúmenes, etc.
 
         Returns:
-            None
+            bool: True si la orden fue enviada, False si falló.
         """
         print("Breakout: Preparando orden ", str(data['symbol']))
         # Pre establece los datos de la orden que se enviará
@@ -633,17 +759,11 @@ class BreakoutTrading:
             "comment": None
         }
         
-        # Consultar el número de órdenes realizadas para el símbolo
-        positions = MT5Api.get_positions(symbol= symbol)
-        
-        # Filtra aquellos con el comentario de la estrategia
-        positions = [position for position in positions if self.comment in position.comment]
+        # Consultar las posiciones de la estrategia en el símbolo
+        self._get_strategy_positions(symbol)
         
-        # Obtiene el numero de la ultima posicion realizada
-        if positions:
-            number = self.get_number_in_comment(positions[-1].comment)
-        else:
-            number = 0
+        # Obtiene el numero de la ultima posicion realizada, 0 si no hay posiciones
+        number = self._position_index.last_counter(self.comment, symbol)
                     
         order['volume'] = data['lot_size']
         
@@ -669,7 +789,7 @@ class BreakoutTrading:
         order['comment'] = self.comment + " " + str(number + 1)
         
         # Se envía la orden por la cola de comunicación
-        self._send_order(order)
+        return self._send_order(order)
 
     def _prepare_breakout_data(self, user_risk: float):
         """
@@ -678,34 +798,24 @@ class BreakoutTrading:
         Args:
             user_risk (float): Riesgo del usuario.
         """
-        current_time = datetime.now(pytz.utc)
-        
-        # Establecer el horario de inicio y finalización del mercado
-        start_time = current_time.replace(
-            hour=self._market_opening_time['hour'],
-            minute=0,
-            second=0,
-            microsecond=0
-        )
-        end_time = current_time.replace(
-            hour=self._market_opening_time['hour'],
-            minute=self._market_opening_time['minute'],
-            second=0,
-            microsecond=0
-        )
-        
         data = {}
+        # Símbolos sin rango de apertura, no se operan en esta sesión
+        skipped = []
         
         # Obtener la informacion necesaria para cada symbolo
         for symbol in self.symbols:
-            rates_in_range = MT5Api.get_rates_range(symbol, TimeFrame.MINUTE_1, start_time, end_time)
             info = MT5Api.get_symbol_info(symbol)
             
             # Obtiene la cantidad de decimales que debe teber una orden en su volumen
             decimals = self._counting_decimals(info.volume_min)
 
-            high = np.max(rates_in_range['high'])
-            low = np.min(rates_in_range['low'])
+            # El rango de apertura se calcula una sola vez y se comparte con las demás estrategias
+            opening_range = self._opening_range.get_range(symbol)
+            if opening_range is None:
+                print(f"Breakout: Sin rango de apertura para {symbol}, se omite el símbolo.")
+                skipped.append(symbol)
+                continue
+            high, low = opening_range
             range_value = round(abs(high - low), decimals)
             trade_risk = round((user_risk / range_value), decimals)
             
@@ -721,66 +831,124 @@ class BreakoutTrading:
                 'partial_position': 1
             }
             
+            # Arma los niveles de ruptura del símbolo
+            self._triggers.arm(symbol, high=high, low=low)
+            
             # Establece el numero de intentos de comprar en 0
             self._purchase_attempts[symbol] = 0
+        
+        for symbol in skipped:
+            self.symbols.remove(symbol)
             
         # Actualiza la variable compartida
         self._data.update(data)
     
-    def _breakout_strategy(self):
+    def _breakout_symbol(self, symbol: str, current_price: float = None):
         """
-        Ejecuta la estrategia.
+        Ejecuta la estrategia para un símbolo.
 
-        Esta función verifica los símbolos proporcionados y toma decisiones de compra o venta basadas en ciertas condiciones.
+        Verifica el símbolo proporcionado y toma decisiones de compra o venta basadas en ciertas condiciones.
+
+        Args:
+            symbol (str): El símbolo a evaluar.
+            current_price (float, optional): El precio actual del símbolo. Si no se indica, se consulta.
 
         Returns:
             None
         """
-        # Verifica que tipo de ejecucion es
-        if self._in_real_time == False:
-            # Espera que el minuto termine para iniciar
-            self._sleep_to_next_minute()
+        # El símbolo pudo haber sido quitado de la lista en un evento anterior
+        if symbol not in self.symbols:
+            return
         
-        # Se crea una copia para evitar errores cuando se modifique la original
-        copy_symbols = list(self.symbols)
+        # Asegura un numero de intentos de compra maximos para evitar que el bot se estanque
+        if self._purchase_attempts[symbol] > 5:
+            print("Numero de intentos de compra para ", symbol, " excedidos, quitando símbolo de la lista.")
+            self._triggers.disarm(symbol)
+            self.symbols.remove(symbol)
+            return
         
-        for symbol in copy_symbols:
-            data = self._data[symbol]
-            
-            # Asegura un numero de intentos de compra maximos para evitar que el bot se estanque
-            if self._purchase_attempts[symbol] > 5:
-                print("Numero de intentos de compra para ", symbol, " excedidos, quitando símbolo de la lista.")
-                self.symbols.remove(symbol)
-                           
-            # Se obtienen las posiciones abiertas
-            positions = MT5Api.get_positions(symbol)
-            # Usar una comprensión de lista para filtrar las posiciones que contienen el comentario
-            positions = [position for position in positions if self.comment in position.comment]
-            type = None
-            # En caso de exisitr almenos una posicion abierta obtiene el tipo de esta
-            if positions:
-                type = positions[-1].type
-                # Remueve los símbolos tradeados segun la estrategia
-                self.symbols.remove(symbol)
-                continue
-            
-            # Obtiene el precio actual
-            current_price = MT5Api.get_last_price(symbol)
-            
-            # Precio ask (venta) como precio de compra
-            if current_price < data['low'] and (type == 0 or type is None):
-                # Se agrega el tipo de orden
-                data['type'] = 'sell'
-                # Crear orden y enviarla
-                self._breakout_order(symbol, data)
-                
-            # Precio bid (oferta) como precio de venta
-            elif current_price > data['high'] and (type == 1 or type is None):
-                # Se agrega el tipo de orden
-                data['type']= 'buy'
-                # Crear orden y enviarla
-                self._breakout_order(symbol, data)
-                               
+        # Obtiene el precio actual
+        if current_price is None:
+            current_price = self._get_current_price(symbol)
+        
+        # Reclama los niveles cruzados; cada ruptura se entrega una sola vez aunque otro proceso consulte el mismo índice
+        fired = self._triggers.check(symbol, current_price)
+        if not fired:
+            return
+        level = fired[0]
+                       
+        # Se obtienen las posiciones abiertas de la estrategia en el símbolo
+        positions = self._get_strategy_positions(symbol)
+        # En caso de exisitr almenos una posicion abierta el símbolo ya fue tradeado
+        if positions:
+            # Remueve los símbolos tradeados segun la estrategia
+            self._triggers.disarm(symbol)
+            self.symbols.remove(symbol)
+            return
+        
+        data = self._data[symbol]
+        # Precio por debajo del low: venta; precio por encima del high: compra
+        data['type'] = 'sell' if level == 'low' else 'buy'
+        
+        # Crear orden y enviarla
+        if self._breakout_order(symbol, data):
+            # La ruptura ya se operó: se desarman los demás niveles y el símbolo sale de la lista
+            self._triggers.disarm(symbol)
+            self.symbols.remove(symbol)
+        else:
+            # La orden falló, se vuelve a armar el nivel para reintentar en el próximo tick
+            self._triggers.rearm(symbol, level)
+    #endregion
+    
+    #region Events
+    def on_tick(self, symbol: str, ticks: ndarray):
+        """
+        Evalúa la estrategia en tiempo real cada vez que llegan ticks nuevos de un símbolo.
+
+        Args:
+            symbol (str): El símbolo de los ticks.
+            ticks (ndarray): Los ticks nuevos del símbolo.
+        """
+        self._breakout_symbol(symbol, last_price(ticks))
+    
+    def on_bar_close(self, symbol: str, bar: ndarray):
+        """
+        Evalúa la estrategia cada vez que cierra una barra de un minuto de un símbolo.
+
+        Args:
+            symbol (str): El símbolo de la barra.
+            bar (ndarray): La barra de un minuto que acaba de cerrar.
+        """
+        self._breakout_symbol(symbol, float(bar['close'][-1]))
+    
+    def _get_last_closed_bar(self, symbol: str) -> ndarray:
+        """
+        Obtiene la última barra de un minuto cerrada de un símbolo.
+        """
+        return MT5Api.get_rates_from_pos(symbol, TimeFrame.MINUTE_1, 1, 1)
+    
+    def _should_stop(self) -> bool:
+        """
+        Indica si la estrategia debe detenerse.
+        """
+        # Salir del bucle si no quedan símbolos
+        if not self.symbols:
+            print("Breakout: No hay símbolos por analizar.")
+            return True
+        
+        # Salir del bucle si termino el mercado
+        if not self._is_in_market_hours():
+            print("Breakout: Finalizo el horario de mercado.")
+            return True
+        return False
+    
+    def _get_tick_source(self):
+        """
+        Obtiene la fuente de ticks de la estrategia: el tablero de cotizaciones si existe o el flujo de ticks de MT5.
+        """
+        if self._quote_board is not None:
+            return self._quote_board.source(list(self.symbols))
+        return MT5Api.stream_ticks(list(self.symbols))
     #endregion
     
     #region start
@@ -788,8 +956,9 @@ class BreakoutTrading:
         """
         Inicia la estrategia de breakout trading para los símbolos especificados.
 
-        Args:
-            user_risk (int, opcional): El nivel de riesgo deseado para las operaciones. El valor predeterminado es 100.
+        La estrategia se ejecuta por eventos: en tiempo real se evalúa con cada tick nuevo y, en el modo
+        de cada minuto, con el cierre de cada barra de un minuto.
+
         Returns:
             None
         """
@@ -800,27 +969,39 @@ class BreakoutTrading:
         else:
             print("Breakout: Iniciando estrategia (cada minuto)...")
             print("Breakout: Símbolos por analizar cada minuto ", self.symbols)
+        
+        # Usa el gateway de MT5 si se configuró uno
+        if self._gateway is not None:
+            MT5Api.use_gateway(self._gateway)
                
-        # Inicio del cilco
-        while True:
-            # Salir del bucle si no quedan símbolos
-            if not self.symbols:
-                print("Breakout: No hay símbolos por analizar.")
-                break
-            
-            # Salir del bucle si termino el mercado
-            if not self._is_in_market_hours():
-                print("Breakout: Finalizo el horario de mercado.")
-                break
+        # Mantiene una sola conexión con MetaTrader 5 durante todo el ciclo
+        with MT5Api.session():
+            dispatcher = EventDispatcher(
+                tick_source=self._get_tick_source(),
+                bar_source=self._get_last_closed_bar,
+                stop_when=self._should_stop
+            )
+            if self._in_real_time:
+                dispatcher.on_tick(self.on_tick)
+            else:
+                dispatcher.on_bar_close(self.on_bar_close)
             
-            # Ejecuta la estrategia
-            self._breakout_strategy()
-        # Fin del ciclo
+            # Inicio del ciclo de eventos, termina cuando no quedan símbolos o termina el mercado
+            dispatcher.run()
+
         
         if self._in_real_time:
             print("Breakout: Finalizando estrategia (tiempo real)...")
         else:
             print("Breakout: Finalizando estrategia (cada minuto)...")             
+
+    def close(self):
+        """
+        Libera la memoria compartida que creó la estrategia. La que recibió en el constructor la libera quien la creó.
+        """
+        for resource in self._owned_resources:
+            resource.close()
+        self._owned_resources = []
     #endregion
     
 
@@ -828,13 +1009,46 @@ class BreakoutTrading:
 
 
 class HedgeTrading:
-    def __init__(self, data:DictProxy, symbols: ListProxy) -> None:
+    # Niveles de la zona de recuperación, se vuelven a armar cuando el precio regresa a la zona
+    LEVELS = [LevelSpec('recovery_high', LevelDirection.ABOVE, rearm=True), LevelSpec('recovery_low', LevelDirection.BELOW, rearm=True)]
+    
+    def __init__(self, data:SymbolStateStore, symbols: SharedSymbolList, gateway: MT5GatewayClient = None, quote_board: QuoteBoard = None, triggers: LevelTriggerIndex = None, opening_range: OpeningRangeService = None, clock: ClockService = None, positions: PositionsPoller = None, position_index: PositionIndex = None) -> None:
         # Se guarda la lista de símbolos compartida
         self.symbols = symbols
         
+        # Reloj sincronizado del bot, se consulta sin red
+        self._clock = clock if clock is not None else ClockService()
+        
+        # Foto compartida de las posiciones abiertas, None si las posiciones se consultan a la terminal
+        self._positions = positions
+        
+        # Índice de las posiciones por estrategia y símbolo
+        self._position_index = position_index if position_index is not None else PositionIndex()
+        
+        # Cliente del gateway de MT5, None si el proceso usa la terminal directamente
+        self._gateway = gateway
+        
+        # Tablero de cotizaciones compartido, None si los precios se consultan a la terminal
+        self._quote_board = quote_board
+        
         # Variable compartida que se acutalizara entre procesos
         self._data = data 
         
+        # Memoria compartida que la estrategia crea porque no se la entregaron; la libera close()
+        self._owned_resources = []
+        
+        # Índice compartido de los niveles de la zona de recuperación
+        if triggers is None:
+            triggers = LevelTriggerIndex(list(symbols), self.LEVELS, create=True)
+            self._owned_resources.append(triggers)
+        self._triggers = triggers
+        
+        # Rango de apertura compartido por todas las estrategias
+        if opening_range is None:
+            opening_range = OpeningRangeService(list(symbols), create=True, clock=self._clock)
+            self._owned_resources.append(opening_range)
+        self._opening_range = opening_range
+        
         # El comentario que identificara a los trades
         self.comment = "Hedge"
                 
@@ -857,14 +1071,26 @@ class HedgeTrading:
             order (Dict[str, Any]): Un diccionario que contiene información de la orden a enviar a MetaTrader 5.
 
         Returns:
-            None
+            bool: True si la orden fue enviada, False si falló.
         """
         # Envía la orden a MetaTrader 5
         request = MT5Api.send_order(**order)
         if request is None:
             self._purchase_attempts[order['symbol']] += 1
+            return False
         else:
             self._purchase_attempts[order['symbol']] = 0
+            self._record_sent_order(order)
+            return True
+
+    def _record_sent_order(self, order: Dict[str, Any]):
+        """
+        Registra en el índice de posiciones una orden enviada, para que el contador y el tipo de la siguiente orden
+        no dependan de que la foto compartida ya muestre su posición.
+        """
+        _, counter = PositionIndex.parse_comment(order['comment'])
+        position_type = 0 if order['order_type'] == OrderType.MARKET_BUY else 1
+        self._position_index.record_sent(self.comment, order['symbol'], counter, position_type)
     #endregion
     
     #region Utilities
@@ -882,7 +1108,7 @@ class HedgeTrading:
             None
         """
         # Obtener la hora actual
-        current_time = datetime.now()
+        current_time = self._clock.now()
 
         # Calcular el momento en que comienza el próximo minuto (segundo 1, microsegundo 0)
         next_minute = current_time.replace(second=1, microsecond=0) + timedelta(minutes=1)
@@ -916,7 +1142,7 @@ class HedgeTrading:
             bool: True si se encuentra en horario de mercado, False si no lo está.
         """
         # Obtener la hora y minutos actuales en UTC
-        current_time = datetime.now(pytz.utc).time()
+        current_time = self._clock.now().time()
 
         # Crear objetos time para el horario de apertura y cierre del mercado
         market_open = current_time.replace(hour=self._market_opening_time['hour'], minute=self._market_opening_time['minute'], second=0)
@@ -938,85 +1164,93 @@ class HedgeTrading:
         Returns:
             int: El número entero extraído si se encuentra, o None si no se encuentra ningún número en el comentario.
         """
-        parts = comment.split()
-
-        if parts[-1].isdigit():
-            return int(parts[-1])
-        else:
-            return None
-    
-    #endregion
+        return PositionIndex.parse_comment(comment)[1]
     
-    #region Positions Management
+    def _get_current_price(self, symbol: str) -> float:
+        """
+        Obtiene el precio actual de un símbolo.
+
+        Si hay un tablero de cotizaciones compartido, el precio se lee de la memoria compartida;
+        si no, o si aún no tiene cotización para el símbolo, se consulta a MetaTrader 5.
+
+        Args:
+            symbol (str): El símbolo a consultar.
+
+        Returns:
+            float: El precio actual del símbolo.
+        """
+        if self._quote_board is not None and self._quote_board.has_symbol(symbol):
+            price = self._quote_board.get_last_price(symbol)
+            if price is not None:
+                return price
+        return MT5Api.get_last_price(symbol)
     
-    def manage_positions(self, positions: List[TradePosition]):
+    def _get_positions(self, symbol: str) -> Tuple[TradePosition]:
         """
-        Gestiona las posiciones de Hedge mediante la actualización del stop loss y el trailing stop.
+        Obtiene las posiciones abiertas de un símbolo.
+
+        Si hay una foto compartida de las posiciones, se lee de la memoria compartida; si no, se consulta a MetaTrader 5.
 
         Args:
-            positions (List[TradePosition]): Lista de posiciones de operaciones.
+            symbol (str): El símbolo a consultar.
+
+        Returns:
+            Tuple[TradePosition]: Las posiciones abiertas del símbolo.
         """
-        # Itera sobre todas las posiciones en la lista "positions"
-        for position in positions:
-            # Obtiene los datos relacionados con el símbolo de la posición
-            data = self._data[position.symbol]
-            
-            # Si el take profit (tp) es igual a cero, ejecuta el trailing stop
-            if position.tp == 0:
-                self._trailing_stop(data['recovery_range'], position)
-            else:               
-                # Calcula la diferencia entre el precio actual y el take profit
-                difference = abs(position.price_current - position.tp)
-                
-                # Si la diferencia es menor que el rango de recuperación
-                if difference < data['recovery_range']:
-                    # Calcula el nuevo valor del stop loss
-                    if position.type == 0: # Para una posición de compra (long)
-                        new_stop_loss = position.tp - data['recovery_range']
-                    else: # Para una posición de venta (short)
-                        new_stop_loss = position.tp + data['recovery_range']
-                                        
-                    # Actualiza el stop loss con el nuevo valor calculado
-                    request = MT5Api.send_change_stop_loss(position.symbol, new_stop_loss, position.ticket)
-                    
-                    # Si el cambio de stopp loss se ejecuto con extito se quita el  take profit
-                    if request is True:
-                        # Elimina el take profit
-                        MT5Api.send_change_take_profit(position.symbol, 0.0, position.ticket)
-                        
-    def _trailing_stop(self, range: float, position: TradePosition):
+        if self._positions is not None:
+            return self._positions.get_positions(symbol)
+        return MT5Api.get_positions(symbol)
+    
+    def _get_strategy_positions(self, symbol: str) -> List[TradePosition]:
         """
-        Aplica un trailing stop a una posición.
+        Obtiene las posiciones abiertas de la estrategia en un símbolo, en el orden en que se abrieron.
 
         Args:
-            range (float): El rango para calcular el trailing stop.
-            position (TradePosition): La posición de la operación.
+            symbol (str): El símbolo a consultar.
 
-        Esta función calcula y aplica un trailing stop a una posición en función del rango especificado.
+        Returns:
+            List[TradePosition]: Las posiciones de la estrategia en el símbolo.
         """
-        # Se calcula la distancia del trailing stop con el rango especificado
-        trailing_stop_distance = range 
+        self._position_index.refresh(self._get_positions(symbol), symbol)
+        return self._position_index.positions(self.comment, symbol)
+    
+    #endregion
+    
+    #region Positions Management
+    
+    def manage_positions(self, positions: List[TradePosition], modifier: StopModifier = None):
+        """
+        Gestiona las posiciones de Hedge mediante la actualización del stop loss y el trailing stop.
 
-        # Calcula la diferencia entre el precio actual y el stop loss existente
-        difference = abs(position.price_current - position.sl)
+        El trailing stop y el rango de recuperación de todas las posiciones se calculan en una sola pasada
+        vectorizada; solo se envían a la terminal las modificaciones resultantes.
+
+        Args:
+            positions (List[TradePosition]): Lista de posiciones de operaciones, o un arreglo POSITION_DTYPE.
+            modifier (StopModifier, optional): La capa de envío de stops del administrador de posiciones.
+        """
+        positions = positions_to_array(positions)
+        if len(positions) == 0:
+            return
+        
+        # Rango de recuperación de cada posición según su símbolo
+        recovery_ranges = symbol_values(positions, {
+            str(symbol): self._data[str(symbol)]['recovery_range']
+            for symbol in np.unique(positions['symbol']) if str(symbol) in self._data
+        })
+        
+        # Sin take profit se aplica el trailing stop al rango de recuperación; con take profit, si el precio quedó
+        # a menos del rango de recuperación del take profit se mueve el stop loss y se quita el take profit
+        modifications = np.concatenate([
+            trailing_stops(positions, recovery_ranges),
+            recovery_stops(positions, recovery_ranges),
+        ])
+        send_modifications(modifications, modifier)
 
-        # Si la diferencia es mayor que el rango especificado, se aplica el trailing stop
-        if difference > range:
-            # Calcula el nuevo stop loss
-            if position.type == 0: 
-                # Para una posición de compra (long)
-                new_sl = position.price_current - trailing_stop_distance
-            else:
-                # Para una posición de venta (short), se aumenta el stop loss
-                new_sl = position.price_current + trailing_stop_distance
-            
-            # Envia la orden para cambiar el stop loss en MT5
-            MT5Api.send_change_stop_loss(position.symbol, new_sl, position.ticket)
- 
     #endregion
     
     #region Hedge strategy
-    def _hedge_order(self, symbol: str, data: Dict[str, Any]) -> None:
+    def _hedge_order(self, symbol: str, data: Dict[str, Any]) -> bool:
         """
         Prepara órdenes para ser enviadas a MetaTrader 5. Cada orden se prepara en función de los datos recibidos.
 
@@ -1025,7 +1259,7 @@ class HedgeTrading:
             data (Dict[str, Any]): Los datos necesarios para preparar la orden, como precios, volúmenes, etc.
 
         Returns:
-            None
+            bool: True si la orden fue enviada, False si falló.
         """
         order = {
             "symbol": symbol, 
@@ -1038,17 +1272,11 @@ class HedgeTrading:
             "comment": None
         }
            
-        # Consultar el número de órdenes realizadas para el símbolo
-        positions = MT5Api.get_positions(symbol= symbol)
-        
-        # Filtra aquellos con el comentario de la estrategia
-        positions = [position for position in positions if self.comment in position.comment]
+        # Consultar las posiciones de la estrategia en el símbolo
+        self._get_strategy_positions(symbol)
         
-        # Obtiene el numero de la ultima posicion realizada
-        if positions:
-            number = self.get_number_in_comment(positions[-1].comment)
-        else:
-            number = 0
+        # Obtiene el numero de la ultima posicion realizada, 0 si no hay posiciones
+        number = self._position_index.last_counter(self.comment, symbol)
             
         # size = 2^(number) con esta formula nos aseguramos que el size siempre sea el doble del anterior
         size = 2 ** (number)
@@ -1076,7 +1304,7 @@ class HedgeTrading:
         order['comment'] = self.comment + " " + str(number+1)
         
         # Se envía la orden por la cola de comunicación
-        self._send_order(order)
+        return self._send_order(order)
 
     def _prepare_hedge_data(self, user_risk: float, max_user_risk: float):
         """
@@ -1087,41 +1315,33 @@ class HedgeTrading:
             max_user_risk (float): Riesgo maximo del usuario.
         """
         print("Hedge: Preparando la data...")
-        current_time = datetime.now(pytz.utc)
-        
-        # Establecer el horario de inicio y finalización del mercado
-        start_time = current_time.replace(
-            hour=self._market_opening_time['hour'],
-            minute=0,
-            second=0,
-            microsecond=0
-        )
-        
-        end_time = current_time.replace(
-            hour=self._market_opening_time['hour'],
-            minute=self._market_opening_time['minute'],
-            second=0,
-            microsecond=0
-        )
+        # Fin de la ventana del rango de apertura
+        _, end_time = self._opening_range.get_window()
         
         data = {}
+        # Símbolos sin rango de apertura, no se operan en esta sesión
+        skipped = []
         
         # Obtener la informacion necesaria para cada symbolo
         for symbol in self.symbols:
-            rates_in_range = MT5Api.get_rates_range(symbol, TimeFrame.MINUTE_1, start_time, end_time)
             info = MT5Api.get_symbol_info(symbol)
             
             # Obtiene la cantidad de decimales que debe teber una orden en su volumen
             decimals = self._counting_decimals(info.volume_min)
 
-            high = np.max(rates_in_range['high'])
-            low = np.min(rates_in_range['low'])
+            # El rango de apertura se calcula una sola vez y se comparte con las demás estrategias
+            opening_range = self._opening_range.get_range(symbol)
+            if opening_range is None:
+                print(f"Hedge: Sin rango de apertura para {symbol}, se omite el símbolo.")
+                skipped.append(symbol)
+                continue
+            high, low = opening_range
             range_value = abs(high - low)
             recovery_range = round((range_value/3), decimals)
             min_trade_risk = round((user_risk / range_value), decimals)
             max_trade_risk = round((max_user_risk / range_value), decimals)
             
-            current_time = datetime.now(pytz.utc)
+            current_time = self._clock.now()
             
             if current_time < (end_time + timedelta(seconds=10)):
                 in_hedge = True
@@ -1148,118 +1368,167 @@ class HedgeTrading:
             
             # Establece el numero de intentos de comprar en 0
             self._purchase_attempts[symbol] = 0
+        
+        for symbol in skipped:
+            self.symbols.remove(symbol)
             
         # Actualiza la variable compartida
         self._data.update(data)
     
-    def _hedge_strategy(self):
+    def _hedge_symbol(self, symbol: str, current_price: float = None):
         """
-        Ejecuta la estrategia.
+        Ejecuta la estrategia para un símbolo.
 
-        Esta función verifica los símbolos proporcionados y toma decisiones de compra o venta basadas en ciertas condiciones.
+        Verifica el símbolo proporcionado y toma decisiones de compra o venta basadas en ciertas condiciones.
+
+        Args:
+            symbol (str): El símbolo a evaluar.
+            current_price (float, optional): El precio actual del símbolo. Si no se indica, se consulta.
 
         Returns:
             None
         """
-        # Se crea una copia para evitar errores cuando se modifique la original
-        copy_symbols = list(self.symbols)
+        # El símbolo pudo haber sido quitado de la lista en un evento anterior
+        if symbol not in self.symbols:
+            return
         
-        for symbol in copy_symbols:
-            data = self._data[symbol]
+        data = self._data[symbol]
+        
+        # # Asegura un numero de intentos de compra maximos para evitar que el bot se estanque
+        # if self._purchase_attempts[symbol] > 5:
+        #     print("Numero de intentos de compra para ", symbol, " excedidos, quitando símbolo de la lista.")
+        #     self.symbols.remove(symbol)
             
-            # # Asegura un numero de intentos de compra maximos para evitar que el bot se estanque
-            # if self._purchase_attempts[symbol] > 5:
-            #     print("Numero de intentos de compra para ", symbol, " excedidos, quitando símbolo de la lista.")
-            #     self.symbols.remove(symbol)
-                
-            # Se obtienen las posiciones abiertas
-            positions = MT5Api.get_positions(symbol)
-            # Usar una comprensión de lista para filtrar las posiciones que contienen el comentario
-            positions = [position for position in positions if self.comment in position.comment]
-            last_type = None
-            # En caso de exisitr almenos una posicion abierta obtiene el tipo de esta
-            if positions:
-                last_position = positions[-1]
-                last_type = last_position.type
-                # Elimina los symbolos que ya consiguieron ganancias y estan en traling stop
-                # Aquellos en trailing stop tendran take profit 0
-                if last_position.tp == 0:
-                    data['in_hedge'] = False
-                    data['recovery_low'] = None
-                    data['recovery_high'] = None
-                    self._data.update({symbol: data})
-                    continue
-                
-            # Obtiene la ultima barra
-            last_bar = MT5Api.get_last_bar(symbol)
-            # Obtiene el precio actual
-            current_price = last_bar['close']
+        # Se obtienen las posiciones abiertas de la estrategia en el símbolo
+        positions = self._get_strategy_positions(symbol)
+        # Tipo de la última posición, o de la última orden enviada si la foto aún no la muestra; None si no hay
+        last_type = self._position_index.last_type(self.comment, symbol)
+        if positions:
+            last_position = positions[-1]
+            # Elimina los symbolos que ya consiguieron ganancias y estan en traling stop
+            # Aquellos en trailing stop tendran take profit 0
+            if last_position.tp == 0:
+                data['in_hedge'] = False
+                data['recovery_low'] = None
+                data['recovery_high'] = None
+                self._data.update({symbol: data})
+                self._triggers.disarm(symbol)
+                return
             
-            # Si el precio vuelve a estar dentro del rango de recuperación, se habilita la cobertura y se actualiza el estado.
-            if data['in_hedge'] == False and data['high'] > current_price > data['low']:
-                data['in_hedge'] = True
+        # Obtiene el precio actual
+        if current_price is None:
+            current_price = self._get_current_price(symbol)
+        
+        # Si el precio vuelve a estar dentro del rango de recuperación, se habilita la cobertura y se actualiza el estado.
+        if data['in_hedge'] == False and data['high'] > current_price > data['low']:
+            data['in_hedge'] = True
+            self._data.update({symbol: data})
+        
+                    
+        if last_type is None and data['in_hedge'] == True:
+            if current_price < data['low']:
+                # Se establece el recovery zone
+                data['recovery_low'] = data['low']
+                data['recovery_high'] = data['low'] + data['recovery_range']
+                # Actualiza el diccionario compartido
                 self._data.update({symbol: data})
             
-                        
-            if last_type is None and data['in_hedge'] == True:
-                if current_price < data['low']:
-                    # Se establece el recovery zone
-                    data['recovery_low'] = data['low']
-                    data['recovery_high'] = data['low'] + data['recovery_range']
-                    # Actualiza el diccionario compartido
-                    self._data.update({symbol: data})
-                
-                elif current_price > data['high']:
-                    # Se establece el recovery zone
-                    data['recovery_low'] = data['high'] - data['recovery_range']
-                    data['recovery_high'] = data['high']
-                    # Actualiza el diccionario compartido
-                    self._data.update({symbol: data})
+            elif current_price > data['high']:
+                # Se establece el recovery zone
+                data['recovery_low'] = data['high'] - data['recovery_range']
+                data['recovery_high'] = data['high']
+                # Actualiza el diccionario compartido
+                self._data.update({symbol: data})
+        
+        # Se asegura de tener la recovery zone establecida antes de  tomar una decision
+        if data['recovery_low'] is not None and data['recovery_high'] is not None:
+            # Arma los niveles de la zona; si no cambiaron se conserva su estado
+            self._triggers.arm(symbol, recovery_low=data['recovery_low'], recovery_high=data['recovery_high'])
             
-            # Se asegura de tener la recovery zone establecida antes de  tomar una decision
-            if data['recovery_low'] is not None and data['recovery_high'] is not None:
-                
-                if (last_type == 0 or last_type is None) and current_price < data['recovery_low']:
-                    # Se agrega el tipo de orden
-                        data['type'] = 'sell'
-                        # Crear orden y enviarla
-                        self._hedge_order(symbol, data)
-                
-                elif (last_type == 1 or last_type is None) and current_price > data['recovery_high']:
-                        # Se agrega el tipo de orden
-                        data['type']= 'buy'
-                        # Crear orden y enviarla
-                        self._hedge_order(symbol, data)
-                    
+            # Después de una compra solo se permite vender y viceversa
+            allowed = []
+            if last_type == 0 or last_type is None:
+                allowed.append('recovery_low')
+            if last_type == 1 or last_type is None:
+                allowed.append('recovery_high')
+            
+            # Reclama los niveles cruzados; cada cruce se entrega una sola vez
+            for level in self._triggers.check(symbol, current_price, allowed):
+                # Se agrega el tipo de orden
+                data['type'] = 'sell' if level == 'recovery_low' else 'buy'
+                # Crear orden y enviarla, si falla se vuelve a armar el nivel
+                if not self._hedge_order(symbol, data):
+                    self._triggers.rearm(symbol, level)
+    #endregion
+    
+    #region Events
+    def on_tick(self, symbol: str, ticks: ndarray):
+        """
+        Evalúa la estrategia cada vez que llegan ticks nuevos de un símbolo.
+
+        Args:
+            symbol (str): El símbolo de los ticks.
+            ticks (ndarray): Los ticks nuevos del símbolo.
+        """
+        self._hedge_symbol(symbol, last_price(ticks))
+    
+    def _should_stop(self) -> bool:
+        """
+        Indica si la estrategia debe detenerse.
+        """
+        # Salir del bucle si no quedan símbolos
+        if not self.symbols:
+            print("Hedge: No hay símbolos por analizar.")
+            return True
+        
+        # Salir del bucle si termino el mercado
+        if not self._is_in_market_hours():
+            print("Hedge: Finalizo el horario de mercado.")
+            return True
+        return False
+    
+    def _get_tick_source(self):
+        """
+        Obtiene la fuente de ticks de la estrategia: el tablero de cotizaciones si existe o el flujo de ticks de MT5.
+        """
+        if self._quote_board is not None:
+            return self._quote_board.source(list(self.symbols))
+        return MT5Api.stream_ticks(list(self.symbols))
     #endregion
     
     #region start
     def start(self):
         """
         Inicia la estrategia de Hedge trading para los símbolos especificados.
+
+        La estrategia se ejecuta por eventos y se evalúa con cada tick nuevo de los símbolos.
+
         Returns:
             None
         """
 
         print("Hedge: Iniciando estrategia...")
         
-        # Inicio del cilco
-        while True:
-            # Salir del bucle si no quedan símbolos
-            if not self.symbols:
-                print("Hedge: No hay símbolos por analizar.")
-                break
-            
-            # Salir del bucle si termino el mercado
-            if not self._is_in_market_hours():
-                print("Hedge: Finalizo el horario de mercado.")
-                break
+        # Usa el gateway de MT5 si se configuró uno
+        if self._gateway is not None:
+            MT5Api.use_gateway(self._gateway)
+        
+        # Mantiene una sola conexión con MetaTrader 5 durante todo el ciclo
+        with MT5Api.session():
+            dispatcher = EventDispatcher(tick_source=self._get_tick_source(), stop_when=self._should_stop)
+            dispatcher.on_tick(self.on_tick)
             
-            # Ejecuta la estrategia
-            self._hedge_strategy()
-        # Fin del ciclo
+            # Inicio del ciclo de eventos, termina cuando no quedan símbolos o termina el mercado
+            dispatcher.run()
         print("Hedge: Finalizando estrategia...")
-          
+
+    def close(self):
+        """
+        Libera la memoria compartida que creó la estrategia. La que recibió en el constructor la libera quien la creó.
+        """
+        for resource in self._owned_resources:
+            resource.close()
+        self._owned_resources = []
     #endregion
 
 
@@ -1267,10 +1536,22 @@ class HedgeTrading:
 
 
 class HardHedgeTrading:
-    def __init__(self, symbols:List[str]) -> None:
+    def __init__(self, symbols:List[str], opening_range: OpeningRangeService = None, clock: ClockService = None) -> None:
         # Lista de symbolos para administar dentro de la estrategia
         self.symbols = symbols
         
+        # Reloj sincronizado del bot, se consulta sin red
+        self._clock = clock if clock is not None else ClockService()
+        
+        # Memoria compartida que la estrategia crea porque no se la entregaron; la libera close()
+        self._owned_resources = []
+        
+        # Rango de apertura compartido por todas las estrategias
+        if opening_range is None:
+            opening_range = OpeningRangeService(list(symbols), create=True, clock=self._clock)
+            self._owned_resources.append(opening_range)
+        self._opening_range = opening_range
+        
         # Diccionario que contendra la data necesaria para ejecutar la estrategia cada symbolo
         self.symbol_data = {}
         
@@ -1283,7 +1564,14 @@ class HardHedgeTrading:
         # Horario de apertura y cierre del mercado
         self._market_opening_time = {'hour':13, 'minute':30}
         self._market_closed_time = {'hour':19, 'minute':55}
-        
+
+    def close(self):
+        """
+        Libera la memoria compartida que creó la estrategia. La que recibió en el constructor la libera quien la creó.
+        """
+        for resource in self._owned_resources:
+            resource.close()
+        self._owned_resources = []
     
     #region Utilities
     def _sleep_to_next_minute(self):
@@ -1300,7 +1588,7 @@ class HardHedgeTrading:
             None
         """
         # Obtener la hora actual
-        current_time = datetime.now()
+        current_time = self._clock.now()
 
         # Calcular el momento en que comienza el próximo minuto (segundo 1, microsegundo 0)
         next_minute = current_time.replace(second=1, microsecond=0) + timedelta(minutes=1)
@@ -1319,7 +1607,7 @@ class HardHedgeTrading:
             bool: True si se encuentra en horario de mercado, False si no lo está.
         """
         # Obtener la hora y minutos actuales en UTC
-        current_time = datetime.now(pytz.utc).time()
+        current_time = self._clock.now().time()
 
         # Crear objetos time para el horario de apertura y cierre del mercado
         market_open = current_time.replace(hour=self._market_opening_time['hour'], minute=self._market_opening_time['minute'], second=0)
@@ -1341,12 +1629,7 @@ class HardHedgeTrading:
         Returns:
             int: El número entero extraído si se encuentra, o None si no se encuentra ningún número en el comentario.
         """
-        parts = comment.split()
-
-        if parts[-1].isdigit():
-            return int(parts[-1])
-        else:
-            return None
+        return PositionIndex.parse_comment(comment)[1]
     
     #endregion
     
@@ -1356,39 +1639,23 @@ class HardHedgeTrading:
         Prepara la data que se usara en la estrategia de Hedge.
         """
         print("HardHedge: Preparando la data...")
-        current_time = datetime.now(pytz.utc)
-        
-        # Establece el periodo de tiempo para calcular el rango
-        start_time = current_time.replace(
-            hour=self._market_opening_time['hour'],
-            minute=0,
-            second=0,
-            microsecond=0
-        )
-        
-        end_time = current_time.replace(
-            hour=self._market_opening_time['hour'],
-            minute=self._market_opening_time['minute'],
-            second=0,
-            microsecond=0
-        )
-        
         symbol_data = {}
         
         # Obtener la informacion necesaria para cada symbolo
         for symbol in self.symbols:
-            rates_in_range = MT5Api.get_rates_range(symbol, TimeFrame.MINUTE_1, start_time, end_time)
             info = MT5Api.get_symbol_info(symbol)
             
             # Obtiene la cantidad de decimales que debe teber una orden en su volumen
             digits = info.digits
 
-            high = np.max(rates_in_range['high'])
-            low = np.min(rates_in_range['low'])
+            # El rango de apertura se calcula una sola vez y se comparte con las demás estrategias
+            opening_range = self._opening_range.get_range(symbol)
+            if opening_range is None:
+                print(f"HardHedge: Sin rango de apertura para {symbol}, se omite el símbolo.")
+                continue
+            high, low = opening_range
             range_value = abs(high - low)
             recovery_range = round((range_value/3), digits)
-            
-            current_time = datetime.now(pytz.utc)
                         
             symbol_data[symbol] = {
                 'symbol': symbol,
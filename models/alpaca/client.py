@@ -5,28 +5,63 @@ from alpaca.trading.requests import GetCalendarRequest
 from alpaca.common.enums import BaseURL
 
 # Importaciones necesarias para manejar fechas
-from datetime import datetime, timedelta
-
+from datetime import datetime, timedelta, date
+import time
+import pytz
 
 # Importaciones necesarias para definir tipos de datos
-from typing import List
+from typing import List, Dict, Tuple
+
+# Para buscar sesiones en el calendario precalculado
+from bisect import bisect_right
+
+# Para refrescar el calendario en segundo plano
+import threading
 
 # Importación de módulos externos
 import os
+import json
 from dotenv import load_dotenv
 
 # Carga las variables de entorno desde un archivo .env
 load_dotenv()
 
 class AlpacaApi:
-    def __init__(self) -> None:
+    def __init__(self, calendar_days: int = 365, calendar_path: str = None) -> None:
         """
         Inicializa la clase AlpacaApi.
 
         Carga las credenciales de Alpaca desde un archivo .env y crea una instancia del cliente de Alpaca.
+
+        Args:
+            calendar_days (int, optional): Número de días de mercado, a partir de hoy, que se guardan en el caché del calendario.
+            calendar_path (str, optional): Archivo donde se persiste el calendario. Por defecto se usa la variable
+                de entorno ALPACA_CALENDAR_PATH o 'market_calendar.json' en el directorio actual.
         """
         self._trading_client = TradingClient(api_key=os.getenv("ALPACA_API_KEY_ID"), secret_key=os.getenv("ALPACA_API_SECRET_KEY"), url_override=BaseURL.TRADING_LIVE)
-        
+
+        # Zona horaria en la que Alpaca entrega el calendario
+        self._market_timezone = pytz.timezone('America/New_York')
+
+        # Caché del calendario de mercado
+        self._calendar_days = calendar_days
+        self._calendar_path = calendar_path or os.getenv("ALPACA_CALENDAR_PATH", os.path.join(os.getcwd(), "market_calendar.json"))
+        self._calendar_refresh_seconds = 24 * 60 * 60
+        self._reset_calendar_state()
+
+    #region Pickle
+    def __getstate__(self):
+        # Los hilos y bloqueos no se pueden enviar a otro proceso, cada proceso inicia su propio refresco
+        state = self.__dict__.copy()
+        state['_calendar_lock'] = None
+        state['_calendar_refresh_thread'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._calendar_lock = threading.Lock()
+    #endregion
+
     def get_current_market_time(self) -> datetime:
         """
         Obtiene la hora actual del mercado.
@@ -35,11 +70,13 @@ class AlpacaApi:
             datetime: Hora actual del mercado en formato datetime.
         """
         return self._trading_client.get_clock().timestamp
-    
+
     def get_next_days_of_market(self, par_days:int = 0) -> List[Calendar]:
         """
         Obtiene el calendario de los próximos días de mercado de Nueva York (NY).
 
+        El calendario se obtiene del caché local; solo se consulta a Alpaca si el caché no cubre los días pedidos.
+
         Args:
             par_days (int): Número de días a partir de hoy para los que se desea obtener el calendario.
                             Si es 0, se devuelve únicamente el calendario del día actual.
@@ -47,10 +84,211 @@ class AlpacaApi:
         Returns:
             List[Calendar]: Lista de objetos Calendar con el calendario de los próximos días de mercado de NY.
         """
-        current_time = self.get_current_market_time()
-        today = current_time.date()
+        self._ensure_calendar()
+        today = self.now().astimezone(self._market_timezone).date()
         next_days = today + timedelta(days=par_days)
+
+        calendar, dates, _, _ = self._calendar_index
+        if dates and dates[-1] >= next_days:
+            first = bisect_right(dates, today - timedelta(days=1))
+            last = bisect_right(dates, next_days)
+            return calendar[first:last]
+
         calendar_request = GetCalendarRequest(start=today, end=next_days)
         calendar_list = self._trading_client.get_calendar(calendar_request)
         return calendar_list
-        
+
+    #region Calendar cache
+    def now(self) -> datetime:
+        """
+        Obtiene la hora actual en UTC calculada a partir del reloj monotónico, sin consultar la red.
+
+        Returns:
+            datetime: Hora actual en UTC.
+        """
+        return datetime.fromtimestamp(self._now_timestamp(), pytz.utc)
+
+    def get_session(self, day: date = None) -> Calendar:
+        """
+        Obtiene la sesión de mercado de un día desde el caché.
+
+        Args:
+            day (date, optional): El día a consultar (fecha de Nueva York). Por defecto, el día actual.
+
+        Returns:
+            Calendar: La sesión del día, o None si ese día no hay mercado.
+        """
+        self._ensure_calendar()
+        if day is None:
+            day = self.now().astimezone(self._market_timezone).date()
+
+        calendar, dates, _, _ = self._calendar_index
+        index = bisect_right(dates, day) - 1
+        if index >= 0 and dates[index] == day:
+            return calendar[index]
+        return None
+
+    def is_market_open(self, timestamp: float = None) -> bool:
+        """
+        Comprueba si el mercado está abierto buscando en las sesiones precalculadas.
+
+        Args:
+            timestamp (float, optional): Segundos desde 1970 en UTC. Por defecto, la hora actual según el reloj monotónico.
+
+        Returns:
+            bool: True si el momento indicado está dentro de una sesión de mercado.
+        """
+        self._ensure_calendar()
+        if timestamp is None:
+            timestamp = self._now_timestamp()
+
+        _, _, opens, closes = self._calendar_index
+        index = bisect_right(opens, timestamp) - 1
+        return index >= 0 and timestamp <= closes[index]
+
+    def load_calendar(self) -> bool:
+        """
+        Carga el calendario de mercado desde Alpaca y lo persiste en el archivo local.
+
+        Si Alpaca no responde, se usa la copia persistida para seguir funcionando sin conexión.
+
+        Returns:
+            bool: True si el calendario quedó cargado, False si no se pudo obtener ni de Alpaca ni del archivo.
+        """
+        raw_calendar = None
+        try:
+            raw_calendar = self._fetch_calendar()
+            self._save_calendar(raw_calendar)
+        except Exception as error:
+            print(f"No se pudo obtener el calendario de Alpaca, se usará la copia local: {error}")
+            raw_calendar = self._read_calendar()
+
+        if raw_calendar is None:
+            return False
+
+        self._build_calendar_index(raw_calendar)
+        return True
+
+    def _reset_calendar_state(self):
+        """
+        Inicializa el estado vacío del caché del calendario.
+        """
+        # Índice del calendario: (sesiones, fechas, aperturas y cierres en segundos UTC)
+        self._calendar_index: Tuple[List[Calendar], List[date], List[float], List[float]] = ([], [], [], [])
+        self._calendar_loaded_at: float = None
+        self._calendar_lock = threading.Lock()
+        self._calendar_refresh_thread: threading.Thread = None
+
+        # Ancla para calcular la hora actual a partir del reloj monotónico
+        self._wall_anchor = time.time()
+        self._monotonic_anchor = time.monotonic()
+
+    def _now_timestamp(self) -> float:
+        """
+        Calcula la hora actual en segundos desde 1970 usando el reloj monotónico.
+        """
+        return self._wall_anchor + (time.monotonic() - self._monotonic_anchor)
+
+    def _ensure_calendar(self):
+        """
+        Carga el calendario la primera vez que se usa en el proceso e inicia su refresco diario en segundo plano.
+        Si el hilo de refresco terminó (por ejemplo, por un error) se vuelve a iniciar.
+        """
+        if self._calendar_loaded_at is not None and self._is_refresh_alive():
+            return
+
+        with self._calendar_lock:
+            if self._calendar_loaded_at is None:
+                # Si la copia local es de hoy se evita consultar a Alpaca
+                raw_calendar = self._read_calendar() if self._is_saved_calendar_fresh() else None
+                if raw_calendar is not None:
+                    self._build_calendar_index(raw_calendar)
+                else:
+                    self.load_calendar()
+                self._calendar_loaded_at = time.monotonic()
+
+            # Bajo el bloqueo, para que dos hilos no inicien dos refrescos
+            if not self._is_refresh_alive():
+                self._calendar_refresh_thread = threading.Thread(target=self._refresh_calendar, daemon=True)
+                self._calendar_refresh_thread.start()
+
+    def _is_refresh_alive(self) -> bool:
+        """
+        Indica si el hilo de refresco del calendario está en ejecución.
+        """
+        thread = self._calendar_refresh_thread
+        return thread is not None and thread.is_alive()
+
+    def _refresh_calendar(self):
+        """
+        Refresca el calendario una vez al día. Se ejecuta en un hilo en segundo plano.
+        """
+        while True:
+            elapsed = time.monotonic() - self._calendar_loaded_at
+            time.sleep(max(self._calendar_refresh_seconds - elapsed, 1))
+            self.load_calendar()
+            self._calendar_loaded_at = time.monotonic()
+
+    def _fetch_calendar(self) -> List[Dict[str, str]]:
+        """
+        Obtiene de Alpaca el calendario desde hoy hasta calendar_days días después.
+
+        Returns:
+            List[Dict[str, str]]: Las sesiones en el formato original de la API ('date', 'open' y 'close').
+        """
+        today = self.get_current_market_time().date()
+        calendar_request = GetCalendarRequest(start=today, end=today + timedelta(days=self._calendar_days))
+        calendar_list = self._trading_client.get_calendar(calendar_request)
+        return [
+            {
+                'date': calendar.date.isoformat(),
+                'open': calendar.open.strftime("%H:%M"),
+                'close': calendar.close.strftime("%H:%M"),
+            }
+            for calendar in calendar_list
+        ]
+
+    def _save_calendar(self, raw_calendar: List[Dict[str, str]]):
+        """
+        Persiste el calendario en el archivo local.
+        """
+        try:
+            with open(self._calendar_path, 'w') as file:
+                json.dump(raw_calendar, file)
+        except OSError as error:
+            print(f"No se pudo guardar el calendario en {self._calendar_path}: {error}")
+
+    def _read_calendar(self) -> List[Dict[str, str]]:
+        """
+        Lee el calendario persistido en el archivo local.
+
+        Returns:
+            List[Dict[str, str]]: Las sesiones guardadas, o None si el archivo no existe o no se puede leer.
+        """
+        try:
+            with open(self._calendar_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _is_saved_calendar_fresh(self) -> bool:
+        """
+        Indica si el archivo del calendario se actualizó hace menos de un día.
+        """
+        try:
+            return time.time() - os.path.getmtime(self._calendar_path) < self._calendar_refresh_seconds
+        except OSError:
+            return False
+
+    def _build_calendar_index(self, raw_calendar: List[Dict[str, str]]):
+        """
+        Precalcula las fechas y los límites de cada sesión en segundos UTC para las búsquedas en memoria.
+        """
+        calendar = sorted((Calendar(**dict(session)) for session in raw_calendar), key=lambda session: session.date)
+        opens = [self._market_timezone.localize(session.open).timestamp() for session in calendar]
+        closes = [self._market_timezone.localize(session.close).timestamp() for session in calendar]
+
+        # Se reemplaza el índice completo de una vez para que los lectores siempre vean un índice consistente
+        self._calendar_index = (calendar, [session.date for session in calendar], opens, closes)
+    #endregion
+
@@ -0,0 +1,232 @@
+from numpy import ndarray
+
+# Importaciones necesarias para manejar fechas y tiempo
+import time
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def last_price(ticks: ndarray) -> float:
+    """
+    Obtiene el precio actual a partir del último tick de un arreglo FieldType.ticks_dtype.
+
+    Las barras de MT5 se construyen con el bid, salvo en los símbolos que informan el último precio negociado.
+
+    Args:
+        ticks (ndarray): Arreglo de ticks ordenados por tiempo.
+
+    Returns:
+        float: El precio del último tick.
+    """
+    tick = ticks[-1]
+    return float(tick['last']) if tick['last'] else float(tick['bid'])
+
+
+class DispatcherStats:
+    """
+    Contadores de un EventDispatcher.
+
+    Attributes:
+        cycles (int): Número de ciclos de consulta realizados.
+        idle_cycles (int): Ciclos en los que no hubo ningún evento.
+        tick_events (int): Eventos on_tick entregados.
+        bar_events (int): Eventos on_bar_close entregados.
+        position_events (int): Eventos on_position_change entregados.
+        dropped_ticks (int): Ticks descartados por la política de contrapresión.
+        slept (float): Segundos que el despachador estuvo dormido.
+    """
+    __slots__ = ('cycles', 'idle_cycles', 'tick_events', 'bar_events', 'position_events', 'dropped_ticks', 'slept')
+
+    def __init__(self) -> None:
+        self.cycles = 0
+        self.idle_cycles = 0
+        self.tick_events = 0
+        self.bar_events = 0
+        self.position_events = 0
+        self.dropped_ticks = 0
+        self.slept = 0.0
+
+
+class EventDispatcher:
+    """
+    Despachador de eventos que reemplaza los ciclos while True sin pausa de las estrategias.
+
+    Consulta las fuentes de datos con una cadencia configurable y solo despierta a los manejadores registrados
+    cuando algo cambió: ticks nuevos (on_tick), cierre de una barra de un minuto (on_bar_close) o cambios en las
+    posiciones abiertas (on_position_change). Mientras el mercado está quieto la espera crece hasta idle_interval,
+    por lo que el uso de CPU cae casi a cero; al llegar un evento vuelve a la cadencia mínima.
+
+    Contrapresión: la fuente de ticks solo se consulta cuando los manejadores terminaron, de modo que los ticks
+    acumulados mientras tanto llegan juntos en un solo evento. Si max_ticks_per_event está definido, solo se
+    entregan los últimos max_ticks_per_event ticks de cada evento y el resto se cuenta en stats.dropped_ticks.
+
+    Example:
+        >>> dispatcher = EventDispatcher(tick_source=MT5Api.stream_ticks(["US30.cash"]), stop_when=lambda: False)
+        >>> dispatcher.on_tick(lambda symbol, ticks: print(symbol, last_price(ticks)))
+        >>> dispatcher.run()
+    """
+    def __init__(self, tick_source: Any = None, bar_source: Callable[[str], ndarray] = None, positions_source: Callable[[], Tuple] = None,
+                 poll_interval: float = 0.001, idle_interval: float = 0.02, max_ticks_per_event: int = None, stop_when: Callable[[], bool] = None,
+                 stop_check_interval: float = 1.0) -> None:
+        """
+        Inicializa el despachador.
+
+        Args:
+            tick_source (Any, optional): Fuente de ticks con un método poll_all() que devuelve [(símbolo, ticks)], como TickStream.
+            bar_source (Callable[[str], ndarray], optional): Función que devuelve la última barra cerrada de un símbolo.
+                Se llama cuando un tick pertenece a un minuto posterior al del tick anterior.
+            positions_source (Callable[[], Tuple], optional): Función que devuelve las posiciones abiertas, como MT5Api.get_positions.
+            poll_interval (float, optional): Segundos de espera mínima entre ciclos.
+            idle_interval (float, optional): Segundos de espera máxima cuando no hay eventos.
+            max_ticks_per_event (int, optional): Número máximo de ticks entregados por evento. None entrega todos.
+            stop_when (Callable[[], bool], optional): Función que devuelve True cuando el despachador debe detenerse.
+            stop_check_interval (float, optional): Segundos entre evaluaciones de stop_when.
+        """
+        self.tick_source = tick_source
+        self.bar_source = bar_source
+        self.positions_source = positions_source
+        self.poll_interval = poll_interval
+        self.idle_interval = max(idle_interval, poll_interval)
+        self.max_ticks_per_event = max_ticks_per_event
+        self.stop_when = stop_when
+        self.stop_check_interval = stop_check_interval
+        self.stats = DispatcherStats()
+
+        self._tick_handlers: List[Callable[[str, ndarray], None]] = []
+        self._bar_handlers: List[Callable[[str, ndarray], None]] = []
+        self._position_handlers: List[Callable[[Tuple], None]] = []
+
+        # Último minuto visto por símbolo, para detectar el cierre de las barras
+        self._last_minute: Dict[str, int] = {}
+        # Firma de la última foto de posiciones, para detectar cambios
+        self._positions_signature: Tuple = None
+        self._last_positions: Tuple = None
+        self._running = False
+
+    #region Registration
+    def on_tick(self, handler: Callable[[str, ndarray], None]):
+        """
+        Registra un manejador que recibe (símbolo, ticks nuevos).
+        """
+        self._tick_handlers.append(handler)
+
+    def on_bar_close(self, handler: Callable[[str, ndarray], None]):
+        """
+        Registra un manejador que recibe (símbolo, barra cerrada) cada vez que termina una barra de un minuto.
+        """
+        self._bar_handlers.append(handler)
+
+    def on_position_change(self, handler: Callable[[Tuple], None]):
+        """
+        Registra un manejador que recibe todas las posiciones abiertas cuando alguna cambió.
+        """
+        self._position_handlers.append(handler)
+    #endregion
+
+    #region Loop
+    def run(self):
+        """
+        Ejecuta el ciclo de eventos hasta que stop_when devuelva True o se llame a stop().
+        """
+        self._running = True
+        sleep = self.poll_interval
+        next_stop_check = 0.0
+
+        while self._running:
+            now = time.monotonic()
+            if self.stop_when is not None and now >= next_stop_check:
+                if self.stop_when():
+                    break
+                next_stop_check = now + self.stop_check_interval
+
+            events = self.dispatch_once()
+
+            # Sin eventos la espera crece hasta idle_interval; con eventos vuelve a la cadencia mínima
+            sleep = self.poll_interval if events else min(sleep * 2, self.idle_interval)
+            if sleep > 0:
+                time.sleep(sleep)
+                self.stats.slept += sleep
+
+        self._running = False
+
+    def stop(self):
+        """
+        Detiene el despachador al terminar el ciclo en curso.
+        """
+        self._running = False
+
+    def dispatch_once(self) -> int:
+        """
+        Realiza un ciclo de consultas y entrega los eventos encontrados.
+
+        Returns:
+            int: Número de eventos entregados en el ciclo.
+        """
+        self.stats.cycles += 1
+        events = 0
+
+        if self.tick_source is not None and (self._tick_handlers or self._bar_handlers):
+            for symbol, ticks in self.tick_source.poll_all():
+                events += self._dispatch_ticks(symbol, ticks)
+
+        if self.positions_source is not None and self._position_handlers:
+            events += self._dispatch_positions()
+
+        if not events:
+            self.stats.idle_cycles += 1
+        return events
+    #endregion
+
+    #region Dispatch
+    def _dispatch_ticks(self, symbol: str, ticks: ndarray) -> int:
+        """
+        Entrega los eventos de ticks y de cierre de barra de un símbolo.
+        """
+        events = 0
+
+        # Detecta el cierre de la barra comparando el minuto del último tick con el del ciclo anterior
+        minute = int(ticks['time_msc'][-1]) // 60000
+        previous_minute = self._last_minute.get(symbol)
+        self._last_minute[symbol] = minute
+        if self._bar_handlers and previous_minute is not None and minute > previous_minute:
+            bar = self.bar_source(symbol) if self.bar_source is not None else None
+            if bar is not None:
+                for handler in self._bar_handlers:
+                    handler(symbol, bar)
+                self.stats.bar_events += 1
+                events += 1
+
+        if self._tick_handlers:
+            if self.max_ticks_per_event is not None and ticks.size > self.max_ticks_per_event:
+                self.stats.dropped_ticks += ticks.size - self.max_ticks_per_event
+                ticks = ticks[-self.max_ticks_per_event:]
+            for handler in self._tick_handlers:
+                handler(symbol, ticks)
+            self.stats.tick_events += 1
+            events += 1
+
+        return events
+
+    def _dispatch_positions(self) -> int:
+        """
+        Entrega las posiciones abiertas si cambiaron desde el ciclo anterior.
+        """
+        positions = self.positions_source()
+        if positions is None:
+            return 0
+        # Una fuente como PositionsPoller.poll devuelve la misma tupla si ninguna posición cambió
+        if positions is self._last_positions:
+            return 0
+        self._last_positions = positions
+
+        signature = tuple((position.ticket, position.volume, position.sl, position.tp, position.price_current) for position in positions)
+        if signature == self._positions_signature:
+            return 0
+        self._positions_signature = signature
+
+        for handler in self._position_handlers:
+            handler(positions)
+        self.stats.position_events += 1
+        return 1
+    #endregion
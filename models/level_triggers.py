@@ -0,0 +1,232 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Para compartir memoria y bloqueos entre procesos
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+
+class LevelDirection:
+    """
+    Sentido en el que se cruza un nivel para que se dispare.
+    """
+    ABOVE = 1       # Se dispara cuando el precio supera el nivel
+    BELOW = -1      # Se dispara cuando el precio queda por debajo del nivel
+
+
+class LevelSpec(NamedTuple):
+    """
+    Definición de un nivel dentro de un LevelTriggerIndex.
+
+    Attributes:
+        name (str): Nombre del nivel, por ejemplo 'high' o 'recovery_low'.
+        direction (int): LevelDirection.ABOVE o LevelDirection.BELOW.
+        rearm (bool): Si es True, el nivel disparado se vuelve a armar cuando el precio regresa al otro lado del nivel.
+    """
+    name: str
+    direction: int
+    rearm: bool = False
+
+
+class LevelTriggerIndex:
+    """
+    Índice de niveles de precio armados para muchos símbolos, en memoria compartida.
+
+    Cada símbolo tiene una fila con los niveles definidos en specs. Los cruces se detectan con una sola comparación
+    vectorizada sobre todas las filas consultadas, en lugar de una cadena de if por símbolo. Cada nivel pasa por los
+    estados desarmado -> armado -> disparado; el paso de armado a disparado se hace bajo el bloqueo de la fila,
+    por lo que un cruce se entrega una sola vez aunque varios procesos consulten el mismo índice al mismo tiempo.
+    El objeto debe compartirse con los otros procesos por herencia, es decir, como argumento del proceso.
+
+    Example:
+        >>> triggers = LevelTriggerIndex(["US30.cash"], [LevelSpec('high', LevelDirection.ABOVE), LevelSpec('low', LevelDirection.BELOW)], create=True)
+        >>> triggers.arm("US30.cash", high=34100.0, low=34000.0)
+        >>> triggers.check("US30.cash", 34100.5)
+        ['high']
+        >>> triggers.check("US30.cash", 34101.0)
+        []
+    """
+    DISARMED = 0
+    ARMED = 1
+    FIRED = 2
+
+    def __init__(self, symbols: List[str], specs: Sequence[LevelSpec], name: str = None, create: bool = False, locks: List[Any] = None) -> None:
+        """
+        Crea el índice o se conecta a uno existente.
+
+        Args:
+            symbols (List[str]): Los símbolos del índice, en el mismo orden para el creador y los demás procesos.
+            specs (Sequence[LevelSpec]): Los niveles de cada símbolo.
+            name (str, optional): Nombre del bloque de memoria compartida. Obligatorio si create es False.
+            create (bool, optional): True para crear el bloque de memoria (solo el proceso dueño).
+            locks (List[Any], optional): Bloqueos de las filas, uno por símbolo. Si no se indican se crean nuevos.
+        """
+        self.symbols = list(symbols)
+        self.specs = [LevelSpec(*spec) for spec in specs]
+        self._slots: Dict[str, int] = {symbol: index for index, symbol in enumerate(self.symbols)}
+        self._columns: Dict[str, int] = {spec.name: index for index, spec in enumerate(self.specs)}
+        self._directions = np.array([spec.direction for spec in self.specs], dtype='i1')
+        self._rearm = np.array([spec.rearm for spec in self.specs], dtype='?')
+        self._owner = create
+        self._locks = locks if locks is not None else [multiprocessing.Lock() for _ in self.symbols]
+
+        # Un bloque con los niveles (float64) seguido de los estados (int8)
+        shape = (max(len(self.symbols), 1), max(len(self.specs), 1))
+        levels_size = int(np.prod(shape)) * 8
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=levels_size + int(np.prod(shape)))
+        self.name = self._shm.name
+        self._levels: ndarray = np.ndarray(shape, dtype='f8', buffer=self._shm.buf)
+        self._states: ndarray = np.ndarray(shape, dtype='i1', buffer=self._shm.buf, offset=levels_size)
+        if create:
+            self._levels[:] = np.nan
+            self._states[:] = self.DISARMED
+
+    #region Pickle
+    def __getstate__(self):
+        return {'symbols': self.symbols, 'specs': self.specs, 'name': self.name, 'locks': self._locks}
+
+    def __setstate__(self, state):
+        self.__init__(state['symbols'], state['specs'], name=state['name'], create=False, locks=state['locks'])
+    #endregion
+
+    #region Arming
+    def arm(self, symbol: str, **levels: float):
+        """
+        Arma los niveles indicados de un símbolo.
+
+        Armar de nuevo un nivel con el mismo precio no cambia su estado, por lo que un nivel ya disparado
+        no se vuelve a armar aunque la estrategia repita la llamada en cada tick.
+
+        Args:
+            symbol (str): El símbolo.
+            **levels (float): Nombre del nivel -> precio. Un precio None desarma el nivel.
+        """
+        row = self._slots[symbol]
+        with self._locks[row]:
+            for level_name, price in levels.items():
+                column = self._columns[level_name]
+                if price is None:
+                    self._levels[row, column] = np.nan
+                    self._states[row, column] = self.DISARMED
+                elif self._levels[row, column] != price or self._states[row, column] == self.DISARMED:
+                    self._levels[row, column] = price
+                    self._states[row, column] = self.ARMED
+
+    def disarm(self, symbol: str, *names: str):
+        """
+        Desarma niveles de un símbolo de forma atómica.
+
+        Args:
+            symbol (str): El símbolo.
+            *names (str): Los niveles a desarmar. Si no se indica ninguno, se desarman todos.
+        """
+        row = self._slots[symbol]
+        columns = [self._columns[level_name] for level_name in names] if names else slice(None)
+        with self._locks[row]:
+            self._states[row, columns] = self.DISARMED
+
+    def rearm(self, symbol: str, *names: str):
+        """
+        Vuelve a armar niveles disparados con su mismo precio, por ejemplo cuando la orden del disparo no se pudo enviar.
+
+        Args:
+            symbol (str): El símbolo.
+            *names (str): Los niveles a rearmar. Si no se indica ninguno, se rearman todos los que tengan precio.
+        """
+        row = self._slots[symbol]
+        columns = [self._columns[level_name] for level_name in names] if names else list(range(len(self.specs)))
+        with self._locks[row]:
+            for column in columns:
+                if not np.isnan(self._levels[row, column]):
+                    self._states[row, column] = self.ARMED
+
+    def get_level(self, symbol: str, level_name: str) -> Tuple[float, int]:
+        """
+        Obtiene el precio y el estado de un nivel.
+
+        Returns:
+            Tuple[float, int]: (precio, estado). El precio es None si el nivel no tiene precio.
+        """
+        row, column = self._slots[symbol], self._columns[level_name]
+        price = self._levels[row, column]
+        return (None if np.isnan(price) else float(price)), int(self._states[row, column])
+    #endregion
+
+    #region Triggers
+    def check(self, symbol: str, price: float, names: Sequence[str] = None) -> List[str]:
+        """
+        Consulta los niveles de un símbolo con su precio actual y reclama los que se cruzaron.
+
+        Args:
+            symbol (str): El símbolo.
+            price (float): El precio actual.
+            names (Sequence[str], optional): Solo se consideran estos niveles. Por defecto, todos.
+
+        Returns:
+            List[str]: Los nombres de los niveles disparados. Cada cruce se entrega una sola vez.
+        """
+        return [level_name for _, level_name in self.check_batch([symbol], [price], names)]
+
+    def check_batch(self, symbols: Sequence[str], prices: Sequence[float], names: Sequence[str] = None) -> List[Tuple[str, str]]:
+        """
+        Consulta en una sola comparación vectorizada los niveles de un lote de cotizaciones.
+
+        Args:
+            symbols (Sequence[str]): Los símbolos del lote.
+            prices (Sequence[float]): El precio actual de cada símbolo, en el mismo orden.
+            names (Sequence[str], optional): Solo se consideran estos niveles. Por defecto, todos.
+
+        Returns:
+            List[Tuple[str, str]]: Los pares (símbolo, nivel) disparados. Cada cruce se entrega una sola vez.
+        """
+        rows = np.fromiter((self._slots[symbol] for symbol in symbols), dtype=np.intp, count=len(symbols))
+        prices = np.asarray(prices, dtype='f8')[:, None]
+        columns = np.ones(len(self.specs), dtype='?')
+        if names is not None:
+            columns[:] = False
+            columns[[self._columns[level_name] for level_name in names]] = True
+
+        levels = self._levels[rows]
+        states = self._states[rows]
+        # Distancia con signo: positiva cuando el precio está del lado que dispara el nivel
+        distance = (prices - levels) * self._directions
+
+        # Los niveles disparados con rearme vuelven a armarse cuando el precio regresa al otro lado
+        returned = (states == self.FIRED) & self._rearm & (distance < 0)
+        if returned.any():
+            for index, column in zip(*np.nonzero(returned)):
+                self._transition(rows[index], column, self.FIRED, self.ARMED)
+
+        crossed = (states == self.ARMED) & columns & (distance > 0)
+        fired = []
+        if crossed.any():
+            for index, column in zip(*np.nonzero(crossed)):
+                if self._transition(rows[index], column, self.ARMED, self.FIRED):
+                    fired.append((self.symbols[rows[index]], self.specs[column].name))
+        return fired
+
+    def _transition(self, row: int, column: int, current: int, new: int) -> bool:
+        """
+        Cambia el estado de un nivel solo si sigue en el estado esperado (comparar e intercambiar bajo el bloqueo de la fila).
+        """
+        with self._locks[row]:
+            if self._states[row, column] != current:
+                return False
+            self._states[row, column] = new
+            return True
+    #endregion
+
+    #region Lifecycle
+    def close(self):
+        """
+        Libera el bloque de memoria compartida. El proceso dueño además lo elimina.
+        """
+        self._levels = None
+        self._states = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+    #endregion
@@ -2,8 +2,15 @@ import MetaTrader5 as mt5   # Para conectarse y realizar solicitudes a una termi
 import numpy as np          # Para realizar operaciones numéricas eficientes
 
 # Importaciones para el manejo de datos
-from .enums import FieldType, TimeFrame, CopyTicks, OrderType, TradeActions, TickFlag
+from .enums import FieldType, TimeFrame, CopyTicks, OrderType, TradeActions, TickFlag, LastErrorCode
 from .models import Tick, MqlTradeResult, SymbolInfo, TradeDeal, TradeOrder, TradePosition
+from .gateway import MT5GatewayClient
+from .streams import TickStream
+from .history_store import RatesHistoryStore
+from .downloader import RangeDownloader
+from .positions import positions_to_array
+from .orders import OrderResult, prepare_order_requests
+from .server_time import ServerTime
 from numpy import ndarray
 
 # Importaciones necesarias para manejar fechas y tiempo
@@ -12,7 +19,10 @@ import time
 import pytz
 
 # Importaciones necesarias para definir tipos de datos
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Callable, Dict
+from contextlib import contextmanager
+from functools import wraps
+import threading
 
 # Importación de módulos externos
 import os
@@ -20,6 +30,53 @@ from dotenv import load_dotenv
 
 # Carga las variables de entorno desde un archivo .env
 load_dotenv()
+
+# Estado por hilo que indica si el hilo actual es el que atiende el gateway
+_gateway_thread = threading.local()
+
+# Estado por hilo que indica si el almacén de barras está descargando datos de la terminal
+_history_thread = threading.local()
+
+def _gateway_routed(method: Callable) -> Callable:
+    """
+    Decorador que envía la llamada al gateway cuando el proceso tiene un cliente registrado con MT5Api.use_gateway().
+    Sin gateway, la llamada se ejecuta con el bloqueo de la terminal del proceso (MT5Api._terminal_lock): la librería
+    MetaTrader5 no admite llamadas simultáneas desde varios hilos.
+
+    Args:
+        method (Callable): Método de MT5Api que se puede atender por el gateway.
+
+    Returns:
+        Callable: El método decorado.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        client = MT5Api._gateway_client()
+        if client is not None:
+            return client.call(method.__name__, *args, **kwargs)
+        with MT5Api._terminal_lock:
+            return method(*args, **kwargs)
+    return wrapper
+
+def _history_routed(method: Callable) -> Callable:
+    """
+    Decorador que atiende la llamada con el almacén de barras cuando el proceso tiene uno registrado con
+    MT5Api.use_history_store(). Se aplica antes que _gateway_routed, de modo que los datos guardados
+    no pasan por el gateway ni por la terminal.
+
+    Args:
+        method (Callable): Getter de barras de MT5Api con un método del mismo nombre en RatesHistoryStore.
+
+    Returns:
+        Callable: El método decorado.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        store = MT5Api._history_store
+        if store is not None and not getattr(_history_thread, 'active', False):
+            return getattr(store, method.__name__)(*args, **kwargs)
+        return method(*args, **kwargs)
+    return wrapper
     
 class MT5Api:
     """
@@ -28,12 +85,40 @@ class MT5Api:
     Esta clase proporciona métodos para conectarse a MetaTrader 5, obtener información de la cuenta, colocar órdenes y más.
     """    
     
+    # Estado de la sesión persistente del proceso actual
+    _session_depth: int = 0
+    _session_connected: bool = False
+    
+    # Serializa las llamadas directas a la terminal de los hilos del proceso actual; reentrante porque unos métodos llaman a otros
+    _terminal_lock = threading.RLock()
+    
+    # Cliente del gateway registrado en el proceso actual, None si el proceso usa la terminal directamente
+    _gateway: MT5GatewayClient = None
+    
+    # Almacén local de barras del proceso actual, None si las barras se piden siempre a la terminal
+    _history_store: RatesHistoryStore = None
+    
+    # Conversión entre UTC y la hora del servidor, con los cambios de horario del broker
+    server_time: ServerTime = ServerTime.from_env()
+    
+    # Códigos de last_error() que indican que el canal IPC con la terminal se perdió
+    _CONNECTION_ERRORS = (
+        LastErrorCode.RES_E_INTERNAL_FAIL,
+        LastErrorCode.RES_E_INTERNAL_FAIL_SEND,
+        LastErrorCode.RES_E_INTERNAL_FAIL_RECEIVE,
+        LastErrorCode.RES_E_INTERNAL_FAIL_INIT,
+        LastErrorCode.RES_E_INTERNAL_FAIL_CONNECT,
+        LastErrorCode.RES_E_INTERNAL_FAIL_TIMEOUT,
+    )
+    
     #region Lifecycle
     def initialize(sleep: int = 0) -> bool:
         """
         Inicializa la conexión con MetaTrader 5.
 
         Esta función inicializa la conexión con MetaTrader 5 utilizando la ruta predefinida en la variable de entorno MT5_PATH.
+        Si hay una sesión persistente abierta en el proceso, no se vuelve a conectar: solo se verifica que la conexión
+        siga viva y se reconecta en caso necesario, sin esperar.
 
         Args:
             sleep (int, optional): El tiempo en segundos para esperar después de la inicialización antes de retornar. 
@@ -42,6 +127,9 @@ class MT5Api:
         Returns:
             bool: True si la inicialización fue exitosa, False en caso contrario.
         """
+        if MT5Api._session_depth > 0:
+            return MT5Api._ensure_connection()
+        
         request = mt5.initialize(path=os.getenv("MT5_PATH"))
         time.sleep(sleep)
         return request
@@ -51,6 +139,7 @@ class MT5Api:
         Detiene la conexión con MetaTrader 5.
 
         Esta función detiene la conexión con MetaTrader 5 y debe llamarse al finalizar la interacción con MetaTrader 5.
+        Si hay una sesión persistente abierta en el proceso, la conexión se mantiene y la llamada no tiene efecto.
 
         Args:
             sleep (int, optional): El tiempo en segundos para esperar después de la detención antes de retornar. 
@@ -59,12 +148,162 @@ class MT5Api:
         Returns:
             None
         """
+        if MT5Api._session_depth > 0:
+            return None
+        
         request = mt5.shutdown()
         time.sleep(sleep)
         return request
+    
+    def open_session() -> bool:
+        """
+        Abre una sesión persistente con MetaTrader 5 para el proceso actual.
+
+        Mientras la sesión esté abierta, initialize() y shutdown() dejan de conectar y desconectar la terminal
+        en cada llamada, por lo que todos los métodos de MT5Api reutilizan la misma conexión.
+        Las sesiones se pueden anidar; la conexión se cierra al cerrar la sesión más externa.
+
+        Returns:
+            bool: True si la conexión quedó establecida, False en caso contrario.
+        """
+        MT5Api._session_depth += 1
+        return MT5Api._ensure_connection()
+    
+    def close_session():
+        """
+        Cierra la sesión persistente abierta con open_session().
+
+        Si es la sesión más externa, se detiene la conexión con MetaTrader 5.
+
+        Returns:
+            None
+        """
+        if MT5Api._session_depth == 0:
+            return
+        
+        MT5Api._session_depth -= 1
+        if MT5Api._session_depth == 0 and MT5Api._session_connected:
+            mt5.shutdown()
+            MT5Api._session_connected = False
+    
+    @contextmanager
+    def session():
+        """
+        Administrador de contexto que mantiene una sesión persistente con MetaTrader 5.
+
+        Example:
+            >>> with MT5Api.session():
+            ...     positions = MT5Api.get_positions()
+            ...     price = MT5Api.get_last_price("US30.cash")
+        """
+        MT5Api.open_session()
+        try:
+            yield
+        finally:
+            MT5Api.close_session()
+    
+    def is_connected() -> bool:
+        """
+        Comprueba de forma económica si la conexión con MetaTrader 5 sigue activa.
+
+        Primero revisa el último error registrado localmente por la librería, y solo si este indica
+        un problema de comunicación consulta terminal_info() a la terminal.
+
+        Returns:
+            bool: True si la conexión está activa, False en caso contrario.
+        """
+        if not MT5Api._session_connected:
+            return False
+        
+        code, _ = mt5.last_error()
+        if code in MT5Api._CONNECTION_ERRORS:
+            return mt5.terminal_info() is not None
+        return True
+    
+    def _ensure_connection() -> bool:
+        """
+        Verifica la conexión de la sesión persistente y reconecta de forma perezosa si se perdió.
+
+        Returns:
+            bool: True si la conexión está activa, False si no se pudo reconectar.
+        """
+        if MT5Api._gateway_client() is not None:
+            # El gateway es el dueño de la conexión con la terminal
+            return True
+        
+        if MT5Api.is_connected():
+            return True
+        
+        if MT5Api._session_connected:
+            # La conexión se perdió, se libera antes de volver a conectar
+            mt5.shutdown()
+            
+        MT5Api._session_connected = bool(mt5.initialize(path=os.getenv("MT5_PATH")))
+        if not MT5Api._session_connected:
+            print(f"No se pudo conectar con MetaTrader 5. Error: {mt5.last_error()}")
+        return MT5Api._session_connected
+    
+    def use_gateway(client: MT5GatewayClient = None):
+        """
+        Registra un cliente del gateway para el proceso actual.
+
+        A partir de este momento los getters y setters de MT5Api se atienden en el proceso del gateway,
+        que es el único que mantiene la conexión con la terminal. Con None se vuelve a usar la terminal directamente.
+
+        Args:
+            client (MT5GatewayClient, optional): El cliente creado con MT5Gateway.create_client().
+        """
+        MT5Api._gateway = client
+    
+    def serving_gateway(active: bool = True):
+        """
+        Marca el hilo actual como el que atiende el gateway, para que sus llamadas se ejecuten contra la terminal.
+
+        Args:
+            active (bool, optional): True mientras el hilo atiende solicitudes del gateway.
+        """
+        _gateway_thread.active = active
+    
+    def _gateway_client() -> MT5GatewayClient:
+        """
+        Obtiene el cliente del gateway al que se deben enviar las llamadas del hilo actual.
+
+        Returns:
+            MT5GatewayClient: El cliente registrado, o None si la llamada se debe ejecutar directamente.
+        """
+        if MT5Api._gateway is None or getattr(_gateway_thread, 'active', False):
+            return None
+        return MT5Api._gateway
+    
+    def use_history_store(store: RatesHistoryStore = None):
+        """
+        Registra un almacén local de barras para el proceso actual.
+
+        A partir de este momento get_rates_range y get_rates_from_date leen primero el almacén y solo piden
+        a la terminal los días que faltan. Con None se vuelve a usar siempre la terminal.
+
+        Args:
+            store (RatesHistoryStore, optional): El almacén de barras.
+        """
+        MT5Api._history_store = store
+    
+    @contextmanager
+    def bypass_history_store():
+        """
+        Contexto en el que los getters de barras del hilo actual van directamente a la terminal (o al gateway).
+        Lo usa el almacén para descargar los días que le faltan.
+        """
+        previous = getattr(_history_thread, 'active', False)
+        _history_thread.active = True
+        try:
+            yield
+        finally:
+            _history_thread.active = previous
     #endregion
 
     #region Getters
+    @_history_routed
+    @_gateway_routed
     def get_rates_from_date(symbol:str, timeframe:TimeFrame, date_from:datetime, count: int) -> ndarray[FieldType.rates_dtype]:
         """
         Obtiene datos históricos de precios (velas) para un símbolo y marco temporal específicos a partir de una fecha dada.
@@ -112,6 +351,7 @@ class MT5Api:
         MT5Api.shutdown()
         return rates
     
+    @_gateway_routed
     def get_rates_from_pos(symbol:str, timeframe:TimeFrame, start_pos:int, count: int) -> ndarray[FieldType.rates_dtype]:
         """
         Obtiene datos históricos de precios (velas) para un símbolo y marco temporal específicos a partir de una posición dada.
@@ -158,6 +398,8 @@ class MT5Api:
         MT5Api.shutdown()
         return rates
     
+    @_history_routed
+    @_gateway_routed
     def get_rates_range(symbol:str, timeframe:TimeFrame, date_from:datetime, date_to:datetime) -> ndarray[FieldType.rates_dtype]:
         """
         Obtiene datos históricos de precios (velas) para un símbolo y marco temporal específicos dentro de un rango de fechas.
@@ -207,6 +449,7 @@ class MT5Api:
         MT5Api.shutdown()
         return rates
     
+    @_gateway_routed
     def get_ticks_from(symbol: str, date_from: datetime, count: int, flag: CopyTicks) -> np.ndarray[FieldType.ticks_dtype]:
         """
         Obtiene ticks del terminal MetaTrader 5 a partir de la fecha indicada.
@@ -241,6 +484,7 @@ class MT5Api:
         MT5Api.shutdown()
         return ticks
     
+    @_gateway_routed
     def get_ticks_range(symbol: str, date_from: datetime, date_to: datetime, flags: CopyTicks) -> np.ndarray[FieldType.ticks_dtype]:
         """
         Obtiene ticks del terminal MetaTrader 5 en un intervalo de fechas indicado.
@@ -263,12 +507,11 @@ class MT5Api:
         # Convierte las fechas a MT5
         date_from_mt5 = MT5Api.convert_utc_to_mt5_timezone(date_from)
         date_to_gmt_mt5 = MT5Api.convert_utc_to_mt5_timezone(date_to)
-        flags_value = sum(flags.value)
         ticks = mt5.copy_ticks_range(
             symbol,       # nombre del símbolo
             date_from_mt5,    # fecha a partir de la cual se solicitan los ticks (hora en UTC)
             date_to_gmt_mt5,      # fecha hasta la cual se solicitan los ticks (hora en UTC)
-            flags_value   # combinación de banderas que determina el tipo de ticks solicitados
+            flags         # combinación de banderas que determina el tipo de ticks solicitados
         )
         if ticks is None:
             return None
@@ -277,7 +520,115 @@ class MT5Api:
         MT5Api.shutdown()
         return ticks
 
-    def get_positions(symbol: str = None, ticket: int = None)-> Tuple[TradePosition, ...]:
+    @_gateway_routed
+    def get_ticks_from_msc(symbol: str, time_msc: int, count: int, flags: CopyTicks) -> np.ndarray[FieldType.ticks_dtype]:
+        """
+        Obtiene ticks a partir de un time_msc expresado en la hora del servidor de MT5, sin conversión de zona horaria.
+
+        copy_ticks_from trabaja con segundos, por lo que el resultado incluye todos los ticks del segundo de time_msc.
+
+        Args:
+            symbol (str): El nombre del instrumento financiero (por ejemplo, "EURUSD").
+            time_msc (int): Milisegundos desde 1970 en la hora del servidor, como los devuelve el campo time_msc.
+            count (int): Número de ticks que se deben obtener.
+            flags (CopyTicks): Bandera que determina el tipo de ticks solicitados (COPY_TICKS_ALL, COPY_TICKS_INFO, o COPY_TICKS_TRADE).
+
+        Returns:
+            np.ndarray: Un arreglo NumPy con los ticks, o None en caso de error.
+        """
+        # Inicializa la conexión con la plataforma MetaTrader 5
+        MT5Api.initialize()
+        
+        ticks = mt5.copy_ticks_from(
+            symbol,             # nombre del símbolo
+            time_msc // 1000,   # segundo a partir del cual se solicitan los ticks
+            count,              # número de ticks
+            flags               # tipo de ticks solicitados
+        )
+        
+        # Cierra la conexión con MetaTrader 5
+        MT5Api.shutdown()
+        return ticks
+    
+    def stream_ticks(symbols: List[str], flags: CopyTicks = CopyTicks.COPY_TICKS_ALL, count: int = 1000, poll_interval: float = 0.01, start_msc: Dict[str, int] = None) -> TickStream:
+        """
+        Crea un flujo incremental de ticks para uno o varios símbolos.
+
+        El flujo consulta copy_ticks_from desde el último time_msc visto de cada símbolo y entrega solo los ticks nuevos,
+        de modo que las estrategias reaccionan a cada tick una sola vez sin volver a pedir barras.
+        Los contadores de retraso y descartes de cada símbolo están en el atributo stats del flujo.
+
+        Args:
+            symbols (List[str]): Los símbolos a seguir.
+            flags (CopyTicks, optional): Tipo de ticks solicitados (COPY_TICKS_ALL, COPY_TICKS_INFO o COPY_TICKS_TRADE).
+            count (int, optional): Número máximo de ticks pedidos por consulta y símbolo.
+            poll_interval (float, optional): Segundos de espera cuando ningún símbolo tuvo ticks nuevos en un ciclo.
+            start_msc (Dict[str, int], optional): time_msc inicial por símbolo (hora del servidor). Por defecto,
+                el flujo comienza en el último tick disponible de cada símbolo.
+
+        Returns:
+            TickStream: Un iterable que produce tuplas (símbolo, ticks) con arreglos FieldType.ticks_dtype.
+
+        Example:
+            >>> stream = MT5Api.stream_ticks(["US30.cash"])
+            >>> for symbol, ticks in stream:
+            ...     print(symbol, ticks['bid'][-1], stream.stats[symbol].lag_ms)
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        return TickStream(symbols, flags=flags, count=count, poll_interval=poll_interval, start_msc=start_msc)
+    
+    def download_ticks(symbol: str, date_from: datetime, date_to: datetime, flags: CopyTicks = CopyTicks.COPY_TICKS_ALL, chunk: timedelta = timedelta(hours=6), parallel: int = 4) -> RangeDownloader:
+        """
+        Descarga los ticks de un rango largo en tramos, varios a la vez, y los entrega en orden.
+
+        A diferencia de get_ticks_range, no arma un único arreglo con todo el rango: cada tramo se procesa y se
+        libera antes de recibir los siguientes, por lo que meses de ticks se recorren con memoria acotada.
+
+        Args:
+            symbol (str): El nombre del instrumento financiero (por ejemplo, "EURUSD").
+            date_from (datetime): La fecha a partir de la cual se solicitan los ticks (hora en UTC).
+            date_to (datetime): La fecha hasta la cual se solicitan los ticks (hora en UTC).
+            flags (CopyTicks, optional): Tipo de ticks solicitados (COPY_TICKS_ALL, COPY_TICKS_INFO o COPY_TICKS_TRADE).
+            chunk (timedelta, optional): Duración de cada tramo.
+            parallel (int, optional): Número máximo de tramos pedidos a la vez.
+
+        Returns:
+            RangeDownloader: Un iterable que produce tuplas (inicio, fin, ticks) con arreglos FieldType.ticks_dtype.
+
+        Example:
+            >>> for chunk_from, chunk_to, ticks in MT5Api.download_ticks("US30.cash", date_from, date_to):
+            ...     renko.update_renko(ticks)
+        """
+        return RangeDownloader(
+            lambda start, end: MT5Api.get_ticks_range(symbol, start, end, flags),
+            date_from, date_to, chunk, MT5Api.convert_utc_to_mt5_timezone,
+            time_field='time_msc', time_scale=1000, parallel=parallel
+        )
+    
+    def download_rates(symbol: str, timeframe: TimeFrame, date_from: datetime, date_to: datetime, chunk: timedelta = timedelta(days=30), parallel: int = 4) -> RangeDownloader:
+        """
+        Descarga las barras de un rango largo en tramos, varios a la vez, y las entrega en orden.
+
+        Args:
+            symbol (str): El nombre del instrumento financiero (por ejemplo, "EURUSD").
+            timeframe (TimeFrame): El marco temporal de las velas.
+            date_from (datetime): La fecha a partir de la cual se solicitan las barras (hora en UTC).
+            date_to (datetime): La fecha hasta la cual se solicitan las barras (hora en UTC).
+            chunk (timedelta, optional): Duración de cada tramo.
+            parallel (int, optional): Número máximo de tramos pedidos a la vez.
+
+        Returns:
+            RangeDownloader: Un iterable que produce tuplas (inicio, fin, barras) con arreglos FieldType.rates_dtype.
+        """
+        return RangeDownloader(
+            lambda start, end: MT5Api.get_rates_range(symbol, timeframe, start, end),
+            date_from, date_to, chunk, MT5Api.convert_utc_to_mt5_timezone,
+            time_field='time', time_scale=1, parallel=parallel
+        )
+
+    @_gateway_routed
+    def get_positions(symbol: str = None, ticket: int = None, as_array: bool = False)-> Tuple[TradePosition, ...]:
         """
         Obtiene las posiciones abiertas para un símbolo específico en MetaTrader 5.
         
@@ -286,6 +637,8 @@ class MT5Api:
         Args:
             symbol (str, optional): El símbolo del instrumento financiero para el cual se desean obtener las posiciones.
             ticket (int, optional): El número de ticket de la posición que se desea obtener de manera específica.
+            as_array (bool, optional): True para obtener un arreglo estructurado POSITION_DTYPE, con la etiqueta de
+                la estrategia y el contador de cada comentario, para procesar todas las posiciones de forma vectorizada.
 
         Returns:
             Tuple[TradePosition, ...] or None: Una tupla de objetos TradePosition que representan las posiciones abiertas.
@@ -302,8 +655,11 @@ class MT5Api:
         
         # Cierra la conexión con MetaTrader 5
         MT5Api.shutdown()
+        if as_array and positions is not None:
+            return positions_to_array(positions)
         return positions
     
+    @_gateway_routed
     def get_history_orders(date_from: datetime, date_to: datetime, symbol: str = None) -> Tuple[TradeOrder, ...]:
         """
         Obtiene un historial de órdenes de trading en un rango de fechas y, opcionalmente, para un símbolo específico.
@@ -340,6 +696,7 @@ class MT5Api:
         MT5Api.shutdown()
         return history_orders
 
+    @_gateway_routed
     def get_history_deals(date_from: datetime, date_to: datetime, symbol: str = None)-> Tuple[TradeDeal, ...]:
         """
         Obtiene un historial de transacciones de trading en un rango de fechas y, opcionalmente, para un símbolo específico.
@@ -376,6 +733,7 @@ class MT5Api:
         MT5Api.shutdown()
         return history_deals
     
+    @_gateway_routed
     def get_symbol_info(symbol: str) -> SymbolInfo:
         """
         Obtiene información detallada del símbolo especificado en MetaTrader 5.
@@ -397,6 +755,7 @@ class MT5Api:
         
         return symbol_info
 
+    @_gateway_routed
     def get_symbol_info_tick(symbol: str)->Tick :
         """
         Obtiene información de la última cotización (tick) del símbolo especificado en MetaTrader 5.
@@ -418,6 +777,7 @@ class MT5Api:
         
         return symbol_info_tick
     
+    @_gateway_routed
     def get_last_price(symbol:str)->float:
         """
         Obtiene el precio de cierre más reciente para un símbolo en MetaTrader 5.
@@ -432,6 +792,7 @@ class MT5Api:
         close = last_rate[-1]['close']
         return close
 
+    @_gateway_routed
     def get_last_bar(symbol:str)->np.ndarray[FieldType.ticks_dtype]:
         """
         Obtiene la barra más reciente para un símbolo en MetaTrader 5.
@@ -448,6 +809,7 @@ class MT5Api:
     #endregion
 
     #region Setters
+    @_gateway_routed
     def send_order(symbol:str, order_type:OrderType, volume:float, price:float=None, stop_loss:float=None, take_profit:float=None, ticket:int=None, comment:str=None) -> MqlTradeResult:
         """
         Envía una orden al servidor de MetaTrader 5.
@@ -506,6 +868,7 @@ class MT5Api:
         MT5Api.shutdown()
         return order_request
     
+    @_gateway_routed
     def send_sell_partial_order(symbol: str, volume_to_sell: float, ticket:int, comment:str = None)->bool:
         """
         Vende una parte de una posición abierta en MT5.
@@ -567,6 +930,7 @@ class MT5Api:
             print("Ticket no encontrado.")
             return False
     
+    @_gateway_routed
     def send_change_stop_loss(symbol:str, new_stop_loss: float, ticket:int)->bool:
         """
         Cambia el nivel de stop loss de una posición abierta en MT5.
@@ -602,6 +966,7 @@ class MT5Api:
             print(f"Comentario: {modify_result.comment}")
             return False  
         
+    @_gateway_routed
     def send_change_take_profit(symbol:str, new_take_profit: float, ticket:int):
         """
         Cambia el nivel de take profit de una posición abierta en MT5.
@@ -632,34 +997,134 @@ class MT5Api:
         # Cierra la conexión con MetaTrader 5
         MT5Api.shutdown()
     
-    def send_close_all_position():
+    @_gateway_routed
+    def send_change_stops(symbol: str, ticket: int, stop_loss: float = None, take_profit: float = None) -> bool:
         """
-        Cierra todas las posiciones abiertas en la plataforma MetaTrader 5.
-        
-        Esta función se conecta a MetaTrader 5, obtiene todas las posiciones abiertas,
-        y las cierra una por una. Luego muestra un mensaje de éxito o error para cada posición cerrada.
+        Cambia el stop loss y el take profit de una posición abierta en MT5 con una sola solicitud.
+
+        Args:
+            symbol (str): El símbolo del instrumento.
+            ticket (int): El número de ticket de la posición a modificar.
+            stop_loss (float, optional): El nuevo nivel de stop loss. Si no se indica, no se incluye en la solicitud.
+            take_profit (float, optional): El nuevo nivel de take profit, 0.0 para quitarlo. Si no se indica, no se incluye en la solicitud.
+
+        Returns:
+            bool: True si la modificación se ejecutó con éxito, False si no.
         """
         # Inicializa la conexión con la plataforma MetaTrader 5
         MT5Api.initialize()
+
+        modify_request = {
+            "action": TradeActions.TRADE_ACTION_SLTP,
+            "symbol": symbol,
+            "position": ticket,
+        }
+        if stop_loss is not None:
+            modify_request["sl"] = float(stop_loss)
+        if take_profit is not None:
+            modify_request["tp"] = float(take_profit)
+
+        modify_result = mt5.order_send(modify_request)
+
+        # Cierra la conexión con MetaTrader 5
+        MT5Api.shutdown()
+
+        if modify_result.retcode == mt5.TRADE_RETCODE_DONE:
+            print(f"Modificación de stops ejecutada. {symbol}: sl[{stop_loss}] tp[{take_profit}]")
+            return True
+        else:
+            print(f"Error al ejecutar la modificación de stops: {modify_result.retcode}")
+            print(f"Comentario: {modify_result.comment}")
+            return False
+
+    @_gateway_routed
+    def send_orders(requests: List[Dict[str, Any]]) -> List[OrderResult]:
+        """
+        Envía varias solicitudes a la terminal, una detrás de otra, dentro de una sola sesión.
+
+        Las solicitudes se validan juntas antes de enviar ninguna: la información y el precio de cada símbolo se
+        consultan una sola vez, y se completa el precio de mercado de las que no lo indican. Las solicitudes no
+        válidas no se envían y su resultado indica el motivo. El envío es secuencial porque la librería MetaTrader5
+        no admite llamadas simultáneas; lo que se ahorra es conectar y consultar los símbolos una vez por solicitud.
+
+        Args:
+            requests (List[Dict[str, Any]]): Las solicitudes, con el formato de mt5.order_send.
+
+        Returns:
+            List[OrderResult]: El resultado de cada solicitud, en el mismo orden, con la latencia de su envío.
+
+        Example:
+            >>> results = MT5Api.send_orders([
+            ...     {"action": TradeActions.TRADE_ACTION_DEAL, "symbol": "US30.cash", "volume": 0.5, "type": OrderType.MARKET_BUY},
+            ...     {"action": TradeActions.TRADE_ACTION_DEAL, "symbol": "US100.cash", "volume": 0.5, "type": OrderType.MARKET_SELL},
+            ... ])
+            >>> [result.latency for result in results if result.done]
+        """
+        if not requests:
+            return []
         
-        # Obtiene todas las posiciones abiertas
-        positions = mt5.positions_get()
+        def send(request: Dict[str, Any], error: str) -> OrderResult:
+            if error is not None:
+                return OrderResult(request, None, 0.0, error, False)
+            start = time.perf_counter()
+            try:
+                result: MqlTradeResult = mt5.order_send(request)
+            except Exception as e:
+                return OrderResult(request, None, time.perf_counter() - start, str(e), False)
+            latency = time.perf_counter() - start
+            if result is None:
+                return OrderResult(request, None, latency, f"Sin respuesta de la terminal: {mt5.last_error()}", False)
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                return OrderResult(request, result, latency, f"Código de error: {result.retcode}. {result.comment}", False)
+            return OrderResult(request, result, latency, None, True)
         
-        if positions is not None:
-            # Itera sobre todas las posiciones abiertas y las cierra
-            for position in positions:  
-                close_result = mt5.Close(position.symbol,ticket=position.ticket)
-                
-                if close_result:
-                    print(f"Posición en {position.symbol} cerrada con éxito")
-                else:
-                    print(f"Error al cerrar la posición en {position.symbol}")
-        else:
-            print("No hay posiciones abiertas para cerrar")
+        # Una sola conexión para validar y enviar todas las solicitudes
+        with MT5Api.session():
+            prepared, errors = prepare_order_requests(requests, mt5.symbol_info, mt5.symbol_info_tick)
+            return [send(request, error) for request, error in zip(prepared, errors)]
+    
+    @_gateway_routed
+    def send_close_all_position() -> List[OrderResult]:
+        """
+        Cierra todas las posiciones abiertas en la plataforma MetaTrader 5.
+        
+        Esta función se conecta a MetaTrader 5, obtiene todas las posiciones abiertas y envía las órdenes
+        opuestas que las cierran con send_orders(). Luego muestra un mensaje de éxito o error para cada posición.
+
+        Returns:
+            List[OrderResult]: El resultado del cierre de cada posición, vacío si no hay posiciones abiertas.
+        """
+        # Una sola conexión para consultar las posiciones y enviar los cierres
+        with MT5Api.session():
+            # Obtiene todas las posiciones abiertas
+            positions = mt5.positions_get()
             
-        # Cierra la conexión con MetaTrader 5
-        MT5Api.shutdown()
+            if not positions:
+                print("No hay posiciones abiertas para cerrar")
+                return []
+            
+            # Una orden opuesta por posición, por todo su volumen
+            requests = [
+                {
+                    "action": TradeActions.TRADE_ACTION_DEAL,
+                    "symbol": position.symbol,
+                    "volume": position.volume,
+                    "type": OrderType.MARKET_SELL if position.type == 0 else OrderType.MARKET_BUY,
+                    "position": position.ticket,
+                    "comment": position.comment,
+                }
+                for position in positions
+            ]
+            results = MT5Api.send_orders(requests)
+        
+        for position, result in zip(positions, results):
+            if result.done:
+                print(f"Posición en {position.symbol} cerrada con éxito ({result.latency * 1000:.0f} ms)")
+            else:
+                print(f"Error al cerrar la posición en {position.symbol}: {result.error}")
+        return results
     
+    @_gateway_routed
     def send_remove_take_profit_and_stop_loss(ticket: int):
         """
         Elimina el stop loss y el take profit de una posición abierta en MetaTrader 5.
@@ -667,10 +1132,8 @@ class MT5Api:
         Parameters:
         ticket (int): El número de ticket de la posición que se desea modificar.
         """
-        # Inicializa la conexión con la plataforma MetaTrader 5
-        MT5Api.initialize()
-        # Verificamos si la conexión con MetaTrader 5 está establecida
-        if not mt5.initialize():
+        # Inicializa la conexión con la plataforma MetaTrader 5 y verifica que esté establecida
+        if not MT5Api.initialize():
             print("Error: No se pudo establecer la conexión con MetaTrader 5.")
             return False
         
@@ -697,17 +1160,44 @@ class MT5Api:
     #region Utilities
     def convert_utc_to_mt5_timezone(date: datetime) -> datetime:
         """
-        Suma 3 horas a la fecha y hora proporcionada.
+        Convierte una fecha UTC a la hora del servidor de MT5, con el cambio de horario vigente en esa fecha.
 
         Args:
             date (datetime): Fecha y hora en formato UTC.
 
         Returns:
-            datetime: La fecha y hora resultante después de sumar 3 horas.
+            datetime: La fecha y hora del servidor (GMT+2 en invierno y GMT+3 en verano con la configuración por defecto).
         """
-        # Suma 3 horas a la fecha y hora original
-        dt_mt5 = date + timedelta(hours=3)
-        
-        return dt_mt5
+        return MT5Api.server_time.utc_to_server(date)
+    
+    def convert_mt5_to_utc_timezone(date: datetime) -> datetime:
+        """
+        Convierte una fecha con la hora del servidor de MT5 a UTC.
+
+        Args:
+            date (datetime): Fecha y hora del servidor.
+
+        Returns:
+            datetime: La fecha y hora en UTC.
+        """
+        return MT5Api.server_time.server_to_utc(date)
+    
+    def convert_mt5_times_to_utc(values: ndarray, unit: str = 's') -> ndarray:
+        """
+        Convierte de una sola vez una columna de horas del servidor, como el 'time' de las barras
+        o el 'time_msc' de los ticks, a UTC.
+
+        Args:
+            values (ndarray): Segundos o milisegundos desde 1970 con la hora del servidor.
+            unit (str, optional): 's' para 'time', 'ms' para 'time_msc'.
+
+        Returns:
+            ndarray: Los instantes en UTC, en la misma unidad (int64).
+
+        Example:
+            >>> rates = MT5Api.get_rates_range("US30.cash", TimeFrame.MINUTE_1, date_from, date_to)
+            >>> utc_seconds = MT5Api.convert_mt5_times_to_utc(rates['time'])
+        """
+        return MT5Api.server_time.server_to_utc_array(values, unit)
     #endregion
 
@@ -0,0 +1,329 @@
+from .server_time import ServerTime
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime
+import pytz
+import time
+
+# Para sincronizar el reloj en segundo plano
+import threading
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Callable, List, NamedTuple, Tuple
+
+
+class ClockState(NamedTuple):
+    """
+    Estimación vigente de los relojes, anclada a un instante del reloj monotónico.
+
+    Attributes:
+        monotonic (float): El instante del reloj monotónico del ancla.
+        local (float): La hora local (time.time()) en el ancla.
+        utc (float): La hora UTC de referencia en el ancla.
+        rate (float): Segundos de la referencia por segundo del reloj monotónico (1 + deriva).
+        mt5_correction (int): Segundos que se suman a la diferencia de ServerTime para obtener la hora del servidor.
+    """
+    monotonic: float
+    local: float
+    utc: float
+    rate: float
+    mt5_correction: int
+
+
+class ClockService:
+    """
+    Reloj del bot en tres referencias: la hora local, UTC según el reloj de Alpaca y la hora del servidor de MT5.
+
+    Las diferencias entre los relojes se estiman una vez con synchronize() y luego cada consulta de now() se
+    calcula con time.monotonic(), sin red ni llamadas a la terminal:
+
+    - UTC: se consulta el reloj de referencia (por ejemplo AlpacaApi.get_current_market_time) samples veces y se usa
+      la consulta de menor ida y vuelta, tomando el punto medio como instante de la respuesta. Con dos
+      sincronizaciones separadas se estima además la deriva del reloj local.
+    - MT5: la diferencia con UTC sale de la tabla de ServerTime, con los cambios de horario, y se verifica con el
+      time_msc del último tick de los símbolos; si un tick reciente indica otra diferencia (redondeada a 15 minutos)
+      se aplica esa corrección.
+
+    start() inicia un hilo que repite la sincronización cada refresh_seconds. El hilo solo consulta el reloj de
+    referencia: la verificación con los ticks de MT5 queda pendiente y se hace en el hilo de la siguiente consulta de
+    la hora del servidor (o con check_mt5()), para que el hilo nunca llame a la terminal en paralelo con el proceso.
+    La estimación vigente se reemplaza completa en un solo atributo, por lo que las lecturas no necesitan bloqueos. Al enviarse a otro proceso se
+    conserva la estimación, ya que el reloj monotónico es del sistema.
+
+    Example:
+        >>> clock = ClockService(reference=alpaca_api.get_current_market_time)
+        >>> clock.start(["US30.cash"])
+        >>> clock.now()                     # UTC
+        >>> clock.now(ClockService.MT5)     # Hora del servidor de MT5
+    """
+    LOCAL = 'local'
+    UTC = 'utc'
+    MT5 = 'mt5'
+
+    # Tolerancia para aceptar un tick como reciente al verificar la diferencia con el servidor
+    TICK_TOLERANCE = 120
+    # Las diferencias horarias de los servidores son múltiplos de 15 minutos
+    OFFSET_STEP = 900
+    # Corrección máxima aceptada sobre la tabla de ServerTime, en segundos
+    MAX_CORRECTION = 7200
+    # Deriva máxima aceptada del reloj local, en segundos por segundo
+    MAX_DRIFT = 1e-3
+
+    def __init__(self, reference: Callable[[], datetime] = None, symbols: List[str] = None, server_time: ServerTime = None,
+                 refresh_seconds: float = 600, samples: int = 3) -> None:
+        """
+        Args:
+            reference (Callable[[], datetime], optional): Devuelve la hora UTC de un reloj de referencia, como
+                AlpacaApi.get_current_market_time. Por defecto, UTC es el reloj local.
+            symbols (List[str], optional): Símbolos cuyo último tick se usa para verificar la hora del servidor de MT5.
+            server_time (ServerTime, optional): La conversión de la hora del servidor. Por defecto, la de MT5Api.
+            refresh_seconds (float, optional): Segundos entre sincronizaciones en segundo plano.
+            samples (int, optional): Consultas al reloj de referencia en cada sincronización.
+        """
+        self.reference = reference
+        self.symbols = list(symbols or [])
+        self.server_time = server_time
+        self.refresh_seconds = refresh_seconds
+        self.samples = max(int(samples), 1)
+
+        monotonic = time.monotonic()
+        local = time.time()
+        self._state = ClockState(monotonic, local, local, 1.0, 0)
+        # Última muestra del reloj de referencia (monotónico, UTC), para estimar la deriva
+        self._last_sample: Tuple[float, float] = None
+        # Diferencia de ServerTime vigente y su periodo (inicio, fin), para no buscar en la tabla en cada consulta
+        self._mt5_period: Tuple[int, int, int] = (0, 0, 0)
+        # True cuando la sincronización en segundo plano dejó pendiente la verificación con los ticks de MT5
+        self._mt5_due = False
+        # time_msc del último tick de la verificación anterior, para aceptar solo ticks que avanzaron
+        self._last_tick_msc: int = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread = None
+        self._stop_event = threading.Event()
+
+    #region Pickle
+    def __getstate__(self):
+        # Los hilos y bloqueos no se pueden enviar a otro proceso
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        state['_thread'] = None
+        state['_stop_event'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+    #endregion
+
+    #region Now
+    def timestamp(self, domain: str = UTC) -> float:
+        """
+        Obtiene la hora actual en segundos desde 1970 en una de las referencias, sin red ni llamadas a la terminal.
+
+        Args:
+            domain (str, optional): ClockService.LOCAL, ClockService.UTC o ClockService.MT5.
+
+        Returns:
+            float: Los segundos; los de MT5 están en la hora del servidor expresada como si fuera UTC, igual que 'time'.
+        """
+        if domain == self.MT5 and self._mt5_due:
+            self.check_mt5()
+        state = self._state
+        elapsed = time.monotonic() - state.monotonic
+        if domain == self.LOCAL:
+            return state.local + elapsed
+        utc = state.utc + elapsed * state.rate
+        if domain == self.UTC:
+            return utc
+        if domain == self.MT5:
+            offset, start, end = self._mt5_period
+            if not start <= utc < end:
+                offset, start, end = self._mt5_period = self._server_time().offset_period(int(utc))
+            return utc + offset + state.mt5_correction
+        raise ValueError(f"Referencia de hora desconocida: {domain}")
+
+    def now(self, domain: str = UTC) -> datetime:
+        """
+        Obtiene la hora actual como datetime con zona horaria UTC en una de las referencias.
+
+        Args:
+            domain (str, optional): ClockService.LOCAL, ClockService.UTC o ClockService.MT5.
+
+        Returns:
+            datetime: La hora actual; la de MT5 es la hora del servidor expresada como si fuera UTC.
+        """
+        return datetime.fromtimestamp(self.timestamp(domain), pytz.utc)
+
+    @property
+    def utc_offset(self) -> float:
+        """
+        Segundos que el reloj UTC de referencia adelanta al reloj local.
+        """
+        return self.timestamp(self.UTC) - self.timestamp(self.LOCAL)
+
+    @property
+    def mt5_offset(self) -> float:
+        """
+        Segundos que la hora del servidor de MT5 adelanta a UTC.
+        """
+        return self.timestamp(self.MT5) - self.timestamp(self.UTC)
+
+    @property
+    def drift(self) -> float:
+        """
+        Deriva estimada del reloj local respecto a la referencia, en segundos por segundo.
+        """
+        return self._state.rate - 1.0
+    #endregion
+
+    #region Synchronization
+    def synchronize(self, check_mt5: bool = True) -> bool:
+        """
+        Estima las diferencias con el reloj de referencia y con el servidor de MT5.
+
+        Args:
+            check_mt5 (bool, optional): False para no consultar la terminal y dejar pendiente la verificación con
+                los ticks de MT5. Lo usa el hilo de segundo plano.
+
+        Returns:
+            bool: True si se pudo consultar el reloj de referencia (o si no hay uno), False si falló.
+        """
+        with self._lock:
+            state = self._state
+            synchronized = True
+            monotonic, local, utc, rate = state.monotonic, state.local, state.utc, state.rate
+
+            if self.reference is not None:
+                sample = self._sample_reference()
+                if sample is None:
+                    synchronized = False
+                else:
+                    monotonic, utc = sample
+                    local = time.time() - (time.monotonic() - monotonic)
+                    rate = self._estimate_rate(sample)
+                    self._last_sample = sample
+            else:
+                monotonic = time.monotonic()
+                local = time.time()
+                utc = local
+
+            correction = state.mt5_correction
+            if check_mt5:
+                correction = self._estimate_mt5_correction(utc + (time.monotonic() - monotonic) * rate, correction)
+            self._mt5_due = not check_mt5 and bool(self.symbols)
+            self._state = ClockState(monotonic, local, utc, rate, correction)
+            return synchronized
+
+    def check_mt5(self):
+        """
+        Verifica la diferencia con el servidor de MT5 con el último tick de los símbolos, en el hilo que llama.
+        """
+        with self._lock:
+            self._mt5_due = False
+            state = self._state
+            utc = state.utc + (time.monotonic() - state.monotonic) * state.rate
+            self._state = state._replace(mt5_correction=self._estimate_mt5_correction(utc, state.mt5_correction))
+
+    def _sample_reference(self) -> Tuple[float, float]:
+        """
+        Consulta el reloj de referencia y devuelve la muestra de menor ida y vuelta como (monotónico, UTC).
+        """
+        best = None
+        for _ in range(self.samples):
+            before = time.monotonic()
+            try:
+                reference = self.reference()
+            except Exception as e:
+                print(f"No se pudo consultar el reloj de referencia: {e}")
+                continue
+            after = time.monotonic()
+            if reference is None:
+                continue
+            if reference.tzinfo is None:
+                reference = reference.replace(tzinfo=pytz.utc)
+            round_trip = after - before
+            if best is None or round_trip < best[0]:
+                best = (round_trip, (before + after) / 2, reference.timestamp())
+        if best is None:
+            return None
+        return best[1], best[2]
+
+    def _estimate_rate(self, sample: Tuple[float, float]) -> float:
+        """
+        Estima la deriva del reloj monotónico con la muestra anterior del reloj de referencia.
+        """
+        if self._last_sample is None:
+            return self._state.rate
+        elapsed = sample[0] - self._last_sample[0]
+        if elapsed < 60:
+            return self._state.rate
+        rate = (sample[1] - self._last_sample[1]) / elapsed
+        return rate if abs(rate - 1.0) <= self.MAX_DRIFT else self._state.rate
+
+    def _estimate_mt5_correction(self, utc: float, current: int) -> int:
+        """
+        Verifica la diferencia de ServerTime con el último tick de los símbolos y devuelve la corrección.
+        Si no hay un tick reciente se conserva la corrección actual: el tick debe haber avanzado desde la verificación
+        anterior (un tick viejo, como antes de la apertura o tras reiniciar el fin de semana, no avanza) y la
+        corrección no puede superar MAX_CORRECTION.
+        """
+        if not self.symbols:
+            return current
+
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        latest = None
+        for symbol in self.symbols:
+            tick = MT5Api.get_symbol_info_tick(symbol)
+            if tick is not None and (latest is None or tick.time_msc > latest):
+                latest = tick.time_msc
+        if latest is None:
+            return current
+        previous, self._last_tick_msc = self._last_tick_msc, latest
+        if previous is None or latest <= previous:
+            return current
+
+        observed = latest / 1000 - utc
+        expected = int(self._server_time().offset_seconds(int(utc)))
+        step = self.OFFSET_STEP
+        correction = int(round((observed - expected) / step)) * step
+        # El tick es reciente solo si la diferencia observada queda cerca de un múltiplo de 15 minutos
+        if abs(observed - expected - correction) > self.TICK_TOLERANCE or abs(correction) > self.MAX_CORRECTION:
+            return current
+        return correction
+
+    def _server_time(self) -> ServerTime:
+        if self.server_time is None:
+            from .client import MT5Api
+            return MT5Api.server_time
+        return self.server_time
+    #endregion
+
+    #region Background
+    def start(self, symbols: List[str] = None):
+        """
+        Sincroniza el reloj e inicia la sincronización periódica en segundo plano.
+
+        Args:
+            symbols (List[str], optional): Reemplaza los símbolos usados para verificar la hora del servidor de MT5.
+        """
+        if symbols is not None:
+            self.symbols = list(symbols)
+        self.synchronize()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Detiene la sincronización en segundo plano.
+        """
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_seconds):
+            self.synchronize(check_mt5=False)
+    #endregion
@@ -0,0 +1,132 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Para descargar varios tramos a la vez
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime, timedelta
+import pytz
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Callable, Deque, Iterator, List, Tuple
+
+
+class RangeDownloader:
+    """
+    Descarga un rango largo de ticks o barras en tramos y los entrega en orden, a medida que llegan.
+
+    El rango se divide en tramos de duración chunk que se piden a la terminal (o al gateway) en paralelo con a lo
+    sumo parallel solicitudes a la vez. Los tramos se entregan en orden cronológico como un generador, y solo se
+    descargan por adelantado parallel tramos, por lo que la memoria usada no depende del tamaño del rango. Cada tramo
+    se recorta a [inicio, fin) con el campo de hora de los datos para que un dato en el límite no se entregue dos veces.
+    Un tramo que falla se reintenta retries veces; si sigue fallando se informa, se guarda en failed y se omite.
+    Se crea con MT5Api.download_ticks() o MT5Api.download_rates().
+
+    La descarga se hace dentro de una sesión de MT5Api, para que los hilos no conecten y desconecten la terminal
+    unos a otros. La librería MetaTrader5 no admite llamadas simultáneas, por lo que las solicitudes de los hilos se
+    serializan (con el bloqueo de la terminal de MT5Api, o con el del cliente si se usa el gateway): el paralelismo
+    superpone la espera de la terminal de un tramo con el recorte y el consumo de los demás.
+
+    Example:
+        >>> for chunk_from, chunk_to, ticks in MT5Api.download_ticks("US30.cash", date_from, date_to, CopyTicks.COPY_TICKS_ALL):
+        ...     archive.append("US30.cash", ticks)
+    """
+    def __init__(self, fetch: Callable[[datetime, datetime], ndarray], date_from: datetime, date_to: datetime, chunk: timedelta,
+                 to_server: Callable[[datetime], datetime], time_field: str = 'time_msc', time_scale: int = 1000,
+                 parallel: int = 4, retries: int = 2) -> None:
+        """
+        Args:
+            fetch (Callable[[datetime, datetime], ndarray]): Descarga un tramo entre dos fechas UTC; devuelve None si falla.
+            date_from (datetime): Inicio del rango (hora en UTC).
+            date_to (datetime): Fin del rango, incluido (hora en UTC).
+            chunk (timedelta): Duración de cada tramo.
+            to_server (Callable[[datetime], datetime]): Convierte una fecha UTC a la hora del servidor.
+            time_field (str, optional): El campo de hora de los datos, en la hora del servidor.
+            time_scale (int, optional): Unidades del campo de hora por segundo (1000 para time_msc, 1 para time).
+            parallel (int, optional): Número máximo de tramos descargándose a la vez.
+            retries (int, optional): Reintentos de un tramo que falla.
+        """
+        if chunk <= timedelta(0):
+            raise ValueError("La duración de los tramos debe ser positiva")
+        self.fetch = fetch
+        self.date_from = date_from
+        self.date_to = date_to
+        self.chunk = chunk
+        self.parallel = max(int(parallel), 1)
+        self.retries = retries
+        self._to_server = to_server
+        self._time_field = time_field
+        self._time_scale = time_scale
+        self.failed: List[Tuple[datetime, datetime]] = []
+
+    def chunks(self) -> List[Tuple[datetime, datetime]]:
+        """
+        Obtiene los tramos del rango en orden cronológico.
+        """
+        bounds = []
+        start = self.date_from
+        while start <= self.date_to:
+            end = min(start + self.chunk, self.date_to)
+            bounds.append((start, end))
+            if end >= self.date_to:
+                break
+            start = end
+        return bounds
+
+    def __iter__(self) -> Iterator[Tuple[datetime, datetime, ndarray]]:
+        """
+        Descarga los tramos y los entrega en orden.
+
+        Yields:
+            Tuple[datetime, datetime, ndarray]: (inicio, fin, datos) de cada tramo descargado.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        bounds = self.chunks()
+        pending: Deque[Tuple[datetime, datetime, bool, Future]] = deque()
+        with MT5Api.session(), ThreadPoolExecutor(max_workers=self.parallel) as executor:
+            next_chunk = 0
+            while next_chunk < len(bounds) or pending:
+                # Mantiene a lo sumo parallel tramos en curso
+                while next_chunk < len(bounds) and len(pending) < self.parallel:
+                    start, end = bounds[next_chunk]
+                    last = next_chunk == len(bounds) - 1
+                    pending.append((start, end, last, executor.submit(self._download, start, end, last)))
+                    next_chunk += 1
+
+                start, end, last, future = pending.popleft()
+                data = future.result()
+                if data is None:
+                    self.failed.append((start, end))
+                    continue
+                yield start, end, data
+
+    def _download(self, start: datetime, end: datetime, last: bool) -> ndarray:
+        """
+        Descarga un tramo con reintentos y lo recorta a [inicio, fin), o a [inicio, fin] si es el último.
+        """
+        data = None
+        for _ in range(self.retries + 1):
+            data = self.fetch(start, end)
+            if data is not None:
+                break
+        if data is None:
+            print(f"No se pudo descargar el tramo entre {start} y {end}")
+            return None
+
+        times = data[self._time_field]
+        low = int(np.searchsorted(times, self._server_time(start), side='left'))
+        high = int(np.searchsorted(times, self._server_time(end), side='right' if last else 'left'))
+        return data[low:high]
+
+    def _server_time(self, date: datetime) -> int:
+        """
+        Convierte una fecha UTC al campo de hora de los datos.
+        """
+        server = self._to_server(date)
+        if server.tzinfo is None:
+            server = server.replace(tzinfo=pytz.utc)
+        return int(round(server.timestamp() * self._time_scale))
@@ -154,3 +154,40 @@ class FieldType:
         ('volume_real', 'f8')
     ])
     
+
+class LastErrorCode:
+    """
+    Enum de los códigos devueltos por last_error() en MetaTrader 5.
+
+    Valores:
+    - RES_S_OK: Operación completada con éxito.
+    - RES_E_FAIL: Error general.
+    - RES_E_INVALID_PARAMS: Argumentos o parámetros inválidos.
+    - RES_E_NO_MEMORY: Memoria insuficiente.
+    - RES_E_NOT_FOUND: No se encontró el historial solicitado.
+    - RES_E_INVALID_VERSION: Versión no soportada.
+    - RES_E_AUTH_FAILED: Error de autorización.
+    - RES_E_UNSUPPORTED: Método no soportado.
+    - RES_E_AUTO_TRADING_DISABLED: El trading automático está deshabilitado.
+    - RES_E_INTERNAL_FAIL: Error interno de IPC.
+    - RES_E_INTERNAL_FAIL_SEND: Error interno al enviar datos por IPC.
+    - RES_E_INTERNAL_FAIL_RECEIVE: Error interno al recibir datos por IPC.
+    - RES_E_INTERNAL_FAIL_INIT: Error interno de inicialización de IPC.
+    - RES_E_INTERNAL_FAIL_CONNECT: No hay conexión IPC con la terminal.
+    - RES_E_INTERNAL_FAIL_TIMEOUT: Tiempo de espera de IPC agotado.
+    """
+    RES_S_OK                            = 1
+    RES_E_FAIL                          = -1
+    RES_E_INVALID_PARAMS                = -2
+    RES_E_NO_MEMORY                     = -3
+    RES_E_NOT_FOUND                     = -4
+    RES_E_INVALID_VERSION               = -5
+    RES_E_AUTH_FAILED                   = -6
+    RES_E_UNSUPPORTED                   = -7
+    RES_E_AUTO_TRADING_DISABLED         = -8
+    RES_E_INTERNAL_FAIL                 = -10000
+    RES_E_INTERNAL_FAIL_SEND            = -10001
+    RES_E_INTERNAL_FAIL_RECEIVE         = -10002
+    RES_E_INTERNAL_FAIL_INIT            = -10003
+    RES_E_INTERNAL_FAIL_CONNECT         = -10004
+    RES_E_INTERNAL_FAIL_TIMEOUT         = -10005
@@ -0,0 +1,388 @@
+import multiprocessing          # Para crear el proceso y las colas compartidas
+from multiprocessing import Queue
+import threading                # Para ejecutar el gateway dentro del mismo proceso
+import pickle                   # Para serializar una sola vez cada resultado que se reparte
+from queue import Empty
+import time
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+
+class GatewayMethod:
+    """
+    Métodos de MT5Api que pueden atenderse a través del gateway.
+
+    Las lecturas idénticas que llegan en el mismo ciclo se agrupan y se ejecutan una sola vez,
+    mientras que las escrituras (órdenes y modificaciones) se ejecutan una por una y en orden de llegada.
+
+    Valores:
+    - READS: Métodos de solo lectura (barras, ticks, posiciones, información de símbolos).
+    - WRITES: Métodos que envían solicitudes de trading a la terminal.
+    """
+    READS = frozenset({
+        'get_rates_from_date',
+        'get_rates_from_pos',
+        'get_rates_range',
+        'get_ticks_from',
+        'get_ticks_range',
+        'get_ticks_from_msc',
+        'get_positions',
+        'get_history_orders',
+        'get_history_deals',
+        'get_symbol_info',
+        'get_symbol_info_tick',
+        'get_last_price',
+        'get_last_bar',
+    })
+    WRITES = frozenset({
+        'send_order',
+        'send_orders',
+        'send_sell_partial_order',
+        'send_change_stop_loss',
+        'send_change_take_profit',
+        'send_change_stops',
+        'send_close_all_position',
+        'send_remove_take_profit_and_stop_loss',
+    })
+    ALL = READS | WRITES
+
+
+class GatewayRequest(NamedTuple):
+    """
+    Solicitud enviada por un cliente al gateway.
+
+    Attributes:
+        client_id (int): Identificador del cliente que envía la solicitud.
+        request_id (int): Número de la solicitud dentro del cliente.
+        method (str): Nombre del método de MT5Api a ejecutar.
+        args (Tuple): Argumentos posicionales del método.
+        kwargs (Tuple): Argumentos con nombre del método como pares (nombre, valor) ordenados.
+    """
+    client_id: int
+    request_id: int
+    method: str
+    args: Tuple
+    kwargs: Tuple
+
+
+class GatewayResponse(NamedTuple):
+    """
+    Respuesta del gateway a una solicitud.
+
+    El resultado se serializa una sola vez y los mismos bytes se envían a todos los clientes que pidieron la misma lectura.
+
+    Attributes:
+        request_id (int): Número de la solicitud que se responde.
+        payload (bytes): La tupla (resultado, excepción) serializada con pickle.
+    """
+    request_id: int
+    payload: bytes
+
+
+class GatewayError(RuntimeError):
+    """
+    El gateway no respondió a una solicitud: dejó de funcionar o superó el tiempo de espera.
+    """
+
+
+class MT5GatewayClient:
+    """
+    Cliente del gateway que se usa desde un proceso de estrategia.
+
+    Una vez registrado con MT5Api.use_gateway(client), todos los métodos de MT5Api del proceso
+    se envían al gateway sin que la estrategia tenga que cambiar.
+
+    Las llamadas de varios hilos del mismo proceso se atienden de a una, ya que comparten la cola de respuestas.
+    Mientras espera una respuesta, el cliente verifica que el gateway siga vivo; si se detuvo, o si la respuesta
+    no llega dentro de timeout segundos, la llamada lanza GatewayError en lugar de quedarse esperando.
+    """
+    # Segundos entre verificaciones del gateway mientras se espera una respuesta
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, client_id: int, requests: Queue, responses: Queue, heartbeat: Any = None, timeout: float = 60.0) -> None:
+        """
+        Inicializa el cliente. Los clientes se crean con MT5Gateway.create_client().
+
+        Args:
+            client_id (int): Identificador del cliente.
+            requests (Queue): Cola compartida de solicitudes hacia el gateway.
+            responses (Queue): Cola propia del cliente donde el gateway deja las respuestas.
+            heartbeat (multiprocessing.Value, optional): Último latido del gateway (time.time()), negativo cuando se detuvo.
+            timeout (float, optional): Segundos máximos de espera de cada respuesta, None para no limitarla.
+        """
+        self.client_id = client_id
+        self._requests = requests
+        self._responses = responses
+        self._heartbeat = heartbeat
+        self.timeout = timeout
+        self._request_id = 0
+        self._lock = threading.Lock()
+
+    #region Pickle
+    def __getstate__(self):
+        # El bloqueo es propio de cada proceso
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    #endregion
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Ejecuta un método de MT5Api en el gateway y espera su resultado.
+
+        Args:
+            method (str): Nombre del método de MT5Api.
+            *args: Argumentos posicionales del método.
+            **kwargs: Argumentos con nombre del método.
+
+        Returns:
+            Any: El valor devuelto por el método en el gateway.
+        """
+        if method not in GatewayMethod.ALL:
+            raise ValueError(f"El método {method} no se puede atender por el gateway.")
+
+        with self._lock:
+            self._request_id += 1
+            request = GatewayRequest(self.client_id, self._request_id, method, tuple(args), tuple(sorted(kwargs.items())))
+            self._requests.put(request)
+            response = self._wait_response(method)
+
+        result, error = pickle.loads(response.payload)
+        if error is not None:
+            raise error
+        return result
+
+    def _wait_response(self, method: str) -> GatewayResponse:
+        """
+        Espera la respuesta de la última solicitud, descartando respuestas atrasadas de solicitudes anteriores.
+
+        Raises:
+            GatewayError: Si el gateway se detuvo o la respuesta no llegó a tiempo.
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            wait = self.POLL_INTERVAL if deadline is None else min(self.POLL_INTERVAL, max(deadline - time.monotonic(), 0))
+            try:
+                response: GatewayResponse = self._responses.get(timeout=wait)
+            except Empty:
+                if not self.gateway_alive():
+                    raise GatewayError(f"El gateway de MT5 no está activo; no se pudo atender {method}.")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise GatewayError(f"El gateway de MT5 no respondió {method} en {self.timeout} segundos.")
+                continue
+            if response.request_id == self._request_id:
+                return response
+
+    def gateway_alive(self) -> bool:
+        """
+        Comprueba con el latido del gateway que siga en funcionamiento.
+
+        Returns:
+            bool: True si el gateway está activo, o si el cliente no tiene cómo verificarlo.
+        """
+        if self._heartbeat is None:
+            return True
+        beat = self._heartbeat.value
+        return beat >= 0 and time.time() - beat <= MT5Gateway.HEARTBEAT_TIMEOUT
+
+
+class MT5Gateway:
+    """
+    Proceso dueño de la única conexión con la terminal de MetaTrader 5.
+
+    Los procesos de estrategia envían solicitudes tipadas por una cola compartida. En cada ciclo el gateway
+    toma todas las solicitudes pendientes, ejecuta las escrituras en orden, agrupa las lecturas idénticas
+    (por ejemplo, varios procesos pidiendo get_positions(symbol) en el mismo tick) y reparte el resultado
+    a cada cliente que lo pidió.
+
+    Example:
+        >>> gateway = MT5Gateway()
+        >>> client = gateway.create_client()
+        >>> gateway.start()
+        >>> # En el proceso de la estrategia
+        >>> MT5Api.use_gateway(client)
+        >>> MT5Api.get_positions("US30.cash")
+    """
+    # Segundos entre latidos del gateway y segundos sin latido tras los cuales los clientes lo dan por detenido
+    HEARTBEAT_INTERVAL = 1.0
+    HEARTBEAT_TIMEOUT = 10.0
+
+    def __init__(self, max_batch: int = 256, timeout: float = 60.0) -> None:
+        """
+        Inicializa el gateway.
+
+        Args:
+            max_batch (int, optional): Número máximo de solicitudes atendidas por ciclo.
+            timeout (float, optional): Segundos máximos que los clientes esperan cada respuesta, None para no limitarla.
+        """
+        self._max_batch = max_batch
+        self._timeout = timeout
+        self._requests: Queue = multiprocessing.Queue()
+        self._responses: Dict[int, Queue] = {}
+        self._worker = None
+        # Latido del gateway compartido con los clientes: time.time() del último latido, negativo si se detuvo
+        self._heartbeat = multiprocessing.Value('d', -1.0)
+
+        # Contadores de la actividad del gateway
+        self.requests_served = 0
+        self.reads_executed = 0
+
+    #region Clients
+    def create_client(self) -> MT5GatewayClient:
+        """
+        Crea un cliente nuevo del gateway. Debe llamarse antes de start().
+
+        Returns:
+            MT5GatewayClient: El cliente que se entregará al proceso de la estrategia.
+        """
+        if self._worker is not None:
+            raise RuntimeError("Los clientes deben crearse antes de iniciar el gateway.")
+
+        client_id = len(self._responses)
+        self._responses[client_id] = multiprocessing.Queue()
+        return MT5GatewayClient(client_id, self._requests, self._responses[client_id], self._heartbeat, self._timeout)
+    #endregion
+
+    #region Lifecycle
+    def start(self, in_process: bool = False):
+        """
+        Inicia el gateway.
+
+        Args:
+            in_process (bool, optional): Si es True el gateway se ejecuta en un hilo del proceso actual,
+                lo que permite probarlo con un módulo MetaTrader5 falso. Por defecto se ejecuta en un proceso propio.
+        """
+        # Se considera activo desde el inicio, mientras el gateway arranca
+        self._heartbeat.value = time.time()
+        if in_process:
+            self._worker = threading.Thread(target=self.serve, daemon=True)
+        else:
+            self._worker = multiprocessing.Process(target=self.serve, daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Detiene el gateway y espera a que termine.
+
+        Args:
+            timeout (float, optional): Tiempo máximo en segundos para esperar al gateway.
+        """
+        if self._worker is None:
+            return
+        self._requests.put(None)
+        self._worker.join(timeout)
+        self._worker = None
+
+    def serve(self):
+        """
+        Ciclo principal del gateway. Mantiene una sesión persistente con MetaTrader 5 y atiende solicitudes hasta recibir la señal de parada.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        # Las llamadas de este hilo se ejecutan contra la terminal aunque el proceso tenga un cliente registrado
+        MT5Api.serving_gateway(True)
+        stopped = threading.Event()
+        beat = threading.Thread(target=self._beat, args=(stopped,), daemon=True)
+        beat.start()
+        try:
+            with MT5Api.session():
+                while True:
+                    batch, stop = self._collect_batch()
+                    self._serve_batch(MT5Api, batch)
+                    if stop:
+                        break
+        finally:
+            stopped.set()
+            beat.join()
+            self._heartbeat.value = -1.0
+            MT5Api.serving_gateway(False)
+
+    def _beat(self, stopped: threading.Event):
+        """
+        Publica el latido del gateway hasta que se detiene, incluso mientras atiende una solicitud larga.
+        """
+        while not stopped.is_set():
+            self._heartbeat.value = time.time()
+            stopped.wait(self.HEARTBEAT_INTERVAL)
+    #endregion
+
+    #region Batching
+    def _collect_batch(self) -> Tuple[List[GatewayRequest], bool]:
+        """
+        Espera la primera solicitud y luego toma sin bloquear todas las que ya estén en la cola.
+
+        Returns:
+            Tuple[List[GatewayRequest], bool]: Las solicitudes del ciclo y True si se recibió la señal de parada.
+        """
+        batch = []
+        request = self._requests.get()
+        while request is not None:
+            batch.append(request)
+            if len(batch) >= self._max_batch:
+                break
+            try:
+                request = self._requests.get_nowait()
+            except Empty:
+                break
+        return batch, request is None
+
+    def _serve_batch(self, api: Any, batch: List[GatewayRequest]):
+        """
+        Atiende un ciclo de solicitudes: primero las escrituras en orden y después las lecturas agrupadas.
+
+        Args:
+            api (Any): La clase MT5Api que ejecuta las solicitudes.
+            batch (List[GatewayRequest]): Las solicitudes del ciclo.
+        """
+        reads: Dict[Tuple, List[GatewayRequest]] = {}
+
+        for request in batch:
+            if request.method in GatewayMethod.WRITES:
+                self._reply([request], *self._execute(api, request))
+                continue
+
+            key = (request.method, request.args, request.kwargs)
+            try:
+                reads.setdefault(key, []).append(request)
+            except TypeError:
+                # Argumentos no hashables, la lectura se atiende por separado
+                self._reply([request], *self._execute(api, request))
+
+        for requests in reads.values():
+            self._reply(requests, *self._execute(api, requests[0]))
+            self.reads_executed += 1
+
+    def _execute(self, api: Any, request: GatewayRequest) -> Tuple[Any, BaseException]:
+        """
+        Ejecuta una solicitud contra MT5Api.
+
+        Returns:
+            Tuple[Any, BaseException]: El resultado y la excepción producida, si la hubo.
+        """
+        if request.method not in GatewayMethod.ALL:
+            return None, ValueError(f"Método no permitido: {request.method}")
+        try:
+            return getattr(api, request.method)(*request.args, **dict(request.kwargs)), None
+        except Exception as error:
+            return None, error
+
+    def _reply(self, requests: List[GatewayRequest], result: Any, error: BaseException):
+        """
+        Envía el mismo resultado a todos los clientes que pidieron la solicitud.
+        """
+        try:
+            payload = pickle.dumps((result, error), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as pickling_error:
+            # Se avisa al cliente en lugar de dejarlo esperando una respuesta que nunca llegará
+            payload = pickle.dumps((None, RuntimeError(f"No se pudo serializar el resultado: {pickling_error}")))
+
+        for request in requests:
+            self._responses[request.client_id].put(GatewayResponse(request.request_id, payload))
+            self.requests_served += 1
+    #endregion
@@ -0,0 +1,276 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Importaciones para el manejo de datos
+from .enums import FieldType, TimeFrame
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime, timedelta
+import pytz
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Dict, List, Tuple
+
+# Importaciones para el manejo de archivos
+import os
+
+
+class RatesHistoryStore:
+    """
+    Almacén local de barras históricas de MT5, en columnas sobre disco.
+
+    Las barras de cada símbolo y marco temporal se guardan en un archivo .npy por día (hora del servidor) con el
+    dtype FieldType.rates_dtype, y se leen con np.load(mmap_mode='r'), sin copiar el archivo a memoria ni consultar
+    la terminal. Los días que faltan se descargan de la terminal en una sola llamada por tramo continuo. Un día
+    solo se guarda si parece completo: tiene barras, es anterior al día en curso en más de SAFETY_DAYS días y la
+    terminal devolvió barras posteriores a él, es decir, su historial ya llegó más allá de ese día. Los días sin
+    barras (fines de semana, feriados) no se guardan; si parecen completos se recuerdan solo en memoria para no
+    volver a pedirlos en el mismo proceso. Los días recientes o incompletos se vuelven a pedir a la terminal en
+    cada consulta, igual que las barras del día en curso. Los marcos semanal y mensual no se guardan.
+
+    El almacén es opcional: se activa en un proceso con MT5Api.use_history_store() y desde ese momento
+    get_rates_range y get_rates_from_date consultan primero el almacén. El controlador no lo activa.
+
+    Example:
+        >>> MT5Api.use_history_store(RatesHistoryStore("/data/mt5_history"))
+        >>> rates = MT5Api.get_rates_range("US30.cash", TimeFrame.MINUTE_1, date_from, date_to)
+    """
+    DAY = 86400
+    # Días anteriores al día en curso que nunca se guardan, por si la terminal aún no completó su historial
+    SAFETY_DAYS = 2
+    # Días posteriores al tramo que se descargan también, para confirmar que el último día del tramo está completo
+    LOOKAHEAD_DAYS = 4
+
+    def __init__(self, root: str = None) -> None:
+        """
+        Args:
+            root (str, optional): La carpeta del almacén. Por defecto, la variable de entorno MT5_HISTORY_PATH
+                o 'mt5_history' en el directorio actual.
+        """
+        self.root = root or os.getenv("MT5_HISTORY_PATH", os.path.join(os.getcwd(), "mt5_history"))
+        # Días ya abiertos con mmap, por símbolo y marco temporal
+        self._days: Dict[Tuple[str, int, int], ndarray] = {}
+
+    #region Paths
+    @staticmethod
+    def is_cacheable(timeframe: int) -> bool:
+        """
+        Indica si las barras del marco temporal se guardan por día (hasta DAY_1).
+        """
+        return timeframe <= TimeFrame.DAY_1
+
+    @staticmethod
+    def timeframe_seconds(timeframe: int) -> int:
+        """
+        Obtiene la duración en segundos de una barra de un marco temporal de hasta un día.
+        """
+        if timeframe & 0x4000:
+            return (timeframe & 0x3FFF) * 3600
+        return timeframe * 60
+
+    def _path(self, symbol: str, timeframe: int, day: int) -> str:
+        date = datetime.fromtimestamp(day * self.DAY, pytz.utc)
+        return os.path.join(self.root, symbol, str(timeframe), f"{date:%Y-%m-%d}.npy")
+    #endregion
+
+    #region Server time
+    @staticmethod
+    def _to_server_seconds(date: datetime) -> int:
+        """
+        Convierte una fecha UTC a segundos con la hora del servidor, la misma referencia del campo 'time' de las barras.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        server = MT5Api.convert_utc_to_mt5_timezone(date)
+        if server.tzinfo is None:
+            server = server.replace(tzinfo=pytz.utc)
+        return int(server.timestamp())
+
+    @staticmethod
+    def _to_utc(server_seconds: int) -> datetime:
+        """
+        Convierte segundos con la hora del servidor a una fecha UTC, la referencia de los parámetros de MT5Api.
+        """
+        from .client import MT5Api
+
+        return MT5Api.convert_mt5_to_utc_timezone(datetime.fromtimestamp(server_seconds, pytz.utc))
+
+    def _current_day(self) -> int:
+        return self._to_server_seconds(datetime.now(pytz.utc)) // self.DAY
+    #endregion
+
+    #region Storage
+    def _load_day(self, symbol: str, timeframe: int, day: int) -> ndarray:
+        """
+        Abre un día guardado con mmap, o devuelve None si el día no está en el almacén.
+        """
+        key = (symbol, timeframe, day)
+        rates = self._days.get(key)
+        if rates is not None:
+            return rates
+        path = self._path(symbol, timeframe, day)
+        if not os.path.exists(path):
+            return None
+        # Un arreglo vacío no se puede abrir con mmap; los días vacíos guardados por versiones anteriores se ignoran
+        if os.path.getsize(path) <= 128:
+            return None
+        rates = np.load(path, mmap_mode='r')
+        self._days[key] = rates
+        return rates
+
+    def _save_day(self, symbol: str, timeframe: int, day: int, rates: ndarray):
+        """
+        Guarda las barras de un día cerrado. Se escribe un archivo temporal y se renombra, para que otro
+        proceso nunca lea un día a medio escribir.
+        """
+        path = self._path(symbol, timeframe, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as file:
+            np.save(file, np.ascontiguousarray(rates))
+        os.replace(temporary, path)
+
+    def _download_days(self, symbol: str, timeframe: int, first_day: int, last_day: int, current_day: int) -> Dict[int, ndarray]:
+        """
+        Descarga de la terminal un tramo continuo de días y guarda los que parecen completos.
+
+        El tramo se extiende hasta LOOKAHEAD_DAYS días después (sin pasar del día en curso) para saber si la terminal
+        tiene barras posteriores al último día pedido.
+
+        Returns:
+            Dict[int, ndarray]: Las barras de cada día del tramo pedido, o None si la terminal no devolvió datos.
+        """
+        from .client import MT5Api
+
+        download_last = max(last_day, min(last_day + self.LOOKAHEAD_DAYS, current_day - 1))
+        date_from = self._to_utc(first_day * self.DAY)
+        date_to = self._to_utc((download_last + 1) * self.DAY - 1)
+        with MT5Api.bypass_history_store():
+            rates = MT5Api.get_rates_range(symbol, timeframe, date_from, date_to)
+        if rates is None:
+            print(f"No se pudieron descargar las barras de {symbol} entre {date_from} y {date_to}")
+            return None
+
+        # Último segundo con barras en la terminal: un día que termina antes ya no recibirá más barras
+        last_time = int(rates['time'][-1]) if len(rates) else -1
+        days = (rates['time'] // self.DAY).astype(np.int64)
+        bounds = np.searchsorted(days, np.arange(first_day, download_last + 2))
+        downloaded = {}
+        for offset, day in enumerate(range(first_day, download_last + 1)):
+            day_rates = rates[bounds[offset]:bounds[offset + 1]]
+            if day <= last_day:
+                downloaded[day] = day_rates
+            complete = day < current_day - self.SAFETY_DAYS and (day + 1) * self.DAY <= last_time
+            if not complete:
+                continue
+            if len(day_rates):
+                self._save_day(symbol, timeframe, day, day_rates)
+            else:
+                self._days[(symbol, timeframe, day)] = day_rates
+        return downloaded
+    #endregion
+
+    #region Readers
+    def get_rates_range(self, symbol: str, timeframe: int, date_from: datetime, date_to: datetime) -> ndarray:
+        """
+        Obtiene las barras con apertura entre date_from y date_to, igual que MT5Api.get_rates_range.
+
+        Args:
+            symbol (str): El nombre del instrumento financiero.
+            timeframe (int): El marco temporal de las velas.
+            date_from (datetime): La fecha a partir de la cual se solicitan las barras (hora en UTC).
+            date_to (datetime): La fecha hasta la cual se solicitan las barras (hora en UTC).
+
+        Returns:
+            ndarray: Las barras FieldType.rates_dtype, o None si faltaban datos y la terminal no los devolvió.
+        """
+        from .client import MT5Api
+
+        if not self.is_cacheable(timeframe):
+            with MT5Api.bypass_history_store():
+                return MT5Api.get_rates_range(symbol, timeframe, date_from, date_to)
+
+        start = self._to_server_seconds(date_from)
+        end = self._to_server_seconds(date_to)
+        if end < start:
+            return np.empty(0, dtype=FieldType.rates_dtype)
+        first_day = start // self.DAY
+        last_day = end // self.DAY
+        current_day = self._current_day()
+
+        # Descarga los tramos de días cerrados que no están en el almacén
+        closed_last = min(last_day, current_day - 1)
+        days: Dict[int, ndarray] = {}
+        for day in range(first_day, closed_last + 1):
+            rates = self._load_day(symbol, timeframe, day)
+            if rates is not None:
+                days[day] = rates
+        missing = [day for day in range(first_day, closed_last + 1) if day not in days]
+        for gap_first, gap_last in self._contiguous(missing):
+            downloaded = self._download_days(symbol, timeframe, gap_first, gap_last, current_day)
+            if downloaded is None:
+                return None
+            days.update(downloaded)
+
+        parts: List[ndarray] = [days[day] for day in range(first_day, closed_last + 1)]
+        if last_day >= current_day:
+            with MT5Api.bypass_history_store():
+                live = MT5Api.get_rates_range(symbol, timeframe, self._to_utc(max(start, current_day * self.DAY)), date_to)
+            if live is None:
+                return None
+            parts.append(live)
+
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return np.empty(0, dtype=FieldType.rates_dtype)
+        rates = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        low = np.searchsorted(rates['time'], start, side='left')
+        high = np.searchsorted(rates['time'], end, side='right')
+        return np.array(rates[low:high])
+
+    def get_rates_from_date(self, symbol: str, timeframe: int, date_from: datetime, count: int, attempts: int = 8) -> ndarray:
+        """
+        Obtiene las count barras anteriores o iguales a date_from, igual que MT5Api.get_rates_from_date.
+
+        Se busca hacia atrás en el almacén con un rango que se duplica hasta reunir count barras; cada intento
+        reutiliza los días ya guardados.
+
+        Args:
+            symbol (str): El nombre del instrumento financiero.
+            timeframe (int): El marco temporal de las velas.
+            date_from (datetime): La fecha de la última barra (hora en UTC).
+            count (int): El número de barras.
+            attempts (int, optional): Número máximo de veces que se duplica el rango antes de consultar la terminal.
+
+        Returns:
+            ndarray: Las barras FieldType.rates_dtype, o None si la terminal no devolvió datos.
+        """
+        from .client import MT5Api
+
+        if self.is_cacheable(timeframe) and count > 0:
+            span = timedelta(seconds=self.timeframe_seconds(timeframe) * count)
+            for _ in range(attempts):
+                rates = self.get_rates_range(symbol, timeframe, date_from - span, date_from)
+                if rates is None:
+                    return None
+                if len(rates) >= count:
+                    return rates[len(rates) - count:]
+                span *= 2
+
+        with MT5Api.bypass_history_store():
+            return MT5Api.get_rates_from_date(symbol, timeframe, date_from, count)
+
+    @staticmethod
+    def _contiguous(days: List[int]) -> List[Tuple[int, int]]:
+        """
+        Agrupa días ordenados en tramos continuos (primer día, último día).
+        """
+        ranges = []
+        for day in days:
+            if ranges and ranges[-1][1] == day - 1:
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+    #endregion
@@ -0,0 +1,290 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Para compartir memoria y bloqueos entre procesos
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Importaciones para el manejo de datos
+from .client import MT5Api
+from .clock import ClockService
+from .enums import CopyTicks, TimeFrame
+from ..event_dispatcher import EventDispatcher
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime, date
+import pytz
+import time
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Dict, List, Tuple
+
+
+class OpeningRangeService:
+    """
+    Rango de apertura (máximo y mínimo entre las 13:00 y las 13:30 UTC) de cada símbolo, compartido por todas las estrategias.
+
+    El rango se calcula una sola vez por símbolo y por sesión. Durante la ventana, run() lo construye de forma
+    incremental con el flujo de ticks, por lo que a las 13:30:00 ya está listo sin consultar barras. Si el servicio
+    no estuvo activo durante la ventana, get_range() lo calcula una vez con las barras de un minuto y lo guarda
+    para los demás procesos. Los valores viven en memoria compartida: cada registro se escribe bajo su bloqueo
+    y se lee sin bloqueo con un contador seqlock. El objeto debe compartirse con los otros procesos por herencia,
+    es decir, como argumento del proceso.
+
+    Example:
+        >>> opening_range = OpeningRangeService(["US30.cash"], create=True)
+        >>> high, low = opening_range.get_range("US30.cash")
+    """
+    dtype_range = np.dtype([
+        ('seq', 'u8'),          # Contador seqlock: impar mientras se escribe el registro
+        ('high', 'f8'),
+        ('low', 'f8'),
+        ('ticks', 'i8'),        # Ticks de la ventana incluidos en el rango
+        ('complete', '?'),      # True cuando la ventana terminó y el rango es definitivo
+    ])
+    # Intentos de lectura de un registro que se está escribiendo; tras SPIN_READS intentos se cede el procesador
+    SPIN_READS = 16
+    MAX_READS = 10000
+
+    def __init__(self, symbols: List[str], opening_time: Dict[str, int] = None, closing_time: Dict[str, int] = None, day: date = None,
+                 name: str = None, create: bool = False, locks: List[Any] = None, clock: ClockService = None) -> None:
+        """
+        Crea el servicio o se conecta a uno existente.
+
+        Args:
+            symbols (List[str]): Los símbolos del servicio, en el mismo orden para el creador y los demás procesos.
+            opening_time (Dict[str, int], optional): Hora y minuto UTC de inicio de la ventana. Por defecto, 13:00.
+            closing_time (Dict[str, int], optional): Hora y minuto UTC de fin de la ventana. Por defecto, 13:30.
+            day (date, optional): El día de la sesión. Por defecto, el día actual en UTC.
+            name (str, optional): Nombre del bloque de memoria compartida. Obligatorio si create es False.
+            create (bool, optional): True para crear el bloque de memoria (solo el proceso dueño).
+            locks (List[Any], optional): Bloqueos de los registros, uno por símbolo. Si no se indican se crean nuevos.
+            clock (ClockService, optional): El reloj de la sesión. Si no se indica se usa la hora del sistema.
+        """
+        self.symbols = list(symbols)
+        self._clock = clock
+        self.opening_time = opening_time or {'hour': 13, 'minute': 0}
+        self.closing_time = closing_time or {'hour': 13, 'minute': 30}
+        self.day = day or self._now().date()
+        self._slots: Dict[str, int] = {symbol: index for index, symbol in enumerate(self.symbols)}
+        self._owner = create
+        self._locks = locks if locks is not None else [multiprocessing.Lock() for _ in self.symbols]
+
+        size = self.dtype_range.itemsize * max(len(self.symbols), 1)
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self._shm.name
+        self._ranges: ndarray = np.ndarray((len(self.symbols),), dtype=self.dtype_range, buffer=self._shm.buf)
+        if create:
+            self._ranges[:] = 0
+            self._ranges['high'] = -np.inf
+            self._ranges['low'] = np.inf
+
+    #region Pickle
+    def __getstate__(self):
+        return {
+            'symbols': self.symbols, 'opening_time': self.opening_time, 'closing_time': self.closing_time,
+            'day': self.day, 'name': self.name, 'locks': self._locks, 'clock': self._clock
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state['symbols'], state['opening_time'], state['closing_time'], state['day'], name=state['name'], create=False, locks=state['locks'], clock=state['clock'])
+    #endregion
+
+    #region Window
+    def _now(self) -> datetime:
+        """
+        Obtiene la hora actual en UTC, la del reloj de la sesión si se indicó.
+        """
+        if self._clock is not None:
+            return self._clock.now()
+        return datetime.now(pytz.utc)
+
+    def get_window(self) -> Tuple[datetime, datetime]:
+        """
+        Obtiene el inicio y el fin de la ventana del rango de apertura.
+
+        Returns:
+            Tuple[datetime, datetime]: (inicio, fin) en UTC.
+        """
+        start = datetime(self.day.year, self.day.month, self.day.day, self.opening_time['hour'], self.opening_time['minute'], tzinfo=pytz.utc)
+        end = datetime(self.day.year, self.day.month, self.day.day, self.closing_time['hour'], self.closing_time['minute'], tzinfo=pytz.utc)
+        return start, end
+
+    def _get_window_msc(self) -> Tuple[int, int]:
+        """
+        Obtiene la ventana en milisegundos con la hora del servidor, la misma referencia del time_msc de los ticks.
+        """
+        start, end = self.get_window()
+        start_msc = int(MT5Api.convert_utc_to_mt5_timezone(start).timestamp() * 1000)
+        end_msc = int(MT5Api.convert_utc_to_mt5_timezone(end).timestamp() * 1000)
+        return start_msc, end_msc
+    #endregion
+
+    #region Writers
+    def update_ticks(self, symbol: str, ticks: ndarray, window_msc: Tuple[int, int] = None):
+        """
+        Agrega ticks al rango de un símbolo. Los ticks fuera de la ventana se ignoran y un tick posterior
+        al fin de la ventana cierra el rango.
+
+        Args:
+            symbol (str): El símbolo de los ticks.
+            ticks (ndarray): Ticks FieldType.ticks_dtype ordenados por time_msc.
+            window_msc (Tuple[int, int], optional): La ventana en milisegundos de la hora del servidor, si ya se calculó.
+        """
+        if ticks is None or ticks.size == 0:
+            return
+        start_msc, end_msc = window_msc or self._get_window_msc()
+
+        time_msc = ticks['time_msc']
+        first = int(np.searchsorted(time_msc, start_msc, side='left'))
+        last = int(np.searchsorted(time_msc, end_msc, side='left'))
+        in_window = ticks[first:last]
+        complete = int(time_msc[-1]) >= end_msc
+
+        if in_window.size == 0 and not complete:
+            return
+
+        # Las barras de MT5 se construyen con el bid, salvo en los símbolos que informan el último precio negociado
+        prices = np.where(in_window['last'] != 0, in_window['last'], in_window['bid'])
+        index = self._slots[symbol]
+        with self._locks[index]:
+            record = self._ranges[index:index + 1]
+            if record['complete'][0]:
+                return
+            record['seq'] += 1
+            if prices.size:
+                record['high'] = max(float(record['high'][0]), float(prices.max()))
+                record['low'] = min(float(record['low'][0]), float(prices.min()))
+                record['ticks'] += prices.size
+            # Un rango sin ticks en la ventana no se cierra, se calculará con las barras
+            record['complete'] = complete and record['ticks'][0] > 0
+            record['seq'] += 1
+
+    def set_range(self, symbol: str, high: float, low: float):
+        """
+        Guarda el rango definitivo de un símbolo.
+        """
+        index = self._slots[symbol]
+        with self._locks[index]:
+            record = self._ranges[index:index + 1]
+            record['seq'] += 1
+            record['high'] = high
+            record['low'] = low
+            record['complete'] = True
+            record['seq'] += 1
+
+    def run(self, poll_interval: float = 0.01, stop_when=None):
+        """
+        Construye el rango de todos los símbolos con el flujo de ticks durante la ventana.
+
+        El flujo comienza en el inicio de la ventana, de modo que si el servicio arranca tarde recupera los ticks
+        ya ocurridos. Si la ventana ya terminó, el rango se calcula con las barras de un minuto.
+
+        Args:
+            poll_interval (float, optional): Segundos de espera mínima entre consultas del flujo.
+            stop_when (Callable[[], bool], optional): Función que devuelve True cuando se debe detener el servicio.
+        """
+        start, end = self.get_window()
+        if self._now() >= end:
+            for symbol in self.symbols:
+                self.get_range(symbol)
+            return
+
+        window_msc = self._get_window_msc()
+        with MT5Api.session():
+            stream = MT5Api.stream_ticks(
+                self.symbols,
+                flags=CopyTicks.COPY_TICKS_INFO,
+                poll_interval=poll_interval,
+                start_msc={symbol: window_msc[0] for symbol in self.symbols}
+            )
+            dispatcher = EventDispatcher(
+                tick_source=stream,
+                poll_interval=poll_interval,
+                # Termina cuando todos los rangos cerraron, o poco después del fin de la ventana si algún símbolo no tuvo ticks
+                stop_when=lambda: self.is_complete() or (stop_when is not None and stop_when()) or (self._now() - end).total_seconds() > 5
+            )
+            dispatcher.on_tick(lambda symbol, ticks: self.update_ticks(symbol, ticks, window_msc))
+            dispatcher.run()
+
+        # Cierra los rangos que no recibieron un tick posterior a la ventana
+        for symbol in self.symbols:
+            if not self._read(symbol)[3]:
+                self.get_range(symbol)
+    #endregion
+
+    #region Readers
+    def get_range(self, symbol: str, wait: float = 1.0) -> Tuple[float, float]:
+        """
+        Obtiene el máximo y el mínimo del rango de apertura de un símbolo.
+
+        Si run() está construyendo el rango, se espera hasta wait segundos después del fin de la ventana a que lo cierre.
+        Si el rango aún no está completo, se calcula una sola vez con las barras de un minuto y se guarda para
+        los demás procesos.
+
+        Args:
+            symbol (str): El símbolo a consultar.
+            wait (float, optional): Segundos de espera máxima, contados desde el fin de la ventana, para que run() cierre el rango.
+
+        Returns:
+            Tuple[float, float]: (high, low), o None si no se pudo obtener el rango.
+        """
+        start, end = self.get_window()
+        high, low, ticks, complete = self._read(symbol)
+        # El flujo ya recibió ticks de la ventana: solo falta el primer tick posterior a la ventana
+        while not complete and ticks and (self._now() - end).total_seconds() < wait:
+            time.sleep(0.01)
+            high, low, ticks, complete = self._read(symbol)
+        if complete:
+            return high, low
+
+        rates_in_range = MT5Api.get_rates_range(symbol, TimeFrame.MINUTE_1, start, end)
+        if rates_in_range is None or len(rates_in_range) == 0:
+            print(f"No se pudo obtener el rango de apertura de {symbol}")
+            return None
+
+        high = float(np.max(rates_in_range['high']))
+        low = float(np.min(rates_in_range['low']))
+        self.set_range(symbol, high, low)
+        return high, low
+
+    def is_complete(self, symbol: str = None) -> bool:
+        """
+        Indica si el rango de un símbolo, o de todos si no se indica ninguno, ya es definitivo.
+        """
+        if symbol is not None:
+            return self._read(symbol)[3]
+        return bool(self._ranges['complete'].all())
+
+    def _read(self, symbol: str) -> Tuple[float, float, int, bool]:
+        """
+        Lee un registro consistente sin tomar el bloqueo.
+
+        Si el registro se está escribiendo se vuelve a leer, cediendo el procesador tras los primeros intentos. Si
+        siguió en escritura durante MAX_READS intentos (el proceso que escribía se detuvo a mitad) se devuelve un
+        rango vacío e incompleto, con lo que get_range() lo calcula con las barras.
+        """
+        record = self._ranges[self._slots[symbol]]
+        for attempt in range(self.MAX_READS):
+            seq = record['seq']
+            if not seq & 1:
+                values = (float(record['high']), float(record['low']), int(record['ticks']), bool(record['complete']))
+                if record['seq'] == seq:
+                    return values
+            # Otro proceso está escribiendo el registro
+            if attempt >= self.SPIN_READS:
+                time.sleep(0)
+        print(f"No se pudo leer un rango de apertura consistente de {symbol}")
+        return np.nan, np.nan, 0, False
+    #endregion
+
+    #region Lifecycle
+    def close(self):
+        """
+        Libera el bloque de memoria compartida. El proceso dueño además lo elimina.
+        """
+        self._ranges = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+    #endregion
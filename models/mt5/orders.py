@@ -0,0 +1,92 @@
+from .enums import OrderType, TradeActions
+from .models import MqlTradeResult
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+
+class OrderResult(NamedTuple):
+    """
+    Resultado de una solicitud enviada con MT5Api.send_orders().
+
+    Attributes:
+        request (Dict[str, Any]): La solicitud enviada a la terminal, con el precio completado si faltaba.
+        result (MqlTradeResult): La respuesta de la terminal, None si la solicitud no se envió o no hubo respuesta.
+        latency (float): Segundos que tardó el envío de la solicitud; 0.0 si no se envió.
+        error (str): El motivo por el que la solicitud no se envió o falló, None si se completó.
+        done (bool): True si la terminal completó la solicitud.
+    """
+    request: Dict[str, Any]
+    result: MqlTradeResult
+    latency: float
+    error: str
+    done: bool
+
+
+# Acciones que abren o cierran volumen y por lo tanto necesitan símbolo, volumen, tipo y precio
+_DEAL_ACTIONS = (TradeActions.TRADE_ACTION_DEAL, TradeActions.TRADE_ACTION_PENDING)
+
+
+def prepare_order_requests(requests: List[Dict[str, Any]], get_symbol_info: Callable[[str], Any], get_tick: Callable[[str], Any],
+                           deviation: int = 10) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Valida juntas las solicitudes de un envío y completa el precio de mercado que falte.
+
+    La información y el último tick de cada símbolo se consultan una sola vez para todas las solicitudes. Se revisa
+    que el símbolo exista y que el volumen esté entre el mínimo y el máximo del símbolo y sea múltiplo de su paso.
+
+    Args:
+        requests (List[Dict[str, Any]]): Las solicitudes, con el formato de mt5.order_send.
+        get_symbol_info (Callable[[str], Any]): Obtiene la información de un símbolo (SymbolInfo), None si no existe.
+        get_tick (Callable[[str], Any]): Obtiene el último tick de un símbolo, None si no hay.
+        deviation (int, optional): Desviación máxima del precio, en puntos, para las solicitudes que no la indican.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[str]]: Las solicitudes completadas y, para cada una, el motivo por el que
+            no es válida o None.
+    """
+    symbols = {request.get('symbol') for request in requests if request.get('symbol')}
+    infos = {symbol: get_symbol_info(symbol) for symbol in symbols}
+    ticks: Dict[str, Any] = {}
+
+    prepared = []
+    errors = []
+    for request in requests:
+        request = dict(request)
+        prepared.append(request)
+        errors.append(None)
+
+        action = request.get('action')
+        if action not in _DEAL_ACTIONS:
+            continue
+
+        symbol = request.get('symbol')
+        info = infos.get(symbol)
+        if info is None:
+            errors[-1] = f"Símbolo no encontrado: {symbol}"
+            continue
+
+        volume = request.get('volume')
+        if volume is None or volume <= 0:
+            errors[-1] = f"Volumen no válido: {volume}"
+            continue
+        if volume < info.volume_min or volume > info.volume_max:
+            errors[-1] = f"El volumen {volume} está fuera del rango [{info.volume_min}, {info.volume_max}] de {symbol}"
+            continue
+        step = info.volume_step
+        if step and abs(round(volume / step) * step - volume) > step * 1e-6:
+            errors[-1] = f"El volumen {volume} no es múltiplo de {step} en {symbol}"
+            continue
+
+        if request.get('type') not in (OrderType.MARKET_BUY, OrderType.MARKET_SELL) or 'price' in request:
+            continue
+        # Precio de mercado: ask para comprar, bid para vender
+        if symbol not in ticks:
+            ticks[symbol] = get_tick(symbol)
+        tick = ticks[symbol]
+        if tick is None:
+            errors[-1] = f"No se pudo obtener el precio actual para {symbol}."
+            continue
+        request['price'] = tick.ask if request['type'] == OrderType.MARKET_BUY else tick.bid
+        request.setdefault('deviation', deviation)
+    return prepared, errors
@@ -0,0 +1,197 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Dict
+
+from .stop_modifier import StopModifier
+
+
+class PositionAction:
+    """
+    Tipos de modificación de una posición calculados por las reglas vectorizadas.
+
+    Valores:
+    - TRAILING_STOP: Mover el stop loss detrás del precio actual.
+    - PARTIAL_EXIT: Cerrar una parte del volumen, mover el stop loss y, en la última parte, quitar el take profit.
+    - RECOVERY_STOP: Mover el stop loss al rango de recuperación y, si se aplicó, quitar el take profit.
+    """
+    TRAILING_STOP = 1
+    PARTIAL_EXIT = 2
+    RECOVERY_STOP = 3
+
+
+# Una modificación por registro; solo se generan las que hay que enviar a la terminal
+MODIFICATION_DTYPE = np.dtype([
+    ('ticket', 'u8'),
+    ('symbol', '<U32'),
+    ('action', 'i1'),           # PositionAction
+    ('sl', 'f8'),               # Nuevo stop loss
+    ('remove_tp', '?'),         # Quitar el take profit si el cambio de stop loss se aplicó
+    ('volume', 'f8'),           # Volumen a cerrar en una salida parcial, 0 en los demás casos
+    ('comment', '<U32'),        # Comentario de la salida parcial
+    ('stop_level', 'f8'),       # Nivel que alcanzó el precio en una salida parcial, NaN en los demás casos
+])
+
+
+def symbol_values(positions: ndarray, values: Dict[str, float]) -> ndarray:
+    """
+    Expande un valor por símbolo a un valor por posición.
+
+    Args:
+        positions (ndarray): Las posiciones (POSITION_DTYPE).
+        values (Dict[str, float]): El valor de cada símbolo; los símbolos que faltan quedan en NaN.
+
+    Returns:
+        ndarray: El valor del símbolo de cada posición (float64).
+    """
+    if len(positions) == 0:
+        return np.empty(0, dtype=np.float64)
+    symbols, inverse = np.unique(positions['symbol'], return_inverse=True)
+    per_symbol = [values.get(str(symbol)) for symbol in symbols]
+    return np.array([np.nan if value is None else value for value in per_symbol], dtype=np.float64)[inverse]
+
+
+def _modifications(positions: ndarray, mask: ndarray, action: int, sl: ndarray) -> ndarray:
+    selected = positions[mask]
+    modifications = np.zeros(len(selected), dtype=MODIFICATION_DTYPE)
+    modifications['ticket'] = selected['ticket']
+    modifications['symbol'] = selected['symbol']
+    modifications['action'] = action
+    modifications['sl'] = sl[mask]
+    modifications['stop_level'] = np.nan
+    return modifications
+
+
+def trailing_stops(positions: ndarray, ranges: ndarray, distance_factor: float = 1.0) -> ndarray:
+    """
+    Calcula el trailing stop de las posiciones sin take profit.
+
+    Si el precio se alejó del stop loss más que el rango, el stop loss se mueve a distance_factor veces el rango
+    detrás del precio actual.
+
+    Args:
+        positions (ndarray): Las posiciones (POSITION_DTYPE).
+        ranges (ndarray): El rango de cada posición; NaN para no gestionarla.
+        distance_factor (float, optional): La distancia del stop loss al precio, como fracción del rango.
+
+    Returns:
+        ndarray: Las modificaciones a enviar (MODIFICATION_DTYPE).
+    """
+    buy = positions['type'] == 0
+    current = positions['price_current']
+    distance = ranges * distance_factor
+    new_sl = np.where(buy, current - distance, current + distance)
+    with np.errstate(invalid='ignore'):
+        mask = (positions['tp'] == 0) & (np.abs(current - positions['sl']) > ranges)
+    return _modifications(positions, mask, PositionAction.TRAILING_STOP, new_sl)
+
+
+def partial_exits(positions: ndarray, piece: float, number_stops: int, first_volumes: ndarray, previous_stop_levels: ndarray, decimals: ndarray) -> ndarray:
+    """
+    Calcula las salidas parciales de las posiciones con take profit.
+
+    El contador del comentario indica cuántas partes se cerraron: la siguiente parte se cierra cuando el precio
+    supera la apertura en piece * contador veces la distancia al take profit. Cada salida cierra piece veces el
+    volumen inicial, mueve el stop loss al nivel anterior y, en la última parte, quita el take profit. Como en el
+    recorrido posición por posición, el nivel anterior se encadena entre las salidas de un mismo símbolo: la primera
+    usa previous_stop_levels y cada una de las siguientes, el nivel alcanzado por la anterior.
+
+    Args:
+        positions (ndarray): Las posiciones (POSITION_DTYPE).
+        piece (float): La fracción del volumen inicial que se cierra en cada parte.
+        number_stops (int): Número de partes.
+        first_volumes (ndarray): El volumen inicial de cada posición.
+        previous_stop_levels (ndarray): El nivel de stop loss al que se mueve cada posición; NaN para no gestionarla.
+        decimals (ndarray): Los decimales del volumen de cada posición.
+
+    Returns:
+        ndarray: Las modificaciones a enviar (MODIFICATION_DTYPE).
+    """
+    buy = positions['type'] == 0
+    price_open = positions['price_open']
+    current = positions['price_current']
+    counters = positions['counter'].astype(np.int64)
+    next_partial_range = piece * counters * np.abs(positions['tp'] - price_open)
+    stop_level = np.where(buy, price_open + next_partial_range, price_open - next_partial_range)
+    with np.errstate(invalid='ignore'):
+        reached = np.where(buy, stop_level < current, stop_level > current)
+    mask = (positions['tp'] != 0) & reached & ~np.isnan(previous_stop_levels)
+
+    modifications = _modifications(positions, mask, PositionAction.PARTIAL_EXIT, previous_stop_levels)
+    if len(modifications) > 1:
+        # Orden estable por símbolo: dentro de cada símbolo se conserva el orden de las posiciones
+        order = np.argsort(modifications['symbol'], kind='stable')
+        symbols = modifications['symbol'][order]
+        chained = np.concatenate([[False], symbols[1:] == symbols[:-1]])
+        reached_levels = stop_level[mask][order]
+        modifications['sl'][order[1:][chained[1:]]] = reached_levels[:-1][chained[1:]]
+    next_counters = counters[mask] + 1
+    # round() por posición, con los decimales de volumen de su símbolo
+    scale = 10.0 ** decimals[mask]
+    modifications['volume'] = np.round(first_volumes[mask] * piece * scale) / scale
+    modifications['comment'] = np.char.add(np.char.add(positions['tag'][mask], ' '), next_counters.astype(str))
+    modifications['remove_tp'] = next_counters == number_stops
+    modifications['stop_level'] = stop_level[mask]
+    return modifications
+
+
+def recovery_stops(positions: ndarray, recovery_ranges: ndarray) -> ndarray:
+    """
+    Calcula el cambio de stop loss de las posiciones de cobertura cuyo precio quedó a menos del rango de
+    recuperación del take profit: el stop loss pasa a un rango de recuperación del take profit y luego se quita
+    el take profit.
+
+    Args:
+        positions (ndarray): Las posiciones (POSITION_DTYPE).
+        recovery_ranges (ndarray): El rango de recuperación de cada posición; NaN para no gestionarla.
+
+    Returns:
+        ndarray: Las modificaciones a enviar (MODIFICATION_DTYPE).
+    """
+    buy = positions['type'] == 0
+    tp = positions['tp']
+    new_sl = np.where(buy, tp - recovery_ranges, tp + recovery_ranges)
+    with np.errstate(invalid='ignore'):
+        mask = (tp != 0) & (np.abs(positions['price_current'] - tp) < recovery_ranges)
+    modifications = _modifications(positions, mask, PositionAction.RECOVERY_STOP, new_sl)
+    modifications['remove_tp'] = True
+    return modifications
+
+
+def send_modifications(modifications: ndarray, modifier: StopModifier = None) -> ndarray:
+    """
+    Envía a la terminal las modificaciones calculadas por las reglas, en orden.
+
+    Una salida parcial cierra primero el volumen indicado; luego se cambia el stop loss y, si el cambio se aplicó
+    y la modificación lo indica, se quita el take profit. Con un StopModifier, el stop loss y el take profit de cada
+    posición se piden al modificador, que los envía juntos en una sola solicitud dentro del presupuesto de la terminal.
+
+    Args:
+        modifications (ndarray): Las modificaciones (MODIFICATION_DTYPE).
+        modifier (StopModifier, optional): La capa de envío de stops del proceso.
+
+    Returns:
+        ndarray: True en las modificaciones cuyo cambio de stop loss se aplicó (o ya estaba vigente); con un
+            modificador, False también en las que quedaron pendientes por el presupuesto.
+    """
+    # Importación local para evitar una importación circular con el cliente de MT5
+    from .client import MT5Api
+
+    applied = np.zeros(len(modifications), dtype=bool)
+    for index, modification in enumerate(modifications):
+        symbol = str(modification['symbol'])
+        ticket = int(modification['ticket'])
+        if modification['action'] == PositionAction.PARTIAL_EXIT:
+            MT5Api.send_sell_partial_order(symbol, float(modification['volume']), ticket, str(modification['comment']))
+        if modifier is not None:
+            modifier.request(symbol, ticket, sl=float(modification['sl']), tp=0.0 if modification['remove_tp'] else None)
+            continue
+        applied[index] = MT5Api.send_change_stop_loss(symbol, float(modification['sl']), ticket) is True
+        if applied[index] and modification['remove_tp']:
+            MT5Api.send_change_take_profit(symbol, 0.0, ticket)
+
+    if modifier is not None and len(modifications):
+        results = modifier.flush()
+        applied = np.array([results.get(int(ticket), False) for ticket in modifications['ticket']], dtype=bool)
+    return applied
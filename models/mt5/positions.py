@@ -0,0 +1,579 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Para compartir memoria entre procesos sin copias ni IPC
+from multiprocessing import shared_memory
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+# Para leer los campos de cada posición de la terminal sin un ciclo de Python por campo
+from operator import attrgetter
+
+# Importaciones necesarias para manejar fechas y tiempo
+import time
+
+
+# Campos de cada posición guardados en la foto compartida
+POSITION_DTYPE = np.dtype([
+    ('ticket', 'u8'),
+    ('time', 'i8'),
+    ('type', 'i4'),
+    ('magic', 'i8'),
+    ('identifier', 'u8'),
+    ('volume', 'f8'),
+    ('price_open', 'f8'),
+    ('sl', 'f8'),
+    ('tp', 'f8'),
+    ('price_current', 'f8'),
+    ('swap', 'f8'),
+    ('profit', 'f8'),
+    ('symbol', '<U32'),
+    ('comment', '<U32'),
+    ('tag', '<U32'),        # Etiqueta de la estrategia, el comentario sin el contador final
+    ('counter', 'i4'),      # Contador final del comentario, 0 si no tiene
+])
+
+# Campos que se leen de cada posición de la terminal
+TERMINAL_FIELDS = POSITION_DTYPE.names[:POSITION_DTYPE.names.index('tag')]
+
+# Campos cuyo cambio se informa como una posición modificada; el precio y la ganancia cambian con cada tick
+MODIFIED_FIELDS = ('volume', 'sl', 'tp', 'comment')
+
+
+def parse_comments(comments: ndarray) -> Tuple[ndarray, ndarray]:
+    """
+    Separa de una sola vez los comentarios de las posiciones en la etiqueta de la estrategia y el contador final,
+    con la misma regla que PositionIndex.parse_comment.
+
+    Args:
+        comments (ndarray): Los comentarios, como "Breakout:rt 3".
+
+    Returns:
+        Tuple[ndarray, ndarray]: (etiquetas, contadores); el contador es 0 si el comentario no termina en un número.
+    """
+    comments = np.char.strip(np.asarray(comments, dtype=str))
+    if comments.size == 0:
+        return comments.copy(), np.zeros(0, dtype=np.int32)
+    parts = np.char.rpartition(comments, ' ')
+    head, tail = parts[..., 0], parts[..., 2]
+    numbered = np.char.isdigit(tail)
+    tags = np.where(numbered, np.char.strip(head), np.char.strip(comments))
+    counters = np.where(numbered, tail, '0').astype(np.int64).astype(np.int32)
+    return tags, counters
+
+
+def positions_to_array(positions: Tuple) -> ndarray:
+    """
+    Convierte las posiciones de la terminal (TradePosition) en un arreglo POSITION_DTYPE, en el mismo orden.
+
+    Args:
+        positions (Tuple): Las posiciones devueltas por MT5Api.get_positions.
+
+    Returns:
+        ndarray: Las posiciones como arreglo estructurado, con la etiqueta y el contador de cada comentario.
+    """
+    if isinstance(positions, ndarray) and positions.dtype == POSITION_DTYPE:
+        return positions
+    if not positions:
+        return np.empty(0, dtype=POSITION_DTYPE)
+    fields = attrgetter(*TERMINAL_FIELDS)
+    empty = ('', 0)
+    array = np.array([fields(position) + empty for position in positions], dtype=POSITION_DTYPE)
+    array['tag'], array['counter'] = parse_comments(array['comment'])
+    return array
+
+
+class PositionChanges(NamedTuple):
+    """
+    Diferencias entre dos fotos de las posiciones abiertas.
+
+    Attributes:
+        snapshot (ndarray): La foto más reciente.
+        opened (ndarray): Las posiciones abiertas desde la foto anterior.
+        closed (ndarray): Las posiciones cerradas desde la foto anterior, con sus últimos valores.
+        modified (ndarray): Las posiciones que cambiaron de volumen, stop loss, take profit o comentario, con sus valores nuevos.
+    """
+    snapshot: ndarray
+    opened: ndarray
+    closed: ndarray
+    modified: ndarray
+
+    @property
+    def empty(self) -> bool:
+        """
+        Indica si no se abrió, cerró ni modificó ninguna posición.
+        """
+        return not (len(self.opened) or len(self.closed) or len(self.modified))
+
+
+def diff_positions(previous: ndarray, current: ndarray) -> PositionChanges:
+    """
+    Compara dos fotos de posiciones por ticket con operaciones de conjuntos vectorizadas.
+
+    Args:
+        previous (ndarray): La foto anterior (POSITION_DTYPE).
+        current (ndarray): La foto actual (POSITION_DTYPE).
+
+    Returns:
+        PositionChanges: Las posiciones abiertas, cerradas y modificadas.
+    """
+    previous_tickets = previous['ticket']
+    current_tickets = current['ticket']
+    opened = current[~np.isin(current_tickets, previous_tickets, assume_unique=True)]
+    closed = previous[~np.isin(previous_tickets, current_tickets, assume_unique=True)]
+
+    _, current_index, previous_index = np.intersect1d(current_tickets, previous_tickets, assume_unique=True, return_indices=True)
+    # Conserva el orden de la foto actual
+    order = np.argsort(current_index)
+    current_index = current_index[order]
+    previous_index = previous_index[order]
+    after = current[current_index]
+    before = previous[previous_index]
+    changed = np.zeros(len(after), dtype=bool)
+    for field in MODIFIED_FIELDS:
+        changed |= after[field] != before[field]
+    return PositionChanges(current, opened, closed, after[changed])
+
+
+class PositionsPoller:
+    """
+    Lector único de las posiciones abiertas, compartido por todas las estrategias.
+
+    Un solo proceso (el administrador de posiciones) llama a poll() en cada ciclo: lee todas las posiciones con una
+    sola consulta a la terminal, compara la foto con la anterior por ticket y entrega a los manejadores registrados
+    las posiciones abiertas, cerradas y modificadas. La foto se publica en memoria compartida protegida por un
+    contador seqlock, de modo que las estrategias de otros procesos leen sus posiciones con get_positions() sin
+    consultar la terminal, o siguen los cambios con watch(). Mientras no se haya publicado ninguna foto, las
+    lecturas se hacen a la terminal. El objeto se puede enviar a otros procesos; al deserializarse se vuelve a
+    conectar al mismo bloque de memoria.
+
+    Example:
+        >>> poller = PositionsPoller(create=True)
+        >>> poller.on_opened(lambda opened: print("Nuevas:", opened['ticket']))
+        >>> dispatcher = EventDispatcher(positions_source=poller.poll)
+        >>> # En el proceso de una estrategia
+        >>> positions = poller.get_positions("US30.cash")
+    """
+    dtype_header = np.dtype([
+        ('seq', 'u8'),          # Contador seqlock: impar mientras se escribe la foto
+        ('version', 'u8'),      # Aumenta con cada foto publicada
+        ('count', 'i8'),        # Número de posiciones de la foto
+    ])
+    HEADER_SIZE = 64
+    # Intentos de lectura de la foto mientras se escribe; tras SPIN_READS intentos se cede el procesador
+    SPIN_READS = 16
+    MAX_READS = 10000
+
+    def __init__(self, capacity: int = 4096, name: str = None, create: bool = False) -> None:
+        """
+        Crea el bloque de la foto compartida o se conecta a uno existente.
+
+        Args:
+            capacity (int, optional): Número máximo de posiciones de la foto compartida.
+            name (str, optional): Nombre del bloque de memoria compartida. Obligatorio si create es False.
+            create (bool, optional): True para crear el bloque de memoria (solo el proceso que llama a poll()).
+        """
+        self.capacity = capacity
+        self._owner = create
+
+        size = self.HEADER_SIZE + POSITION_DTYPE.itemsize * max(capacity, 1)
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self._shm.name
+        self._header: ndarray = np.ndarray((1,), dtype=self.dtype_header, buffer=self._shm.buf)
+        self._positions: ndarray = np.ndarray((capacity,), dtype=POSITION_DTYPE, buffer=self._shm.buf, offset=self.HEADER_SIZE)
+        if create:
+            self._header[:] = 0
+
+        # Estado del proceso que llama a poll()
+        self._previous: ndarray = np.empty(0, dtype=POSITION_DTYPE)
+        self._last_positions: Tuple = None
+        # Última foto consistente leída, la que se entrega si la foto sigue en escritura
+        self._last_snapshot: Tuple[int, ndarray] = (0, np.empty(0, dtype=POSITION_DTYPE))
+        self._opened_handlers: List[Callable[[ndarray], None]] = []
+        self._closed_handlers: List[Callable[[ndarray], None]] = []
+        self._modified_handlers: List[Callable[[ndarray], None]] = []
+        self._snapshot_handlers: List[Callable[[ndarray], None]] = []
+
+    #region Pickle
+    def __getstate__(self):
+        return {'capacity': self.capacity, 'name': self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'], name=state['name'], create=False)
+    #endregion
+
+    #region Registration
+    def on_opened(self, handler: Callable[[ndarray], None]):
+        """
+        Registra un manejador que recibe las posiciones abiertas desde el ciclo anterior.
+        """
+        self._opened_handlers.append(handler)
+
+    def on_closed(self, handler: Callable[[ndarray], None]):
+        """
+        Registra un manejador que recibe las posiciones cerradas desde el ciclo anterior.
+        """
+        self._closed_handlers.append(handler)
+
+    def on_modified(self, handler: Callable[[ndarray], None]):
+        """
+        Registra un manejador que recibe las posiciones cuyo volumen, stop loss, take profit o comentario cambió.
+        """
+        self._modified_handlers.append(handler)
+
+    def on_snapshot(self, handler: Callable[[ndarray], None]):
+        """
+        Registra un manejador que recibe la foto completa cada vez que algún campo de alguna posición cambió.
+        """
+        self._snapshot_handlers.append(handler)
+    #endregion
+
+    #region Writer
+    def poll(self) -> Tuple:
+        """
+        Lee las posiciones de la terminal una vez, publica la foto y entrega los cambios a los manejadores.
+        Solo debe llamarlo un proceso.
+
+        Se puede usar como positions_source de EventDispatcher: si ningún campo cambió se devuelve la misma tupla
+        del ciclo anterior.
+
+        Returns:
+            Tuple[TradePosition, ...]: Todas las posiciones abiertas, o None si la terminal no respondió.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        positions = MT5Api.get_positions()
+        if positions is None:
+            return None
+
+        current = positions_to_array(positions)
+        previous = self._previous
+        if self._last_positions is not None and len(current) == len(previous) and bool(np.all(current == previous)):
+            return self._last_positions
+        self._last_positions = positions
+        self._previous = current
+
+        self._publish(current)
+        changes = diff_positions(previous, current)
+        self._deliver(self._opened_handlers, changes.opened)
+        self._deliver(self._closed_handlers, changes.closed)
+        self._deliver(self._modified_handlers, changes.modified)
+        for handler in self._snapshot_handlers:
+            handler(current)
+        return positions
+
+    def _publish(self, current: ndarray):
+        """
+        Escribe la foto en la memoria compartida.
+        """
+        if len(current) > self.capacity:
+            print(f"Hay {len(current)} posiciones abiertas y la foto compartida solo admite {self.capacity}")
+            current = current[:self.capacity]
+        header = self._header
+        # Marca la foto como en escritura (impar)
+        header['seq'] += 1
+        self._positions[:len(current)] = current
+        header['count'] = len(current)
+        header['version'] += 1
+        # Marca la foto como consistente (par)
+        header['seq'] += 1
+
+    @staticmethod
+    def _deliver(handlers: List[Callable[[ndarray], None]], positions: ndarray):
+        if len(positions):
+            for handler in handlers:
+                handler(positions)
+
+    @property
+    def latest(self) -> ndarray:
+        """
+        La última foto leída por poll() en este proceso (POSITION_DTYPE).
+        """
+        return self._previous
+    #endregion
+
+    #region Readers
+    @property
+    def version(self) -> int:
+        """
+        Número de fotos publicadas; 0 si aún no se ha publicado ninguna.
+        """
+        return int(self._header['version'][0])
+
+    def snapshot(self) -> Tuple[int, ndarray]:
+        """
+        Lee la última foto consistente.
+
+        Si la foto se está escribiendo se vuelve a leer, cediendo el procesador tras los primeros intentos.
+
+        Returns:
+            Tuple[int, ndarray]: (versión, copia de las posiciones POSITION_DTYPE). Si la foto siguió en escritura
+                durante MAX_READS intentos (el publicador se detuvo a mitad) se devuelve la última foto consistente
+                leída, o la versión 0 si no hay ninguna, con lo que get_positions() consulta la terminal.
+        """
+        header = self._header[0]
+        for attempt in range(self.MAX_READS):
+            seq = header['seq']
+            if not seq & 1:
+                version = int(header['version'])
+                positions = self._positions[:int(header['count'])].copy()
+                if header['seq'] == seq:
+                    self._last_snapshot = (version, positions)
+                    return version, positions
+            # El proceso que publica está escribiendo la foto
+            if attempt >= self.SPIN_READS:
+                time.sleep(0)
+        print("No se pudo leer una foto consistente de las posiciones")
+        version, positions = self._last_snapshot
+        return version, positions.copy()
+
+    def get_positions(self, symbol: str = None, ticket: int = None, as_array: bool = False) -> Tuple:
+        """
+        Obtiene las posiciones abiertas de la foto compartida, igual que MT5Api.get_positions.
+
+        Args:
+            symbol (str, optional): Filtra las posiciones de un símbolo.
+            ticket (int, optional): Filtra la posición de un ticket.
+            as_array (bool, optional): True para obtener un arreglo POSITION_DTYPE en lugar de una tupla.
+
+        Returns:
+            Tuple: Las posiciones, con acceso por atributo (position.comment, position.tp), en el orden de la terminal.
+        """
+        version, positions = self.snapshot()
+        if version == 0:
+            # Aún no se publicó ninguna foto, se consulta la terminal
+            from .client import MT5Api
+            return MT5Api.get_positions(symbol=symbol, ticket=ticket, as_array=as_array)
+
+        if ticket is not None:
+            positions = positions[positions['ticket'] == ticket]
+        elif symbol is not None:
+            positions = positions[positions['symbol'] == symbol]
+        if as_array:
+            return positions
+        return tuple(positions.view(np.recarray))
+
+    def watch(self) -> 'PositionsWatcher':
+        """
+        Crea un lector que entrega los cambios de la foto compartida desde su lectura anterior, para otros procesos.
+        """
+        return PositionsWatcher(self)
+    #endregion
+
+    #region Lifecycle
+    def close(self):
+        """
+        Libera el bloque de memoria compartida. El proceso dueño además lo elimina.
+        """
+        self._header = None
+        self._positions = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+    #endregion
+
+
+class PositionsWatcher:
+    """
+    Lector de la foto compartida de un PositionsPoller que entrega solo los cambios desde su lectura anterior.
+
+    Cada lector lleva su propia foto anterior, por lo que varios procesos pueden seguir la misma foto.
+    """
+    def __init__(self, poller: PositionsPoller) -> None:
+        self._poller = poller
+        self._version = 0
+        self._previous: ndarray = np.empty(0, dtype=POSITION_DTYPE)
+
+    def poll(self) -> PositionChanges:
+        """
+        Lee la foto compartida una vez.
+
+        Returns:
+            PositionChanges: Los cambios desde la lectura anterior, o None si no se publicó una foto nueva.
+        """
+        if self._poller.version == self._version:
+            return None
+        version, current = self._poller.snapshot()
+        changes = diff_positions(self._previous, current)
+        self._version = version
+        self._previous = current
+        return changes
+
+
+class PositionIndex:
+    """
+    Índice de las posiciones abiertas por estrategia y símbolo.
+
+    El comentario de cada posición ("Breakout:rt 3") se separa una sola vez por ticket en la etiqueta de la
+    estrategia ("Breakout:rt") y el contador (3); si el número mágico de la posición está en magics, la etiqueta es
+    la del número mágico. El índice mantiene diccionarios de (etiqueta, símbolo) a tickets, en el orden en que se
+    abrieron, y de ticket a contador, de modo que cada estrategia obtiene sus posiciones sin recorrer las de las
+    demás. refresh() actualiza el índice con los tickets nuevos y cerrados de cada foto; los comentarios de una
+    posición abierta no cambian, por lo que los tickets ya conocidos no se vuelven a separar.
+
+    La foto puede llegar atrasada respecto a las órdenes que acaba de enviar la estrategia. record_sent() registra
+    cada orden enviada con éxito, y last_counter() y last_type() la consideran hasta que la foto muestra una posición
+    de la estrategia con ese contador, o hasta SENT_TIMEOUT segundos si la posición nunca aparece.
+
+    Example:
+        >>> index = PositionIndex()
+        >>> index.refresh(MT5Api.get_positions())
+        >>> index.positions("Breakout:rt", "US30.cash")
+        >>> index.last_counter("Breakout:rt", "US30.cash")
+        3
+    """
+    # Segundos que una orden enviada se considera aunque la foto no muestre su posición
+    SENT_TIMEOUT = 30.0
+
+    def __init__(self, magics: Dict[int, str] = None) -> None:
+        """
+        Args:
+            magics (Dict[int, str], optional): Etiqueta de las estrategias que identifican sus posiciones por número mágico.
+        """
+        self.magics = dict(magics or {})
+        # Ticket -> (etiqueta, símbolo, contador)
+        self._entries: Dict[int, Tuple[str, str, int]] = {}
+        # (etiqueta, símbolo) -> tickets y etiqueta -> tickets, ordenados por apertura
+        self._keys: Dict[Tuple[str, str], Dict[int, None]] = {}
+        self._tags: Dict[str, Dict[int, None]] = {}
+        # Símbolo -> tickets, para actualizar solo un símbolo
+        self._symbols: Dict[str, Dict[int, None]] = {}
+        # Ticket -> posición de la última foto
+        self._positions: Dict[int, Any] = {}
+        # (etiqueta, símbolo) -> (contador, tipo, instante) de la última orden enviada que la foto aún no refleja
+        self._sent: Dict[Tuple[str, str], Tuple[int, int, float]] = {}
+
+    @staticmethod
+    def parse_comment(comment: str) -> Tuple[str, int]:
+        """
+        Separa un comentario en la etiqueta de la estrategia y el contador final.
+
+        Args:
+            comment (str): El comentario de la posición, como "Breakout:rt 3".
+
+        Returns:
+            Tuple[str, int]: (etiqueta, contador); el contador es None si el comentario no termina en un número.
+        """
+        parts = str(comment).strip().rsplit(None, 1)
+        if len(parts) == 2 and parts[1].isdigit():
+            return parts[0], int(parts[1])
+        if len(parts) == 1 and parts[0].isdigit():
+            return '', int(parts[0])
+        return str(comment).strip(), None
+
+    #region Updates
+    def refresh(self, positions: Iterable, symbol: str = None):
+        """
+        Actualiza el índice con una foto de las posiciones abiertas.
+
+        Args:
+            positions (Iterable): Las posiciones abiertas (TradePosition o filas de POSITION_DTYPE).
+            symbol (str, optional): Si se indica, la foto contiene solo las posiciones de ese símbolo y solo se
+                actualizan sus tickets.
+        """
+        if positions is None:
+            return
+        current = {int(position.ticket): position for position in positions}
+        known = self._symbols.get(symbol, {}) if symbol is not None else self._entries
+
+        for ticket in [ticket for ticket in known if ticket not in current]:
+            self._remove(ticket)
+        for ticket, position in current.items():
+            if ticket not in self._entries:
+                self._add(ticket, position)
+        self._positions.update(current)
+        self._confirm_sent()
+
+    def record_sent(self, tag: str, symbol: str, counter: int, type: int):
+        """
+        Registra una orden enviada con éxito, antes de que su posición aparezca en la foto.
+
+        Args:
+            tag (str): La etiqueta de la estrategia.
+            symbol (str): El símbolo de la orden.
+            counter (int): El contador del comentario de la orden.
+            type (int): El tipo de la posición abierta: 0 compra, 1 venta.
+        """
+        self._sent[(tag, symbol)] = (int(counter), int(type), time.monotonic())
+
+    def _confirm_sent(self):
+        """
+        Olvida las órdenes enviadas que la foto ya refleja o que vencieron.
+        """
+        now = time.monotonic()
+        for key, (counter, _, sent_at) in list(self._sent.items()):
+            counters = [self._entries[ticket][2] for ticket in self._keys.get(key, {})]
+            if now - sent_at > self.SENT_TIMEOUT or any(value is not None and value >= counter for value in counters):
+                del self._sent[key]
+
+    def _add(self, ticket: int, position: Any):
+        tag, counter = self.parse_comment(position.comment)
+        tag = self.magics.get(int(position.magic), tag)
+        symbol = str(position.symbol)
+        self._entries[ticket] = (tag, symbol, counter)
+        self._keys.setdefault((tag, symbol), {})[ticket] = None
+        self._tags.setdefault(tag, {})[ticket] = None
+        self._symbols.setdefault(symbol, {})[ticket] = None
+
+    def _remove(self, ticket: int):
+        tag, symbol, _ = self._entries.pop(ticket)
+        for mapping, key in ((self._keys, (tag, symbol)), (self._tags, tag), (self._symbols, symbol)):
+            tickets = mapping.get(key)
+            if tickets is not None:
+                tickets.pop(ticket, None)
+                if not tickets:
+                    del mapping[key]
+        self._positions.pop(ticket, None)
+    #endregion
+
+    #region Lookups
+    def tickets(self, tag: str, symbol: str = None) -> List[int]:
+        """
+        Obtiene los tickets de una estrategia, de todos sus símbolos o de uno, en el orden en que se abrieron.
+        """
+        tickets = self._tags.get(tag) if symbol is None else self._keys.get((tag, symbol))
+        return list(tickets) if tickets else []
+
+    def positions(self, tag: str, symbol: str = None) -> List[Any]:
+        """
+        Obtiene las posiciones de una estrategia, de todos sus símbolos o de uno, con los valores de la última foto.
+        """
+        return [self._positions[ticket] for ticket in self.tickets(tag, symbol)]
+
+    def counter(self, ticket: int) -> int:
+        """
+        Obtiene el contador del comentario de una posición, o None si no tiene o el ticket no está en el índice.
+        """
+        entry = self._entries.get(int(ticket))
+        return entry[2] if entry is not None else None
+
+    def last_counter(self, tag: str, symbol: str) -> int:
+        """
+        Obtiene el contador de la última posición abierta de una estrategia en un símbolo, o 0 si no tiene posiciones.
+        Una orden enviada que la foto aún no refleja cuenta como la última posición.
+        """
+        tickets = self._keys.get((tag, symbol))
+        counter = self._entries[next(reversed(tickets))][2] if tickets else 0
+        sent = self._sent.get((tag, symbol))
+        if sent is not None:
+            return max(counter or 0, sent[0])
+        return counter
+
+    def last_type(self, tag: str, symbol: str) -> int:
+        """
+        Obtiene el tipo (0 compra, 1 venta) de la última posición abierta de una estrategia en un símbolo, o None si
+        no tiene posiciones. Una orden enviada que la foto aún no refleja cuenta como la última posición.
+        """
+        sent = self._sent.get((tag, symbol))
+        if sent is not None:
+            return sent[1]
+        tickets = self._keys.get((tag, symbol))
+        if not tickets:
+            return None
+        return int(self._positions[next(reversed(tickets))].type)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+    #endregion
@@ -0,0 +1,252 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Para compartir memoria entre procesos sin copias ni IPC
+from multiprocessing import shared_memory
+
+# Importaciones para el manejo de datos
+from .enums import CopyTicks, FieldType
+
+# Importaciones necesarias para manejar fechas y tiempo
+import time
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Dict, List, Tuple
+
+
+class QuoteBoard:
+    """
+    Tablero de las últimas cotizaciones en memoria compartida.
+
+    Cada símbolo tiene un registro fijo con bid, ask, last y time_msc protegido por un contador seqlock:
+    un único publicador escribe el tablero y cualquier proceso lo lee directamente desde la memoria compartida,
+    sin copias ni llamadas a la terminal. El objeto se puede enviar a otros procesos; al deserializarse
+    se vuelve a conectar al mismo bloque de memoria.
+
+    Example:
+        >>> board = QuoteBoard(["US30.cash"], create=True)
+        >>> board.publish("US30.cash", bid=34000.5, ask=34001.5, last=0.0, time_msc=1694000000000)
+        >>> board.get_last_price("US30.cash")
+        34000.5
+    """
+    dtype_quote = np.dtype([
+        ('seq', 'u8'),          # Contador seqlock: impar mientras se escribe el registro
+        ('bid', 'f8'),
+        ('ask', 'f8'),
+        ('last', 'f8'),
+        ('time_msc', 'i8'),
+    ])
+
+    # Intentos de lectura de un registro que se está escribiendo; tras SPIN_READS intentos se cede el procesador
+    SPIN_READS = 16
+    MAX_READS = 10000
+
+    def __init__(self, symbols: List[str], name: str = None, create: bool = False) -> None:
+        """
+        Crea el tablero o se conecta a uno existente.
+
+        Args:
+            symbols (List[str]): Los símbolos del tablero, en el mismo orden para el creador y los lectores.
+            name (str, optional): Nombre del bloque de memoria compartida. Obligatorio si create es False.
+            create (bool, optional): True para crear el bloque de memoria (solo el proceso dueño).
+        """
+        self.symbols = list(symbols)
+        self._slots: Dict[str, int] = {symbol: index for index, symbol in enumerate(self.symbols)}
+        self._owner = create
+
+        size = self.dtype_quote.itemsize * max(len(self.symbols), 1)
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self._shm.name
+        self._quotes: ndarray = np.ndarray((len(self.symbols),), dtype=self.dtype_quote, buffer=self._shm.buf)
+        if create:
+            self._quotes[:] = 0
+
+    #region Pickle
+    def __getstate__(self):
+        return {'symbols': self.symbols, 'name': self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['symbols'], name=state['name'], create=False)
+    #endregion
+
+    #region Writer
+    def publish(self, symbol: str, bid: float, ask: float, last: float, time_msc: int):
+        """
+        Publica la última cotización de un símbolo. Solo debe llamarlo el proceso publicador.
+
+        Args:
+            symbol (str): El símbolo de la cotización.
+            bid (float): Precio de oferta.
+            ask (float): Precio de demanda.
+            last (float): Último precio negociado (0 si el símbolo no lo informa).
+            time_msc (int): Hora del tick en milisegundos.
+        """
+        quote = self._quotes[self._slots[symbol]:self._slots[symbol] + 1]
+        # Marca el registro como en escritura (impar)
+        quote['seq'] += 1
+        quote['bid'] = bid
+        quote['ask'] = ask
+        quote['last'] = last
+        quote['time_msc'] = time_msc
+        # Marca el registro como consistente (par)
+        quote['seq'] += 1
+
+    def publish_ticks(self, symbol: str, ticks: ndarray):
+        """
+        Publica el último tick de un arreglo FieldType.ticks_dtype.
+
+        Args:
+            symbol (str): El símbolo de los ticks.
+            ticks (ndarray): Arreglo de ticks ordenados; solo se publica el último.
+        """
+        if ticks is None or ticks.size == 0:
+            return
+        tick = ticks[-1]
+        self.publish(symbol, tick['bid'], tick['ask'], tick['last'], tick['time_msc'])
+
+    def run_publisher(self, flags: int = CopyTicks.COPY_TICKS_INFO, poll_interval: float = 0.01, stop_when=None, stop_check_interval: float = 1.0):
+        """
+        Publica continuamente las cotizaciones de todos los símbolos del tablero desde el flujo de ticks de MT5.
+
+        stop_when se consulta cada stop_check_interval segundos, haya o no ticks nuevos, por lo que el publicador
+        se detiene aunque el flujo de ticks se interrumpa.
+
+        Args:
+            flags (int, optional): Tipo de ticks solicitados al flujo.
+            poll_interval (float, optional): Segundos de espera cuando no hubo ticks nuevos en un ciclo.
+            stop_when (Callable[[], bool], optional): Función que devuelve True cuando se debe detener el publicador.
+            stop_check_interval (float, optional): Segundos entre consultas a stop_when.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        stream = MT5Api.stream_ticks(self.symbols, flags=flags, poll_interval=poll_interval)
+        next_check = time.monotonic()
+        with MT5Api.session():
+            while True:
+                if stop_when is not None and time.monotonic() >= next_check:
+                    if stop_when():
+                        break
+                    next_check = time.monotonic() + stop_check_interval
+
+                received = stream.poll_all()
+                for symbol, ticks in received:
+                    self.publish_ticks(symbol, ticks)
+                if not received and poll_interval:
+                    time.sleep(poll_interval)
+    #endregion
+
+    #region Readers
+    def get_quote(self, symbol: str) -> Tuple[float, float, float, int]:
+        """
+        Lee la última cotización consistente de un símbolo.
+
+        Si el registro se está escribiendo se vuelve a leer, cediendo el procesador tras los primeros intentos.
+
+        Args:
+            symbol (str): El símbolo a consultar.
+
+        Returns:
+            Tuple[float, float, float, int]: (bid, ask, last, time_msc). time_msc es 0 si aún no se ha publicado nada.
+                None si el registro siguió en escritura durante MAX_READS intentos (el publicador se detuvo a mitad).
+        """
+        quote = self._quotes[self._slots[symbol]]
+        for attempt in range(self.MAX_READS):
+            seq = quote['seq']
+            if not seq & 1:
+                values = (float(quote['bid']), float(quote['ask']), float(quote['last']), int(quote['time_msc']))
+                if quote['seq'] == seq:
+                    return values
+            # El publicador está escribiendo el registro
+            if attempt >= self.SPIN_READS:
+                time.sleep(0)
+        print(f"No se pudo leer una cotización consistente de {symbol}")
+        return None
+
+    def get_last_price(self, symbol: str) -> float:
+        """
+        Obtiene el precio actual de un símbolo, equivalente al cierre de la barra en curso.
+
+        Las barras de MT5 se construyen con el bid, salvo en los símbolos que informan el último precio negociado.
+
+        Args:
+            symbol (str): El símbolo a consultar.
+
+        Returns:
+            float: El precio actual, o None si aún no se ha publicado una cotización para el símbolo.
+        """
+        quote = self.get_quote(symbol)
+        if quote is None:
+            return None
+        bid, _, last, time_msc = quote
+        if time_msc == 0:
+            return None
+        return last if last else bid
+
+    def has_symbol(self, symbol: str) -> bool:
+        """
+        Indica si el símbolo tiene un registro en el tablero.
+        """
+        return symbol in self._slots
+
+    def source(self, symbols: List[str] = None) -> 'QuoteBoardSource':
+        """
+        Crea una fuente de ticks que entrega las cotizaciones nuevas del tablero, para usarla con EventDispatcher.
+
+        Args:
+            symbols (List[str], optional): Los símbolos a seguir. Por defecto, todos los del tablero.
+
+        Returns:
+            QuoteBoardSource: La fuente de ticks del lector.
+        """
+        return QuoteBoardSource(self, symbols if symbols is not None else self.symbols)
+    #endregion
+
+    #region Lifecycle
+    def close(self):
+        """
+        Libera el bloque de memoria compartida. El proceso dueño además lo elimina.
+        """
+        self._quotes = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+    #endregion
+
+
+class QuoteBoardSource:
+    """
+    Fuente de ticks que lee un QuoteBoard y entrega solo las cotizaciones que cambiaron desde la lectura anterior.
+
+    Cada lector lleva su propio registro de lo último que vio, por lo que varios procesos pueden leer el mismo tablero.
+    """
+    def __init__(self, board: QuoteBoard, symbols: List[str]) -> None:
+        self._board = board
+        self.symbols = [symbol for symbol in symbols if board.has_symbol(symbol)]
+        self._last_seen: Dict[str, int] = {symbol: 0 for symbol in self.symbols}
+
+    def poll_all(self) -> List[Tuple[str, ndarray]]:
+        """
+        Lee el tablero una vez.
+
+        Returns:
+            List[Tuple[str, ndarray]]: Los símbolos con una cotización nueva y un arreglo FieldType.ticks_dtype de un solo tick.
+        """
+        received = []
+        for symbol in self.symbols:
+            quote = self._board.get_quote(symbol)
+            if quote is None:
+                continue
+            bid, ask, last, time_msc = quote
+            if time_msc == 0 or time_msc == self._last_seen[symbol]:
+                continue
+            self._last_seen[symbol] = time_msc
+
+            ticks = np.zeros(1, dtype=FieldType.ticks_dtype)
+            ticks['time'] = time_msc // 1000
+            ticks['bid'] = bid
+            ticks['ask'] = ask
+            ticks['last'] = last
+            ticks['time_msc'] = time_msc
+            received.append((symbol, ticks))
+        return received
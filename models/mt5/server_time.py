@@ -0,0 +1,149 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime, timedelta
+import pytz
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Tuple, Union
+
+# Importación de módulos externos
+import os
+
+
+class ServerTime:
+    """
+    Conversión entre UTC y la hora del servidor de MT5, con cambios de horario.
+
+    La hora del servidor es la de una zona horaria de pytz más un desplazamiento fijo; por defecto, Nueva York
+    más 7 horas (GMT+2 en invierno y GMT+3 en verano, con el cambio de horario de Estados Unidos), la convención
+    de la mayoría de los brokers. La tabla de cambios de la zona se calcula una sola vez, y las columnas completas
+    de 'time' (segundos) o 'time_msc' (milisegundos) se convierten con una búsqueda binaria vectorizada sobre la
+    tabla, sin crear un datetime por valor.
+
+    Se configura con las variables de entorno MT5_SERVER_TIMEZONE y MT5_SERVER_SHIFT_HOURS; para un
+    desplazamiento fijo se puede usar una zona sin cambios, por ejemplo 'UTC' con 3 horas.
+
+    Example:
+        >>> server_time = ServerTime('America/New_York', shift_hours=7)
+        >>> server_time.utc_to_server(datetime(2023, 7, 3, 13, 30, tzinfo=pytz.utc))
+        datetime.datetime(2023, 7, 3, 16, 30, tzinfo=<UTC>)
+        >>> utc_msc = server_time.server_to_utc_array(ticks['time_msc'], unit='ms')
+    """
+    UNITS = {'s': 1, 'ms': 1000}
+
+    def __init__(self, timezone: str = 'America/New_York', shift_hours: float = 7) -> None:
+        """
+        Args:
+            timezone (str, optional): La zona horaria de pytz cuyos cambios de horario sigue el servidor.
+            shift_hours (float, optional): Horas que se suman a la hora de la zona para obtener la del servidor.
+        """
+        self.timezone = timezone
+        self.shift_hours = shift_hours
+        zone = pytz.timezone(timezone)
+        shift = int(round(shift_hours * 3600))
+
+        # Tabla de cambios: instante UTC (segundos) desde el cual rige cada diferencia con UTC
+        transitions = getattr(zone, '_utc_transition_times', None)
+        if transitions:
+            epoch = datetime(1970, 1, 1)
+            self._transitions = np.array([
+                (moment - epoch).total_seconds() if moment.year > 1 else np.iinfo(np.int64).min // 2
+                for moment in transitions
+            ], dtype=np.int64)
+            self._offsets = np.array([int(info[0].total_seconds()) + shift for info in zone._transition_info], dtype=np.int64)
+        else:
+            offset = zone.utcoffset(datetime(1970, 1, 1))
+            self._transitions = np.array([np.iinfo(np.int64).min // 2], dtype=np.int64)
+            self._offsets = np.array([int(offset.total_seconds()) + shift], dtype=np.int64)
+
+    @classmethod
+    def from_env(cls) -> 'ServerTime':
+        """
+        Crea la conversión con las variables de entorno MT5_SERVER_TIMEZONE y MT5_SERVER_SHIFT_HOURS.
+        """
+        return cls(os.getenv("MT5_SERVER_TIMEZONE", 'America/New_York'), float(os.getenv("MT5_SERVER_SHIFT_HOURS", 7)))
+
+    #region Arrays
+    def offset_seconds(self, utc_seconds: Union[ndarray, int]) -> ndarray:
+        """
+        Obtiene la diferencia en segundos entre la hora del servidor y UTC en cada instante UTC.
+        """
+        index = np.searchsorted(self._transitions, np.asarray(utc_seconds, dtype=np.int64), side='right') - 1
+        return self._offsets[index]
+
+    def offset_period(self, utc_seconds: int) -> Tuple[int, int, int]:
+        """
+        Obtiene la diferencia vigente en un instante UTC y el periodo en que rige, para reutilizarla sin buscar en la tabla.
+
+        Returns:
+            Tuple[int, int, int]: (diferencia en segundos, inicio del periodo, fin del periodo excluido), en segundos UTC.
+        """
+        index = int(np.searchsorted(self._transitions, int(utc_seconds), side='right')) - 1
+        end = int(self._transitions[index + 1]) if index + 1 < len(self._transitions) else np.iinfo(np.int64).max
+        return int(self._offsets[index]), int(self._transitions[index]), end
+
+    def utc_to_server_array(self, values: ndarray, unit: str = 's') -> ndarray:
+        """
+        Convierte una columna de instantes UTC a la hora del servidor.
+
+        Args:
+            values (ndarray): Segundos o milisegundos desde 1970 en UTC.
+            unit (str, optional): 's' para segundos ('time'), 'ms' para milisegundos ('time_msc').
+
+        Returns:
+            ndarray: Los instantes con la hora del servidor, en la misma unidad (int64).
+        """
+        scale = self.UNITS[unit]
+        values = np.asarray(values, dtype=np.int64)
+        return values + self.offset_seconds(values // scale) * scale
+
+    def server_to_utc_array(self, values: ndarray, unit: str = 's') -> ndarray:
+        """
+        Convierte una columna con la hora del servidor, como el 'time' de las barras o el 'time_msc' de los ticks, a UTC.
+
+        En la hora repetida del cambio de horario de otoño se elige la diferencia anterior al cambio.
+
+        Args:
+            values (ndarray): Segundos o milisegundos desde 1970 con la hora del servidor.
+            unit (str, optional): 's' para segundos ('time'), 'ms' para milisegundos ('time_msc').
+
+        Returns:
+            ndarray: Los instantes en UTC, en la misma unidad (int64).
+        """
+        scale = self.UNITS[unit]
+        values = np.asarray(values, dtype=np.int64)
+        seconds = values // scale
+        # Dos pasos de punto fijo: la diferencia vigente en el instante UTC estimado
+        guess = seconds - self.offset_seconds(seconds - self._offsets.max())
+        offsets = self.offset_seconds(guess)
+        return values - offsets * scale
+
+    def server_to_datetime64(self, values: ndarray, unit: str = 's', utc: bool = False) -> ndarray:
+        """
+        Convierte una columna con la hora del servidor a datetime64, opcionalmente en UTC.
+        """
+        values = self.server_to_utc_array(values, unit) if utc else np.asarray(values, dtype=np.int64)
+        return values.astype(f'datetime64[{unit}]')
+    #endregion
+
+    #region Scalars
+    def utc_to_server(self, date: datetime) -> datetime:
+        """
+        Convierte una fecha UTC a la hora del servidor. Una fecha sin zona horaria se interpreta como UTC
+        y el resultado conserva la zona horaria (o la falta de ella) de la fecha recibida.
+        """
+        moment = date if date.tzinfo is not None else date.replace(tzinfo=pytz.utc)
+        seconds = int(np.floor(moment.timestamp()))
+        return date + timedelta(seconds=int(self.offset_seconds(seconds)))
+
+    def server_to_utc(self, date: datetime) -> datetime:
+        """
+        Convierte una fecha con la hora del servidor a UTC.
+        """
+        moment = date if date.tzinfo is not None else date.replace(tzinfo=pytz.utc)
+        seconds = int(np.floor(moment.timestamp()))
+        utc_seconds = int(self.server_to_utc_array(np.array([seconds]))[0])
+        return date - timedelta(seconds=seconds - utc_seconds)
+    #endregion
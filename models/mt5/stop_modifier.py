@@ -0,0 +1,220 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+
+# Importaciones necesarias para manejar fechas y tiempo
+import time
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .positions import positions_to_array
+
+
+class StopRequest(NamedTuple):
+    """
+    Cambio pendiente del stop loss y el take profit de una posición.
+
+    Attributes:
+        symbol (str): El símbolo de la posición.
+        sl (float): El nuevo stop loss, None si no cambia.
+        tp (float): El nuevo take profit, None si no cambia; 0.0 lo quita.
+        requested (float): El instante (time.monotonic()) del primer pedido aún no enviado, para enviarlos en orden.
+    """
+    symbol: str
+    sl: float
+    tp: float
+    requested: float
+
+
+class StopModifier:
+    """
+    Capa de envío de los cambios de stop loss y take profit a la terminal.
+
+    Las estrategias piden los cambios con request() y se envían con flush():
+
+    - Los pedidos de una misma posición se combinan: el stop loss y el take profit pendientes se envían juntos en una
+      sola solicitud TRADE_ACTION_SLTP, y un pedido nuevo reemplaza al pendiente, por lo que siempre se envía el último.
+    - Los precios se redondean al trade_tick_size del símbolo, y un cambio menor a un tick respecto al valor de la
+      terminal, o al último valor enviado mientras la foto de posiciones aún no lo refleja, se descarta.
+    - Cada flush() envía a lo sumo las solicitudes que permite el presupuesto de la terminal, max_requests cada period
+      segundos. Las que no entran quedan pendientes sin bloquear al proceso y se combinan con los pedidos siguientes.
+
+    El presupuesto es del objeto; para que sea el de la terminal se usa un solo StopModifier en el proceso que
+    administra las posiciones. refresh() debe recibir cada foto de las posiciones para conocer el stop loss y el take
+    profit vigentes.
+
+    Example:
+        >>> modifier = StopModifier(max_requests=20, period=1.0)
+        >>> modifier.refresh(MT5Api.get_positions())
+        >>> modifier.request("US30.cash", ticket, sl=34010.5)
+        >>> modifier.request("US30.cash", ticket, tp=0.0)
+        >>> modifier.flush()                # Una sola solicitud con el stop loss y sin take profit
+        {123456: True}
+    """
+    def __init__(self, max_requests: int = 20, period: float = 1.0) -> None:
+        """
+        Args:
+            max_requests (int, optional): Solicitudes que se pueden enviar a la terminal en cada periodo.
+            period (float, optional): Duración del periodo del presupuesto, en segundos.
+        """
+        self.max_requests = max(int(max_requests), 1)
+        self.period = period
+        # Presupuesto disponible y el instante de su última recarga
+        self._tokens = float(self.max_requests)
+        self._refilled = time.monotonic()
+        # Pedidos pendientes por ticket
+        self._pending: Dict[int, StopRequest] = {}
+        # Stop loss y take profit de la terminal por ticket, según la última foto
+        self._current: Dict[int, Tuple[float, float]] = {}
+        # Último stop loss y take profit enviados por ticket y los de la foto al enviarlos, hasta que la foto cambie
+        self._sent: Dict[int, Tuple[Tuple[float, float], Tuple[float, float]]] = {}
+        # trade_tick_size de cada símbolo
+        self._tick_sizes: Dict[str, float] = {}
+
+    #region Positions
+    def refresh(self, positions: Iterable):
+        """
+        Actualiza el stop loss y el take profit vigentes con una foto de las posiciones.
+        Se olvidan los pedidos de las posiciones que ya no están abiertas.
+
+        Args:
+            positions (Iterable): Las posiciones (TradePosition o arreglo POSITION_DTYPE).
+        """
+        positions = positions_to_array(positions)
+        current = {
+            int(ticket): (float(sl), float(tp))
+            for ticket, sl, tp in zip(positions['ticket'].tolist(), positions['sl'].tolist(), positions['tp'].tolist())
+        }
+        for ticket in list(self._sent):
+            # Un envío deja de estar en curso cuando la foto cambia (lo refleja) o la posición se cerró
+            if ticket not in current or current[ticket] != self._sent[ticket][1]:
+                del self._sent[ticket]
+        for ticket in list(self._pending):
+            if ticket not in current:
+                del self._pending[ticket]
+        self._current = current
+    #endregion
+
+    #region Requests
+    def request(self, symbol: str, ticket: int, sl: float = None, tp: float = None):
+        """
+        Pide un cambio del stop loss y/o el take profit de una posición. Reemplaza al pedido pendiente de la posición
+        en los valores indicados.
+
+        Args:
+            symbol (str): El símbolo de la posición.
+            ticket (int): El ticket de la posición.
+            sl (float, optional): El nuevo stop loss.
+            tp (float, optional): El nuevo take profit; 0.0 lo quita.
+        """
+        ticket = int(ticket)
+        pending = self._pending.get(ticket)
+        if pending is None:
+            pending = StopRequest(symbol, None, None, time.monotonic())
+        self._pending[ticket] = pending._replace(
+            sl=pending.sl if sl is None else float(sl),
+            tp=pending.tp if tp is None else float(tp),
+        )
+
+    def pending(self) -> List[int]:
+        """
+        Obtiene los tickets con cambios pendientes de envío, en el orden en que se pidieron.
+        """
+        return sorted(self._pending, key=lambda ticket: self._pending[ticket].requested)
+
+    def flush(self) -> Dict[int, bool]:
+        """
+        Envía los cambios pendientes que permite el presupuesto, del más antiguo al más reciente.
+
+        Returns:
+            Dict[int, bool]: Por cada ticket procesado, True si el cambio se aplicó o ya estaba vigente y False si la
+                terminal lo rechazó. Los tickets que quedan pendientes por el presupuesto no se incluyen.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        results: Dict[int, bool] = {}
+        for ticket in self.pending():
+            pending = self._pending[ticket]
+            sl, tp = self._changes(ticket, pending)
+            if sl is None and tp is None:
+                # El cambio es menor a un tick o repite uno en curso
+                del self._pending[ticket]
+                results[ticket] = True
+                continue
+            if not self._take_token():
+                break
+            del self._pending[ticket]
+
+            # Una sola solicitud con los dos valores; el que no cambia se envía con su valor vigente
+            current_sl, current_tp = self._reference(ticket)
+            stop_loss = sl if sl is not None else current_sl
+            take_profit = tp if tp is not None else current_tp
+            applied = MT5Api.send_change_stops(pending.symbol, ticket, stop_loss, take_profit) is True
+            if applied:
+                self._sent[ticket] = ((stop_loss, take_profit), self._current.get(ticket))
+            results[ticket] = applied
+        return results
+
+    def _changes(self, ticket: int, pending: StopRequest) -> Tuple[float, float]:
+        """
+        Redondea los valores pedidos al tick del símbolo y descarta los que difieren del valor vigente en menos de un tick.
+        """
+        tick_size = self._tick_size(pending.symbol)
+        current_sl, current_tp = self._reference(ticket)
+        return (
+            self._change(pending.sl, current_sl, tick_size),
+            self._change(pending.tp, current_tp, tick_size),
+        )
+
+    @staticmethod
+    def _change(value: float, current: float, tick_size: float) -> float:
+        if value is None:
+            return None
+        if tick_size > 0 and value != 0:
+            value = float(np.round(value / tick_size) * tick_size)
+        if current is None:
+            return value
+        # Quitar un valor (0.0) solo se descarta si ya no está
+        if value == 0 or current == 0:
+            return None if value == current else value
+        if value == current or abs(value - current) < tick_size:
+            return None
+        return value
+
+    def _reference(self, ticket: int) -> Tuple[float, float]:
+        """
+        Obtiene el stop loss y el take profit con los que se compara un pedido: el último enviado si aún está en curso,
+        si no el de la terminal; (None, None) si la posición no está en la foto.
+        """
+        if ticket in self._sent:
+            return self._sent[ticket][0]
+        return self._current.get(ticket, (None, None))
+
+    def _tick_size(self, symbol: str) -> float:
+        """
+        Obtiene el trade_tick_size del símbolo, consultado una sola vez.
+        """
+        if symbol not in self._tick_sizes:
+            # Importación local para evitar una importación circular con el cliente de MT5
+            from .client import MT5Api
+
+            info = MT5Api.get_symbol_info(symbol)
+            if info is None:
+                return 0.0
+            self._tick_sizes[symbol] = float(info.trade_tick_size)
+        return self._tick_sizes[symbol]
+    #endregion
+
+    #region Budget
+    def _take_token(self) -> bool:
+        """
+        Descuenta una solicitud del presupuesto de la terminal, recargado de forma continua a max_requests por periodo.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.max_requests, self._tokens + (now - self._refilled) * self.max_requests / self.period)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+    #endregion
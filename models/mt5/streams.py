@@ -0,0 +1,204 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+
+# Importaciones para el manejo de datos
+from .enums import CopyTicks
+from numpy import ndarray
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime, timezone
+import time
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Dict, Iterator, List, Tuple
+
+
+class TickStreamStats:
+    """
+    Contadores de un símbolo dentro de un TickStream.
+
+    Attributes:
+        ticks (int): Número de ticks nuevos entregados.
+        duplicates (int): Número de ticks descartados por estar repetidos en el límite del cursor.
+        drops (int): Número de consultas descartadas porque la terminal no devolvió datos (error de copy_ticks_from).
+        polls (int): Número de consultas realizadas a la terminal.
+        lag_ms (int): Diferencia en milisegundos entre la hora actual del servidor y el último tick entregado.
+    """
+    __slots__ = ('ticks', 'duplicates', 'drops', 'polls', 'lag_ms')
+
+    def __init__(self) -> None:
+        self.ticks = 0
+        self.duplicates = 0
+        self.drops = 0
+        self.polls = 0
+        self.lag_ms = 0
+
+    def __repr__(self) -> str:
+        return f"TickStreamStats(ticks={self.ticks}, duplicates={self.duplicates}, drops={self.drops}, polls={self.polls}, lag_ms={self.lag_ms})"
+
+
+class TickStream:
+    """
+    Flujo incremental de ticks para varios símbolos basado en un cursor de time_msc.
+
+    En cada ciclo consulta copy_ticks_from desde el último time_msc visto de cada símbolo, descarta los ticks
+    repetidos en el límite del cursor y entrega únicamente los ticks nuevos como arreglos FieldType.ticks_dtype.
+    Se crea con MT5Api.stream_ticks().
+
+    Example:
+        >>> for symbol, ticks in MT5Api.stream_ticks(["US30.cash", "US500.cash"]):
+        ...     print(symbol, ticks['bid'][-1])
+    """
+    def __init__(self, symbols: List[str], flags: int = CopyTicks.COPY_TICKS_ALL, count: int = 1000, poll_interval: float = 0.01, start_msc: Dict[str, int] = None) -> None:
+        """
+        Inicializa el flujo de ticks.
+
+        Args:
+            symbols (List[str]): Los símbolos a seguir.
+            flags (int, optional): Tipo de ticks solicitados (COPY_TICKS_ALL, COPY_TICKS_INFO o COPY_TICKS_TRADE).
+            count (int, optional): Número máximo de ticks pedidos por consulta y símbolo.
+            poll_interval (float, optional): Segundos de espera cuando ningún símbolo tuvo ticks nuevos en el ciclo.
+            start_msc (Dict[str, int], optional): time_msc inicial por símbolo (hora del servidor).
+                Si no se indica, el flujo comienza en el último tick disponible de cada símbolo.
+        """
+        self.symbols = list(symbols)
+        self.flags = flags
+        self.count = count
+        self.poll_interval = poll_interval
+        self.stats: Dict[str, TickStreamStats] = {symbol: TickStreamStats() for symbol in self.symbols}
+
+        # Cursor por símbolo: último time_msc entregado y cuántos ticks con ese mismo time_msc ya se entregaron
+        self._cursors: Dict[str, Tuple[int, int]] = {}
+        # Tamaño de la consulta por símbolo, crece si un mismo segundo tiene más ticks que count
+        self._counts: Dict[str, int] = {symbol: count for symbol in self.symbols}
+        self._start_msc = dict(start_msc or {})
+        self._running = True
+
+    #region Iteration
+    def __iter__(self) -> Iterator[Tuple[str, ndarray]]:
+        """
+        Recorre los ticks nuevos de todos los símbolos hasta que se llame a stop().
+
+        Yields:
+            Tuple[str, ndarray]: El símbolo y un arreglo con sus ticks nuevos, ordenados por time_msc.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        with MT5Api.session():
+            while self._running:
+                received = False
+                for symbol, ticks in self.poll_all():
+                    received = True
+                    yield symbol, ticks
+                    if not self._running:
+                        break
+
+                if not received and self.poll_interval:
+                    time.sleep(self.poll_interval)
+
+    def stop(self):
+        """
+        Detiene el flujo al terminar el ciclo en curso.
+        """
+        self._running = False
+    #endregion
+
+    #region Polling
+    def poll_all(self) -> List[Tuple[str, ndarray]]:
+        """
+        Realiza un ciclo de consultas sobre todos los símbolos sin esperar.
+
+        Returns:
+            List[Tuple[str, ndarray]]: Los símbolos que tuvieron ticks nuevos junto con sus ticks.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        received = []
+        for symbol in self.symbols:
+            if symbol not in self._cursors:
+                self._init_cursor(MT5Api, symbol)
+            ticks = self.poll(MT5Api, symbol)
+            if ticks is not None and ticks.size:
+                received.append((symbol, ticks))
+        return received
+
+    def poll(self, api, symbol: str) -> ndarray:
+        """
+        Consulta una vez los ticks nuevos de un símbolo y avanza su cursor.
+
+        Args:
+            api: La clase MT5Api que realiza la consulta.
+            symbol (str): El símbolo a consultar.
+
+        Returns:
+            ndarray: Los ticks nuevos del símbolo (puede estar vacío), o None si la terminal no devolvió datos.
+        """
+        stats = self.stats[symbol]
+        last_msc, seen_at_last = self._cursors[symbol]
+        count = self._counts[symbol]
+
+        stats.polls += 1
+        ticks = api.get_ticks_from_msc(symbol, last_msc, count, self.flags)
+        if ticks is None:
+            stats.drops += 1
+            return None
+
+        new_ticks, duplicates = self._new_ticks(ticks, last_msc, seen_at_last)
+        stats.duplicates += duplicates
+
+        if new_ticks.size == 0:
+            # Si la consulta llegó llena y no avanzó, el segundo del cursor tiene más ticks que count
+            self._counts[symbol] = count * 2 if len(ticks) >= count else self.count
+            return new_ticks
+        self._counts[symbol] = self.count
+
+        # Avanza el cursor al último time_msc entregado
+        newest = int(new_ticks['time_msc'][-1])
+        at_newest = int(np.count_nonzero(new_ticks['time_msc'] == newest))
+        if newest == last_msc:
+            at_newest += seen_at_last
+        self._cursors[symbol] = (newest, at_newest)
+
+        stats.ticks += new_ticks.size
+        stats.lag_ms = self._server_now_msc(api) - newest
+        return new_ticks
+
+    def _new_ticks(self, ticks: ndarray, last_msc: int, seen_at_last: int) -> Tuple[ndarray, int]:
+        """
+        Separa los ticks nuevos de los ya entregados.
+
+        copy_ticks_from trabaja con segundos, por lo que cada consulta repite los ticks del segundo del cursor.
+        Se descartan los ticks anteriores al cursor y los primeros seen_at_last ticks con el mismo time_msc del cursor.
+
+        Returns:
+            Tuple[ndarray, int]: Los ticks nuevos y el número de ticks repetidos descartados.
+        """
+        time_msc = ticks['time_msc']
+        # Índice del primer tick con time_msc igual o mayor al cursor (los ticks vienen ordenados)
+        first_at_cursor = int(np.searchsorted(time_msc, last_msc, side='left'))
+        first_after_cursor = int(np.searchsorted(time_msc, last_msc, side='right'))
+        start = min(first_at_cursor + seen_at_last, first_after_cursor) if seen_at_last else first_at_cursor
+        return ticks[start:], start
+
+    def _init_cursor(self, api, symbol: str):
+        """
+        Establece el cursor inicial de un símbolo.
+        """
+        if symbol in self._start_msc:
+            self._cursors[symbol] = (int(self._start_msc[symbol]), 0)
+            return
+
+        # Comienza en el último tick disponible, que también se entrega
+        tick = api.get_symbol_info_tick(symbol)
+        start = int(tick.time_msc) if tick is not None else self._server_now_msc(api)
+        self._cursors[symbol] = (start, 0)
+
+    def _server_now_msc(self, api) -> int:
+        """
+        Obtiene la hora actual del servidor de MT5 en milisegundos.
+        """
+        # Los time_msc de la terminal están en la hora del servidor expresada como si fuera UTC
+        now_mt5 = api.convert_utc_to_mt5_timezone(datetime.now(timezone.utc))
+        return int(now_mt5.timestamp() * 1000)
+    #endregion
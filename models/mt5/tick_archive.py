@@ -0,0 +1,374 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Importaciones para el manejo de datos
+from .enums import CopyTicks, FieldType, TickFlag
+
+# Importaciones necesarias para manejar fechas y tiempo
+from datetime import datetime
+import pytz
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Dict, List, Tuple
+
+# Importaciones para el manejo de archivos
+import os
+import threading
+
+
+class TickSegment:
+    """
+    Archivo de ticks de un símbolo con capacidad fija, escrito solo al final.
+
+    El archivo comienza con una cabecera de 64 bytes (int64: firma, versión, número de ticks, capacidad) seguida de
+    los ticks con el dtype FieldType.ticks_dtype. El escritor copia los ticks y después publica el nuevo número de
+    ticks en la cabecera, por lo que un lector en otro proceso nunca ve un tick a medio escribir: solo lee los ticks
+    publicados. El índice disperso guarda el time_msc de uno de cada index_stride ticks para ubicar un instante
+    con una búsqueda binaria que solo lee las páginas necesarias del archivo.
+    """
+    MAGIC = 0x4B434954      # 'TICK'
+    VERSION = 1
+    HEADER = 64
+
+    def __init__(self, path: str, capacity: int = None, writable: bool = False, index_stride: int = 1024) -> None:
+        """
+        Abre un segmento existente o, si se indica capacity, crea uno nuevo.
+
+        Args:
+            path (str): La ruta del archivo.
+            capacity (int, optional): Número máximo de ticks de un segmento nuevo.
+            writable (bool, optional): True para abrir un segmento existente para escritura.
+            index_stride (int, optional): Cada cuántos ticks se guarda una entrada del índice disperso.
+        """
+        self.path = path
+        self.index_stride = index_stride
+        self.writable = writable or capacity is not None
+        if capacity is not None:
+            # Se crea con otro nombre y se renombra con la cabecera ya escrita, para que un lector no lo abra incompleto
+            temporary = f"{path}.tmp"
+            with open(temporary, 'wb') as file:
+                file.write(np.array([self.MAGIC, self.VERSION, 0, capacity, 0, 0, 0, 0], dtype='<i8').tobytes())
+                file.truncate(self.HEADER + capacity * FieldType.ticks_dtype.itemsize)
+            os.replace(temporary, path)
+        mode = 'r+' if self.writable else 'r'
+        self._header = np.memmap(path, dtype='<i8', mode=mode, shape=(8,))
+        if self._header[0] != self.MAGIC:
+            raise ValueError(f"{path} no es un segmento de ticks")
+        self.capacity = int(self._header[3])
+        self._ticks = np.memmap(path, dtype=FieldType.ticks_dtype, mode=mode, offset=self.HEADER, shape=(self.capacity,))
+        self._index = np.empty(0, dtype='<i8')
+
+    def __len__(self) -> int:
+        return int(self._header[2])
+
+    def is_full(self) -> bool:
+        return len(self) >= self.capacity
+
+    def append(self, ticks: ndarray) -> int:
+        """
+        Copia ticks al final del segmento.
+
+        Returns:
+            int: Número de ticks copiados, limitado por la capacidad libre.
+        """
+        count = len(self)
+        written = min(len(ticks), self.capacity - count)
+        if written <= 0:
+            return 0
+        self._ticks[count:count + written] = ticks[:written]
+        # Publica los ticks después de copiarlos
+        self._header[2] = count + written
+        return written
+
+    def view(self) -> ndarray:
+        """
+        Obtiene los ticks publicados como una vista del archivo, sin copia.
+        """
+        return self._ticks[:len(self)]
+
+    def first_msc(self) -> int:
+        return int(self._ticks['time_msc'][0]) if len(self) else None
+
+    def last_msc(self) -> int:
+        return int(self._ticks['time_msc'][len(self) - 1]) if len(self) else None
+
+    def locate(self, time_msc: int, side: str = 'left') -> int:
+        """
+        Obtiene la posición de time_msc dentro del segmento, como np.searchsorted sobre los ticks publicados.
+        """
+        count = len(self)
+        # Extiende el índice disperso con los ticks publicados desde la última consulta
+        indexed = len(self._index) * self.index_stride
+        if indexed < count:
+            self._index = np.concatenate((self._index, self._ticks['time_msc'][indexed:count:self.index_stride]))
+        block = int(np.searchsorted(self._index, time_msc, side=side)) - 1
+        low = max(block, 0) * self.index_stride
+        high = min(low + 2 * self.index_stride, count) if block >= 0 else min(self.index_stride, count)
+        return low + int(np.searchsorted(self._ticks['time_msc'][low:high], time_msc, side=side))
+
+    def flush(self):
+        self._ticks.flush()
+        self._header.flush()
+
+
+class TickArchive:
+    """
+    Archivo local de ticks por símbolo en segmentos memory-mapped, escritos solo al final.
+
+    Un proceso escritor registra el flujo en vivo (append, compatible con EventDispatcher.on_tick) y completa el
+    historial desde la terminal (backfill); cualquier número de procesos lectores consulta rangos al mismo tiempo
+    con get_ticks_range_msc o get_ticks_range. Las consultas ubican el rango con el índice disperso de cada
+    segmento y filtran por banderas con una máscara vectorizada sobre la vista del archivo, sin pedir nada a la
+    terminal. Cada símbolo tiene una carpeta con un archivo por segmento, nombrado con el time_msc de su primer tick.
+
+    Example:
+        >>> archive = TickArchive("/data/mt5_ticks")
+        >>> dispatcher.on_tick(archive.append)
+        >>> trades = archive.get_ticks_range("US30.cash", date_from, date_to, CopyTicks.COPY_TICKS_TRADE)
+    """
+    SUFFIX = '.ticks'
+
+    # Banderas de cada tipo de copia de ticks de MT5
+    COPY_FLAGS = {
+        CopyTicks.COPY_TICKS_INFO: TickFlag.TICK_FLAG_BID | TickFlag.TICK_FLAG_ASK,
+        CopyTicks.COPY_TICKS_TRADE: TickFlag.TICK_FLAG_LAST | TickFlag.TICK_FLAG_VOLUME,
+    }
+
+    def __init__(self, root: str = None, segment_ticks: int = 1 << 20, index_stride: int = 1024) -> None:
+        """
+        Args:
+            root (str, optional): La carpeta del archivo. Por defecto, la variable de entorno MT5_TICKS_PATH
+                o 'mt5_ticks' en el directorio actual.
+            segment_ticks (int, optional): Capacidad de cada segmento nuevo, en ticks.
+            index_stride (int, optional): Cada cuántos ticks se guarda una entrada del índice disperso.
+        """
+        self.root = root or os.getenv("MT5_TICKS_PATH", os.path.join(os.getcwd(), "mt5_ticks"))
+        self.segment_ticks = segment_ticks
+        self.index_stride = index_stride
+        # Segmentos abiertos por símbolo, ordenados por el time_msc de su primer tick
+        self._segments: Dict[str, List[Tuple[int, TickSegment]]] = {}
+        self._lock = threading.Lock()
+
+    #region Segments
+    def _folder(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol)
+
+    def _refresh(self, symbol: str) -> List[Tuple[int, TickSegment]]:
+        """
+        Abre los segmentos del símbolo creados desde la última consulta, por ejemplo por otro proceso escritor.
+        """
+        segments = self._segments.setdefault(symbol, [])
+        folder = self._folder(symbol)
+        if not os.path.isdir(folder):
+            return segments
+        known = {first for first, _ in segments}
+        names = [name for name in os.listdir(folder) if name.endswith(self.SUFFIX)]
+        new = sorted(int(name[:-len(self.SUFFIX)]) for name in names if int(name[:-len(self.SUFFIX)]) not in known)
+        if new:
+            for first in new:
+                segments.append((first, TickSegment(os.path.join(folder, f"{first}{self.SUFFIX}"), index_stride=self.index_stride)))
+            segments.sort(key=lambda item: item[0])
+        return segments
+
+    def _writable_tail(self, symbol: str, first_msc: int) -> TickSegment:
+        """
+        Obtiene el último segmento del símbolo abierto para escritura, o crea uno nuevo si está lleno.
+        """
+        segments = self._refresh(symbol)
+        if segments:
+            first, tail = segments[-1]
+            if not tail.is_full():
+                if not tail.writable:
+                    tail = TickSegment(tail.path, writable=True, index_stride=self.index_stride)
+                    segments[-1] = (first, tail)
+                return tail
+        os.makedirs(self._folder(symbol), exist_ok=True)
+        tail = TickSegment(os.path.join(self._folder(symbol), f"{first_msc}{self.SUFFIX}"), capacity=self.segment_ticks, index_stride=self.index_stride)
+        segments.append((first_msc, tail))
+        return tail
+
+    def last_msc(self, symbol: str) -> Tuple[int, int]:
+        """
+        Obtiene el time_msc del último tick archivado del símbolo y cuántos ticks archivados tienen ese mismo time_msc.
+
+        Returns:
+            Tuple[int, int]: (time_msc, ticks), o (None, 0) si el símbolo no tiene ticks.
+        """
+        for _, segment in reversed(self._refresh(symbol)):
+            if len(segment):
+                last = segment.last_msc()
+                same = len(segment) - segment.locate(last, side='left')
+                return last, same
+        return None, 0
+    #endregion
+
+    #region Writer
+    def append(self, symbol: str, ticks: ndarray) -> int:
+        """
+        Agrega ticks nuevos al final del archivo del símbolo. Solo un proceso debe escribir cada símbolo.
+
+        Los ticks anteriores al último tick archivado se descartan, para conservar el orden por time_msc.
+
+        Args:
+            symbol (str): El símbolo de los ticks.
+            ticks (ndarray): Ticks FieldType.ticks_dtype ordenados por time_msc.
+
+        Returns:
+            int: Número de ticks archivados.
+        """
+        if ticks is None or len(ticks) == 0:
+            return 0
+        with self._lock:
+            last, _ = self.last_msc(symbol)
+            if last is not None:
+                ticks = ticks[ticks['time_msc'] >= last]
+            written = 0
+            while written < len(ticks):
+                tail = self._writable_tail(symbol, int(ticks['time_msc'][written]))
+                written += tail.append(ticks[written:])
+            return written
+
+    def backfill(self, symbol: str, date_from: datetime, date_to: datetime, flags: int = CopyTicks.COPY_TICKS_ALL, count: int = 100000) -> int:
+        """
+        Completa el archivo con los ticks históricos de la terminal, desde el último tick archivado
+        (o desde date_from si el símbolo no tiene ticks) hasta date_to.
+
+        Args:
+            symbol (str): El símbolo.
+            date_from (datetime): Inicio del historial si el símbolo no tiene ticks (hora en UTC).
+            date_to (datetime): Fin del historial (hora en UTC).
+            flags (int, optional): Tipo de ticks solicitados a la terminal.
+            count (int, optional): Número de ticks pedidos por consulta.
+
+        Returns:
+            int: Número de ticks archivados, o -1 si la terminal no devolvió datos.
+        """
+        # Importación local para evitar una importación circular con el cliente de MT5
+        from .client import MT5Api
+
+        end_msc = self._to_server_msc(date_to)
+        cursor, skip = self.last_msc(symbol)
+        if cursor is None:
+            cursor = self._to_server_msc(date_from)
+        archived = 0
+        while cursor <= end_msc:
+            ticks = MT5Api.get_ticks_from_msc(symbol, cursor, count, flags)
+            if ticks is None:
+                print(f"No se pudieron obtener los ticks de {symbol} desde {cursor}")
+                return -1
+            # copy_ticks_from comienza en el segundo del cursor: descarta lo anterior y lo ya archivado en el cursor
+            new = ticks[int(np.searchsorted(ticks['time_msc'], cursor, side='left')):]
+            new = new[min(skip, int(np.searchsorted(new['time_msc'], cursor, side='right'))):]
+            in_range = new[new['time_msc'] <= end_msc]
+            if len(in_range):
+                archived += self.append(symbol, in_range)
+                cursor, skip = self.last_msc(symbol)
+            if len(ticks) < count or len(in_range) < len(new):
+                # No hay más ticks en la terminal, o se llegó al fin del rango
+                break
+            if len(new) == 0:
+                # Un mismo segundo tiene más ticks que count
+                count *= 2
+        return archived
+
+    def record(self, symbols: List[str], flags: int = CopyTicks.COPY_TICKS_ALL, poll_interval: float = 0.01, stop_when=None):
+        """
+        Archiva el flujo de ticks en vivo de varios símbolos, continuando desde el último tick archivado de cada uno.
+
+        Args:
+            symbols (List[str]): Los símbolos a archivar.
+            flags (int, optional): Tipo de ticks solicitados al flujo.
+            poll_interval (float, optional): Segundos de espera mínima entre consultas del flujo.
+            stop_when (Callable[[], bool], optional): Función que devuelve True cuando se debe detener el registro.
+        """
+        from .client import MT5Api
+        from ..event_dispatcher import EventDispatcher
+
+        start_msc = {}
+        for symbol in symbols:
+            last, _ = self.last_msc(symbol)
+            if last is not None:
+                start_msc[symbol] = last
+        with MT5Api.session():
+            stream = MT5Api.stream_ticks(symbols, flags=flags, poll_interval=poll_interval, start_msc=start_msc)
+            dispatcher = EventDispatcher(tick_source=stream, poll_interval=poll_interval, stop_when=stop_when)
+            dispatcher.on_tick(self._append_new(start_msc))
+            dispatcher.run()
+        self.flush()
+
+    def _append_new(self, start_msc: Dict[str, int]):
+        """
+        Crea el manejador del flujo. El flujo comienza con los ticks del time_msc del último tick archivado,
+        y los que ya estaban archivados se descartan.
+        """
+        pending = {symbol: self.last_msc(symbol)[1] for symbol in start_msc}
+
+        def on_tick(symbol: str, ticks: ndarray):
+            skip = pending.get(symbol, 0)
+            if skip:
+                at_cursor = int(np.searchsorted(ticks['time_msc'], start_msc[symbol], side='right'))
+                dropped = min(skip, at_cursor)
+                # Si todo el lote estaba en el cursor, los repetidos pueden continuar en el lote siguiente
+                pending[symbol] = skip - dropped if at_cursor == len(ticks) else 0
+                ticks = ticks[dropped:]
+            self.append(symbol, ticks)
+        return on_tick
+
+    def flush(self):
+        """
+        Escribe en disco los cambios pendientes de todos los segmentos abiertos.
+        """
+        for segments in self._segments.values():
+            for _, segment in segments:
+                if segment.writable:
+                    segment.flush()
+    #endregion
+
+    #region Readers
+    def get_ticks_range_msc(self, symbol: str, start_msc: int, end_msc: int, flags: int = CopyTicks.COPY_TICKS_ALL, flag_mask: int = None) -> ndarray:
+        """
+        Obtiene los ticks archivados con time_msc entre start_msc y end_msc, ambos incluidos.
+
+        Args:
+            symbol (str): El símbolo.
+            start_msc (int): Inicio del rango en milisegundos, hora del servidor.
+            end_msc (int): Fin del rango en milisegundos, hora del servidor.
+            flags (int, optional): COPY_TICKS_ALL, COPY_TICKS_INFO (cambios de bid o ask) o COPY_TICKS_TRADE (cambios de last o volumen).
+            flag_mask (int, optional): Combinación de TickFlag; solo se devuelven los ticks con alguna de esas banderas.
+
+        Returns:
+            ndarray: Los ticks FieldType.ticks_dtype, una copia independiente del archivo.
+        """
+        mask = self.COPY_FLAGS.get(flags, 0) | (flag_mask or 0)
+        parts = []
+        for first, segment in self._refresh(symbol):
+            if first > end_msc or len(segment) == 0 or segment.last_msc() < start_msc:
+                continue
+            low = segment.locate(start_msc, side='left')
+            high = segment.locate(end_msc, side='right')
+            ticks = segment.view()[low:high]
+            if mask:
+                ticks = ticks[(ticks['flags'] & mask) != 0]
+            parts.append(np.array(ticks))
+        if not parts:
+            return np.empty(0, dtype=FieldType.ticks_dtype)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def get_ticks_range(self, symbol: str, date_from: datetime, date_to: datetime, flags: int = CopyTicks.COPY_TICKS_ALL, flag_mask: int = None) -> ndarray:
+        """
+        Obtiene los ticks archivados entre dos fechas UTC, con los mismos parámetros de MT5Api.get_ticks_range.
+        """
+        return self.get_ticks_range_msc(symbol, self._to_server_msc(date_from), self._to_server_msc(date_to), flags, flag_mask)
+
+    @staticmethod
+    def _to_server_msc(date: datetime) -> int:
+        """
+        Convierte una fecha UTC a milisegundos con la hora del servidor, la referencia del campo time_msc.
+        """
+        from .client import MT5Api
+
+        server = MT5Api.convert_utc_to_mt5_timezone(date)
+        if server.tzinfo is None:
+            server = server.replace(tzinfo=pytz.utc)
+        return int(server.timestamp() * 1000)
+    #endregion
@@ -0,0 +1,267 @@
+import numpy as np          # Para realizar operaciones numéricas eficientes
+from numpy import ndarray
+
+# Para compartir memoria y bloqueos entre procesos
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Dict, Iterator, List
+
+
+# Esquema fijo del estado de cada símbolo compartido por las estrategias y el administrador de posiciones.
+# Los campos float sin valor se guardan como NaN y se leen como None.
+STRATEGY_STATE_DTYPE = np.dtype([
+    ('symbol', '<U32'),
+    ('active', '?'),                # El símbolo sigue en la lista de símbolos por analizar
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('range', 'f8'),
+    ('lot_size', 'f8'),
+    ('max_lot_size', 'f8'),
+    ('decimals', 'i4'),
+    ('volume_min', 'f8'),
+    ('volume_max', 'f8'),
+    ('partial_position', 'i4'),
+    ('first_volume', 'f8'),
+    ('previous_stop_level', 'f8'),
+    ('recovery_range', 'f8'),
+    ('recovery_high', 'f8'),
+    ('recovery_low', 'f8'),
+    ('in_hedge', '?'),
+    ('type', '<U4'),                # 'buy', 'sell' o vacío
+])
+
+
+class SymbolState:
+    """
+    Vista del registro de un símbolo dentro de un SymbolStateStore.
+
+    Las lecturas se hacen directamente sobre la memoria compartida, ya sea como atributo (state.high)
+    o como clave (state['high']), igual que con el diccionario que reemplaza. Cada escritura toma el bloqueo del registro.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: 'SymbolStateStore', index: int) -> None:
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self._store.fields:
+            raise AttributeError(name)
+        return self._store._read(self._index, name)
+
+    def __setattr__(self, name: str, value: Any):
+        if name not in self._store.fields:
+            raise AttributeError(name)
+        with self._store._locks[self._index]:
+            self._store._write(self._index, name, value)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._store.fields:
+            raise KeyError(name)
+        return self._store._read(self._index, name)
+
+    def __setitem__(self, name: str, value: Any):
+        if name not in self._store.fields:
+            raise KeyError(name)
+        with self._store._locks[self._index]:
+            self._store._write(self._index, name, value)
+
+    def __contains__(self, name: str) -> bool:
+        # Un campo existe si está en el esquema y tiene un valor asignado
+        return name in self._store.fields and self._store._read(self._index, name) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Obtiene una copia consistente del registro, leída bajo el bloqueo del registro.
+
+        Returns:
+            Dict[str, Any]: Los campos del registro.
+        """
+        with self._store._locks[self._index]:
+            return {name: self._store._read(self._index, name) for name in self._store.dtype.names}
+
+    def __repr__(self) -> str:
+        return f"SymbolState({self.to_dict()})"
+
+
+class SymbolStateStore:
+    """
+    Almacén de estado por símbolo respaldado por un arreglo estructurado de NumPy en memoria compartida.
+
+    Reemplaza a los diccionarios de multiprocessing.Manager: cada lectura es un acceso directo a memoria
+    en lugar de una llamada al proceso del Manager, y cada registro tiene su propio bloqueo para que el proceso
+    de la estrategia y el del administrador de posiciones vean siempre el mismo estado. Ofrece la misma interfaz
+    que el diccionario compartido (store[symbol], symbol in store, store.update({symbol: data})).
+    El objeto debe compartirse con los otros procesos por herencia, es decir, como argumento del proceso.
+
+    Example:
+        >>> store = SymbolStateStore(["US30.cash"], create=True)
+        >>> store.update({"US30.cash": {"symbol": "US30.cash", "high": 34100.0, "low": 34000.0}})
+        >>> store["US30.cash"].high
+        34100.0
+    """
+    def __init__(self, symbols: List[str], dtype: np.dtype = STRATEGY_STATE_DTYPE, name: str = None, create: bool = False, locks: List[Any] = None) -> None:
+        """
+        Crea el almacén o se conecta a uno existente.
+
+        Args:
+            symbols (List[str]): Los símbolos del almacén, en el mismo orden para el creador y los demás procesos.
+            dtype (np.dtype, optional): El esquema de cada registro.
+            name (str, optional): Nombre del bloque de memoria compartida. Obligatorio si create es False.
+            create (bool, optional): True para crear el bloque de memoria (solo el proceso dueño).
+            locks (List[Any], optional): Bloqueos de los registros, uno por símbolo. Si no se indican se crean nuevos.
+        """
+        self.symbol_names = list(symbols)
+        self.dtype = np.dtype(dtype)
+        self.fields = frozenset(self.dtype.names)
+        self._slots: Dict[str, int] = {symbol: index for index, symbol in enumerate(self.symbol_names)}
+        self._owner = create
+        self._locks = locks if locks is not None else [multiprocessing.Lock() for _ in self.symbol_names]
+
+        size = self.dtype.itemsize * max(len(self.symbol_names), 1)
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self._shm.name
+        self._records: ndarray = np.ndarray((len(self.symbol_names),), dtype=self.dtype, buffer=self._shm.buf)
+        if create:
+            self._reset()
+        self._views = [SymbolState(self, index) for index in range(len(self.symbol_names))]
+
+    #region Pickle
+    def __getstate__(self):
+        return {'symbols': self.symbol_names, 'dtype': self.dtype, 'name': self.name, 'locks': self._locks}
+
+    def __setstate__(self, state):
+        self.__init__(state['symbols'], dtype=state['dtype'], name=state['name'], create=False, locks=state['locks'])
+    #endregion
+
+    #region Mapping
+    def __getitem__(self, symbol: str) -> SymbolState:
+        if symbol not in self:
+            raise KeyError(symbol)
+        return self._views[self._slots[symbol]]
+
+    def __contains__(self, symbol: str) -> bool:
+        # Un símbolo está en el almacén cuando su registro ya fue preparado
+        index = self._slots.get(symbol)
+        return index is not None and bool(self._records[index]['symbol'])
+
+    def __iter__(self) -> Iterator[str]:
+        return (symbol for symbol in self.symbol_names if symbol in self)
+
+    def get(self, symbol: str, default: Any = None) -> SymbolState:
+        return self[symbol] if symbol in self else default
+
+    def update(self, data: Dict[str, Any]):
+        """
+        Actualiza varios registros, cada uno bajo su propio bloqueo.
+
+        Args:
+            data (Dict[str, Any]): Diccionario símbolo -> campos a actualizar (diccionario o SymbolState).
+                Las claves que no están en el esquema se ignoran.
+        """
+        for symbol, values in data.items():
+            index = self._slots[symbol]
+            if isinstance(values, SymbolState):
+                if values._store is self and values._index == index:
+                    # El registro ya se escribió directamente en la memoria compartida
+                    continue
+                values = values.to_dict()
+
+            with self._locks[index]:
+                if not self._records[index]['symbol']:
+                    self._write(index, 'symbol', symbol)
+                for name, value in values.items():
+                    if name in self.fields:
+                        self._write(index, name, value)
+    #endregion
+
+    #region Symbols
+    def symbols(self) -> 'SharedSymbolList':
+        """
+        Obtiene la lista compartida de símbolos activos, que reemplaza a la lista del Manager.
+
+        Returns:
+            SharedSymbolList: Lista de símbolos respaldada por el campo 'active' del almacén.
+        """
+        return SharedSymbolList(self)
+    #endregion
+
+    #region Records
+    def _read(self, index: int, name: str) -> Any:
+        value = self._records[index][name]
+        kind = self.dtype.fields[name][0].kind
+        if kind == 'f':
+            return None if np.isnan(value) else float(value)
+        if kind == 'b':
+            return bool(value)
+        if kind == 'i':
+            return int(value)
+        return str(value)
+
+    def _write(self, index: int, name: str, value: Any):
+        kind = self.dtype.fields[name][0].kind
+        if value is None:
+            value = np.nan if kind == 'f' else self._empty_value(kind)
+        self._records[index][name] = value
+
+    def _empty_value(self, kind: str) -> Any:
+        return {'b': False, 'i': 0, 'U': ''}.get(kind, 0)
+
+    def _reset(self):
+        for name in self.dtype.names:
+            kind = self.dtype.fields[name][0].kind
+            self._records[name] = np.nan if kind == 'f' else self._empty_value(kind)
+        if 'active' in self.fields:
+            self._records['active'] = True
+    #endregion
+
+    #region Lifecycle
+    def close(self):
+        """
+        Libera el bloque de memoria compartida. El proceso dueño además lo elimina.
+        """
+        self._views = []
+        self._records = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+    #endregion
+
+
+class SharedSymbolList:
+    """
+    Lista de símbolos activos compartida entre procesos, respaldada por un SymbolStateStore.
+
+    Ofrece las operaciones que las estrategias usan de la lista del Manager: iterar, remove, len y evaluación booleana.
+    """
+    def __init__(self, store: SymbolStateStore) -> None:
+        self._store = store
+
+    def __iter__(self) -> Iterator[str]:
+        records = self._store._records
+        return iter([symbol for index, symbol in enumerate(self._store.symbol_names) if records[index]['active']])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._store._records['active']))
+
+    def __bool__(self) -> bool:
+        return bool(self._store._records['active'].any())
+
+    def __contains__(self, symbol: str) -> bool:
+        index = self._store._slots.get(symbol)
+        return index is not None and bool(self._store._records[index]['active'])
+
+    def remove(self, symbol: str):
+        """
+        Quita un símbolo de la lista de símbolos activos.
+        """
+        if symbol not in self:
+            raise ValueError(f"{symbol} no está en la lista")
+        index = self._store._slots[symbol]
+        with self._store._locks[index]:
+            self._store._records[index]['active'] = False
+
+    def __repr__(self) -> str:
+        return repr(list(self))
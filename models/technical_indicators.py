@@ -1,32 +1,351 @@
 import numpy as np          # Para realizar operaciones numéricas eficientes
 
+# Para repartir cálculos entre varios procesos
+import multiprocessing
+
 # Importaciones para el manejo de datos
 from mt5.enums import FieldType
+from mt5.server_time import ServerTime
 from numpy import ndarray
 
 # Importaciones necesarias para definir tipos de datos
 from typing import Dict, List, Tuple, Any
 
-# Importaciones necesarias para manejar fechas y tiempo
-from datetime import datetime, timedelta
+# Para las ventanas de los indicadores de flujo
+from collections import deque
+
+
+class BrickBuffer:
+    """
+    Arreglo estructurado de ladrillos con capacidad preasignada.
+
+    Agregar un ladrillo escribe en la siguiente posición libre; cuando la capacidad se agota se duplica, por lo que
+    agregar n ladrillos cuesta O(n) en total en lugar de copiar todo el historial en cada ladrillo como np.append.
+    Con max_size el buffer queda acotado y conserva solo los últimos max_size ladrillos: se reservan 2 * max_size
+    posiciones y, al llenarse, los últimos max_size ladrillos se mueven al inicio, de modo que los datos siempre
+    son contiguos y view() no necesita copiarlos.
+
+    Example:
+        >>> bricks = BrickBuffer(dtype, max_size=5000)
+        >>> bricks.append(brick)
+        >>> bricks.view()[-1]
+    """
+    def __init__(self, dtype, capacity: int = 1024, max_size: int = None) -> None:
+        """
+        Args:
+            dtype: El tipo de dato de los ladrillos.
+            capacity (int, optional): Capacidad inicial.
+            max_size (int, optional): Número máximo de ladrillos conservados. Por defecto, sin límite.
+        """
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size debe ser mayor que cero")
+        self.dtype = np.dtype(dtype)
+        self.max_size = max_size
+        capacity = 2 * max_size if max_size is not None else max(int(capacity), 1)
+        self._data = np.empty(capacity, dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def view(self) -> ndarray:
+        """
+        Obtiene los ladrillos como una vista sin copia.
+
+        La vista refleja el buffer en el momento de la llamada; después de agregar ladrillos puede quedar desactualizada
+        o apuntar a datos que se movieron, por lo que se debe copiar si se necesita conservarla.
+
+        Returns:
+            ndarray: Los ladrillos, del más antiguo al más reciente.
+        """
+        return self._data[self._start:self._end]
+
+    def last(self):
+        """
+        Obtiene el último ladrillo, o None si el buffer está vacío.
+        """
+        if self._end == self._start:
+            return None
+        return self._data[self._end - 1]
+
+    def clear(self):
+        """
+        Elimina todos los ladrillos sin liberar la capacidad reservada.
+        """
+        self._start = 0
+        self._end = 0
+
+    def append(self, brick: Tuple):
+        """
+        Agrega un ladrillo al final del buffer.
+
+        Args:
+            brick (Tuple): Los campos del ladrillo, en el orden del dtype.
+        """
+        self._reserve(1)
+        self._data[self._end] = brick
+        self._end += 1
+        self._trim()
+
+    def extend(self, bricks: ndarray):
+        """
+        Agrega un arreglo de ladrillos al final del buffer. En modo acotado solo se conservan los últimos max_size.
+
+        Args:
+            bricks (ndarray): Los ladrillos a agregar, con el mismo dtype del buffer.
+        """
+        if self.max_size is not None and len(bricks) >= self.max_size:
+            # Los ladrillos nuevos reemplazan todo el contenido
+            self._data[:self.max_size] = bricks[len(bricks) - self.max_size:]
+            self._start = 0
+            self._end = self.max_size
+            return
+        self._reserve(len(bricks))
+        self._data[self._end:self._end + len(bricks)] = bricks
+        self._end += len(bricks)
+        self._trim()
+
+    def _trim(self):
+        """
+        En modo acotado descarta los ladrillos más antiguos que exceden max_size, sin mover datos.
+        """
+        if self.max_size is not None and len(self) > self.max_size:
+            self._start = self._end - self.max_size
+
+    def _reserve(self, count: int):
+        """
+        Garantiza espacio para count ladrillos más al final del buffer.
+        """
+        if self._end + count <= len(self._data):
+            return
+        if self.max_size is not None:
+            # Conserva los últimos ladrillos que caben junto a los nuevos y los mueve al inicio
+            keep = min(len(self), self.max_size - count)
+            self._data[:keep] = self._data[self._end - keep:self._end]
+            self._start = 0
+            self._end = keep
+            return
+        capacity = len(self._data)
+        while capacity < len(self) + count:
+            capacity *= 2
+        data = np.empty(capacity, dtype=self.dtype)
+        data[:len(self)] = self.view()
+        self._data = data
+        self._end = len(self)
+        self._start = 0
+
+
+class CompactBricks:
+    """
+    Ladrillos Renko en formato compacto, para guardar historiales largos de muchos símbolos.
+
+    Cada ladrillo ocupa 25 bytes con precios float32 o int32 en lugar de los 56 bytes de vRenko.dtype_renko:
+    la dirección es un int8 (1 sube, -1 baja), la hora un int64 con segundos desde la época y los precios pueden
+    guardarse como float64, float32 o como un entero de puntos del símbolo. Las columnas se leen con el mismo
+    nombre y tipo que en dtype_renko; 'time' es una vista sin copia y las demás se convierten al leerlas.
+
+    Example:
+        >>> compact = CompactBricks.from_bricks(renko.get_renko_data(), price_type='i4', point=0.01)
+        >>> compact['close']
+        >>> bricks = compact.to_bricks()
+    """
+    PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+    def __init__(self, data: ndarray, point: float = None) -> None:
+        """
+        Args:
+            data (ndarray): Arreglo con el dtype de CompactBricks.dtype_compact().
+            point (float, optional): Tamaño del punto si los precios son enteros.
+        """
+        if data.dtype['open'].kind in 'iu' and point is None:
+            raise ValueError("Los precios enteros necesitan el tamaño del punto")
+        self.data = data
+        self.point = point
+        # Con puntos decimales (0.01, 0.001...) dividir por el entero 1/point devuelve exactamente el precio original
+        inverse = 1 / point if point else None
+        self._scale = round(inverse) if inverse is not None and abs(inverse - round(inverse)) < 1e-9 else None
+
+    @staticmethod
+    def dtype_compact(price_type: str = 'f4') -> np.dtype:
+        """
+        Obtiene el dtype compacto para un tipo de precio.
+
+        Args:
+            price_type (str, optional): 'f8', 'f4', 'i4' o 'i8'.
+        """
+        return np.dtype([('time', '<i8'), ('direction', 'i1')] + [(field, price_type) for field in CompactBricks.PRICE_FIELDS])
+
+    @classmethod
+    def from_bricks(cls, bricks: ndarray, price_type: str = 'f4', point: float = None) -> 'CompactBricks':
+        """
+        Convierte ladrillos con el dtype de vRenko al formato compacto.
+
+        Args:
+            bricks (ndarray): Ladrillos con vRenko.dtype_renko.
+            price_type (str, optional): 'f8', 'f4', 'i4' o 'i8'. Con enteros los precios se guardan en puntos.
+            point (float, optional): Tamaño del punto del símbolo, obligatorio con precios enteros.
+
+        Returns:
+            CompactBricks: Los ladrillos compactos.
+        """
+        dtype = cls.dtype_compact(price_type)
+        if dtype['open'].kind in 'iu' and point is None:
+            raise ValueError("Los precios enteros necesitan el tamaño del punto")
+        data = np.empty(len(bricks), dtype=dtype)
+        data['time'] = bricks['time'].astype('datetime64[s]').view('<i8')
+        data['direction'] = np.where(bricks['type'] == 'up', 1, -1)
+        for field in cls.PRICE_FIELDS:
+            if dtype[field].kind in 'iu':
+                data[field] = np.rint(bricks[field] / point)
+            else:
+                data[field] = bricks[field]
+        return cls(data, point)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, key):
+        """
+        Lee una columna con el nombre y tipo de dtype_renko, o una parte de los ladrillos como CompactBricks.
+        """
+        if not isinstance(key, str):
+            return CompactBricks(np.atleast_1d(self.data[key]), self.point)
+        if key == 'time':
+            return self.data['time'].view('datetime64[s]')
+        if key == 'type':
+            return np.where(self.data['direction'] > 0, 'up', 'down').astype('<U4')
+        if key in self.PRICE_FIELDS:
+            if self.data.dtype[key].kind in 'iu':
+                if self._scale is not None:
+                    return self.data[key] / self._scale
+                return self.data[key] * self.point
+            return self.data[key].astype('<f8')
+        return self.data[key]
+
+    def to_bricks(self) -> ndarray:
+        """
+        Convierte los ladrillos al dtype de vRenko.
+
+        Returns:
+            ndarray: Los ladrillos con vRenko.dtype_renko.
+        """
+        bricks = np.empty(len(self.data), dtype=vRenko.dtype_renko)
+        for field in bricks.dtype.names:
+            bricks[field] = self[field]
+        return bricks
+
+    def save(self, path: str):
+        """
+        Guarda los ladrillos y el tamaño del punto en un archivo .npz sin comprimir.
+        """
+        np.savez(path, data=self.data, point=np.nan if self.point is None else self.point)
+
+    @classmethod
+    def load(cls, path: str) -> 'CompactBricks':
+        """
+        Carga ladrillos guardados con save().
+        """
+        with np.load(path) as stored:
+            point = float(stored['point'])
+            return cls(stored['data'], None if np.isnan(point) else point)
 
 
 class vRenko:
-    def __init__(self, brick_size):
+    dtype_renko = [('time', 'datetime64[s]'), ('type', '<U4'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8')]
+    # Barras del primer tramo vectorizado de _brick_counts y mínimo al que se reduce tras una diferencia de redondeo
+    VECTOR_WINDOW = 4096
+    MIN_VECTOR_WINDOW = 256
+    # Barras que se calculan con la fórmula original después de una diferencia de redondeo
+    EXACT_WINDOW = 64
+
+    def __init__(self, brick_size, max_bricks: int = None, utc_times: bool = False, server_time: ServerTime = None):
         """
         Inicializa una instancia de vRenko con un tamaño de ladrillo especificado.
 
         Args:
             brick_size (float): El tamaño de ladrillo para el gráfico Renko.
+            max_bricks (int, optional): Número máximo de ladrillos conservados, para sesiones largas. Por defecto, sin límite.
+            utc_times (bool, optional): True para expresar la hora de los ladrillos en UTC. Por defecto, la hora del servidor de las barras.
+            server_time (ServerTime, optional): La conversión de la hora del servidor. Por defecto, la de las variables de entorno.
         """
         self.brick_size = brick_size
-        self.dtype_renko = [('time', 'datetime64[s]'), ('type', '<U4'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8')]
-        self.renko_rates = np.empty(0, dtype= self.dtype_renko)
+        self.utc_times = utc_times
+        self.server_time = server_time or ServerTime.from_env()
+        self._bricks = BrickBuffer(self.dtype_renko, max_size=max_bricks)
+
+    @property
+    def renko_rates(self) -> ndarray:
+        """
+        Los ladrillos calculados, como una vista del buffer.
+        """
+        return self._bricks.view()
+
+    @renko_rates.setter
+    def renko_rates(self, bricks: ndarray):
+        self._bricks.clear()
+        self._bricks.extend(bricks)
 
     def calculate_renko(self, rates: ndarray[FieldType.rates_dtype]):
         """
         Calcula y genera datos de gráfico Renko basados en las tasas de precios proporcionadas.
 
+        Los ladrillos de todo el arreglo se calculan con operaciones vectorizadas de NumPy; el resultado es idéntico
+        al del cálculo barra por barra (_calculate_renko_rows).
+
+        Args:
+            rates (ndarray): Un array de barras de MT5 que incluye información de open, high, low, close, etc.
+        """
+        if rates is None or len(rates) == 0:
+            self.renko_rates = np.empty(0, dtype= self.dtype_renko)
+            return
+
+        open_price = self._first_brick_open(rates[0])
+        counts, signs = self._brick_counts(rates['close'], open_price)
+        self.renko_rates = self._build_bricks(rates, open_price, counts, signs)
+
+    @classmethod
+    def calculate_many(cls, rates: ndarray[FieldType.rates_dtype], brick_sizes: List[float], processes: int = None, utc_times: bool = False) -> 'RenkoSweep':
+        """
+        Calcula el gráfico Renko de las mismas barras para varios tamaños de ladrillo.
+
+        Las horas de las barras se convierten una sola vez para todos los tamaños y cada tamaño se calcula con el
+        cálculo vectorizado de calculate_renko. Con processes mayor que 1 los tamaños se reparten en un grupo de
+        procesos; cada proceso recibe las barras una sola vez al iniciarse, no una vez por tamaño.
+
+        Args:
+            rates (ndarray): Un array de barras de MT5 que incluye información de open, high, low, close, etc.
+            brick_sizes (List[float]): Los tamaños de ladrillo.
+            processes (int, optional): Número de procesos. Por defecto, se calcula en el proceso actual.
+            utc_times (bool, optional): True para expresar la hora de los ladrillos en UTC.
+
+        Returns:
+            RenkoSweep: Los ladrillos de todos los tamaños, indexados por posición o por tamaño.
+
+        Example:
+            >>> sweep = vRenko.calculate_many(rates, [1.0, 2.5, 5.0], processes=3)
+            >>> sweep.get(2.5)['close']
+        """
+        brick_sizes = [float(brick_size) for brick_size in brick_sizes]
+        if rates is None or len(rates) == 0:
+            return RenkoSweep(brick_sizes, [np.empty(0, dtype=cls.dtype_renko) for _ in brick_sizes])
+
+        bar_times = cls(1.0, utc_times=utc_times)._convert_times_to_mt5(rates['time'], np.ones(len(rates), dtype=np.int64))
+        if processes is None or processes <= 1 or len(brick_sizes) <= 1:
+            _init_sweep_worker(rates, bar_times)
+            try:
+                series = [_calculate_sweep_series(brick_size) for brick_size in brick_sizes]
+            finally:
+                _init_sweep_worker(None, None)
+        else:
+            with multiprocessing.Pool(min(processes, len(brick_sizes)), initializer=_init_sweep_worker, initargs=(rates, bar_times)) as pool:
+                series = pool.map(_calculate_sweep_series, brick_sizes)
+        return RenkoSweep(brick_sizes, series)
+
+    def _calculate_renko_rows(self, rates: ndarray[FieldType.rates_dtype]):
+        """
+        Calcula los datos de gráfico Renko barra por barra. Es la implementación de referencia del cálculo vectorizado.
+
         Args:
             rates (ndarray): Un array de barras de MT5 que incluye información de open, high, low, close, etc.
         """
@@ -54,6 +373,178 @@ class vRenko:
 
         self.renko_rates = np.array(renko_bricks, dtype=self.dtype_renko)
         
+    #region Vectorized
+    def _first_brick_open(self, rate: Tuple) -> float:
+        """
+        Calcula la apertura del primer ladrillo a partir de la primera barra, alineada a múltiplos del tamaño de ladrillo.
+        """
+        quantity_high = int(rate['open']/self.brick_size)
+        quantity_low = int(rate['close']/self.brick_size)
+        if rate['open'] > rate['close']:
+            return quantity_high * self.brick_size
+        return (quantity_low + 1) * self.brick_size
+
+    def _brick_counts(self, close: ndarray, open_price: float) -> Tuple[ndarray, ndarray]:
+        """
+        Calcula cuántos ladrillos forma cada barra y en qué dirección.
+
+        Con x = (close - apertura inicial) / brick_size, el número neto de ladrillos después de cada barra es
+        floor(x) si el precio subió respecto al último ladrillo y ceil(x) si bajó; cuando el cierre queda dentro del
+        ladrillo actual se conserva el valor anterior. Ese valor se obtiene con un arrastre hacia adelante
+        (np.maximum.accumulate) en lugar de un ciclo. Como el cálculo original acumula los cierres en punto flotante,
+        el resultado se verifica contra la fórmula original. Las barras se vectorizan por tramos: si alguna barra
+        difiere por redondeo, desde esa barra se calculan EXACT_WINDOW barras con la fórmula original y se vuelve a
+        vectorizar con un tramo más corto, que crece de nuevo mientras no haya diferencias. Así cada diferencia
+        cuesta a lo sumo un tramo y el cálculo sigue siendo lineal aunque el tamaño de ladrillo no sea exacto en
+        binario (0.7, 0.1).
+
+        Args:
+            close (ndarray): Los cierres de las barras.
+            open_price (float): La apertura del primer ladrillo.
+
+        Returns:
+            Tuple[ndarray, ndarray]: Número de ladrillos de cada barra y su dirección (1 sube, -1 baja).
+        """
+        size = len(close)
+        counts = np.zeros(size, dtype=np.int64)
+        signs = np.ones(size, dtype=np.int8)
+
+        start = 0
+        window = self.VECTOR_WINDOW
+        while start < size:
+            end = min(start + window, size)
+            segment_counts, segment_signs = self._brick_counts_exact(close[start:end], open_price)
+
+            # Nivel de cada ladrillo con la misma acumulación secuencial que el cálculo original
+            steps = np.repeat(segment_signs * self.brick_size, segment_counts)
+            levels = np.add.accumulate(np.concatenate(([open_price], steps)))
+            bricks_before = np.concatenate(([0], np.cumsum(segment_counts)[:-1]))
+            open_before = levels[bricks_before]
+
+            # Verifica cada barra contra la fórmula original
+            price_diff = close[start:end] - open_before
+            expected_counts = (np.abs(price_diff) // self.brick_size).astype(np.int64)
+            expected_signs = np.where(price_diff > 0, 1, -1).astype(np.int8)
+            mismatch = (expected_counts != segment_counts) | ((segment_counts > 0) & (expected_signs != segment_signs))
+
+            if not mismatch.any():
+                counts[start:end] = segment_counts
+                signs[start:end] = segment_signs
+                open_price = levels[-1]
+                start = end
+                window *= 2
+                continue
+
+            # Las barras anteriores a la primera diferencia son correctas; desde esa barra se usa la fórmula original
+            first = int(np.argmax(mismatch))
+            counts[start:start + first] = segment_counts[:first]
+            signs[start:start + first] = segment_signs[:first]
+            start += first
+            end = min(start + self.EXACT_WINDOW, size)
+            open_price = self._brick_counts_rows(close[start:end], open_before[first], counts[start:end], signs[start:end])
+            start = end
+            window = max(window // 2, self.MIN_VECTOR_WINDOW)
+
+        return counts, signs
+
+    def _brick_counts_rows(self, close: ndarray, open_price: float, counts: ndarray, signs: ndarray) -> float:
+        """
+        Calcula barra por barra, con la fórmula original, el número de ladrillos y la dirección de cada barra.
+
+        Args:
+            close (ndarray): Los cierres de las barras.
+            open_price (float): La apertura del ladrillo actual.
+            counts (ndarray): Donde se escribe el número de ladrillos de cada barra.
+            signs (ndarray): Donde se escribe la dirección de cada barra.
+
+        Returns:
+            float: La apertura del ladrillo actual después de la última barra.
+        """
+        for index, price in enumerate(close.tolist()):
+            price_diff = price - open_price
+            count = int(abs(price_diff) // self.brick_size)
+            sign = 1 if price_diff > 0 else -1
+            counts[index] = count
+            signs[index] = sign
+            for _ in range(count):
+                open_price += sign * self.brick_size
+        return open_price
+
+    def _brick_counts_exact(self, close: ndarray, open_price: float) -> Tuple[ndarray, ndarray]:
+        """
+        Calcula el número de ladrillos y la dirección de cada barra con aritmética exacta sobre la apertura inicial.
+        """
+        x = (close - open_price) / self.brick_size
+        low = np.floor(x)
+        high = np.ceil(x)
+
+        # Candidatos del número neto de ladrillos de la barra anterior (la primera barra parte de 0)
+        previous_low = np.concatenate(([0.0], low[:-1]))
+        previous_high = np.concatenate(([0.0], high[:-1]))
+
+        # 0: queda en floor(x), 1: queda en ceil(x), -1: conserva el valor de la barra anterior
+        state = np.full(len(close), -1, dtype=np.int8)
+        state[previous_high <= low] = 0
+        state[previous_low >= high] = 1
+        state[low == high] = 0
+
+        # Arrastra el último estado conocido hacia adelante
+        known = np.where(state >= 0, np.arange(len(close)), 0)
+        np.maximum.accumulate(known, out=known)
+        carried = state[known]
+        carried[carried < 0] = 0
+
+        net = (low + carried).astype(np.int64)
+        moves = np.diff(np.concatenate(([0], net)))
+        return np.abs(moves), np.where(moves > 0, 1, -1).astype(np.int8)
+
+    def _build_bricks(self, rates: ndarray, open_price: float, counts: ndarray, signs: ndarray, bar_times: ndarray = None) -> ndarray:
+        """
+        Construye el arreglo de ladrillos a partir del número de ladrillos y la dirección de cada barra.
+
+        Si se indica bar_times (la hora convertida de cada barra), no se vuelven a convertir las horas.
+        """
+        total = int(counts.sum())
+        renko = np.empty(total, dtype= self.dtype_renko)
+        if total == 0:
+            return renko
+
+        # Barra que origina cada ladrillo y si es el primer ladrillo de su barra
+        rate_index = np.repeat(np.arange(len(rates)), counts)
+        first_of_rate = np.zeros(total, dtype=bool)
+        first_of_rate[np.cumsum(counts[counts > 0]) - counts[counts > 0]] = True
+        up = np.repeat(signs, counts) > 0
+
+        steps = np.where(up, self.brick_size, -self.brick_size)
+        levels = np.add.accumulate(np.concatenate(([open_price], steps)))
+        opens = levels[:-1]
+        closes = levels[1:]
+
+        renko['time'] = self._convert_times_to_mt5(rates['time'], counts) if bar_times is None else np.repeat(bar_times, counts)
+        renko['type'] = np.where(up, 'up', 'down')
+        renko['open'] = opens
+        renko['close'] = closes
+        renko['high'] = np.where(up, closes, np.where(first_of_rate, rates['high'][rate_index], opens))
+        renko['low'] = np.where(up, np.where(first_of_rate, rates['low'][rate_index], opens), closes)
+        return renko
+
+    def _convert_times_to_mt5(self, times: ndarray, counts: ndarray) -> ndarray:
+        """
+        Convierte de una sola vez las horas de las barras que originan ladrillos, igual que _convert_time_to_mt5.
+
+        Args:
+            times (ndarray): Las horas de las barras en segundos desde 1970, con la hora del servidor.
+            counts (ndarray): Número de ladrillos de cada barra.
+
+        Returns:
+            ndarray: Las horas de cada ladrillo como datetime64[s].
+        """
+        used = np.flatnonzero(counts)
+        seconds = times[used].astype(np.int64)
+        converted = self.server_time.server_to_utc_array(seconds) if self.utc_times else seconds
+        return np.repeat(converted, counts[used]).astype('datetime64[s]')
+    #endregion
+
     def _add_bricks(self, rate:Tuple, current_brick: Dict[str, Any], renko_bricks: List[Tuple] = None):
         """
         Añade ladrillos Renko al gráfico.
@@ -67,13 +558,13 @@ class vRenko:
         brick_count = abs(price_diff) // self.brick_size
         for i in range(int(brick_count)):
             if price_diff > 0:
-                current_brick['time'] = self._convert_time_to_mt5(datetime.fromtimestamp(rate['time']))
+                current_brick['time'] = self._convert_time_to_mt5(rate['time'])
                 current_brick['type'] = 'up'
                 current_brick['close'] += self.brick_size
                 current_brick['high'] = current_brick['close']
                 current_brick['low'] = rate['low'] if i == 0 else current_brick['open']
             else:
-                current_brick['time'] = self._convert_time_to_mt5(datetime.fromtimestamp(rate['time']))
+                current_brick['time'] = self._convert_time_to_mt5(rate['time'])
                 current_brick['type'] = 'down'
                 current_brick['close'] -= self.brick_size
                 current_brick['high'] = rate['high'] if i == 0 else current_brick['open']
@@ -82,27 +573,24 @@ class vRenko:
             brick = (current_brick['time'], current_brick['type'], current_brick['open'], current_brick['high'], current_brick['low'], current_brick['close'],)
                 
             if renko_bricks is None:
-                self.renko_rates = np.append(self.renko_rates, np.array([brick], dtype=self.dtype_renko))
+                self._bricks.append(brick)
             else:
                 renko_bricks.append(brick)
-                current_brick.update({
-                        'open': current_brick['close'], 'close': current_brick['close']
-                    })
+            current_brick.update({
+                    'open': current_brick['close'], 'close': current_brick['close']
+                })
             
-    def _convert_time_to_mt5(self, date: datetime) -> datetime:
+    def _convert_time_to_mt5(self, time: float) -> np.datetime64:
         """
-        Suma 5 horas a la fecha y hora proporcionada.
+        Convierte la hora de una barra en la hora de su ladrillo.
 
         Args:
-            date (datetime): Fecha y hora en formato UTC.
+            time (float): La hora de la barra en segundos desde 1970, con la hora del servidor.
 
         Returns:
-            datetime: La fecha y hora resultante después de sumar 5 horas.
+            np.datetime64: La hora del servidor, o UTC si el gráfico se creó con utc_times.
         """
-        # Suma 5 horas a la fecha y hora original
-        dt_mt5 = date + timedelta(hours=5)
-        
-        return dt_mt5
+        return self._convert_times_to_mt5(np.array([time]), np.ones(1, dtype=np.int64))[0]
     
     def update_renko(self, rate):
         """
@@ -111,16 +599,765 @@ class vRenko:
         Args:
             rate (Tuple): Información de una barra de precios de MT5.
         """
-        if self.renko_rates.size != 0:
-            last_brick = self.renko_rates[-1].copy()
-            self._add_bricks(rate, last_brick)
+        last_brick = self._bricks.last()
+        if last_brick is not None:
+            # El ladrillo en curso comienza en el cierre del último ladrillo, igual que en calculate_renko
+            current_brick = {'open': last_brick['close'], 'close': last_brick['close']}
+            self._add_bricks(rate, current_brick)
   
+    def get_compact_data(self, price_type: str = 'f4', point: float = None) -> CompactBricks:
+        """
+        Obtiene los ladrillos calculados en formato compacto.
+
+        Args:
+            price_type (str, optional): 'f8', 'f4', 'i4' o 'i8'. Con enteros los precios se guardan en puntos.
+            point (float, optional): Tamaño del punto del símbolo, obligatorio con precios enteros.
+
+        Returns:
+            CompactBricks: Los ladrillos compactos.
+        """
+        return CompactBricks.from_bricks(self.get_renko_data(), price_type, point)
+
     def get_renko_data(self):
         """
         Obtiene los datos del gráfico Renko calculados.
 
         Returns:
-            ndarray: Un array de datos del gráfico Renko.
+            ndarray: Un array de datos del gráfico Renko. Es una vista sin copia, válida hasta la siguiente actualización.
+        """
+        return self._bricks.view()
+
+
+
+#region Sweep
+# Barras y horas convertidas del cálculo en curso de vRenko.calculate_many, una copia por proceso del grupo
+_sweep_rates: ndarray = None
+_sweep_times: ndarray = None
+
+
+def _init_sweep_worker(rates: ndarray, bar_times: ndarray):
+    """
+    Guarda las barras compartidas por todos los tamaños de ladrillo de un proceso.
+    """
+    global _sweep_rates, _sweep_times
+    _sweep_rates = rates
+    _sweep_times = bar_times
+
+
+def _calculate_sweep_series(brick_size: float) -> ndarray:
+    """
+    Calcula los ladrillos de un tamaño sobre las barras guardadas por _init_sweep_worker.
+    """
+    renko = vRenko(brick_size)
+    open_price = renko._first_brick_open(_sweep_rates[0])
+    counts, signs = renko._brick_counts(_sweep_rates['close'], open_price)
+    return renko._build_bricks(_sweep_rates, open_price, counts, signs, _sweep_times)
+
+
+class RenkoSweep:
+    """
+    Ladrillos Renko de varios tamaños guardados en un solo arreglo.
+
+    Los ladrillos de todos los tamaños están concatenados en bricks y offsets indica dónde comienza cada serie:
+    la serie i es bricks[offsets[i]:offsets[i + 1]]. Cada serie se obtiene como una vista, sin copias.
+
+    Example:
+        >>> sweep = vRenko.calculate_many(rates, [1.0, 2.5, 5.0])
+        >>> for brick_size, bricks in sweep.items():
+        ...     print(brick_size, len(bricks))
+    """
+    def __init__(self, brick_sizes: List[float], series: List[ndarray]) -> None:
+        """
+        Args:
+            brick_sizes (List[float]): Los tamaños de ladrillo.
+            series (List[ndarray]): Los ladrillos de cada tamaño, en el mismo orden.
+        """
+        self.brick_sizes = np.asarray(brick_sizes, dtype='f8')
+        self.offsets = np.zeros(len(series) + 1, dtype=np.int64)
+        np.cumsum([len(bricks) for bricks in series], out=self.offsets[1:])
+        self.bricks = np.concatenate(series) if series else np.empty(0, dtype=vRenko.dtype_renko)
+        self._index: Dict[float, int] = {float(brick_size): index for index, brick_size in enumerate(self.brick_sizes)}
+
+    def __len__(self) -> int:
+        return len(self.brick_sizes)
+
+    def __getitem__(self, index: int) -> ndarray:
+        """
+        Obtiene los ladrillos de la serie en la posición index.
+        """
+        return self.bricks[self.offsets[index]:self.offsets[index + 1]]
+
+    def get(self, brick_size: float) -> ndarray:
+        """
+        Obtiene los ladrillos de un tamaño, o None si el tamaño no se calculó.
+        """
+        index = self._index.get(float(brick_size))
+        return None if index is None else self[index]
+
+    def counts(self) -> ndarray:
+        """
+        Obtiene el número de ladrillos de cada tamaño.
+        """
+        return np.diff(self.offsets)
+
+    def items(self):
+        """
+        Recorre los pares (tamaño de ladrillo, ladrillos).
+        """
+        for index, brick_size in enumerate(self.brick_sizes):
+            yield float(brick_size), self[index]
+#endregion
+
+
+class TickRenko(vRenko):
+    """
+    Gráfico Renko construido con ticks en lugar de barras.
+
+    Los ladrillos se forman en el tick que cruza el límite del ladrillo, con la misma regla de vRenko
+    (un ladrillo cada vez que el precio se aleja brick_size del cierre del último ladrillo), por lo que no se
+    pierden los ladrillos formados dentro de una barra. Cada lote de ticks se procesa con las mismas operaciones
+    vectorizadas de vRenko: calculate_renko reconstruye el historial completo y update_renko agrega los ticks
+    nuevos del flujo y devuelve los ladrillos que se formaron. El máximo (ladrillo bajista) o el mínimo (alcista)
+    del primer ladrillo de cada tick es el extremo del precio desde el ladrillo anterior.
+
+    Example:
+        >>> renko = TickRenko(2.5, price='bid')
+        >>> renko.calculate_renko(MT5Api.get_ticks_range("US30.cash", start, end))
+        >>> dispatcher.on_tick(lambda symbol, ticks: renko.update_renko(ticks))
+    """
+    PRICES = ('bid', 'ask', 'last')
+
+    def __init__(self, brick_size, price: str = 'bid', max_bricks: int = None, utc_times: bool = False, server_time: ServerTime = None):
+        """
+        Args:
+            brick_size (float): El tamaño de ladrillo para el gráfico Renko.
+            price (str, optional): El precio de los ticks usado: 'bid', 'ask' o 'last'.
+            max_bricks (int, optional): Número máximo de ladrillos conservados, para sesiones largas. Por defecto, sin límite.
+            utc_times (bool, optional): True para expresar la hora de los ladrillos en UTC. Por defecto, la hora del servidor.
+            server_time (ServerTime, optional): La conversión de la hora del servidor. Por defecto, la de las variables de entorno.
+        """
+        if price not in self.PRICES:
+            raise ValueError(f"El precio debe ser uno de {self.PRICES}")
+        super().__init__(brick_size, max_bricks, utc_times, server_time)
+        self.price = price
+        self._reset()
+
+    def _reset(self):
+        """
+        Reinicia el ladrillo en curso.
+        """
+        self._bricks.clear()
+        self._open = None               # Apertura del ladrillo en curso (cierre del último ladrillo)
+        self._wick_high = -np.inf       # Extremos del precio desde el último ladrillo
+        self._wick_low = np.inf
+
+    def calculate_renko(self, ticks: ndarray[FieldType.ticks_dtype]):
+        """
+        Calcula el gráfico Renko completo de un arreglo de ticks, descartando los ladrillos anteriores.
+
+        Args:
+            ticks (ndarray): Ticks FieldType.ticks_dtype ordenados por time_msc.
+        """
+        self._reset()
+        self.update_renko(ticks)
+
+    def update_renko(self, ticks: ndarray[FieldType.ticks_dtype]) -> ndarray:
+        """
+        Agrega un lote de ticks nuevos al gráfico.
+
+        Los ticks en los que el precio elegido es 0 (el tick no lo informa) se ignoran. La apertura del primer
+        ladrillo se alinea al múltiplo de brick_size inferior al primer precio.
+
+        Args:
+            ticks (ndarray): Ticks FieldType.ticks_dtype posteriores a los ya procesados, ordenados por time_msc.
+
+        Returns:
+            ndarray: Los ladrillos formados por el lote, con el dtype de vRenko; vacío si no se formó ninguno.
+        """
+        if ticks is None or len(ticks) == 0:
+            return np.empty(0, dtype=self.dtype_renko)
+        prices = ticks[self.price]
+        valid = prices != 0
+        if not valid.all():
+            ticks = ticks[valid]
+            prices = prices[valid]
+            if len(prices) == 0:
+                return np.empty(0, dtype=self.dtype_renko)
+
+        if self._open is None:
+            self._open = int(prices[0] / self.brick_size) * self.brick_size
+
+        # Camino rápido del flujo: el lote no se aleja un ladrillo completo de la apertura
+        if np.abs(prices - self._open).max() < self.brick_size:
+            self._wick_high = max(self._wick_high, float(prices.max()))
+            self._wick_low = min(self._wick_low, float(prices.min()))
+            return np.empty(0, dtype=self.dtype_renko)
+
+        counts, signs = self._brick_counts(prices, self._open)
+        bricks = self._build_tick_bricks(ticks, prices, counts, signs)
+        if len(bricks):
+            self._open = bricks['close'][-1]
+        self._bricks.extend(bricks)
+        return bricks
+
+    def _build_tick_bricks(self, ticks: ndarray, prices: ndarray, counts: ndarray, signs: ndarray) -> ndarray:
+        """
+        Construye los ladrillos de un lote y actualiza los extremos del precio desde el último ladrillo.
+        """
+        formers = np.flatnonzero(counts)
+        if len(formers) == 0:
+            self._wick_high = max(self._wick_high, float(prices.max()))
+            self._wick_low = min(self._wick_low, float(prices.min()))
+            return np.empty(0, dtype=self.dtype_renko)
+
+        # Extremos del precio entre cada tick que forma ladrillos y el anterior, incluido el tramo del lote previo
+        starts = np.concatenate(([0], formers[:-1] + 1))
+        segment_high = np.maximum.reduceat(prices[:formers[-1] + 1], starts)
+        segment_low = np.minimum.reduceat(prices[:formers[-1] + 1], starts)
+        segment_high[0] = max(segment_high[0], self._wick_high)
+        segment_low[0] = min(segment_low[0], self._wick_low)
+        rest = prices[formers[-1] + 1:]
+        self._wick_high = float(rest.max()) if len(rest) else -np.inf
+        self._wick_low = float(rest.min()) if len(rest) else np.inf
+
+        total = int(counts.sum())
+        renko = np.empty(total, dtype=self.dtype_renko)
+        former_counts = counts[formers]
+        segment = np.repeat(np.arange(len(formers)), former_counts)
+        first_of_tick = np.zeros(total, dtype=bool)
+        first_of_tick[np.cumsum(former_counts) - former_counts] = True
+        up = np.repeat(signs[formers], former_counts) > 0
+
+        steps = np.where(up, self.brick_size, -self.brick_size)
+        levels = np.add.accumulate(np.concatenate(([self._open], steps)))
+        opens = levels[:-1]
+        closes = levels[1:]
+
+        # La hora del servidor del tick, la misma referencia de las barras de MT5
+        renko['time'] = self._convert_times_to_mt5(ticks['time_msc'][formers] // 1000, former_counts)
+        renko['type'] = np.where(up, 'up', 'down')
+        renko['open'] = opens
+        renko['close'] = closes
+        renko['high'] = np.where(up, closes, np.where(first_of_tick, segment_high[segment], opens))
+        renko['low'] = np.where(up, np.where(first_of_tick, segment_low[segment], opens), closes)
+        return renko
+
+
+#region Indicators
+def _linear_recurrence(values: ndarray, factor: float, weight: float, initial: float) -> ndarray:
+    """
+    Calcula de forma vectorizada y[i] = factor * y[i - 1] + weight * values[i], con y[-1] = initial.
+
+    Es la recurrencia de las medias exponenciales (EMA, suavizado de Wilder). Los valores se procesan en bloques
+    en los que factor**-i no supera 1e4, con una suma acumulada por bloque; el arrastre entre bloques decae con
+    factor**bloque y se suma con unos pocos desplazamientos, hasta que su aporte queda por debajo de la precisión.
+    """
+    u = weight * np.asarray(values, dtype='f8')
+    size = len(u)
+    if size == 0:
+        return u
+    u[0] += factor * initial
+    if factor == 0:
+        return u
+
+    block = int(max(1, min(size, np.floor(np.log(1e4) / -np.log(factor)))))
+    padded = np.concatenate((u, np.zeros((-size) % block))).reshape(-1, block)
+    powers = factor ** np.arange(block)
+    local = np.cumsum(padded / powers, axis=1) * powers
+
+    # Valor de la recurrencia al final de cada bloque: E[k] = fin local[k] + decay * E[k - 1]
+    ends = local[:, -1]
+    decay = factor ** block
+    carried = ends.copy()
+    if len(ends) > 1 and decay > 0:
+        terms = min(len(ends) - 1, int(np.ceil(np.log(1e-18) / np.log(decay))))
+        for shift in range(1, terms + 1):
+            carried[shift:] += decay ** shift * ends[:-shift]
+    local[1:] += carried[:-1, None] * (factor * powers)[None, :]
+    return local.ravel()[:size]
+
+
+def _rolling_extreme(values: ndarray, period: int, function) -> ndarray:
+    """
+    Máximo o mínimo móvil exacto en O(n) (algoritmo de van Herk/Gil-Werman): cada ventana combina el acumulado
+    hacia atrás de su primer bloque de tamaño period con el acumulado hacia adelante del bloque siguiente.
+    """
+    size = len(values)
+    result = np.full(size, np.nan)
+    if size < period:
+        return result
+    fill = -np.inf if function is np.maximum else np.inf
+    blocks = np.concatenate((np.asarray(values, dtype='f8'), np.full((-size) % period, fill))).reshape(-1, period)
+    prefix = function.accumulate(blocks, axis=1).ravel()
+    suffix = function.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    ends = np.arange(period - 1, size)
+    result[period - 1:] = function(suffix[ends - period + 1], prefix[ends])
+    return result
+
+
+class StreamingIndicator:
+    """
+    Base de los indicadores técnicos.
+
+    Cada indicador tiene dos formas con el mismo resultado (salvo el redondeo de punto flotante, menor a 1e-9 relativo):
+    calculate(), vectorizada sobre un arreglo completo de barras, y update(), que agrega un solo valor en O(1) y
+    devuelve el valor actual del indicador. Los valores anteriores a completar el periodo son NaN. El estado del
+    flujo se guarda en __slots__ para que actualizar indicadores en cada tick o barra no cree diccionarios.
+    """
+    __slots__ = ('period', 'value', '_count')
+
+    def __init__(self, period: int) -> None:
+        if period < 1:
+            raise ValueError("El periodo debe ser mayor que cero")
+        self.period = int(period)
+        self.value = np.nan
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        """
+        Indica si el indicador ya completó su periodo.
+        """
+        return not np.isnan(self.value)
+
+    @staticmethod
+    def _values(rates: ndarray, field: str = 'close') -> ndarray:
+        """
+        Obtiene un campo de un arreglo de barras, o el mismo arreglo si ya es un arreglo de valores.
+        """
+        if rates.dtype.names is not None:
+            return rates[field].astype('f8')
+        return np.asarray(rates, dtype='f8')
+
+
+class SMA(StreamingIndicator):
+    """
+    Media móvil simple.
+
+    Example:
+        >>> SMA.calculate(rates, 20)
+        >>> sma = SMA(20)
+        >>> sma.update(rate['close'])
+    """
+    __slots__ = ('_window', '_index', '_sum')
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self._window = [0.0] * self.period
+        self._index = 0
+        self._sum = 0.0
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int, field: str = 'close') -> ndarray:
+        """
+        Calcula la media de todas las barras.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype o un arreglo de valores.
+            period (int): El número de valores de la media.
+            field (str, optional): El campo de las barras usado. Por defecto, 'close'.
+
+        Returns:
+            ndarray: La media de cada barra.
+        """
+        values = cls._values(rates, field)
+        result = np.full(len(values), np.nan)
+        if len(values) < period:
+            return result
+        # Suma acumulada de las diferencias con el primer valor, para no perder precisión con precios grandes
+        reference = values[0]
+        cumulative = np.concatenate(([0.0], np.cumsum(values - reference)))
+        result[period - 1:] = (cumulative[period:] - cumulative[:-period]) / period + reference
+        return result
+
+    def update(self, value: float) -> float:
+        """
+        Agrega un valor y devuelve la media actual.
+        """
+        self._sum += value - self._window[self._index]
+        self._window[self._index] = value
+        self._index += 1
+        self._count += 1
+        if self._index == self.period:
+            # Recalcula la suma una vez por vuelta para que el error de redondeo no se acumule
+            self._index = 0
+            self._sum = float(sum(self._window))
+        if self._count >= self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+
+class EMA(StreamingIndicator):
+    """
+    Media móvil exponencial con alpha = 2 / (period + 1), iniciada con la media simple de los primeros period valores.
+    """
+    __slots__ = ('alpha', '_sum')
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self.alpha = 2 / (self.period + 1)
+        self._sum = 0.0
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int, field: str = 'close') -> ndarray:
+        """
+        Calcula la media de todas las barras.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype o un arreglo de valores.
+            period (int): El periodo de la media.
+            field (str, optional): El campo de las barras usado. Por defecto, 'close'.
+
+        Returns:
+            ndarray: La media de cada barra.
+        """
+        values = cls._values(rates, field)
+        result = np.full(len(values), np.nan)
+        if len(values) < period:
+            return result
+        alpha = 2 / (period + 1)
+        seed = values[:period].mean()
+        result[period - 1] = seed
+        result[period:] = _linear_recurrence(values[period:], 1 - alpha, alpha, seed)
+        return result
+
+    def update(self, value: float) -> float:
+        """
+        Agrega un valor y devuelve la media actual.
+        """
+        self._count += 1
+        if self._count < self.period:
+            self._sum += value
+        elif self._count == self.period:
+            self.value = (self._sum + value) / self.period
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+
+class RSI(StreamingIndicator):
+    """
+    Índice de fuerza relativa con el suavizado de Wilder (alpha = 1 / period). Vale 100 si en el periodo no hubo pérdidas.
+    """
+    __slots__ = ('_previous', '_gain', '_loss')
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__(period)
+        self._previous = None
+        self._gain = 0.0
+        self._loss = 0.0
+
+    @staticmethod
+    def _rsi(gain, loss):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int = 14, field: str = 'close') -> ndarray:
+        """
+        Calcula el RSI de todas las barras. El primer valor corresponde a la barra period.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype o un arreglo de valores.
+            period (int, optional): El periodo del indicador. Por defecto, 14.
+            field (str, optional): El campo de las barras usado. Por defecto, 'close'.
+
+        Returns:
+            ndarray: El RSI de cada barra, entre 0 y 100.
+        """
+        values = cls._values(rates, field)
+        result = np.full(len(values), np.nan)
+        if len(values) <= period:
+            return result
+        changes = np.diff(values)
+        gains = np.maximum(changes, 0.0)
+        losses = np.maximum(-changes, 0.0)
+        gain = np.concatenate(([gains[:period].mean()], _linear_recurrence(gains[period:], 1 - 1 / period, 1 / period, gains[:period].mean())))
+        loss = np.concatenate(([losses[:period].mean()], _linear_recurrence(losses[period:], 1 - 1 / period, 1 / period, losses[:period].mean())))
+        result[period:] = cls._rsi(gain, loss)
+        return result
+
+    def update(self, value: float) -> float:
+        """
+        Agrega un cierre y devuelve el RSI actual.
+        """
+        if self._previous is None:
+            self._previous = value
+            return self.value
+        change = value - self._previous
+        self._previous = value
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        self._count += 1
+        if self._count < self.period:
+            self._gain += gain
+            self._loss += loss
+            return self.value
+        if self._count == self.period:
+            self._gain = (self._gain + gain) / self.period
+            self._loss = (self._loss + loss) / self.period
+        else:
+            self._gain = (1 - 1 / self.period) * self._gain + gain / self.period
+            self._loss = (1 - 1 / self.period) * self._loss + loss / self.period
+        self.value = 100.0 if self._loss == 0 else 100 - 100 / (1 + self._gain / self._loss)
+        return self.value
+
+
+class ATR(StreamingIndicator):
+    """
+    Rango verdadero promedio con el suavizado de Wilder. El rango de la primera barra es high - low.
+    """
+    __slots__ = ('_previous_close', '_sum')
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__(period)
+        self._previous_close = None
+        self._sum = 0.0
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int = 14) -> ndarray:
+        """
+        Calcula el ATR de todas las barras.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype.
+            period (int, optional): El periodo del indicador. Por defecto, 14.
+
+        Returns:
+            ndarray: El ATR de cada barra.
+        """
+        high = rates['high'].astype('f8')
+        low = rates['low'].astype('f8')
+        close = rates['close'].astype('f8')
+        result = np.full(len(rates), np.nan)
+        if len(rates) < period:
+            return result
+        true_range = high - low
+        previous_close = close[:-1]
+        true_range[1:] = np.maximum(true_range[1:], np.maximum(np.abs(high[1:] - previous_close), np.abs(low[1:] - previous_close)))
+        seed = true_range[:period].mean()
+        result[period - 1] = seed
+        result[period:] = _linear_recurrence(true_range[period:], 1 - 1 / period, 1 / period, seed)
+        return result
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """
+        Agrega una barra y devuelve el ATR actual.
+        """
+        true_range = high - low
+        if self._previous_close is not None:
+            true_range = max(true_range, abs(high - self._previous_close), abs(low - self._previous_close))
+        self._previous_close = close
+
+        self._count += 1
+        if self._count < self.period:
+            self._sum += true_range
+        elif self._count == self.period:
+            self.value = (self._sum + true_range) / self.period
+        else:
+            self.value = (1 - 1 / self.period) * self.value + true_range / self.period
+        return self.value
+
+
+class VWAP(StreamingIndicator):
+    """
+    Precio promedio ponderado por volumen del precio típico (high + low + close) / 3, reiniciado cada día.
+    """
+    __slots__ = ('_day', '_price_volume', '_volume')
+
+    def __init__(self) -> None:
+        super().__init__(1)
+        self._day = None
+        self._price_volume = 0.0
+        self._volume = 0.0
+
+    @classmethod
+    def calculate(cls, rates: ndarray, volume: str = 'tick_volume', session: bool = True) -> ndarray:
+        """
+        Calcula el VWAP de todas las barras.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype.
+            volume (str, optional): El campo de volumen: 'tick_volume' o 'real_volume'.
+            session (bool, optional): True para reiniciar el VWAP en cada día de la hora de las barras.
+
+        Returns:
+            ndarray: El VWAP de cada barra; NaN mientras el volumen acumulado sea 0.
+        """
+        typical = (rates['high'].astype('f8') + rates['low'] + rates['close']) / 3
+        volumes = rates[volume].astype('f8')
+        price_volume = typical * volumes
+        cumulative_volume = volumes.copy()
+        bounds = [0, len(rates)]
+        if session and len(rates):
+            days = (rates['time'] // 86400).astype(np.int64)
+            bounds = np.append(np.flatnonzero(np.diff(days, prepend=days[0] - 1)), len(rates))
+        # Una suma acumulada por día: restar lo acumulado de los días anteriores perdería precisión
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            np.cumsum(price_volume[start:end], out=price_volume[start:end])
+            np.cumsum(cumulative_volume[start:end], out=cumulative_volume[start:end])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(cumulative_volume > 0, price_volume / cumulative_volume, np.nan)
+
+    def update(self, high: float, low: float, close: float, volume: float, time: float = None) -> float:
+        """
+        Agrega una barra o un tick y devuelve el VWAP actual.
+
+        Args:
+            time (float, optional): Hora en segundos; si cambia el día se reinicia el VWAP.
+        """
+        if time is not None:
+            day = int(time // 86400)
+            if day != self._day:
+                self._day = day
+                self._price_volume = 0.0
+                self._volume = 0.0
+                self.value = np.nan
+        self._price_volume += (high + low + close) / 3 * volume
+        self._volume += volume
+        if self._volume > 0:
+            self.value = self._price_volume / self._volume
+        return self.value
+
+
+class RollingHigh(StreamingIndicator):
+    """
+    Máximo de los últimos period valores.
+    """
+    __slots__ = ('_candidates',)
+    _function = np.maximum
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        # Pares (posición, valor) con valores decrecientes: el primero es el extremo de la ventana
+        self._candidates = deque()
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int, field: str = 'high') -> ndarray:
+        """
+        Calcula el extremo móvil de todas las barras.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype o un arreglo de valores.
+            period (int): El número de valores de la ventana.
+            field (str, optional): El campo de las barras usado.
+
+        Returns:
+            ndarray: El extremo de cada barra.
+        """
+        return _rolling_extreme(cls._values(rates, field), period, cls._function)
+
+    def _dominates(self, value: float, candidate: float) -> bool:
+        return value >= candidate
+
+    def update(self, value: float) -> float:
+        """
+        Agrega un valor y devuelve el extremo actual.
+        """
+        candidates = self._candidates
+        while candidates and self._dominates(value, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self._count, value))
+        if candidates[0][0] <= self._count - self.period:
+            candidates.popleft()
+        self._count += 1
+        if self._count >= self.period:
+            self.value = candidates[0][1]
+        return self.value
+
+
+class RollingLow(RollingHigh):
+    """
+    Mínimo de los últimos period valores.
+    """
+    __slots__ = ()
+    _function = np.minimum
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int, field: str = 'low') -> ndarray:
+        return super().calculate(rates, period, field)
+
+    def _dominates(self, value: float, candidate: float) -> bool:
+        return value <= candidate
+
+
+class BollingerBands(StreamingIndicator):
+    """
+    Bandas de Bollinger: media simple y media más/menos deviations desviaciones estándar (poblacionales) de la ventana.
+
+    Example:
+        >>> middle, upper, lower = BollingerBands.calculate(rates, 20, 2.0)
+        >>> bands = BollingerBands(20, 2.0)
+        >>> middle, upper, lower = bands.update(rate['close'])
+    """
+    __slots__ = ('deviations', '_window', '_index', '_reference', '_sum', '_squares', 'upper', 'lower')
+
+    def __init__(self, period: int = 20, deviations: float = 2.0) -> None:
+        super().__init__(period)
+        self.deviations = deviations
+        self._window = [0.0] * self.period
+        self._index = 0
+        self._reference = None
+        self._sum = 0.0
+        self._squares = 0.0
+        self.upper = np.nan
+        self.lower = np.nan
+
+    @classmethod
+    def calculate(cls, rates: ndarray, period: int = 20, deviations: float = 2.0, field: str = 'close', chunk: int = 65536) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Calcula las bandas de todas las barras.
+
+        La desviación de cada ventana se calcula sobre las diferencias con su media, por bloques de chunk ventanas,
+        para no perder precisión con precios grandes.
+
+        Args:
+            rates (ndarray): Barras FieldType.rates_dtype o un arreglo de valores.
+            period (int, optional): El número de valores de la ventana. Por defecto, 20.
+            deviations (float, optional): El número de desviaciones estándar de las bandas. Por defecto, 2.
+            field (str, optional): El campo de las barras usado. Por defecto, 'close'.
+            chunk (int, optional): Ventanas procesadas a la vez.
+
+        Returns:
+            Tuple[ndarray, ndarray, ndarray]: (media, banda superior, banda inferior).
+        """
+        values = cls._values(rates, field)
+        middle = SMA.calculate(values, period)
+        deviation = np.full(len(values), np.nan)
+        if len(values) >= period:
+            windows = np.lib.stride_tricks.sliding_window_view(values, period)
+            for start in range(0, len(windows), chunk):
+                block = windows[start:start + chunk]
+                mean = middle[period - 1 + start:period - 1 + start + len(block)]
+                deviation[period - 1 + start:period - 1 + start + len(block)] = np.sqrt(((block - mean[:, None]) ** 2).mean(axis=1))
+        return middle, middle + deviations * deviation, middle - deviations * deviation
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        """
+        Agrega un valor y devuelve (media, banda superior, banda inferior).
         """
-        return self.renko_rates
+        if self._reference is None:
+            self._reference = value
+        # Sumas de las diferencias con una referencia cercana a la media, recalculadas una vez por vuelta
+        old = self._window[self._index] - self._reference if self._count >= self.period else 0.0
+        new = value - self._reference
+        self._sum += new - old
+        self._squares += new * new - old * old
+        self._window[self._index] = value
+        self._index += 1
+        self._count += 1
+        if self._index == self.period:
+            self._index = 0
+            self._reference = float(sum(self._window)) / self.period
+            self._sum = float(sum(item - self._reference for item in self._window))
+            self._squares = float(sum((item - self._reference) ** 2 for item in self._window))
 
+        if self._count >= self.period:
+            mean = self._sum / self.period
+            deviation = max(self._squares / self.period - mean * mean, 0.0) ** 0.5
+            self.value = self._reference + mean
+            self.upper = self.value + self.deviations * deviation
+            self.lower = self.value - self.deviations * deviation
+        return self.value, self.upper, self.lower
+#endregion
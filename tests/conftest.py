@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# La raíz del repositorio para importar 'models' y 'controller', y la carpeta models porque technical_indicators
+# importa 'mt5.enums' relativo a ella
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'models'))
+
+# Las pruebas nunca usan una terminal real: MetaTrader5 se reemplaza por el módulo falso en memoria
+from tests import fake_metatrader5
+sys.modules['MetaTrader5'] = fake_metatrader5
+
+
+@pytest.fixture
+def mt5():
+    """
+    La terminal falsa en su estado inicial; al terminar, MT5Api vuelve a usar la terminal directamente.
+    """
+    from models.mt5.client import MT5Api
+
+    fake_metatrader5.reset()
+    yield fake_metatrader5
+    MT5Api.use_gateway(None)
+    while MT5Api._session_depth:
+        MT5Api.close_session()
+    fake_metatrader5.reset()
@@ -0,0 +1,268 @@
+"""
+Módulo MetaTrader5 falso para las pruebas.
+
+Reproduce en memoria la parte de la API del paquete MetaTrader5 que usa MT5Api: conexión, posiciones, símbolos,
+ticks, barras y order_send. tests/conftest.py lo registra como 'MetaTrader5' antes de importar los modelos, por lo
+que MT5Api y el gateway se ejecutan contra él sin una terminal.
+
+Además de la API, registra las llamadas recibidas (calls), permite simular latencia (delay) y guarda el máximo de
+llamadas atendidas a la vez (max_concurrent) para las pruebas de concurrencia. Las funciones de datos devuelven None mientras no haya conexión, como la terminal real.
+"""
+import numpy as np
+
+# Para simular la latencia de la terminal
+import time
+import threading
+from collections import namedtuple
+
+# Importaciones necesarias para definir tipos de datos
+from typing import Any, Dict, List, Tuple
+
+
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+RES_S_OK = 1
+RES_E_INTERNAL_FAIL_SEND = -10004
+
+TradePosition = namedtuple('TradePosition', [
+    'ticket', 'time', 'type', 'magic', 'identifier', 'volume', 'price_open', 'sl', 'tp', 'price_current',
+    'swap', 'profit', 'symbol', 'comment',
+])
+SymbolInfo = namedtuple('SymbolInfo', ['name', 'trade_tick_size', 'volume_min', 'volume_max', 'volume_step', 'digits'])
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc', 'flags', 'volume_real'])
+OrderSendResult = namedtuple('OrderSendResult', ['retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment', 'request_id', 'retcode_external', 'request'])
+
+RATES_DTYPE = np.dtype([
+    ('time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'),
+    ('tick_volume', 'u8'), ('spread', 'i4'), ('real_volume', 'u8'),
+])
+TICKS_DTYPE = np.dtype([
+    ('time', 'i8'), ('bid', 'f8'), ('ask', 'f8'), ('last', 'f8'), ('volume', 'u8'),
+    ('time_msc', 'i8'), ('flags', 'u4'), ('volume_real', 'f8'),
+])
+
+_lock = threading.RLock()
+
+# Estado de la terminal falsa
+connected = False
+calls: List[Tuple[Any, ...]] = []
+delay = 0.0
+max_concurrent = 0
+_active = 0
+symbols: Dict[str, SymbolInfo] = {}
+quotes: Dict[str, Tuple[float, float]] = {}
+positions: Dict[int, TradePosition] = {}
+_next_ticket = 1
+
+
+def reset():
+    """
+    Deja la terminal falsa en su estado inicial, con US30.cash y US100.cash.
+    """
+    global connected, delay, max_concurrent, _active, _next_ticket
+    with _lock:
+        connected = False
+        delay = 0.0
+        max_concurrent = 0
+        _active = 0
+        calls.clear()
+        positions.clear()
+        symbols.clear()
+        quotes.clear()
+        _next_ticket = 1
+        add_symbol("US30.cash", bid=34000.0, ask=34001.0, tick_size=0.5)
+        add_symbol("US100.cash", bid=15000.0, ask=15000.5, tick_size=0.25)
+
+
+def add_symbol(name: str, bid: float, ask: float, tick_size: float = 0.01, volume_min: float = 0.01,
+               volume_max: float = 100.0, volume_step: float = 0.01):
+    symbols[name] = SymbolInfo(name, tick_size, volume_min, volume_max, volume_step, 2)
+    quotes[name] = (bid, ask)
+
+
+def add_position(symbol: str, type: int, volume: float, price_open: float, sl: float = 0.0, tp: float = 0.0,
+                 comment: str = "", magic: int = 0) -> int:
+    global _next_ticket
+    with _lock:
+        ticket = _next_ticket
+        _next_ticket += 1
+        bid, ask = quotes[symbol]
+        positions[ticket] = TradePosition(ticket, int(time.time()), type, magic, ticket, volume, price_open, sl, tp,
+                                          bid if type == 0 else ask, 0.0, 0.0, symbol, comment)
+        return ticket
+
+
+def _record(name: str, *args):
+    global max_concurrent, _active
+    with _lock:
+        calls.append((name, threading.get_ident()) + args)
+        _active += 1
+        max_concurrent = max(max_concurrent, _active)
+    try:
+        if delay:
+            time.sleep(delay)
+    finally:
+        with _lock:
+            _active -= 1
+
+
+#region Conexión
+def initialize(path: str = None, **kwargs) -> bool:
+    global connected
+    _record('initialize')
+    connected = True
+    return True
+
+
+def shutdown() -> bool:
+    global connected
+    _record('shutdown')
+    connected = False
+    return True
+
+
+def last_error() -> Tuple[int, str]:
+    return (RES_S_OK, 'Success') if connected else (RES_E_INTERNAL_FAIL_SEND, 'IPC send failed')
+
+
+def terminal_info():
+    return object() if connected else None
+#endregion
+
+
+#region Datos
+def positions_get(symbol: str = None, ticket: int = None, **kwargs):
+    _record('positions_get', symbol, ticket)
+    if not connected:
+        return None
+    with _lock:
+        found = [position for position in positions.values()
+                 if (symbol is None or position.symbol == symbol) and (ticket is None or position.ticket == ticket)]
+    return tuple(found)
+
+
+def symbol_info(symbol: str):
+    _record('symbol_info', symbol)
+    if not connected:
+        return None
+    return symbols.get(symbol)
+
+
+def symbol_info_tick(symbol: str):
+    _record('symbol_info_tick', symbol)
+    if not connected or symbol not in quotes:
+        return None
+    bid, ask = quotes[symbol]
+    now = time.time()
+    return Tick(int(now), bid, ask, bid, 0, int(now * 1000), 6, 0.0)
+
+
+def _seconds(date) -> int:
+    return int(date.timestamp()) if hasattr(date, 'timestamp') else int(date)
+
+
+def copy_rates_range(symbol: str, timeframe: int, date_from, date_to):
+    """
+    Barras de un minuto sintéticas entre las dos fechas, incluidas.
+    """
+    _record('copy_rates_range', symbol, _seconds(date_from), _seconds(date_to))
+    if not connected or symbol not in quotes:
+        return None
+    start = -(-_seconds(date_from) // 60) * 60
+    times = np.arange(start, _seconds(date_to) + 1, 60, dtype=np.int64)
+    rates = np.zeros(len(times), dtype=RATES_DTYPE)
+    rates['time'] = times
+    prices = quotes[symbol][0] + (times % 3600) / 60.0
+    rates['open'] = rates['close'] = prices
+    rates['high'] = prices + 1
+    rates['low'] = prices - 1
+    rates['tick_volume'] = 1
+    return rates
+
+
+def copy_rates_from(symbol: str, timeframe: int, date_from, count: int):
+    end = _seconds(date_from)
+    return copy_rates_range(symbol, timeframe, end - (count - 1) * 60, end)
+
+
+def copy_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int):
+    end = int(time.time()) // 60 * 60 - start_pos * 60
+    return copy_rates_range(symbol, timeframe, end - (count - 1) * 60, end)
+
+
+def copy_ticks_range(symbol: str, date_from, date_to, flags: int):
+    """
+    Un tick sintético por segundo entre las dos fechas, incluidas.
+    """
+    _record('copy_ticks_range', symbol, _seconds(date_from), _seconds(date_to))
+    if not connected or symbol not in quotes:
+        return None
+    times = np.arange(_seconds(date_from), _seconds(date_to) + 1, dtype=np.int64)
+    ticks = np.zeros(len(times), dtype=TICKS_DTYPE)
+    bid, ask = quotes[symbol]
+    ticks['time'] = times
+    ticks['time_msc'] = times * 1000
+    ticks['bid'] = bid
+    ticks['ask'] = ask
+    ticks['flags'] = 6
+    return ticks
+
+
+def copy_ticks_from(symbol: str, date_from, count: int, flags: int):
+    start = _seconds(date_from)
+    return copy_ticks_range(symbol, start, start + count - 1, flags)
+
+
+def history_orders_get(*args, **kwargs):
+    return ()
+
+
+def history_deals_get(*args, **kwargs):
+    return ()
+#endregion
+
+
+#region Órdenes
+def _result(retcode: int, request: Dict[str, Any], comment: str = "", **fields) -> OrderSendResult:
+    values = dict(deal=0, order=0, volume=request.get('volume', 0.0), price=request.get('price', 0.0), bid=0.0, ask=0.0,
+                  request_id=0, retcode_external=0)
+    values.update(fields)
+    return OrderSendResult(retcode, comment=comment, request=request, **values)
+
+
+def order_send(request: Dict[str, Any]):
+    """
+    Atiende órdenes de mercado (abrir, cerrar o cerrar en parte una posición) y cambios de stop loss y take profit.
+    """
+    _record('order_send', dict(request))
+    if not connected:
+        return None
+    action = request.get('action')
+    with _lock:
+        if action == 1:
+            ticket = request.get('position')
+            if ticket:
+                position = positions.get(ticket)
+                if position is None:
+                    return _result(TRADE_RETCODE_INVALID, request, "Position not found")
+                remaining = round(position.volume - request['volume'], 8)
+                if remaining <= 0:
+                    del positions[ticket]
+                else:
+                    positions[ticket] = position._replace(volume=remaining, comment=request.get('comment', position.comment))
+                return _result(TRADE_RETCODE_DONE, request, "Request executed", order=ticket)
+            ticket = add_position(request['symbol'], request['type'], request['volume'], request.get('price', 0.0),
+                                  request.get('sl', 0.0), request.get('tp', 0.0), request.get('comment', ""))
+            return _result(TRADE_RETCODE_DONE, request, "Request executed", order=ticket, deal=ticket)
+        if action == 6:
+            position = positions.get(request.get('position'))
+            if position is None:
+                return _result(TRADE_RETCODE_INVALID, request, "Position not found")
+            # Como en la terminal, un valor que no se indica queda en 0
+            positions[position.ticket] = position._replace(sl=request.get('sl', 0.0), tp=request.get('tp', 0.0))
+            return _result(TRADE_RETCODE_DONE, request, "Request executed")
+    return _result(TRADE_RETCODE_INVALID, request, "Unsupported action")
+#endregion
+
+
+reset()
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from models.alpaca.client import AlpacaApi
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def make_api(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALPACA_API_KEY_ID", "key")
+    monkeypatch.setenv("ALPACA_API_SECRET_KEY", "secret")
+    api = AlpacaApi(calendar_path=str(tmp_path / "calendar.json"))
+    monkeypatch.setattr(api, 'load_calendar', lambda: True)
+    started = []
+    release = threading.Event()
+
+    def refresh():
+        started.append(threading.get_ident())
+        release.wait(5)
+
+    monkeypatch.setattr(api, '_refresh_calendar', refresh)
+    return api, started, release
+
+
+def test_concurrent_first_use_starts_one_refresh_thread(tmp_path, monkeypatch):
+    api, started, release = make_api(tmp_path, monkeypatch)
+    try:
+        threads = [threading.Thread(target=api._ensure_calendar) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        assert wait_for(lambda: len(started) == 1) and api._calendar_loaded_at is not None
+        time.sleep(0.05)
+        assert len(started) == 1
+    finally:
+        release.set()
+
+
+def test_dead_refresh_thread_is_restarted(tmp_path, monkeypatch):
+    api, started, release = make_api(tmp_path, monkeypatch)
+    release.set()
+    api._ensure_calendar()
+    assert wait_for(lambda: len(started) == 1)
+    api._calendar_refresh_thread.join(timeout=5)
+    assert not api._calendar_refresh_thread.is_alive()
+
+    # El refresco terminó: el siguiente uso lo vuelve a iniciar
+    release.clear()
+    try:
+        api._ensure_calendar()
+        assert wait_for(lambda: len(started) == 2) and api._calendar_refresh_thread.is_alive()
+    finally:
+        release.set()
@@ -0,0 +1,40 @@
+import pytest
+
+from controller.bot_controller import BreakoutTrading
+from models.state_store import SymbolStateStore
+
+SYMBOL = "US30.cash"
+
+
+@pytest.fixture
+def strategy(mt5):
+    store = SymbolStateStore([SYMBOL], create=True)
+    strategy = BreakoutTrading(data=store, symbols=store.symbols(), in_real_time=True)
+    store.update({SYMBOL: {'symbol': SYMBOL, 'high': 34000.0, 'low': 33900.0, 'range': 100.0, 'lot_size': 0.1,
+                           'decimals': 2, 'volume_min': 0.01, 'volume_max': 100.0, 'partial_position': 1}})
+    strategy._triggers.arm(SYMBOL, high=34000.0, low=33900.0)
+    strategy._purchase_attempts[SYMBOL] = 0
+    yield strategy
+    strategy.close()
+    store.close()
+
+
+def test_traded_symbol_leaves_the_list(strategy, mt5):
+    strategy._breakout_symbol(SYMBOL, current_price=34010.0)
+
+    assert [position.comment for position in mt5.positions.values()] == ["Breakout:rt 1"]
+    # El símbolo ya operado sale de la lista: la estrategia puede terminar cuando se operan todos
+    assert SYMBOL not in strategy.symbols
+    assert not strategy.symbols
+
+
+def test_failed_order_keeps_the_symbol_and_rearms_the_level(strategy, mt5, monkeypatch):
+    order_send = mt5.order_send
+    monkeypatch.setattr(mt5, 'order_send', lambda request: mt5._result(mt5.TRADE_RETCODE_INVALID, request, "Invalid request"))
+    strategy._breakout_symbol(SYMBOL, current_price=34010.0)
+    assert SYMBOL in strategy.symbols and not mt5.positions
+
+    # El nivel se volvió a armar: el siguiente tick reintenta la orden
+    monkeypatch.setattr(mt5, 'order_send', order_send)
+    strategy._breakout_symbol(SYMBOL, current_price=34010.0)
+    assert SYMBOL not in strategy.symbols and len(mt5.positions) == 1
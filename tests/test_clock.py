@@ -0,0 +1,65 @@
+import threading
+import time
+
+from models.mt5.clock import ClockService
+
+
+def test_background_sync_never_calls_the_terminal(mt5):
+    clock = ClockService(symbols=["US30.cash"], refresh_seconds=0.02)
+    clock.start()
+    try:
+        time.sleep(0.2)
+        # La verificación de start() se hace en el hilo que llama; el hilo de segundo plano solo deja pendiente la siguiente
+        threads = {call[1] for call in mt5.calls if call[0] == 'symbol_info_tick'}
+        assert threads == {threading.get_ident()}
+        assert clock._mt5_due
+
+        clock.stop()
+        clock._thread.join(timeout=1)
+        calls = len(mt5.calls)
+        clock.now(ClockService.MT5)
+        assert [call[0] for call in mt5.calls[calls:]].count('symbol_info_tick') == 1
+        assert {call[1] for call in mt5.calls} == {threading.get_ident()}
+        assert not clock._mt5_due
+    finally:
+        clock.stop()
+
+
+def fake_ticks(mt5, monkeypatch, clock, shift, advance=True):
+    # Ticks con la hora del servidor según la tabla más shift segundos; si advance es False el tick nunca cambia
+    first = time.time()
+
+    def symbol_info_tick(symbol):
+        now = time.time() if advance else first
+        server = now + clock._server_time().offset_seconds(int(now)) + shift
+        return mt5.Tick(int(server), 34000.0, 34001.0, 34000.0, 0, int(server * 1000), 6, 0.0)
+
+    monkeypatch.setattr(mt5, 'symbol_info_tick', symbol_info_tick)
+
+
+def test_recent_ticks_correct_the_server_offset(mt5, monkeypatch):
+    clock = ClockService(symbols=["US30.cash"])
+    fake_ticks(mt5, monkeypatch, clock, 3600)
+    # La primera verificación solo guarda el tick; la corrección se aplica cuando el tick avanzó
+    clock.check_mt5()
+    assert clock._state.mt5_correction == 0
+    time.sleep(0.01)
+    clock.check_mt5()
+    assert clock._state.mt5_correction == 3600
+
+
+def test_stale_ticks_keep_the_current_correction(mt5, monkeypatch):
+    # Un tick de hace 16 horas, como antes de la apertura, no avanza entre verificaciones
+    clock = ClockService(symbols=["US30.cash"])
+    fake_ticks(mt5, monkeypatch, clock, -16 * 3600, advance=False)
+    for _ in range(3):
+        clock.check_mt5()
+        time.sleep(0.01)
+    assert clock._state.mt5_correction == 0
+
+    # Aunque avance, una diferencia mayor que MAX_CORRECTION no se acepta
+    fake_ticks(mt5, monkeypatch, clock, -16 * 3600)
+    for _ in range(3):
+        clock.check_mt5()
+        time.sleep(0.01)
+    assert clock._state.mt5_correction == 0
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from models.mt5.client import MT5Api
+from models.mt5.enums import CopyTicks
+
+
+def test_parallel_chunks_share_one_connection_and_never_overlap(mt5):
+    mt5.delay = 0.01
+    date_from = datetime(2024, 3, 4, 13, 0, tzinfo=pytz.utc)
+    date_to = date_from + timedelta(minutes=40)
+
+    chunks = list(MT5Api.download_ticks("US30.cash", date_from, date_to, CopyTicks.COPY_TICKS_ALL,
+                                        chunk=timedelta(minutes=5), parallel=4))
+
+    assert len(chunks) == 8
+    ticks = np.concatenate([data for _, _, data in chunks])
+    # Un tick por segundo, sin repetir los límites de los tramos
+    assert len(ticks) == 40 * 60 + 1
+    assert np.all(np.diff(ticks['time_msc']) > 0)
+
+    # Una sola conexión para todos los hilos, y nunca dos llamadas a la terminal a la vez
+    names = [call[0] for call in mt5.calls]
+    assert names.count('initialize') == 1
+    assert names.count('shutdown') == 1 and names[-1] == 'shutdown'
+    assert mt5.max_concurrent == 1
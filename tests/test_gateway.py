@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from models.mt5.client import MT5Api
+from models.mt5.enums import OrderType
+from models.mt5.gateway import GatewayError, GatewayRequest, MT5Gateway
+
+
+@pytest.fixture
+def gateway(mt5):
+    gateway = MT5Gateway(timeout=5.0)
+    client = gateway.create_client()
+    gateway.start(in_process=True)
+    MT5Api.use_gateway(client)
+    yield gateway, client
+    MT5Api.use_gateway(None)
+    gateway.stop(timeout=5.0)
+
+
+def test_calls_are_served_by_the_gateway(gateway, mt5):
+    _, client = gateway
+    ticket = mt5.add_position("US30.cash", 0, 1.0, 34000.0, comment="Breakout:rt 1")
+
+    positions = MT5Api.get_positions("US30.cash")
+    assert [position.ticket for position in positions] == [ticket]
+
+    assert MT5Api.send_change_stops("US30.cash", ticket, 33990.0, 34050.0) is True
+    assert mt5.positions[ticket].sl == 33990.0
+    assert mt5.positions[ticket].tp == 34050.0
+
+    # Todas las llamadas a la terminal salen del hilo del gateway, con una sola conexión
+    worker = {call[1] for call in mt5.calls}
+    assert threading.get_ident() not in worker
+    assert [call[0] for call in mt5.calls].count('initialize') == 1
+
+
+def test_gateway_groups_identical_reads(mt5):
+    gateway = MT5Gateway()
+    clients = [gateway.create_client() for _ in range(3)]
+    # Tres lecturas idénticas en el mismo ciclo se ejecutan una sola vez
+    batch = [GatewayRequest(client.client_id, 1, 'get_symbol_info', ("US30.cash",), ()) for client in clients]
+    with MT5Api.session():
+        gateway._serve_batch(MT5Api, batch)
+    assert gateway.reads_executed == 1
+    assert [call[0] for call in mt5.calls].count('symbol_info') == 1
+    for client in clients:
+        assert client._responses.get(timeout=1).request_id == 1
+
+
+def test_threads_sharing_a_client_get_their_own_results(gateway, mt5):
+    mt5.delay = 0.005
+    symbols = ["US30.cash", "US100.cash", "US30.cash", "US100.cash"]
+    results = [None] * len(symbols)
+    errors = []
+
+    def worker(index):
+        try:
+            results[index] = [MT5Api.get_symbol_info(symbols[index]).name for _ in range(10)]
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(len(symbols))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert errors == []
+    assert results == [[symbol] * 10 for symbol in symbols]
+
+
+def test_orders_are_sent_through_the_gateway(gateway, mt5):
+    result = MT5Api.send_order("US30.cash", OrderType.MARKET_BUY, 0.5, comment="Breakout:rt 1")
+    assert result.retcode == mt5.TRADE_RETCODE_DONE
+    assert [position.volume for position in mt5.positions.values()] == [0.5]
+
+    MT5Api.send_close_all_position()
+    assert mt5.positions == {}
+
+
+def test_call_fails_when_the_gateway_stops(gateway):
+    server, client = gateway
+    client.POLL_INTERVAL = 0.05
+    server.stop(timeout=5.0)
+
+    started = time.monotonic()
+    with pytest.raises(GatewayError):
+        MT5Api.get_positions()
+    assert time.monotonic() - started < 2
+
+
+def test_call_fails_when_the_response_does_not_arrive(gateway, mt5):
+    _, client = gateway
+    client.POLL_INTERVAL = 0.05
+    client.timeout = 0.2
+    mt5.delay = 1.0
+
+    with pytest.raises(GatewayError):
+        MT5Api.get_symbol_info("US30.cash")
+
+    # Una respuesta atrasada no se entrega a la llamada siguiente
+    mt5.delay = 0.0
+    client.timeout = 5.0
+    assert MT5Api.get_symbol_info("US100.cash").name == "US100.cash"
@@ -0,0 +1,98 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from models.mt5.client import MT5Api
+from models.mt5.enums import TimeFrame
+from models.mt5.history_store import RatesHistoryStore
+
+DAY = RatesHistoryStore.DAY
+
+
+@pytest.fixture
+def store(mt5, tmp_path):
+    store = RatesHistoryStore(str(tmp_path))
+    MT5Api.use_history_store(store)
+    yield store
+    MT5Api.use_history_store(None)
+
+
+def days_ago(days: int) -> datetime:
+    today = datetime.now(pytz.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days)
+
+
+def terminal_reads(mt5) -> int:
+    return [call[0] for call in mt5.calls].count('copy_rates_range')
+
+
+def server_day(date: datetime) -> int:
+    return RatesHistoryStore._to_server_seconds(date) // DAY
+
+
+def is_saved(store: RatesHistoryStore, date: datetime) -> bool:
+    return os.path.exists(store._path("US30.cash", TimeFrame.MINUTE_1, server_day(date)))
+
+
+def get_rates(date_from: datetime, date_to: datetime):
+    with MT5Api.session():
+        return MT5Api.get_rates_range("US30.cash", TimeFrame.MINUTE_1, date_from, date_to)
+
+
+def test_complete_past_days_are_saved_and_read_from_disk(store, mt5):
+    date_from, date_to = days_ago(12), days_ago(10) - timedelta(minutes=1)
+    rates = get_rates(date_from, date_to)
+    assert len(rates) == 2 * 24 * 60
+    assert is_saved(store, days_ago(12)) and is_saved(store, days_ago(11))
+
+    reads = terminal_reads(mt5)
+    assert np.array_equal(get_rates(date_from, date_to), rates)
+    assert terminal_reads(mt5) == reads
+
+
+def test_recent_days_are_not_saved(store, mt5):
+    date_from = days_ago(RatesHistoryStore.SAFETY_DAYS)
+    rates = get_rates(date_from, date_from + timedelta(hours=6))
+    assert len(rates) == 6 * 60 + 1
+    assert not is_saved(store, date_from)
+
+    # Se vuelven a pedir a la terminal
+    reads = terminal_reads(mt5)
+    get_rates(date_from, date_from + timedelta(hours=6))
+    assert terminal_reads(mt5) == reads + 1
+
+
+def test_empty_days_are_not_saved(store, mt5, monkeypatch):
+    empty_day = server_day(days_ago(11))
+    copy_rates_range = mt5.copy_rates_range
+
+    def without_empty_day(*args):
+        rates = copy_rates_range(*args)
+        return None if rates is None else rates[rates['time'] // DAY != empty_day]
+
+    monkeypatch.setattr(mt5, 'copy_rates_range', without_empty_day)
+    rates = get_rates(days_ago(12), days_ago(10) - timedelta(minutes=1))
+    assert len(rates) == 24 * 60
+    assert is_saved(store, days_ago(12)) and not is_saved(store, days_ago(11))
+
+    # El día vacío se recuerda en memoria y no se vuelve a pedir
+    reads = terminal_reads(mt5)
+    get_rates(days_ago(12), days_ago(10) - timedelta(minutes=1))
+    assert terminal_reads(mt5) == reads
+
+
+def test_days_without_later_bars_are_not_saved(store, mt5, monkeypatch):
+    # La terminal aún no tiene barras posteriores al día pedido: podría estar incompleto
+    last_time = int(days_ago(11).timestamp())
+    copy_rates_range = mt5.copy_rates_range
+
+    def history_until_last_time(*args):
+        rates = copy_rates_range(*args)
+        return None if rates is None else rates[rates['time'] < last_time - 3600]
+
+    monkeypatch.setattr(mt5, 'copy_rates_range', history_until_last_time)
+    get_rates(days_ago(12), days_ago(11) - timedelta(minutes=1))
+    assert not is_saved(store, days_ago(12))
@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+
+from benchmarks.renko_benchmark import make_rates
+from technical_indicators import ATR, EMA, RSI, SMA, VWAP, BollingerBands, RollingHigh, RollingLow
+
+PERIOD = 14
+
+
+#region Cálculos de referencia
+# Definiciones directas, barra por barra y sobre la ventana completa, contra las que se comparan las dos formas
+def reference_sma(values, period):
+    return np.array([np.nan if end < period else np.mean(values[end - period:end]) for end in range(1, len(values) + 1)])
+
+
+def reference_ema(values, period):
+    result = np.full(len(values), np.nan)
+    if len(values) < period:
+        return result
+    alpha = 2 / (period + 1)
+    result[period - 1] = np.mean(values[:period])
+    for index in range(period, len(values)):
+        result[index] = alpha * values[index] + (1 - alpha) * result[index - 1]
+    return result
+
+
+def reference_rsi(values, period):
+    result = np.full(len(values), np.nan)
+    if len(values) <= period:
+        return result
+    changes = np.diff(values)
+    gain = np.mean(np.maximum(changes[:period], 0))
+    loss = np.mean(np.maximum(-changes[:period], 0))
+    for index in range(period, len(values)):
+        if index > period:
+            change = changes[index - 1]
+            gain = (gain * (period - 1) + max(change, 0)) / period
+            loss = (loss * (period - 1) + max(-change, 0)) / period
+        result[index] = 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+    return result
+
+
+def reference_atr(rates, period):
+    high, low, close = rates['high'], rates['low'], rates['close']
+    true_range = [high[0] - low[0]] + [
+        max(high[index] - low[index], abs(high[index] - close[index - 1]), abs(low[index] - close[index - 1]))
+        for index in range(1, len(rates))
+    ]
+    result = np.full(len(rates), np.nan)
+    if len(rates) < period:
+        return result
+    result[period - 1] = np.mean(true_range[:period])
+    for index in range(period, len(rates)):
+        result[index] = (result[index - 1] * (period - 1) + true_range[index]) / period
+    return result
+
+
+def reference_vwap(rates):
+    result = np.full(len(rates), np.nan)
+    for index in range(len(rates)):
+        day = rates['time'] // 86400 == rates['time'][index] // 86400
+        session = rates[:index + 1][day[:index + 1]]
+        volume = session['tick_volume'].astype('f8')
+        if volume.sum() > 0:
+            typical = (session['high'] + session['low'] + session['close']) / 3
+            result[index] = np.sum(typical * volume) / volume.sum()
+    return result
+
+
+def reference_rolling(values, period, function):
+    return np.array([np.nan if end < period else function(values[end - period:end]) for end in range(1, len(values) + 1)])
+
+
+def reference_bollinger(values, period, deviations):
+    middle = reference_sma(values, period)
+    deviation = np.array([np.nan if end < period else np.std(values[end - period:end]) for end in range(1, len(values) + 1)])
+    return middle, middle + deviations * deviation, middle - deviations * deviation
+#endregion
+
+
+#region Series
+def random_rates(bars=600):
+    rates = make_rates(bars, seed=11)
+    rates['tick_volume'] = np.random.default_rng(11).integers(0, 50, bars)
+    # La primera barra sin volumen: el VWAP empieza en NaN
+    rates['tick_volume'][0] = 0
+    # Dos días para el reinicio del VWAP
+    rates['time'] = 1_600_041_600 + 300 * np.arange(bars)
+    return rates
+
+
+def constant_rates(bars=60):
+    rates = make_rates(bars)
+    for field in ('open', 'high', 'low', 'close'):
+        rates[field] = 34000.0
+    rates['tick_volume'] = 10
+    return rates
+
+
+SERIES = {
+    'random': random_rates,
+    'constant': constant_rates,
+    'short': lambda: random_rates(PERIOD - 1),
+    'one_period': lambda: random_rates(PERIOD),
+}
+#endregion
+
+
+def stream(indicator, rates, fields):
+    columns = [rates[field].tolist() for field in fields]
+    return np.array([indicator.update(*values) for values in zip(*columns)], dtype='f8')
+
+
+def assert_same(actual, expected):
+    # Misma posición de los NaN y diferencia relativa menor a 1e-9
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.fixture(params=list(SERIES))
+def rates(request):
+    return SERIES[request.param]()
+
+
+def test_sma(rates):
+    expected = reference_sma(rates['close'], PERIOD)
+    assert_same(SMA.calculate(rates, PERIOD), expected)
+    assert_same(stream(SMA(PERIOD), rates, ['close']), expected)
+
+
+def test_ema(rates):
+    expected = reference_ema(rates['close'], PERIOD)
+    assert_same(EMA.calculate(rates, PERIOD), expected)
+    assert_same(stream(EMA(PERIOD), rates, ['close']), expected)
+
+
+def test_rsi(rates):
+    expected = reference_rsi(rates['close'], PERIOD)
+    assert_same(RSI.calculate(rates, PERIOD), expected)
+    assert_same(stream(RSI(PERIOD), rates, ['close']), expected)
+
+
+def test_atr(rates):
+    expected = reference_atr(rates, PERIOD)
+    assert_same(ATR.calculate(rates, PERIOD), expected)
+    assert_same(stream(ATR(PERIOD), rates, ['high', 'low', 'close']), expected)
+
+
+def test_vwap(rates):
+    expected = reference_vwap(rates)
+    assert_same(VWAP.calculate(rates), expected)
+    assert_same(stream(VWAP(), rates, ['high', 'low', 'close', 'tick_volume', 'time']), expected)
+
+
+@pytest.mark.parametrize('indicator, field, function', [(RollingHigh, 'high', np.max), (RollingLow, 'low', np.min)])
+def test_rolling_extremes(rates, indicator, field, function):
+    expected = reference_rolling(rates[field], PERIOD, function)
+    assert_same(indicator.calculate(rates, PERIOD), expected)
+    assert_same(stream(indicator(PERIOD), rates, [field]), expected)
+
+
+def test_bollinger_bands(rates):
+    expected = reference_bollinger(rates['close'], PERIOD, 2.0)
+    for band, values in zip(expected, BollingerBands.calculate(rates, PERIOD, 2.0)):
+        assert_same(values, band)
+
+    bands = BollingerBands(PERIOD, 2.0)
+    streamed = np.array([bands.update(value) for value in rates['close'].tolist()], dtype='f8')
+    for index, band in enumerate(expected):
+        assert_same(streamed[:, index], band)
+
+
+def test_warmup_values_are_nan():
+    rates = random_rates()
+    for values in (SMA.calculate(rates, PERIOD), EMA.calculate(rates, PERIOD), ATR.calculate(rates, PERIOD),
+                   RollingHigh.calculate(rates, PERIOD), BollingerBands.calculate(rates, PERIOD)[1]):
+        assert np.isnan(values[:PERIOD - 1]).all() and not np.isnan(values[PERIOD - 1:]).any()
+    # El RSI necesita period cambios, es decir period + 1 cierres
+    rsi = RSI.calculate(rates, PERIOD)
+    assert np.isnan(rsi[:PERIOD]).all() and not np.isnan(rsi[PERIOD:]).any()
@@ -0,0 +1,54 @@
+import multiprocessing
+from queue import Empty
+
+import pytest
+
+from models.level_triggers import LevelDirection, LevelSpec, LevelTriggerIndex
+
+
+LEVELS = [LevelSpec('high', LevelDirection.ABOVE), LevelSpec('low', LevelDirection.BELOW)]
+
+
+def _claim(triggers: LevelTriggerIndex, start, claims):
+    start.wait()
+    for _ in range(200):
+        for symbol, level_name in triggers.check_batch(triggers.symbols, [110.0] * len(triggers.symbols)):
+            claims.put((symbol, level_name))
+
+
+def test_levels_fire_once_and_rearm_after_return():
+    triggers = LevelTriggerIndex(["A", "B"], LEVELS + [LevelSpec('recovery', LevelDirection.ABOVE, rearm=True)], create=True)
+    try:
+        triggers.arm("A", high=105.0, low=95.0, recovery=100.0)
+        assert sorted(triggers.check("A", 106.0)) == ['high', 'recovery']
+        assert triggers.check("A", 107.0) == []
+        # El nivel con rearme se vuelve a armar cuando el precio regresa por debajo
+        assert triggers.check("A", 99.0) == []
+        assert triggers.check("A", 101.0) == ['recovery']
+        assert triggers.check("B", 200.0) == []
+    finally:
+        triggers.close()
+
+
+def test_concurrent_processes_claim_each_crossing_once():
+    symbols = [f"S{index}" for index in range(50)]
+    triggers = LevelTriggerIndex(symbols, LEVELS, create=True)
+    try:
+        for symbol in symbols:
+            triggers.arm(symbol, high=100.0, low=90.0)
+        start = multiprocessing.Event()
+        claims = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_claim, args=(triggers, start, claims)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        start.set()
+        for process in processes:
+            process.join(timeout=30)
+
+        fired = [claims.get(timeout=5) for _ in symbols]
+        # Ningún proceso recibió un cruce que ya había reclamado otro
+        with pytest.raises(Empty):
+            claims.get(timeout=0.5)
+        assert sorted(fired) == sorted((symbol, 'high') for symbol in symbols)
+    finally:
+        triggers.close()
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+
+import pytest
+import pytz
+
+from models.mt5.opening_range import OpeningRangeService
+
+
+class FixedClock:
+    def __init__(self, now):
+        self._now = now
+
+    def now(self):
+        return self._now
+
+
+@pytest.fixture
+def opening_range(mt5):
+    service = OpeningRangeService(["US30.cash", "US100.cash"], day=date(2024, 3, 4), create=True)
+    yield service
+    service.close()
+
+
+def test_range_is_calculated_with_bars_after_the_window(opening_range, mt5):
+    high, low = opening_range.get_range("US30.cash")
+    # Barras sintéticas de 13:00 a 13:30: precios 34000 + minuto, high +1 y low -1
+    assert (high, low) == (34031.0, 33999.0)
+    assert opening_range.is_complete("US30.cash")
+
+    # Los demás procesos leen el rango guardado sin volver a consultar las barras
+    assert opening_range.get_range("US30.cash") == (high, low)
+    assert [call[0] for call in mt5.calls].count('copy_rates_range') == 1
+
+
+def test_missing_range_returns_none(opening_range, mt5):
+    del mt5.quotes["US100.cash"]
+    assert opening_range.get_range("US100.cash") is None
+    assert not opening_range.is_complete("US100.cash")
+
+
+def test_day_and_window_follow_the_clock(mt5):
+    clock = FixedClock(datetime(2024, 3, 5, 14, 0, tzinfo=pytz.utc))
+    service = OpeningRangeService(["US30.cash"], create=True, clock=clock)
+    try:
+        assert service.day == date(2024, 3, 5)
+        # Para el reloj la ventana ya terminó: run() calcula el rango con las barras sin abrir el flujo de ticks
+        service.run()
+        assert service.is_complete()
+        assert 'copy_ticks_range' not in [call[0] for call in mt5.calls]
+    finally:
+        service.close()
+
+
+def test_read_gives_up_on_a_record_left_in_writing(opening_range, mt5):
+    # El proceso que escribía el rango se detuvo a mitad: la lectura se rinde y el rango se calcula con las barras
+    opening_range._ranges['seq'][0] += 1
+    opening_range.MAX_READS = 50
+    assert not opening_range.is_complete("US30.cash")
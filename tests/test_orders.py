@@ -0,0 +1,35 @@
+from models.mt5.client import MT5Api
+from models.mt5.enums import OrderType, TradeActions
+
+
+def deal(symbol: str, volume: float, type: int) -> dict:
+    return {"action": TradeActions.TRADE_ACTION_DEAL, "symbol": symbol, "volume": volume, "type": type}
+
+
+def test_orders_are_sent_one_at_a_time_in_one_session(mt5):
+    mt5.delay = 0.005
+    results = MT5Api.send_orders([
+        deal("US30.cash", 0.5, OrderType.MARKET_BUY),
+        deal("US100.cash", 0.25, OrderType.MARKET_SELL),
+        deal("US30.cash", 0.001, OrderType.MARKET_BUY),
+    ])
+
+    assert [result.done for result in results] == [True, True, False]
+    assert "fuera del rango" in results[2].error
+    # El precio de mercado se completa con el ask para comprar y el bid para vender
+    assert results[0].request['price'] == 34001.0 and results[1].request['price'] == 15000.0
+
+    names = [call[0] for call in mt5.calls]
+    assert names.count('initialize') == 1 and names.count('order_send') == 2
+    assert mt5.max_concurrent == 1
+
+
+def test_close_all_positions_in_one_session(mt5):
+    mt5.add_position("US30.cash", 0, 1.0, 34000.0, comment="Breakout:rt 1")
+    mt5.add_position("US100.cash", 1, 0.5, 15000.0, comment="Hedge 1")
+
+    results = MT5Api.send_close_all_position()
+
+    assert [result.done for result in results] == [True, True]
+    assert mt5.positions == {}
+    assert [call[0] for call in mt5.calls].count('initialize') == 1
@@ -0,0 +1,94 @@
+import numpy as np
+
+from models.mt5.position_rules import PositionAction, partial_exits, symbol_values, trailing_stops
+from models.mt5.positions import POSITION_DTYPE
+
+SYMBOLS = ["US30.cash", "US100.cash", "GER40.cash"]
+PIECE = 0.25
+NUMBER_STOPS = 4
+TAG = "Breakout:rt"
+
+
+def random_positions(count=60, seed=3):
+    rng = np.random.default_rng(seed)
+    positions = np.zeros(count, dtype=POSITION_DTYPE)
+    positions['ticket'] = np.arange(1, count + 1)
+    positions['symbol'] = rng.choice(SYMBOLS, count)
+    positions['type'] = rng.integers(0, 2, count)
+    positions['volume'] = 1.0
+    positions['price_open'] = 34000.0
+    direction = np.where(positions['type'] == 0, 1.0, -1.0)
+    # Un tercio sin take profit, para el trailing stop
+    positions['tp'] = np.where(rng.random(count) < 1 / 3, 0.0, 34000.0 + direction * 100.0)
+    positions['price_current'] = 34000.0 + direction * rng.uniform(-20.0, 120.0, count)
+    positions['sl'] = 34000.0 - direction * rng.uniform(0.0, 100.0, count)
+    positions['counter'] = rng.integers(1, NUMBER_STOPS, count)
+    positions['tag'] = TAG
+    positions['comment'] = np.char.add(TAG + " ", positions['counter'].astype(str))
+    return positions
+
+
+def symbol_data():
+    return {
+        symbol: {'range': 50.0 + index, 'first_volume': 1.0 + index, 'previous_stop_level': 33950.0 + index, 'decimals': 2}
+        for index, symbol in enumerate(SYMBOLS)
+    }
+
+
+#region Cálculo de referencia
+# El recorrido posición por posición que reemplazan las reglas vectorizadas
+def reference_rules(positions, data):
+    modifications = []
+    for position in positions:
+        symbol_data = data[str(position['symbol'])]
+        buy = position['type'] == 0
+        if position['tp'] == 0:
+            if abs(position['price_current'] - position['sl']) > symbol_data['range']:
+                distance = symbol_data['range'] * 0.5
+                new_sl = position['price_current'] - distance if buy else position['price_current'] + distance
+                modifications.append((int(position['ticket']), PositionAction.TRAILING_STOP, new_sl, 0.0, "", False))
+            continue
+        counter = int(position['counter'])
+        next_partial_range = PIECE * counter * abs(position['tp'] - position['price_open'])
+        stop_level = position['price_open'] + next_partial_range if buy else position['price_open'] - next_partial_range
+        if (stop_level < position['price_current']) if buy else (stop_level > position['price_current']):
+            volume = round(symbol_data['first_volume'] * PIECE, symbol_data['decimals'])
+            modifications.append((int(position['ticket']), PositionAction.PARTIAL_EXIT, symbol_data['previous_stop_level'],
+                                  volume, f"{TAG} {counter + 1}", counter + 1 == NUMBER_STOPS))
+            symbol_data['previous_stop_level'] = stop_level
+    return sorted(modifications), {symbol: values['previous_stop_level'] for symbol, values in data.items()}
+#endregion
+
+
+def vectorized_rules(positions, data):
+    def values(field):
+        return symbol_values(positions, {symbol: state[field] for symbol, state in data.items()})
+
+    result = np.concatenate([
+        trailing_stops(positions, values('range'), distance_factor=0.5),
+        partial_exits(positions, PIECE, NUMBER_STOPS, values('first_volume'), values('previous_stop_level'),
+                      values('decimals').astype(np.int64)),
+    ])
+    modifications = sorted(
+        (int(row['ticket']), int(row['action']), float(row['sl']), float(row['volume']), str(row['comment']), bool(row['remove_tp']))
+        for row in result
+    )
+    # Como manage_positions: el nivel de la última salida parcial de cada símbolo pasa a ser su nivel anterior
+    levels = {symbol: state['previous_stop_level'] for symbol, state in data.items()}
+    for row in result[result['action'] == PositionAction.PARTIAL_EXIT]:
+        levels[str(row['symbol'])] = float(row['stop_level'])
+    return modifications, levels
+
+
+def test_vectorized_rules_match_the_per_position_loop():
+    positions = random_positions()
+    expected, expected_levels = reference_rules(positions, symbol_data())
+    actual, levels = vectorized_rules(positions, symbol_data())
+
+    # Varias salidas parciales por símbolo en la misma pasada, para probar el encadenamiento del nivel anterior
+    partial_symbols = [positions['symbol'][ticket - 1] for ticket, action, *_ in expected if action == PositionAction.PARTIAL_EXIT]
+    assert max(partial_symbols.count(symbol) for symbol in SYMBOLS) > 1
+
+    assert [row[:2] + row[3:] for row in actual] == [row[:2] + row[3:] for row in expected]
+    np.testing.assert_allclose([row[2] for row in actual], [row[2] for row in expected])
+    assert levels == expected_levels
@@ -0,0 +1,99 @@
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from models.mt5.client import MT5Api
+from models.mt5.positions import PositionIndex, PositionsPoller, parse_comments
+
+Position = namedtuple('Position', ['ticket', 'symbol', 'type', 'magic', 'comment', 'tp'])
+
+TAG = "Hedge"
+
+COMMENTS = ["Breakout:rt 3", "Breakout:em 12", "Hedge 1", "HardHedge 2", "Hedge", "Hedge 1 b", "7", "", "  Hedge  4", "Hedge 5 "]
+
+
+@pytest.mark.parametrize('comment, expected', [
+    ("Breakout:rt 3", ("Breakout:rt", 3)),
+    ("Hedge 12", ("Hedge", 12)),
+    ("Hedge", ("Hedge", None)),
+    ("Hedge 1 b", ("Hedge 1 b", None)),
+    ("7", ("", 7)),
+])
+def test_parse_comment(comment, expected):
+    assert PositionIndex.parse_comment(comment) == expected
+
+
+def test_parse_comments_matches_parse_comment():
+    tags, counters = parse_comments(np.array(COMMENTS))
+    expected = [PositionIndex.parse_comment(comment) for comment in COMMENTS]
+    assert list(tags) == [tag for tag, _ in expected]
+    # El contador vectorizado es 0 cuando el comentario no termina en un número
+    assert list(counters) == [counter or 0 for _, counter in expected]
+
+
+def test_lookups_by_tag_counter_and_symbol():
+    index = PositionIndex(magics={77: "Sweep"})
+    index.refresh([
+        Position(1, "US30.cash", 0, 0, "Hedge 1", 1.0),
+        Position(2, "US100.cash", 1, 0, "Hedge 1", 1.0),
+        Position(3, "US30.cash", 1, 0, "HardHedge 1", 1.0),
+        Position(4, "US30.cash", 1, 0, "Hedge 2", 1.0),
+        Position(5, "US30.cash", 0, 0, "Hedge:rt 1", 1.0),
+        Position(6, "US30.cash", 0, 77, "Hedge 9", 1.0),
+    ])
+    # La etiqueta se compara completa: "HardHedge" y "Hedge:rt" no son de "Hedge", y el número mágico manda
+    assert index.tickets(TAG) == [1, 2, 4]
+    assert index.tickets(TAG, "US30.cash") == [1, 4]
+    assert index.tickets("HardHedge") == [3] and index.tickets("Sweep") == [6]
+    assert [position.ticket for position in index.positions(TAG, "US100.cash")] == [2]
+    assert (index.counter(4), index.counter(99)) == (2, None)
+    assert (index.last_counter(TAG, "US30.cash"), index.last_type(TAG, "US30.cash")) == (2, 1)
+
+    # Una foto de un solo símbolo no toca los tickets de los demás
+    index.refresh([Position(1, "US30.cash", 0, 0, "Hedge 1", 1.0)], "US30.cash")
+    assert index.tickets(TAG) == [1, 2]
+    assert index.tickets("HardHedge") == [] and len(index) == 2
+
+
+def test_sent_order_counts_until_the_snapshot_shows_it():
+    index = PositionIndex()
+    index.refresh([Position(1, "US30.cash", 0, 0, "Hedge 1", 1.0)])
+    assert (index.last_counter(TAG, "US30.cash"), index.last_type(TAG, "US30.cash")) == (1, 0)
+
+    # La orden enviada se considera aunque la foto siguiente aún no la muestre
+    index.record_sent(TAG, "US30.cash", 2, 1)
+    index.refresh([Position(1, "US30.cash", 0, 0, "Hedge 1", 1.0)])
+    assert (index.last_counter(TAG, "US30.cash"), index.last_type(TAG, "US30.cash")) == (2, 1)
+    assert index.last_counter(TAG, "US100.cash") == 0
+
+    # Cuando la foto la muestra, manda la foto: si después se cierran todas, se vuelve a empezar
+    index.refresh([Position(1, "US30.cash", 0, 0, "Hedge 1", 1.0), Position(2, "US30.cash", 1, 0, "Hedge 2", 1.0)])
+    index.refresh([])
+    assert (index.last_counter(TAG, "US30.cash"), index.last_type(TAG, "US30.cash")) == (0, None)
+
+
+def test_sent_order_expires_if_its_position_never_appears():
+    index = PositionIndex()
+    index.SENT_TIMEOUT = -1.0
+    index.record_sent(TAG, "US30.cash", 1, 0)
+    index.refresh([])
+    assert (index.last_counter(TAG, "US30.cash"), index.last_type(TAG, "US30.cash")) == (0, None)
+
+
+def test_snapshot_read_gives_up_on_a_photo_left_in_writing(mt5):
+    poller = PositionsPoller(capacity=8, create=True)
+    try:
+        mt5.add_position("US30.cash", 0, 0.1, 34000.0, comment="Hedge 1")
+        with MT5Api.session():
+            poller.poll()
+        version, positions = poller.snapshot()
+        assert version == 1 and list(positions['comment']) == ["Hedge 1"]
+
+        # El publicador se detuvo a mitad de la escritura: se entrega la última foto consistente
+        poller._header['seq'] += 1
+        poller.MAX_READS = 50
+        version, positions = poller.snapshot()
+        assert version == 1 and list(positions['comment']) == ["Hedge 1"]
+    finally:
+        poller.close()
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from models.mt5.quote_board import QuoteBoard
+
+
+@pytest.fixture
+def board():
+    board = QuoteBoard(["US30.cash", "US100.cash"], create=True)
+    yield board
+    board.close()
+
+
+def test_publish_and_read(board):
+    assert board.get_last_price("US30.cash") is None
+    board.publish("US30.cash", bid=34000.5, ask=34001.5, last=0.0, time_msc=1694000000000)
+    assert board.get_quote("US30.cash") == (34000.5, 34001.5, 0.0, 1694000000000)
+    assert board.get_last_price("US30.cash") == 34000.5
+
+
+def test_publisher_stops_when_the_feed_stalls(board, mt5, monkeypatch):
+    # La terminal no entrega ticks nuevos
+    monkeypatch.setattr(mt5, 'copy_ticks_from', lambda *args: np.zeros(0, dtype=mt5.TICKS_DTYPE))
+    deadline = time.monotonic() + 0.2
+
+    thread = threading.Thread(target=board.run_publisher, kwargs=dict(
+        poll_interval=0.01, stop_when=lambda: time.monotonic() >= deadline, stop_check_interval=0.05,
+    ))
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_reader_gives_up_on_a_record_left_in_writing(board):
+    board.publish("US30.cash", bid=1.0, ask=2.0, last=0.0, time_msc=1)
+    # El publicador se detuvo a mitad de una escritura
+    board._quotes[0]['seq'] += 1
+
+    started = time.monotonic()
+    assert board.get_quote("US30.cash") is None
+    assert board.get_last_price("US30.cash") is None
+    assert time.monotonic() - started < 5
+    assert board.source().poll_all() == []
@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+
+from benchmarks.renko_benchmark import make_rates, make_ticks, same_bricks
+from technical_indicators import BrickBuffer, CompactBricks, TickRenko, vRenko
+
+
+@pytest.mark.parametrize('brick_size', [2.5, 0.7, 0.1])
+def test_vectorized_bricks_match_the_row_calculation(brick_size):
+    rates = make_rates(20_000, seed=7)
+
+    vectorized = vRenko(brick_size)
+    vectorized.calculate_renko(rates)
+    reference = vRenko(brick_size)
+    reference._calculate_renko_rows(rates)
+
+    assert same_bricks(vectorized.get_renko_data(), reference.get_renko_data())
+
+
+def test_rounding_differences_keep_the_calculation_linear():
+    # Con 0.1 casi cada tramo tiene diferencias de redondeo: cada una recalcula a lo sumo EXACT_WINDOW barras
+    rates = make_rates(50_000, seed=7)
+    renko = vRenko(0.1)
+    calls = []
+    rows = renko._brick_counts_rows
+    renko._brick_counts_rows = lambda close, *args: calls.append(len(close)) or rows(close, *args)
+
+    counts, _ = renko._brick_counts(rates['close'], renko._first_brick_open(rates[0]))
+
+    assert calls and max(calls) <= vRenko.EXACT_WINDOW
+    assert sum(calls) < len(rates)
+    reference = vRenko(0.1)
+    reference._calculate_renko_rows(rates)
+    assert counts.sum() == len(reference.get_renko_data())
+
+
+@pytest.mark.parametrize('brick_size', [2.5, 0.7])
+@pytest.mark.parametrize('batch', [1, 7, 'random'])
+def test_tick_renko_stream_matches_the_batch_calculation(brick_size, batch):
+    ticks = make_ticks(20_000, seed=5)
+    # Ticks sin bid, que se ignoran
+    ticks['bid'][::97] = 0
+
+    renko = TickRenko(brick_size)
+    renko.calculate_renko(ticks)
+
+    stream = TickRenko(brick_size)
+    sizes = np.random.default_rng(5).integers(1, 500, len(ticks)) if batch == 'random' else np.full(len(ticks), batch)
+    ends = np.cumsum(sizes)
+    formed = [stream.update_renko(ticks[end - size:end]) for size, end in zip(sizes, ends) if end - size < len(ticks)]
+
+    assert len(renko.get_renko_data()) > 100
+    assert same_bricks(stream.get_renko_data(), renko.get_renko_data())
+    # Cada ladrillo se devuelve una sola vez, en el lote del tick que lo formó
+    assert same_bricks(np.concatenate(formed), renko.get_renko_data())
+
+
+@pytest.mark.parametrize('max_size', [None, 1, 5, 64])
+def test_brick_buffer_keeps_the_last_max_size_bricks(max_size):
+    buffer = BrickBuffer([('value', 'i8')], capacity=2, max_size=max_size)
+    expected = []
+    rng = np.random.default_rng(3)
+    value = 0
+    for _ in range(200):
+        # Ladrillos sueltos y lotes de distintos tamaños, incluidos lotes mayores que max_size
+        size = int(rng.integers(0, 150)) if rng.random() < 0.3 else 1
+        values = np.arange(value, value + size)
+        value += size
+        if size == 1:
+            buffer.append((int(values[0]),))
+        else:
+            buffer.extend(np.array(values, dtype=[('value', 'i8')]))
+        expected.extend(values.tolist())
+        kept = expected if max_size is None else expected[-max_size:]
+        assert buffer.view()['value'].tolist() == kept
+        assert len(buffer) == len(kept)
+    if max_size is not None:
+        # El buffer acotado nunca crece más allá de 2 * max_size
+        assert len(buffer._data) == 2 * max_size
+
+
+@pytest.mark.parametrize('brick_size', [2.5, 0.7])
+def test_update_renko_bar_by_bar_matches_calculate_renko(brick_size):
+    rates = make_rates(3_000, seed=9)
+    renko = vRenko(brick_size)
+    renko.calculate_renko(rates)
+
+    streamed = vRenko(brick_size)
+    streamed.calculate_renko(rates[:100])
+    for rate in rates[100:]:
+        streamed.update_renko(rate)
+    assert same_bricks(streamed.get_renko_data(), renko.get_renko_data())
+
+    # Acotado, conserva los últimos max_bricks ladrillos de la misma serie
+    bounded = vRenko(brick_size, max_bricks=50)
+    bounded.calculate_renko(rates[:100])
+    for rate in rates[100:]:
+        bounded.update_renko(rate)
+    assert same_bricks(bounded.get_renko_data(), renko.get_renko_data()[-50:])
+
+
+@pytest.mark.parametrize('price_type, point', [('f8', None), ('f4', None), ('i4', 0.01), ('i8', 0.25)])
+def test_compact_bricks_save_and_load(tmp_path, price_type, point):
+    renko = vRenko(2.5)
+    renko.calculate_renko(make_rates(5_000, seed=4))
+    bricks = renko.get_renko_data()
+
+    compact = renko.get_compact_data(price_type, point)
+    compact.save(str(tmp_path / "bricks.npz"))
+    loaded = CompactBricks.load(str(tmp_path / "bricks.npz"))
+
+    assert loaded.point == point and loaded.data.dtype == CompactBricks.dtype_compact(price_type)
+    assert np.array_equal(loaded.data, compact.data)
+    restored = loaded.to_bricks()
+    assert np.array_equal(restored['time'], bricks['time']) and np.array_equal(restored['type'], bricks['type'])
+    for field in CompactBricks.PRICE_FIELDS:
+        if price_type == 'f8':
+            assert np.array_equal(restored[field], bricks[field])
+        elif price_type == 'f4':
+            np.testing.assert_allclose(restored[field], bricks[field], rtol=1e-6)
+        else:
+            # Con enteros el precio se redondea al punto más cercano
+            np.testing.assert_allclose(restored[field], bricks[field], rtol=0, atol=point / 2)
+    # Una parte conserva el tamaño del punto
+    assert same_bricks(loaded[10:20].to_bricks(), restored[10:20])
+
+
+def test_compact_bricks_price_scale():
+    bricks = np.zeros(3, dtype=vRenko.dtype_renko)
+    bricks['type'] = ['up', 'down', 'up']
+    bricks['close'] = [1.23, 0.07, 34000.01]
+
+    # 1 / 0.01 es un entero: se divide por 100 y el precio es el mismo float que se guardó
+    cents = CompactBricks.from_bricks(bricks, 'i4', point=0.01)
+    assert cents.data['close'].tolist() == [123, 7, 3400001]
+    assert cents['close'].tolist() == [1.23, 0.07, 34000.01]
+    assert cents['type'].tolist() == ['up', 'down', 'up']
+
+    # Con un punto cuyo inverso no es entero se multiplica por el punto
+    thirds = CompactBricks.from_bricks(bricks, 'i8', point=0.3)
+    assert thirds._scale is None
+    np.testing.assert_allclose(thirds['close'], np.rint(bricks['close'] / 0.3) * 0.3)
+
+    with pytest.raises(ValueError):
+        CompactBricks.from_bricks(bricks, 'i4')
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+@pytest.mark.parametrize('utc_times', [False, True])
+def test_calculate_many_matches_calculate_renko_per_size(processes, utc_times):
+    rates = make_rates(10_000, seed=8)
+    brick_sizes = [0.7, 2.5, 5, 10.0]
+    sweep = vRenko.calculate_many(rates, brick_sizes, processes=processes, utc_times=utc_times)
+
+    assert len(sweep) == len(brick_sizes)
+    for index, brick_size in enumerate(brick_sizes):
+        renko = vRenko(brick_size, utc_times=utc_times)
+        renko.calculate_renko(rates)
+        assert same_bricks(sweep[index], renko.get_renko_data())
+        assert same_bricks(sweep.get(brick_size), renko.get_renko_data())
+        assert sweep.counts()[index] == len(renko.get_renko_data())
+    assert [brick_size for brick_size, _ in sweep.items()] == [0.7, 2.5, 5.0, 10.0]
+    assert sweep.get(1.0) is None
+
+
+def test_calculate_many_without_rates():
+    sweep = vRenko.calculate_many(make_rates(0), [1.0, 2.5])
+    assert sweep.counts().tolist() == [0, 0] and len(sweep.get(2.5)) == 0
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+from models.mt5.server_time import ServerTime
+
+HOUR = 3600
+
+
+def utc_seconds(*args) -> int:
+    return int(datetime(*args, tzinfo=pytz.utc).timestamp())
+
+
+# Cambios de horario de Nueva York en 2023, en UTC
+SPRING = utc_seconds(2023, 3, 12, 7)
+FALL = utc_seconds(2023, 11, 5, 6)
+
+
+def test_offsets_follow_the_new_york_transitions():
+    server_time = ServerTime('America/New_York', shift_hours=7)
+    times = np.array([SPRING - 1, SPRING, FALL - 1, FALL])
+    assert server_time.offset_seconds(times).tolist() == [2 * HOUR, 3 * HOUR, 3 * HOUR, 2 * HOUR]
+    assert server_time.offset_period(SPRING) == (3 * HOUR, SPRING, FALL)
+
+
+def test_round_trip_over_2023():
+    server_time = ServerTime('America/New_York', shift_hours=7)
+    utc = np.arange(utc_seconds(2023, 1, 1), utc_seconds(2024, 1, 1), 60, dtype=np.int64)
+    back = server_time.server_to_utc_array(server_time.utc_to_server_array(utc))
+
+    # En la hora repetida de otoño se elige la diferencia anterior al cambio: la segunda pasada de la hora
+    # del servidor vuelve una hora antes
+    repeated = (utc >= FALL) & (utc < FALL + HOUR)
+    assert np.array_equal(back[~repeated], utc[~repeated])
+    assert np.array_equal(back[repeated], utc[repeated] - HOUR)
+
+    # Lo mismo en milisegundos
+    utc_msc = utc * 1000 + 123
+    back_msc = server_time.server_to_utc_array(server_time.utc_to_server_array(utc_msc, unit='ms'), unit='ms')
+    assert np.array_equal(back_msc[~repeated], utc_msc[~repeated])
+
+
+def test_transition_hours_on_the_server_clock():
+    server_time = ServerTime('America/New_York', shift_hours=7)
+    # En primavera el servidor salta de las 09:00 a las 10:00
+    assert server_time.utc_to_server_array(np.array([SPRING - 1, SPRING])).tolist() == [
+        utc_seconds(2023, 3, 12, 8, 59, 59), utc_seconds(2023, 3, 12, 10)]
+    # En otoño las 08:30 del servidor ocurren dos veces; se toma la primera, con la diferencia de verano
+    assert server_time.server_to_utc(datetime(2023, 11, 5, 8, 30, tzinfo=pytz.utc)) == datetime(2023, 11, 5, 5, 30, tzinfo=pytz.utc)
+    assert server_time.server_to_utc(datetime(2023, 11, 5, 9, 30)) == datetime(2023, 11, 5, 7, 30)
@@ -0,0 +1,78 @@
+import math
+import multiprocessing
+
+import pytest
+
+from models.state_store import SymbolStateStore
+
+SYMBOLS = ["US30.cash", "US100.cash", "GER40.cash"]
+
+
+def _child(store: SymbolStateStore, symbols, results):
+    # Corre en un proceso nuevo: lee lo que escribió el padre y escribe su parte
+    state = store["US30.cash"]
+    results.put((state.high, state['low'], state.first_volume, list(symbols), "US100.cash" in store))
+    state.previous_stop_level = 34050.5
+    store.update({"US100.cash": {'symbol': "US100.cash", 'range': 12.25, 'in_hedge': True}})
+    symbols.remove("GER40.cash")
+
+
+@pytest.fixture
+def store():
+    # Bloqueos del contexto spawn, como los que se crean por defecto en Windows
+    context = multiprocessing.get_context('spawn')
+    store = SymbolStateStore(SYMBOLS, create=True, locks=[context.Lock() for _ in SYMBOLS])
+    yield store
+    store.close()
+
+
+def test_spawned_process_shares_the_store(store):
+    store.update({"US30.cash": {'symbol': "US30.cash", 'high': 34100.0, 'low': 34000.0, 'decimals': 2}})
+    symbols = store.symbols()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_child, args=(store, symbols, results))
+    process.start()
+    received = results.get(timeout=30)
+    process.join(timeout=30)
+    assert process.exitcode == 0
+
+    assert received == (34100.0, 34000.0, None, SYMBOLS, False)
+    assert store["US30.cash"].previous_stop_level == 34050.5
+    assert (store["US100.cash"].range, store["US100.cash"].in_hedge) == (12.25, True)
+    assert list(symbols) == ["US30.cash", "US100.cash"]
+
+
+def test_unset_floats_read_as_none(store):
+    store.update({"US30.cash": {'symbol': "US30.cash", 'high': 34100.0}})
+    state = store["US30.cash"]
+    assert state.low is None and state['recovery_range'] is None
+    assert 'high' in state and 'low' not in state
+
+    # Guardar None o NaN deja el campo sin valor
+    state.high = None
+    store.update({"US30.cash": {'low': math.nan}})
+    assert state.to_dict()['high'] is None and state.low is None
+    # Los campos que no son de punto flotante tienen su valor vacío
+    assert (state.decimals, state.in_hedge, state.type) == (0, False, '')
+
+
+def test_symbol_list_membership_follows_the_active_field(store):
+    symbols = store.symbols()
+    assert list(symbols) == SYMBOLS and len(symbols) == 3 and symbols
+    # La lista no depende de que el registro ya tenga datos
+    assert "GER40.cash" in symbols and "GER40.cash" not in store
+
+    symbols.remove("US100.cash")
+    assert "US100.cash" not in symbols and list(symbols) == ["US30.cash", "GER40.cash"]
+    # Otra lista del mismo almacén ve el cambio
+    assert list(store.symbols()) == ["US30.cash", "GER40.cash"]
+    assert store._records['active'].tolist() == [True, False, True]
+    with pytest.raises(ValueError):
+        symbols.remove("US100.cash")
+    assert "EURUSD" not in symbols
+
+    symbols.remove("US30.cash")
+    symbols.remove("GER40.cash")
+    assert not symbols and len(symbols) == 0
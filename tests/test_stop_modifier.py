@@ -0,0 +1,89 @@
+import pytest
+
+from models.mt5.client import MT5Api
+from models.mt5.stop_modifier import StopModifier
+
+SYMBOL = "US30.cash"
+
+
+def stop_requests(mt5):
+    return [call[2] for call in mt5.calls if call[0] == 'order_send' and call[2]['action'] == 6]
+
+
+def refresh(modifier):
+    with MT5Api.session():
+        modifier.refresh(MT5Api.get_positions())
+
+
+@pytest.fixture
+def ticket(mt5):
+    return mt5.add_position(SYMBOL, 0, 0.1, 34000.0, sl=33900.0, tp=34200.0, comment="Breakout:rt 1")
+
+
+def test_requests_on_one_ticket_are_sent_together(mt5, ticket):
+    modifier = StopModifier()
+    refresh(modifier)
+    modifier.request(SYMBOL, ticket, sl=33950.0)
+    modifier.request(SYMBOL, ticket, tp=0.0)
+    # El último pedido reemplaza al pendiente
+    modifier.request(SYMBOL, ticket, sl=33960.0)
+
+    assert modifier.flush() == {ticket: True}
+    sent = stop_requests(mt5)
+    assert len(sent) == 1 and (sent[0]['sl'], sent[0]['tp']) == (33960.0, 0.0)
+    assert (mt5.positions[ticket].sl, mt5.positions[ticket].tp) == (33960.0, 0.0)
+
+
+def test_prices_are_rounded_to_the_tick_size(mt5, ticket):
+    # US30.cash tiene un tick de 0.5
+    modifier = StopModifier()
+    refresh(modifier)
+    modifier.request(SYMBOL, ticket, sl=33950.3)
+    modifier.flush()
+    assert stop_requests(mt5)[-1]['sl'] == 33950.5
+
+    # Un cambio menor a un tick no se envía
+    refresh(modifier)
+    modifier.request(SYMBOL, ticket, sl=33950.6)
+    assert modifier.flush() == {ticket: True}
+    assert len(stop_requests(mt5)) == 1
+
+
+def test_sent_values_are_not_repeated_until_the_snapshot_shows_them(mt5, ticket):
+    modifier = StopModifier()
+    refresh(modifier)
+    modifier.request(SYMBOL, ticket, sl=33950.0)
+    modifier.flush()
+
+    # La foto aún muestra el stop anterior: el mismo pedido no se vuelve a enviar
+    modifier.request(SYMBOL, ticket, sl=33950.0)
+    modifier.flush()
+    assert len(stop_requests(mt5)) == 1
+
+    # Con la foto nueva se compara contra la terminal
+    refresh(modifier)
+    assert not modifier._sent
+    modifier.request(SYMBOL, ticket, sl=33950.0)
+    modifier.flush()
+    assert len(stop_requests(mt5)) == 1
+    modifier.request(SYMBOL, ticket, sl=33980.0)
+    modifier.flush()
+    assert len(stop_requests(mt5)) == 2
+
+
+def test_budget_limits_the_requests_per_period(mt5):
+    tickets = [mt5.add_position(SYMBOL, 0, 0.1, 34000.0, sl=33900.0) for _ in range(3)]
+    modifier = StopModifier(max_requests=2, period=60.0)
+    refresh(modifier)
+    for ticket in tickets:
+        modifier.request(SYMBOL, ticket, sl=33950.0)
+
+    # Solo dos solicitudes entran en el presupuesto; la tercera queda pendiente sin bloquear
+    assert modifier.flush() == {tickets[0]: True, tickets[1]: True}
+    assert modifier.pending() == [tickets[2]]
+    assert modifier.flush() == {}
+
+    # Medio periodo después se recarga una solicitud
+    modifier._refilled -= 30.0
+    assert modifier.flush() == {tickets[2]: True}
+    assert len(stop_requests(mt5)) == 3
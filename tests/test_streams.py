@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from models.mt5.enums import FieldType
+from models.mt5.streams import TickStream
+
+SYMBOL = "US30.cash"
+START = 1_709_557_200_000      # 2024-03-04 13:00:00 en milisegundos
+
+
+class FakeApi:
+    """
+    La parte de MT5Api que usa el flujo, sobre un historial que crece entre consultas.
+    """
+    def __init__(self, offsets):
+        self.history = np.zeros(0, dtype=FieldType.ticks_dtype)
+        self.failing = False
+        self.add(offsets)
+
+    def add(self, offsets):
+        ticks = np.zeros(len(offsets), dtype=FieldType.ticks_dtype)
+        ticks['time_msc'] = START + np.asarray(offsets, dtype=np.int64)
+        ticks['bid'] = 34000.0 + len(self.history) + np.arange(len(offsets))
+        self.history = np.concatenate([self.history, ticks])
+
+    def get_ticks_from_msc(self, symbol, time_msc, count, flags):
+        # Como copy_ticks_from, desde el segundo de time_msc
+        if self.failing:
+            return None
+        return self.history[self.history['time_msc'] >= time_msc // 1000 * 1000][:count]
+
+    def get_symbol_info_tick(self, symbol):
+        return None
+
+    def convert_utc_to_mt5_timezone(self, date):
+        return datetime.fromtimestamp((START + 10_000) / 1000, timezone.utc)
+
+
+def poll_until_idle(stream, api, polls=50):
+    delivered = []
+    for _ in range(polls):
+        ticks = stream.poll(api, SYMBOL)
+        if ticks is not None and ticks.size:
+            delivered.append(ticks)
+    return np.concatenate(delivered) if delivered else np.zeros(0, dtype=FieldType.ticks_dtype)
+
+
+def test_cursor_delivers_each_tick_once_across_repeated_milliseconds():
+    api = FakeApi([0, 100, 100])
+    stream = TickStream([SYMBOL], count=1000, start_msc={SYMBOL: START})
+    stream._init_cursor(api, SYMBOL)
+
+    assert np.array_equal(stream.poll(api, SYMBOL)['bid'], api.history['bid'])
+    assert stream._cursors[SYMBOL] == (START + 100, 2)
+
+    # Llega un tercer tick en el mismo milisegundo del cursor y otros en el mismo segundo
+    api.add([100, 100, 400])
+    new = stream.poll(api, SYMBOL)
+    assert np.array_equal(new['bid'], api.history['bid'][3:])
+    assert stream._cursors[SYMBOL] == (START + 400, 1)
+    # Los ticks del segundo del cursor que ya se entregaron se descartan
+    assert stream.stats[SYMBOL].duplicates == 3
+
+    assert stream.poll(api, SYMBOL).size == 0
+    assert stream.stats[SYMBOL].ticks == len(api.history)
+
+
+def test_query_grows_while_one_second_has_more_ticks_than_count():
+    api = FakeApi(list(range(0, 1000, 100)) + [1500, 2500])
+    stream = TickStream([SYMBOL], count=4, start_msc={SYMBOL: START})
+    stream._init_cursor(api, SYMBOL)
+
+    assert stream.poll(api, SYMBOL).size == 4
+    # La consulta siguiente llega llena con los mismos ticks: se duplica el tamaño
+    assert stream.poll(api, SYMBOL).size == 0
+    assert stream._counts[SYMBOL] == 8
+    assert stream.poll(api, SYMBOL).size == 4
+    # Al avanzar vuelve al tamaño inicial
+    assert stream._counts[SYMBOL] == 4
+
+    delivered = poll_until_idle(stream, api)
+    assert stream.stats[SYMBOL].ticks == len(api.history)
+    assert np.array_equal(delivered['bid'], api.history['bid'][8:])
+
+
+def test_drops_and_lag():
+    api = FakeApi([0, 2000])
+    stream = TickStream([SYMBOL], start_msc={SYMBOL: START})
+    stream._init_cursor(api, SYMBOL)
+
+    api.failing = True
+    assert stream.poll(api, SYMBOL) is None
+    assert (stream.stats[SYMBOL].drops, stream.stats[SYMBOL].polls) == (1, 1)
+    assert stream._cursors[SYMBOL] == (START, 0)
+
+    api.failing = False
+    assert stream.poll(api, SYMBOL).size == 2
+    # La hora del servidor está 10 segundos después del inicio; el último tick, 2 segundos después
+    assert stream.stats[SYMBOL].lag_ms == 8000
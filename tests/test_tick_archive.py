@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from models.mt5.enums import CopyTicks, FieldType, TickFlag
+from models.mt5.tick_archive import TickArchive
+
+SYMBOL = "US30.cash"
+DATE_FROM = datetime(2024, 3, 4, 13, 0, tzinfo=pytz.utc)
+INFO = TickFlag.TICK_FLAG_BID | TickFlag.TICK_FLAG_ASK
+TRADE = TickFlag.TICK_FLAG_LAST | TickFlag.TICK_FLAG_VOLUME
+
+
+def make_ticks(start_msc: int, offsets) -> np.ndarray:
+    ticks = np.zeros(len(offsets), dtype=FieldType.ticks_dtype)
+    ticks['time_msc'] = start_msc + np.asarray(offsets, dtype=np.int64)
+    ticks['time'] = ticks['time_msc'] // 1000
+    ticks['bid'] = 34000.0 + np.arange(len(offsets))
+    # Se alternan ticks de cotización y de operación
+    ticks['flags'] = np.where(np.arange(len(offsets)) % 3 == 2, TRADE, INFO)
+    return ticks
+
+
+@pytest.fixture
+def history(mt5, monkeypatch):
+    # Varios ticks por milisegundo y un segundo con más ticks que los pedidos en cada consulta
+    start = TickArchive._to_server_msc(DATE_FROM)
+    offsets = [0, 0, 0, 250, 250, 1000, 1000, 1000, 1000, 1001, 1002, 1003, 1500, 2000, 2000, 3400, 5000, 5000, 5000, 7000]
+    history = make_ticks(start, offsets)
+
+    def copy_ticks_from(symbol, date_from, count, flags):
+        mt5._record('copy_ticks_from', symbol, date_from, count)
+        return history[history['time_msc'] >= int(date_from) * 1000][:count]
+
+    monkeypatch.setattr(mt5, 'copy_ticks_from', copy_ticks_from)
+    return history
+
+
+def test_backfill_resumes_on_a_millisecond_shared_by_several_ticks(tmp_path, history):
+    archive = TickArchive(str(tmp_path))
+    # El archivo termina con dos de los cuatro ticks del milisegundo 1000
+    archive.append(SYMBOL, history[:7])
+    assert archive.last_msc(SYMBOL) == (int(history['time_msc'][6]), 2)
+
+    date_to = DATE_FROM + timedelta(seconds=10)
+    assert archive.backfill(SYMBOL, DATE_FROM, date_to, count=4) == len(history) - 7
+    stored = archive.get_ticks_range_msc(SYMBOL, 0, TickArchive._to_server_msc(date_to))
+    assert np.array_equal(stored, history)
+
+    # Otra vez no agrega nada
+    assert archive.backfill(SYMBOL, DATE_FROM, date_to, count=4) == 0
+
+
+def test_live_stream_resumes_on_a_millisecond_shared_by_several_ticks(tmp_path, history):
+    archive = TickArchive(str(tmp_path))
+    archive.append(SYMBOL, history[:7])
+    cursor = int(history['time_msc'][6])
+    on_tick = archive._append_new({SYMBOL: cursor})
+
+    # El flujo vuelve a entregar los ticks del cursor, los dos ya archivados llegan en lotes distintos
+    at_cursor = history[history['time_msc'] >= cursor]
+    on_tick(SYMBOL, at_cursor[:1])
+    on_tick(SYMBOL, at_cursor[1:])
+    assert np.array_equal(archive.get_ticks_range_msc(SYMBOL, 0, int(history['time_msc'][-1])), history)
+
+
+def test_ranges_spanning_several_segments(tmp_path, history):
+    archive = TickArchive(str(tmp_path), segment_ticks=6, index_stride=2)
+    archive.append(SYMBOL, history[:9])
+    archive.append(SYMBOL, history[9:])
+    assert len(archive._segments[SYMBOL]) == 4
+
+    # Un lector en otro proceso abre los mismos segmentos
+    reader = TickArchive(str(tmp_path), index_stride=2)
+    times = history['time_msc']
+    for start, end in [(times[0], times[-1]), (times[3], times[12]), (times[5], times[8]), (times[9] + 1, times[15] - 1)]:
+        expected = history[(times >= start) & (times <= end)]
+        assert np.array_equal(reader.get_ticks_range_msc(SYMBOL, int(start), int(end)), expected)
+
+    # locate() coincide con np.searchsorted sobre cada segmento, también en milisegundos repetidos
+    for _, segment in reader._refresh(SYMBOL):
+        values = segment.view()['time_msc']
+        for value in np.unique(np.concatenate([times, times + 1, times - 1])):
+            for side in ('left', 'right'):
+                assert segment.locate(int(value), side=side) == int(np.searchsorted(values, value, side=side))
+
+
+def test_flags_filter_the_ticks(tmp_path, history):
+    archive = TickArchive(str(tmp_path), segment_ticks=8)
+    archive.append(SYMBOL, history)
+    start, end = int(history['time_msc'][0]), int(history['time_msc'][-1])
+
+    trades = archive.get_ticks_range_msc(SYMBOL, start, end, CopyTicks.COPY_TICKS_TRADE)
+    assert np.array_equal(trades, history[history['flags'] == TRADE])
+    info = archive.get_ticks_range_msc(SYMBOL, start, end, CopyTicks.COPY_TICKS_INFO)
+    assert np.array_equal(info, history[history['flags'] == INFO])
+    assert len(archive.get_ticks_range_msc(SYMBOL, start, end, flag_mask=TickFlag.TICK_FLAG_LAST)) == len(trades)
+    assert len(archive.get_ticks_range_msc(SYMBOL, start, end, flag_mask=TickFlag.TICK_FLAG_BUY)) == 0